@@ -1,40 +1,83 @@
 import asyncio
-import base64
-import io
 import os
 import sys
 import traceback
 from dotenv import load_dotenv
-import cv2
-import pyaudio
-import PIL.Image
-import mss
 import argparse
-import math
-import struct
 import time
 
 from google import genai
 from google.genai import types
 
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
 if sys.version_info < (3, 11, 0):
     import taskgroup, exceptiongroup
     asyncio.TaskGroup = taskgroup.TaskGroup
     asyncio.ExceptionGroup = exceptiongroup.ExceptionGroup
 
-from tools import tools_list
-
-FORMAT = pyaudio.paInt16
+from tools import write_file_tool, read_directory_tool, read_file_tool
+from vad import create_vad
+from audio_capture import MicCapture
+from speech_gate import SpeechGate
+from audio_playback import AudioPlayer
+from barge_in import BargeInController
+from echo_canceller import EchoCanceller
+from resampler import native_format
+from realtime_sender import RealtimeAudioSender
+from frame_slot import FrameSlot
+from video_flow import CLIENT_MODE  # Video mode: camera frames pushed by the connected UI (server.py)
+from scene_change import SceneChangeDetector, downscale_gray
+from camera_encoder import CameraEncoder
+from camera_broker import acquire_camera
+from screen_capture import ScreenCapture, stream_to as stream_screen, DEFAULT_TOKEN_BUDGET as SCREEN_TOKEN_BUDGET
+from session_resumption import SessionResumption, compression_config
+from live_standby import HotStandby
+from agent_registry import AgentRegistry, agent_property
+from lazy_import import lazy_attr
+from tool_registry import ToolRegistry, ToolSpec, ToolError, SERIAL
+from tool_executor import ToolExecutor, CONFIRMED, DENIED, TIMED_OUT
+from tool_profiles import ToolGroup, ToolProfiles, CORE, SMART_HOME, GOOGLE_AUTH, GOOGLE_WORKSPACE, N8N, LOCAL_PC, WEBHOOKS, WHATSAPP, PRINTER, YAHOO
+from uplink import UplinkScheduler, AUDIO as UPLINK_AUDIO, AUDIO_END as UPLINK_AUDIO_END
+
+# paInt16, mirrored so this module imports without pyaudio
+FORMAT = pyaudio.paInt16 if pyaudio else 8
 CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
+CHUNK_MS = CHUNK_SIZE / SEND_SAMPLE_RATE * 1000
+UPLINK_PREROLL_MS = 300
+BARGE_IN_CONFIRM_MS = 120
+# Largest coalesced audio send; bounds the latency added by batching
+UPLINK_LATENCY_BUDGET_MS = 100
+# Speech kept while the Live session is reconnecting, flushed to the next session
+UPLINK_RECONNECT_BUFFER_MS = 10000
+# Vision uplink: send frames on scene change, at most this often, plus periodic keyframes
+VISION_MIN_INTERVAL_S = 1.0
+VISION_KEYFRAME_S = 30.0
+# Unanswered tool confirmations count as denied after this long
+TOOL_CONFIRMATION_TIMEOUT_S = 60.0
+# Tool responses for a session that closed wait this long for the resumed session
+TOOL_RESPONSE_RESUME_WAIT_S = 15.0
+
 
 MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
 DEFAULT_MODE = "camera"
 
 load_dotenv()
-client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
+_client = None
+
+
+def get_client() -> genai.Client:
+    """The Gemini client, created on first use instead of at import."""
+    global _client
+    if _client is None:
+        _client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
 
 
 
@@ -427,32 +470,6 @@ google_create_presentation_tool = {
     }
 }
 
-# Google Workspace tools list
-google_workspace_tools = [
-    google_authenticate_tool,
-    google_list_events_tool,
-    google_create_event_tool,
-    google_delete_event_tool,
-    google_read_spreadsheet_tool,
-    google_write_spreadsheet_tool,
-    google_append_spreadsheet_tool,
-    google_create_spreadsheet_tool,
-    google_add_sheet_tool,
-    google_delete_sheet_tool,
-    google_list_drive_files_tool,
-    google_upload_to_drive_tool,
-    google_download_from_drive_tool,
-    google_create_drive_folder_tool,
-    google_send_email_tool,
-    google_list_emails_tool,
-    google_read_email_tool,
-    google_create_document_tool,
-    google_read_document_tool,
-    google_append_document_tool,
-    google_create_form_tool,
-    google_create_presentation_tool,
-]
-
 
 # ==================== N8N MCP TOOLS ====================
 
@@ -511,15 +528,6 @@ n8n_get_workflow_info_tool = {
     }
 }
 
-# n8n MCP tools list
-n8n_mcp_tools = [
-    n8n_connect_tool,
-    n8n_list_workflows_tool,
-    n8n_search_workflows_tool,
-    n8n_execute_workflow_tool,
-    n8n_get_workflow_info_tool,
-]
-
 # ==================== LOCAL PC TOOLS ====================
 
 pc_create_file_tool = {
@@ -613,17 +621,6 @@ pc_search_files_tool = {
     }
 }
 
-# Local PC tools list
-local_pc_tools = [
-    pc_create_file_tool,
-    pc_read_file_tool,
-    pc_write_file_tool,
-    pc_list_folder_tool,
-    pc_create_folder_tool,
-    pc_open_app_tool,
-    pc_search_files_tool,
-]
-
 # ==================== WEBHOOK TOOLS ====================
 
 webhook_send_tool = {
@@ -663,13 +660,6 @@ webhook_list_tool = {
     }
 }
 
-# Webhook tools list
-webhook_tools = [
-    webhook_send_tool,
-    webhook_send_saved_tool,
-    webhook_list_tool,
-]
-
 # ==================== WHATSAPP TOOLS ====================
 
 wa_send_message_tool = {
@@ -695,12 +685,6 @@ wa_check_status_tool = {
     }
 }
 
-# WhatsApp tools list
-whatsapp_tools = [
-    wa_send_message_tool,
-    wa_check_status_tool,
-]
-
 # ==================== DOCUMENT PRINTER TOOLS ====================
 
 doc_list_printers_tool = {
@@ -752,14 +736,6 @@ doc_printer_status_tool = {
     }
 }
 
-# Document printer tools list
-document_printer_tools = [
-    doc_list_printers_tool,
-    doc_print_file_tool,
-    doc_print_text_tool,
-    doc_printer_status_tool,
-]
-
 # ==================== YAHOO MAIL TOOLS ====================
 
 yahoo_send_email_tool = {
@@ -788,13 +764,107 @@ yahoo_list_emails_tool = {
     }
 }
 
-# Yahoo Mail tools list
-yahoo_mail_tools = [
-    yahoo_send_email_tool,
-    yahoo_list_emails_tool,
-]
-
-tools = [{'google_search': {}}, {"function_declarations": [run_web_agent, create_project_tool, switch_project_tool, list_projects_tool, list_smart_devices_tool, control_light_tool] + google_workspace_tools + n8n_mcp_tools + local_pc_tools + webhook_tools + whatsapp_tools + document_printer_tools + yahoo_mail_tools + tools_list[0]['function_declarations'][1:]}]
+# ==================== TOOL TABLE ====================
+
+# Every tool: declaration, AudioLoop handler, group, timeout and concurrency (see tool_registry).
+# Declarations and dispatch both come from this table.
+# Tools with side effects (sending, creating, deleting, launching) are SERIAL:
+# within one agent they run one at a time, in the order the model asked
+TOOLS = ToolRegistry([
+    # Browser, projects, project files (file tools report back with a System Notification)
+    ToolSpec(run_web_agent, "handle_web_agent_request", CORE, concurrency=SERIAL, background="Web Navigation started. Do not reply to this message."),
+    ToolSpec(create_project_tool, "handle_create_project", CORE, timeout=10, concurrency=SERIAL),
+    ToolSpec(switch_project_tool, "handle_switch_project", CORE, timeout=10, concurrency=SERIAL),
+    ToolSpec(list_projects_tool, "handle_list_projects", CORE, timeout=10),
+    ToolSpec(write_file_tool, "handle_write_file", CORE, concurrency=SERIAL, background="Writing file..."),
+    ToolSpec(read_directory_tool, "handle_read_directory", CORE, background="Reading directory..."),
+    ToolSpec(read_file_tool, "handle_read_file", CORE, background="Reading file..."),
+    # Smart home
+    ToolSpec(list_smart_devices_tool, "handle_list_smart_devices", SMART_HOME, timeout=10),
+    ToolSpec(control_light_tool, "handle_control_light", SMART_HOME, timeout=20, concurrency=SERIAL),
+    # Google Workspace (sign-in waits for the user in the browser)
+    ToolSpec(google_authenticate_tool, "handle_google_authenticate", GOOGLE_AUTH, timeout=None, concurrency=SERIAL),
+    ToolSpec(google_list_events_tool, "handle_google_list_events", GOOGLE_WORKSPACE, timeout=60),
+    ToolSpec(google_create_event_tool, "handle_google_create_event", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_delete_event_tool, "handle_google_delete_event", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_read_spreadsheet_tool, "handle_google_read_spreadsheet", GOOGLE_WORKSPACE, timeout=60),
+    ToolSpec(google_write_spreadsheet_tool, "handle_google_write_spreadsheet", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_append_spreadsheet_tool, "handle_google_append_spreadsheet", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_create_spreadsheet_tool, "handle_google_create_spreadsheet", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_add_sheet_tool, "handle_google_add_sheet", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_delete_sheet_tool, "handle_google_delete_sheet", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_list_drive_files_tool, "handle_google_list_drive_files", GOOGLE_WORKSPACE, timeout=60),
+    ToolSpec(google_upload_to_drive_tool, "handle_google_upload_to_drive", GOOGLE_WORKSPACE, timeout=300, concurrency=SERIAL),
+    ToolSpec(google_download_from_drive_tool, "handle_google_download_from_drive", GOOGLE_WORKSPACE, timeout=300, concurrency=SERIAL),
+    ToolSpec(google_create_drive_folder_tool, "handle_google_create_drive_folder", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_send_email_tool, "handle_google_send_email", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_list_emails_tool, "handle_google_list_emails", GOOGLE_WORKSPACE, timeout=60),
+    ToolSpec(google_read_email_tool, "handle_google_read_email", GOOGLE_WORKSPACE, timeout=60),
+    ToolSpec(google_create_document_tool, "handle_google_create_document", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_read_document_tool, "handle_google_read_document", GOOGLE_WORKSPACE, timeout=60),
+    ToolSpec(google_append_document_tool, "handle_google_append_document", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_create_form_tool, "handle_google_create_form", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    ToolSpec(google_create_presentation_tool, "handle_google_create_presentation", GOOGLE_WORKSPACE, timeout=60, concurrency=SERIAL),
+    # n8n workflows
+    ToolSpec(n8n_connect_tool, "handle_n8n_connect", N8N, concurrency=SERIAL),
+    ToolSpec(n8n_list_workflows_tool, "handle_n8n_list_workflows", N8N),
+    ToolSpec(n8n_search_workflows_tool, "handle_n8n_search_workflows", N8N),
+    ToolSpec(n8n_execute_workflow_tool, "handle_n8n_execute_workflow", N8N, timeout=300, concurrency=SERIAL),
+    ToolSpec(n8n_get_workflow_info_tool, "handle_n8n_get_workflow_info", N8N),
+    # Local PC
+    ToolSpec(pc_create_file_tool, "handle_pc_create_file", LOCAL_PC, concurrency=SERIAL),
+    ToolSpec(pc_read_file_tool, "handle_pc_read_file", LOCAL_PC),
+    ToolSpec(pc_write_file_tool, "handle_pc_write_file", LOCAL_PC, concurrency=SERIAL),
+    ToolSpec(pc_list_folder_tool, "handle_pc_list_folder", LOCAL_PC),
+    ToolSpec(pc_create_folder_tool, "handle_pc_create_folder", LOCAL_PC, concurrency=SERIAL),
+    ToolSpec(pc_open_app_tool, "handle_pc_open_app", LOCAL_PC, concurrency=SERIAL),
+    ToolSpec(pc_search_files_tool, "handle_pc_search_files", LOCAL_PC, timeout=120),
+    # Webhooks, WhatsApp
+    ToolSpec(webhook_send_tool, "handle_webhook_send", WEBHOOKS, concurrency=SERIAL),
+    ToolSpec(webhook_send_saved_tool, "handle_webhook_send_saved", WEBHOOKS, concurrency=SERIAL),
+    ToolSpec(webhook_list_tool, "handle_webhook_list", WEBHOOKS),
+    ToolSpec(wa_send_message_tool, "handle_wa_send_message", WHATSAPP, concurrency=SERIAL),
+    ToolSpec(wa_check_status_tool, "handle_wa_check_status", WHATSAPP),
+    # Printing
+    ToolSpec(doc_list_printers_tool, "handle_doc_list_printers", PRINTER),
+    ToolSpec(doc_print_file_tool, "handle_doc_print_file", PRINTER, timeout=60, concurrency=SERIAL),
+    ToolSpec(doc_print_text_tool, "handle_doc_print_text", PRINTER, timeout=60, concurrency=SERIAL),
+    ToolSpec(doc_printer_status_tool, "handle_doc_printer_status", PRINTER),
+    # Yahoo Mail
+    ToolSpec(yahoo_send_email_tool, "handle_yahoo_send_email", YAHOO, timeout=60, concurrency=SERIAL),
+    ToolSpec(yahoo_list_emails_tool, "handle_yahoo_list_emails", YAHOO, timeout=60),
+])
+
+core_tools = TOOLS.declarations(CORE)
+smart_home_tools = TOOLS.declarations(SMART_HOME)
+
+# Full set; each session declares only the groups AudioLoop.tool_profiles selects
+tools = [{'google_search': {}}, {"function_declarations": TOOLS.declarations()}]
+
+
+
+def _google_signed_in(agents):
+    # Before the agent exists (it loads and may refresh credentials) look for the saved token
+    agent = agents.peek("google_workspace")
+    return agent.is_authenticated() if agent is not None else has_saved_credentials()
+
+
+def tool_groups(agents):
+    """Declarations per agent, with the checks that leave out agents that are not configured."""
+    return [
+        ToolGroup(CORE, core_tools),
+        ToolGroup(SMART_HOME, smart_home_tools),
+        # Sign-in is offered until it succeeds; the Workspace tools only after it
+        ToolGroup(GOOGLE_AUTH, TOOLS.declarations(GOOGLE_AUTH), lambda: not _google_signed_in(agents)),
+        ToolGroup(GOOGLE_WORKSPACE, TOOLS.declarations(GOOGLE_WORKSPACE), lambda: _google_signed_in(agents)),
+        # n8n and Yahoo read their configuration from the environment; creating them is cheap
+        ToolGroup(N8N, TOOLS.declarations(N8N), lambda: agents.get("n8n").is_configured),
+        ToolGroup(LOCAL_PC, TOOLS.declarations(LOCAL_PC)),
+        ToolGroup(WEBHOOKS, TOOLS.declarations(WEBHOOKS)),
+        ToolGroup(WHATSAPP, TOOLS.declarations(WHATSAPP)),
+        ToolGroup(PRINTER, TOOLS.declarations(PRINTER)),
+        ToolGroup(YAHOO, TOOLS.declarations(YAHOO), lambda: bool(agents.get("yahoo").email_address and agents.get("yahoo").password)),
+    ]
 
 
 # --- CONFIG UPDATE: Enabled Transcription ---
@@ -818,22 +888,46 @@ config = types.LiveConnectConfig(
     )
 )
 
-pya = pyaudio.PyAudio()
+_pya = None
+
 
+def get_pya():
+    """The PortAudio instance; opened (and devices enumerated) when AudioLoop first needs it."""
+    global _pya
+    if _pya is None:
+        if pyaudio is None:
+            raise RuntimeError("pyaudio is not installed")
+        _pya = pyaudio.PyAudio()
+    return _pya
 
-from web_agent import WebAgent
-from kasa_agent import KasaAgent
 
-from google_workspace_agent import get_workspace_agent
-from n8n_mcp_agent import get_n8n_agent
-from local_pc_agent import get_local_pc_agent
-from webhook_agent import get_webhook_agent
-from whatsapp_agent import get_whatsapp_agent
-from document_printer_agent import get_document_printer_agent
-from yahoo_mail_agent import get_yahoo_agent
+from google_workspace_agent import has_saved_credentials
+
+# Agent modules (playwright, python-kasa, Google API client, aiohttp) are imported when
+# AgentRegistry first creates the agent, not with this module
+WebAgent = lazy_attr("web_agent", "WebAgent")
+KasaAgent = lazy_attr("kasa_agent", "KasaAgent")
+get_workspace_agent = lazy_attr("google_workspace_agent", "get_workspace_agent")
+get_n8n_agent = lazy_attr("n8n_mcp_agent", "get_n8n_agent")
+get_local_pc_agent = lazy_attr("local_pc_agent", "get_local_pc_agent")
+get_webhook_agent = lazy_attr("webhook_agent", "get_webhook_agent")
+get_whatsapp_agent = lazy_attr("whatsapp_agent", "get_whatsapp_agent")
+get_document_printer_agent = lazy_attr("document_printer_agent", "get_document_printer_agent")
+get_yahoo_agent = lazy_attr("yahoo_mail_agent", "get_yahoo_agent")
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None):
+    # Resolved from self.agents on first access
+    web_agent = agent_property("web")
+    kasa_agent = agent_property("kasa")
+    google_workspace_agent = agent_property("google_workspace")
+    n8n_mcp_agent = agent_property("n8n")
+    yahoo_mail_agent = agent_property("yahoo")
+    local_pc_agent = agent_property("local_pc")
+    webhook_agent = agent_property("webhook")
+    whatsapp_agent = agent_property("whatsapp")
+    document_printer_agent = agent_property("document_printer")
+
+    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None, vad=None, silence_suppression=True, preroll_ms=UPLINK_PREROLL_MS, barge_in_enabled=True, barge_in_confirm_ms=BARGE_IN_CONFIRM_MS, echo_cancellation=True, native_audio_rate=True, scene_min_interval=VISION_MIN_INTERVAL_S, scene_keyframe_s=VISION_KEYFRAME_S, screen_monitor=1, screen_region=None, screen_fps=1.0, screen_token_budget=SCREEN_TOKEN_BUDGET, camera_width=1280, camera_height=720, camera_max_size=1024, camera_target_kb=60, session_resumption=True, compression_trigger_tokens=None, compression_target_tokens=None, hot_standby=False, reconnect_buffer_ms=UPLINK_RECONNECT_BUFFER_MS, tool_profiles=None, confirmation_timeout=TOOL_CONFIRMATION_TIMEOUT_S):
         self.video_mode = video_mode
         self.on_audio_data = on_audio_data
         self.on_video_frame = on_video_frame
@@ -850,8 +944,6 @@ class AudioLoop:
         self.input_device_name = input_device_name
         self.output_device_index = output_device_index
 
-        self.audio_in_queue = None
-        self.out_queue = None
         self.paused = False
 
         self.chat_buffer = {"sender": None, "text": ""} # For aggregating chunks
@@ -860,38 +952,102 @@ class AudioLoop:
         self._last_input_transcription = ""
         self._last_output_transcription = ""
 
-        self.audio_in_queue = None
-        self.out_queue = None
-        self.paused = False
+        # Priority uplink (audio before frames, no blocking puts); created once per run() and
+        # kept across reconnects, buffering up to reconnect_buffer_ms of speech while disconnected
+        self.uplink = None
+        self.reconnect_buffer_ms = reconnect_buffer_ms
+        self.audio_sender = None
+        # Set while running, cleared while paused; capture/video tasks await it instead of polling
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
 
         self.session = None
+        self.mic_capture = None
+        # Open devices at their own rate and resample internally (USB/Bluetooth headsets)
+        self.native_audio_rate = native_audio_rate
+        output_rate, output_channels = RECEIVE_SAMPLE_RATE, CHANNELS
+        if native_audio_rate:
+            output_rate, output_channels = native_format(
+                get_pya(), output_device_index, output=True, fallback_rate=RECEIVE_SAMPLE_RATE, channels=CHANNELS
+            )
+        # Echo cancellation: playback is the reference, applied to every mic chunk
+        self.echo_canceller = EchoCanceller(
+            sample_rate=SEND_SAMPLE_RATE,
+            reference_rate=output_rate,
+            reference_channels=output_channels,
+            enabled=echo_cancellation,
+        )
+        # Model audio playback (bounded jitter buffer + PortAudio callback stream)
+        self.audio_player = AudioPlayer(
+            get_pya(),
+            rate=RECEIVE_SAMPLE_RATE,
+            channels=CHANNELS,
+            output_device_index=output_device_index,
+            on_output=self.echo_canceller.push_reference,
+            device_rate=output_rate,
+            device_channels=output_channels,
+        )
+        # Local barge-in: duck/flush playback from the capture-side VAD
+        self.barge_in = BargeInController(
+            self.audio_player,
+            confirm_ms=barge_in_confirm_ms,
+            enabled=barge_in_enabled,
+        )
         
-        # Create CadAgent with thought callback
-        self.web_agent = WebAgent()
-        self.kasa_agent = kasa_agent if kasa_agent else KasaAgent()
-        self.google_workspace_agent = get_workspace_agent()
-        self.n8n_mcp_agent = get_n8n_agent()
-        print("[SERVER] Startup: Initializing Yahoo Mail Agent...")
-        self.yahoo_mail_agent = get_yahoo_agent()
-        self.local_pc_agent = get_local_pc_agent()
-        self.webhook_agent = get_webhook_agent()
-        self.whatsapp_agent = get_whatsapp_agent()
-        self.document_printer_agent = get_document_printer_agent()
-        self.document_printer_agent = get_document_printer_agent()
+        # Agents are created on first use; the expensive ones are warmed once the session is live
+        self.agents = AgentRegistry()
+        self.agents.register("web", WebAgent, warm=True)
+        self.agents.register("kasa", lambda: kasa_agent if kasa_agent else KasaAgent())
+        self.agents.register("google_workspace", get_workspace_agent, warm=True)
+        self.agents.register("n8n", get_n8n_agent)
+        self.agents.register("yahoo", get_yahoo_agent)
+        self.agents.register("local_pc", get_local_pc_agent)
+        self.agents.register("webhook", get_webhook_agent, warm=True, warmup=lambda agent: agent._get_session())
+        self.agents.register("whatsapp", get_whatsapp_agent, warm=True, warmup=lambda agent: agent._get_session())
+        self.agents.register("document_printer", get_document_printer_agent)
+
+        # Tool dispatch table (handlers resolved and checked against their schemas once)
+        self.tool_registry = TOOLS.bind(self)
+        # Per-session tool declarations: selected profiles, minus agents that are not configured
+        self.tool_profiles = ToolProfiles(tool_groups(self.agents), profiles=tool_profiles, builtin_tools=[{'google_search': {}}])
 
         self.send_text_task = None
         self.stop_event = asyncio.Event()
-        
-        self.stop_event = asyncio.Event()
-        
+
         self.permissions = {} # Default Empty (Will treat unset as True)
         self._pending_confirmations = {}
-
-        # Video buffering state
-        self._latest_image_payload = None
+        self.confirmation_timeout = confirmation_timeout
+        # Runs tool calls (and their confirmations) so receive_audio never waits on them
+        self.tool_executor = ToolExecutor(self._handle_function_calls, resumed_session=self._resumed_session)
+
+        # Latest camera/screen frame: raw bytes, checked for a scene change and
+        # encoded only when sent on speech onset
+        self.frame_slot = FrameSlot(scene_detector=SceneChangeDetector(min_interval=0.0, keyframe_period=scene_keyframe_s))
+        # Camera mode: only frames that differ from the last one sent go to the uplink
+        self.scene_detector = SceneChangeDetector(min_interval=scene_min_interval, keyframe_period=scene_keyframe_s)
+        # Camera mode: device-side resolution, reused resize buffer, adaptive JPEG quality
+        self.camera_size = (camera_width, camera_height)
+        self.camera_encoder = CameraEncoder(max_size=camera_max_size, target_bytes=camera_target_kb * 1024 if camera_target_kb else None)
+        # Screen mode: threaded mss capture, sends only dirty screens or on speech onset
+        self.screen_capture = None
+        if video_mode == "screen":
+            self.screen_capture = ScreenCapture(
+                monitor=screen_monitor,
+                region=screen_region,
+                fps=screen_fps,
+                token_budget=screen_token_budget,
+                keyframe_period=scene_keyframe_s,
+            )
         # VAD State
+        self.vad = vad if vad else create_vad("energy", sample_rate=SEND_SAMPLE_RATE)
         self._is_speaking = False
-        self._silence_start_time = None
+        # Uplink silence suppression
+        self.speech_gate = SpeechGate(
+            sample_rate=SEND_SAMPLE_RATE,
+            chunk_size=CHUNK_SIZE,
+            preroll_ms=preroll_ms,
+            enabled=silence_suppression,
+        )
         
         # Initialize ProjectManager
         from project_manager import ProjectManager
@@ -901,6 +1057,29 @@ class AudioLoop:
         # If ada.py is in backend/, project root is one up
         project_root = os.path.dirname(current_dir)
         self.project_manager = ProjectManager(project_root)
+
+        # Reconnects resume the server-side session (handle kept per project);
+        # sliding-window compression keeps long sessions under the context limit
+        self.resumption = SessionResumption(
+            project_path=self.project_manager.get_current_project_path,
+            enabled=session_resumption,
+            compression=compression_config(compression_trigger_tokens, compression_target_tokens),
+        )
+        self._go_away = False
+        # Bumped when a session starts without the previous one's context (fresh or
+        # replayed); a resumed session continues the conversation and its tool calls
+        self._conversation = 0
+        self._session_ready = asyncio.Event()
+        # Tool set changed mid-turn; redeclared (reconnect) at the end of the turn
+        self._tools_stale = False
+        self._in_turn = False
+        # Optional warm second session: when a failed session cannot be resumed,
+        # only the network tasks move to it
+        self.standby = None
+        if hot_standby:
+            self.standby = HotStandby(
+                lambda: get_client().aio.live.connect(model=MODEL, config=self.resumption.config_for(self._session_config()))
+            )
         
         # Sync Initial Project State
         if self.on_project_update:
@@ -909,6 +1088,46 @@ class AudioLoop:
             # We will handle this by calling it in run() or just print for now.
             pass
 
+    def _session_config(self):
+        """LiveConnectConfig for the next (re)connect, with the current tool set."""
+        return self.tool_profiles.config_for(config)
+
+    def set_tool_profiles(self, profiles):
+        self.tool_profiles.set_profiles(profiles)
+        self.refresh_tools()
+
+    def refresh_tools(self):
+        """
+        Reconnect if the declared tool set is out of date (e.g. after Google sign-in).
+        The session is resumed with its handle, so only the declarations change.
+        While a model turn or tool call is in progress the reconnect waits for
+        the end of the turn, so tool responses and replies reach the session.
+        """
+        if not self.tool_profiles.changed():
+            return False
+        self._tools_stale = True
+        if self._in_turn or self.tool_executor.in_flight:
+            print(f"[ADA DEBUG] [TOOLS] Tool set changed; redeclaring after the current turn.")
+        else:
+            self._apply_tool_refresh()
+        return True
+
+    def _apply_tool_refresh(self):
+        """Reconnect with the current tool set if refresh_tools() marked it stale."""
+        if not self._tools_stale:
+            return
+        self._tools_stale = False
+        if not self.tool_profiles.changed():
+            # Another reconnect (e.g. GoAway) already declared the new set
+            return
+        print(f"[ADA DEBUG] [TOOLS] Tool set changed; reconnecting to redeclare tools.")
+        if self.standby:
+            self.standby.invalidate()
+        if self.session is not None:
+            # Planned reconnect: no backoff, like a GoAway
+            self._go_away = True
+            asyncio.create_task(self.session.close())
+
     def flush_chat(self):
         """Forces the current chat buffer to be written to log."""
         if self.chat_buffer["sender"] and self.chat_buffer["text"].strip():
@@ -924,6 +1143,36 @@ class AudioLoop:
 
     def set_paused(self, paused):
         self.paused = paused
+        if paused:
+            self._resume_event.clear()
+        else:
+            self._resume_event.set()
+
+    def get_vision_state(self):
+        """What client video flow control needs: is the model listening, who is talking, what a frame costs."""
+        return {
+            "session": self.uplink is not None and self.uplink.connected,
+            "paused": self.paused,
+            "user_speaking": self._is_speaking,
+            "model_speaking": self.audio_player.is_playing,
+            "video_mode": self.video_mode,
+            "frame_cost_s": self.frame_slot.take_seconds,
+        }
+
+    async def _pause_capture(self):
+        """Stops the mic while paused and restarts it once resumed."""
+        if self.speech_gate.close_stream() and self.uplink:
+            # Cut off mid-utterance: let the server close the audio stream now
+            self.uplink.put_audio_end()
+        self._is_speaking = False
+
+        await asyncio.to_thread(self.mic_capture.pause)
+        print("[ADA DEBUG] [AUDIO] Microphone paused.")
+        await self._resume_event.wait()
+        await asyncio.to_thread(self.mic_capture.resume)
+        print("[ADA DEBUG] [AUDIO] Microphone resumed.")
+        self.vad.reset()
+        self.speech_gate.reset()
 
     def stop(self):
         self.stop_event.set()
@@ -940,48 +1189,86 @@ class AudioLoop:
         else:
             print(f"[ADA DEBUG] [WARN] Confirmation Request {request_id} not found in pending dict. Keys: {list(self._pending_confirmations.keys())}")
 
-    def clear_audio_queue(self):
-        """Clears the queue of pending audio chunks to stop playback immediately."""
-        try:
-            count = 0
-            while not self.audio_in_queue.empty():
-                self.audio_in_queue.get_nowait()
-                count += 1
-            if count > 0:
-                print(f"[ADA DEBUG] [AUDIO] Cleared {count} chunks from playback queue due to interruption.")
-        except Exception as e:
-            print(f"[ADA DEBUG] [ERR] Failed to clear audio queue: {e}")
+    def get_pipeline_stats(self):
+        """Snapshot of the audio/uplink pipeline counters (depths, drops, latencies)."""
+        return {
+            "capture": self.mic_capture.get_stats() if self.mic_capture else None,
+            "speech_gate": self.speech_gate.get_stats(),
+            "uplink": self.uplink.get_stats() if self.uplink else None,
+            "sender": self.audio_sender.get_stats() if self.audio_sender else None,
+            "playback": self.audio_player.get_stats(),
+            "barge_in": self.barge_in.get_stats(),
+            "echo_canceller": self.echo_canceller.get_stats(),
+            "frames": self.frame_slot.get_stats(),
+            "session": self.resumption.get_stats(),
+            "standby": self.standby.get_stats() if self.standby else None,
+            "tools": self.tool_profiles.get_stats(),
+            "tool_calls": self.tool_registry.get_stats(),
+            "tool_executor": self.tool_executor.get_stats(),
+            "agents": self.agents.get_stats(),
+        }
 
-    async def send_frame(self, frame_data):
-        # Update the latest frame payload
-        if isinstance(frame_data, bytes):
-            b64_data = base64.b64encode(frame_data).decode('utf-8')
+    def clear_audio_queue(self):
+        """Flushes the playback jitter buffer to stop playback immediately."""
+        dropped = self.audio_player.flush()
+        if dropped > 0:
+            print(f"[ADA DEBUG] [AUDIO] Flushed {dropped / self.audio_player.bytes_per_ms:.0f} ms from playback buffer due to interruption.")
+
+    def _send_onset_frame(self):
+        """Speech onset: send ONE frame, unless the scene is unchanged since the last one sent."""
+        if self.screen_capture is not None:
+            # Screen mode: the capture thread grabs and sends the current screen now;
+            # frames pushed by the client are not used, so they are not decoded either
+            self.screen_capture.request_frame()
+        elif self.video_mode != CLIENT_MODE:
+            # Camera mode sends from get_frames on scene change; "none" sends no video
+            return
+        elif payload := (self.frame_slot.take() if self.uplink else None):
+            self.uplink.put_frame(payload)
+        elif self.frame_slot.has_frame:
+            print(f"[ADA DEBUG] [VAD] Scene unchanged since last frame sent. Skipping.")
         else:
-            b64_data = frame_data 
+            print(f"[ADA DEBUG] [VAD] No video frame available to send.")
 
-        # Store as the designated "next frame to send"
-        self._latest_image_payload = {"mime_type": "image/jpeg", "data": b64_data}
-        # No event signal needed - listen_audio pulls it
+    async def send_frame(self, frame_data):
+        # Store as the designated "next frame to send"; encoding happens only if
+        # listen_audio (speech onset) or a text turn actually sends it
+        if self.video_mode == CLIENT_MODE:
+            self.frame_slot.update(frame_data)
 
     async def send_realtime(self):
+        uplink = self.uplink
+        sender = self.audio_sender = RealtimeAudioSender(self.session, sample_rate=SEND_SAMPLE_RATE)
         while True:
-            msg = await self.out_queue.get()
-            await self.session.send(input=msg, end_of_turn=False)
+            item = await uplink.get()
+            started = time.perf_counter()
+            try:
+                if item.kind == UPLINK_AUDIO_END:
+                    await sender.send_audio_end()
+                elif item.kind == UPLINK_AUDIO:
+                    await sender.send_audio(item.payload)
+                else:
+                    await self.session.send(input=item.payload, end_of_turn=False)
+            except BaseException:
+                # Session died mid-send: keep the item for the next session
+                uplink.requeue(item)
+                raise
+            uplink.record_send(item, time.perf_counter() - started)
 
     async def listen_audio(self):
-        mic_info = pya.get_default_input_device_info()
+        mic_info = get_pya().get_default_input_device_info()
 
         # Resolve Input Device by Name if provided
         resolved_input_device_index = None
         
         if self.input_device_name:
             print(f"[ADA] Attempting to find input device matching: '{self.input_device_name}'")
-            count = pya.get_device_count()
+            count = get_pya().get_device_count()
             best_match = None
             
             for i in range(count):
                 try:
-                    info = pya.get_device_info_by_index(i)
+                    info = get_pya().get_device_info_by_index(i)
                     if info['maxInputChannels'] > 0:
                         name = info.get('name', '')
                         # Simple case-insensitive check
@@ -1011,79 +1298,75 @@ class AudioLoop:
         if resolved_input_device_index is None:
              print("[ADA] Using Default Input Device")
 
-        try:
-            self.audio_stream = await asyncio.to_thread(
-                pya.open,
-                format=FORMAT,
-                channels=CHANNELS,
-                rate=SEND_SAMPLE_RATE,
-                input=True,
-                input_device_index=resolved_input_device_index if resolved_input_device_index is not None else mic_info["index"],
-                frames_per_buffer=CHUNK_SIZE,
+        input_index = resolved_input_device_index if resolved_input_device_index is not None else mic_info["index"]
+        input_rate, input_channels = SEND_SAMPLE_RATE, CHANNELS
+        if self.native_audio_rate:
+            input_rate, input_channels = native_format(
+                get_pya(), input_index, fallback_rate=SEND_SAMPLE_RATE, channels=CHANNELS
             )
+        self.mic_capture = MicCapture(
+            get_pya(),
+            rate=SEND_SAMPLE_RATE,
+            channels=CHANNELS,
+            chunk_size=CHUNK_SIZE,
+            input_device_index=input_index,
+            device_rate=input_rate,
+            device_channels=input_channels,
+        )
+        try:
+            await self.mic_capture.open()
         except OSError as e:
             print(f"[ADA] [ERR] Failed to open audio input stream: {e}")
             print("[ADA] [WARN] Audio features will be disabled. Please check microphone permissions.")
+            self.mic_capture = None
             return
 
-        if __debug__:
-            kwargs = {"exception_on_overflow": False}
-        else:
-            kwargs = {}
-        
-        # VAD Constants
-        VAD_THRESHOLD = 800 # Adj based on mic sensitivity (800 is conservative for 16-bit)
-        SILENCE_DURATION = 0.5 # Seconds of silence to consider "done speaking"
+        # Fresh noise floor for the (possibly different) device
+        self.vad.reset()
+        self.speech_gate.reset()
+        # Echo arrives roughly one input + one output latency after it is queued
+        self.echo_canceller.reset()
+        self.echo_canceller.set_delay_ms((self.mic_capture.latency + self.audio_player.latency) * 1000)
         
         while True:
             if self.paused:
-                await asyncio.sleep(0.1)
+                await self._pause_capture()
                 continue
 
             try:
-                data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
+                # Zero-copy view into the capture ring, valid until the next read
+                chunk = await self.mic_capture.read()
                 
-                # 1. Send Audio
-                if self.out_queue:
-                    await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+                # Remove our own playback from the mic (in place in the ring slot)
+                chunk = self.echo_canceller.process(chunk)
                 
-                # 2. VAD Logic for Video
-                # rms = audioop.rms(data, 2)
-                # Replacement for audioop.rms(data, 2)
-                count = len(data) // 2
-                if count > 0:
-                    shorts = struct.unpack(f"<{count}h", data)
-                    sum_squares = sum(s**2 for s in shorts)
-                    rms = int(math.sqrt(sum_squares / count))
-                else:
-                    rms = 0
+                vad_result = self.vad.process(chunk)
+                
+                # 1. Send Audio: speech plus pre-roll only, then an explicit end-of-stream
+                to_send, stream_end = self.speech_gate.process(chunk, vad_result)
+                if self.uplink:
+                    for pcm in to_send:
+                        self.uplink.put_audio(pcm)
+                    if stream_end:
+                        self.uplink.put_audio_end()
+                
+                # 2. Local barge-in (ducks within one chunk, flushes once confirmed)
+                action = self.barge_in.process(vad_result, CHUNK_MS, self.mic_capture.last_chunk_time)
+                if action == "interrupt":
+                    print(f"[ADA DEBUG] [AUDIO] Local barge-in: playback flushed.")
                 
-                if rms > VAD_THRESHOLD:
-                    # Speech Detected
-                    self._silence_start_time = None
+                # 3. VAD Logic for Video
+                if vad_result.speech_started:
+                    # NEW Speech Utterance Started
+                    self._is_speaking = True
+                    print(f"[ADA DEBUG] [VAD] Speech Detected (RMS: {vad_result.rms:.0f}, Floor: {vad_result.noise_floor:.0f}). Sending Video Frame.")
                     
-                    if not self._is_speaking:
-                        # NEW Speech Utterance Started
-                        self._is_speaking = True
-                        print(f"[ADA DEBUG] [VAD] Speech Detected (RMS: {rms}). Sending Video Frame.")
-                        
-                        # Send ONE frame
-                        if self._latest_image_payload and self.out_queue:
-                            await self.out_queue.put(self._latest_image_payload)
-                        else:
-                            print(f"[ADA DEBUG] [VAD] No video frame available to send.")
-                            
-                else:
-                    # Silence
-                    if self._is_speaking:
-                        if self._silence_start_time is None:
-                            self._silence_start_time = time.time()
-                        
-                        elif time.time() - self._silence_start_time > SILENCE_DURATION:
-                            # Silence confirmed, reset state
-                            print(f"[ADA DEBUG] [VAD] Silence detected. Resetting speech state.")
-                            self._is_speaking = False
-                            self._silence_start_time = None
+                    self._send_onset_frame()
+                
+                elif vad_result.speech_ended:
+                    # Silence confirmed (hangover elapsed), reset state
+                    print(f"[ADA DEBUG] [VAD] Silence detected. Resetting speech state.")
+                    self._is_speaking = False
 
             except Exception as e:
                 print(f"Error reading audio: {e}")
@@ -1190,7 +1473,8 @@ class AudioLoop:
                  self.on_web_data({"image": image_b64, "log": log_text})
                  
         # Run the web agent and wait for it to return
-        result = await self.web_agent.run_task(prompt, update_callback=update_frontend)
+        agent = await self.agents.aget("web")
+        result = await agent.run_task(prompt, update_callback=update_frontend)
         print(f"[ADA DEBUG] [WEB] Web Agent Task Returned: {result}")
         
         # Send the final result back to the main model
@@ -1199,12 +1483,121 @@ class AudioLoop:
         except Exception as e:
              print(f"[ADA DEBUG] [ERR] Failed to send web agent result to model: {e}")
 
+    # ==================== PROJECT / SMART HOME HANDLERS ====================
+
+    async def handle_create_project(self, name):
+        success, msg = self.project_manager.create_project(name)
+        if success:
+            # Auto-switch to the newly created project
+            self.project_manager.switch_project(name)
+            msg += f" Switched to '{name}'."
+            if self.on_project_update:
+                self.on_project_update(name)
+        return {"result": msg}
+
+    async def handle_switch_project(self, name):
+        success, msg = self.project_manager.switch_project(name)
+        if success:
+            if self.on_project_update:
+                self.on_project_update(name)
+            # Gather project context and send to AI (silently, no response expected)
+            context = self.project_manager.get_project_context()
+            print(f"[ADA DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
+            try:
+                await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
+            except Exception as e:
+                print(f"[ADA DEBUG] [ERR] Failed to send project context: {e}")
+        return {"result": msg}
+
+    async def handle_list_projects(self):
+        projects = self.project_manager.list_projects()
+        return {"result": f"Available projects: {', '.join(projects)}"}
+
+    def _kasa_device_list(self, agent):
+        """Cached Kasa devices in the shape the frontend expects."""
+        devices = []
+        for ip, dev in agent.devices.items():
+            dev_type = "unknown"
+            if dev.is_bulb: dev_type = "bulb"
+            elif dev.is_plug: dev_type = "plug"
+            elif dev.is_strip: dev_type = "strip"
+            elif dev.is_dimmer: dev_type = "dimmer"
+
+            devices.append({
+                "ip": ip,
+                "alias": dev.alias,
+                "model": dev.model,
+                "type": dev_type,
+                "is_on": dev.is_on,
+                "brightness": dev.brightness if dev.is_bulb or dev.is_dimmer else None,
+                "hsv": dev.hsv if dev.is_bulb and dev.is_color else None,
+                "has_color": dev.is_color if dev.is_bulb else False,
+                "has_brightness": dev.is_dimmable if dev.is_bulb or dev.is_dimmer else False
+            })
+        return devices
+
+    async def handle_list_smart_devices(self):
+        # Use cached devices directly for speed
+        frontend_list = self._kasa_device_list(await self.agents.aget("kasa"))
+        dev_summaries = [
+            f"{d['alias']} (IP: {d['ip']}, Type: {d['type']}) [{'ON' if d['is_on'] else 'OFF'}]"
+            for d in frontend_list
+        ]
+
+        result_str = "No devices found in cache."
+        if dev_summaries:
+            result_str = "Found Devices (Cached):\n" + "\n".join(dev_summaries)
+
+        # Trigger frontend update
+        if self.on_device_update:
+            self.on_device_update(frontend_list)
+        return {"result": result_str}
+
+    async def handle_control_light(self, target, action, brightness=None, color=None):
+        agent = await self.agents.aget("kasa")
+        result_msg = f"Action '{action}' on '{target}' failed."
+        success = False
+
+        if action == "turn_on":
+            success = await agent.turn_on(target)
+            if success:
+                result_msg = f"Turned ON '{target}'."
+        elif action == "turn_off":
+            success = await agent.turn_off(target)
+            if success:
+                result_msg = f"Turned OFF '{target}'."
+        elif action == "set":
+            success = True
+            result_msg = f"Updated '{target}':"
+
+        # Apply extra attributes if 'set' or if we just turned it on and want to set them too
+        if success or action == "set":
+            if brightness is not None:
+                sb = await agent.set_brightness(target, brightness)
+                if sb:
+                    result_msg += f" Set brightness to {brightness}."
+            if color is not None:
+                sc = await agent.set_color(target, color)
+                if sc:
+                    result_msg += f" Set color to {color}."
+
+        # Notify Frontend of State Change (KasaAgent updates its cached state on control)
+        if success:
+            if self.on_device_update:
+                self.on_device_update(self._kasa_device_list(agent))
+        else:
+            # Report Error
+            if self.on_error:
+                self.on_error(result_msg)
+        return {"result": result_msg}
+
     # ==================== GOOGLE WORKSPACE HANDLERS ====================
 
     async def handle_google_authenticate(self):
         """Handle Google Workspace authentication."""
         print(f"[ADA DEBUG] [GOOGLE] Starting authentication...")
-        result = await self.google_workspace_agent.authenticate()
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.authenticate()
         
         if result.get("success"):
             message = "Successfully authenticated with Google Workspace! You can now use Calendar, Sheets, Drive, Gmail, and Docs."
@@ -1216,13 +1609,18 @@ class AudioLoop:
             await self.session.send(input=f"System Notification: {message}", end_of_turn=True)
         except Exception as e:
             print(f"[ADA DEBUG] [ERR] Failed to send auth result: {e}")
+        if result.get("success"):
+            # The Workspace tools were not declared while signed out; the
+            # reconnect waits until this call's response has been sent
+            self.refresh_tools()
         
         return result
 
     async def handle_google_list_events(self, max_results=10, time_min=None, time_max=None):
         """Handle listing calendar events."""
         print(f"[ADA DEBUG] [GOOGLE] Listing calendar events...")
-        result = await self.google_workspace_agent.list_calendar_events(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.list_calendar_events(
             max_results=max_results,
             time_min=time_min,
             time_max=time_max
@@ -1251,7 +1649,8 @@ class AudioLoop:
         if attendees:
             attendees_list = [a.strip() for a in attendees.split(",")]
         
-        result = await self.google_workspace_agent.create_calendar_event(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.create_calendar_event(
             summary=summary,
             start_time=start_time,
             end_time=end_time,
@@ -1271,7 +1670,8 @@ class AudioLoop:
     async def handle_google_delete_event(self, event_id):
         """Handle deleting a calendar event."""
         print(f"[ADA DEBUG] [GOOGLE] Deleting event: {event_id}")
-        result = await self.google_workspace_agent.delete_calendar_event(event_id=event_id)
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.delete_calendar_event(event_id=event_id)
         
         if result.get("success"):
             message = f"Event deleted successfully."
@@ -1283,7 +1683,8 @@ class AudioLoop:
     async def handle_google_read_spreadsheet(self, spreadsheet_id, range_name="Sheet1!A1:Z100"):
         """Handle reading from a spreadsheet."""
         print(f"[ADA DEBUG] [GOOGLE] Reading spreadsheet: {spreadsheet_id}")
-        result = await self.google_workspace_agent.read_spreadsheet(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.read_spreadsheet(
             spreadsheet_id=spreadsheet_id,
             range_name=range_name
         )
@@ -1314,7 +1715,8 @@ class AudioLoop:
         except:
             values_list = [[values]]  # Wrap single value
         
-        result = await self.google_workspace_agent.write_spreadsheet(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.write_spreadsheet(
             spreadsheet_id=spreadsheet_id,
             range_name=range_name,
             values=values_list
@@ -1337,7 +1739,8 @@ class AudioLoop:
         except:
             values_list = [[values]]
         
-        result = await self.google_workspace_agent.append_spreadsheet(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.append_spreadsheet(
             spreadsheet_id=spreadsheet_id,
             range_name=range_name,
             values=values_list
@@ -1358,7 +1761,8 @@ class AudioLoop:
         if sheets:
             sheets_list = [s.strip() for s in sheets.split(",")]
         
-        result = await self.google_workspace_agent.create_spreadsheet(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.create_spreadsheet(
             title=title,
             sheets=sheets_list
         )
@@ -1373,7 +1777,8 @@ class AudioLoop:
     async def handle_google_add_sheet(self, spreadsheet_id, title):
         """Handle adding a sheet."""
         print(f"[ADA DEBUG] [GOOGLE] Adding sheet: {title}")
-        result = await self.google_workspace_agent.add_sheet(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.add_sheet(
             spreadsheet_id=spreadsheet_id,
             title=title
         )
@@ -1388,7 +1793,8 @@ class AudioLoop:
     async def handle_google_delete_sheet(self, spreadsheet_id, sheet_title):
         """Handle deleting a sheet."""
         print(f"[ADA DEBUG] [GOOGLE] Deleting sheet: {sheet_title}")
-        result = await self.google_workspace_agent.delete_sheet(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.delete_sheet(
             spreadsheet_id=spreadsheet_id,
             sheet_title=sheet_title
         )
@@ -1403,7 +1809,8 @@ class AudioLoop:
     async def handle_google_list_drive_files(self, query=None, max_results=20, folder_id=None):
         """Handle listing Drive files."""
         print(f"[ADA DEBUG] [GOOGLE] Listing Drive files...")
-        result = await self.google_workspace_agent.list_drive_files(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.list_drive_files(
             query=query,
             max_results=max_results,
             folder_id=folder_id
@@ -1426,7 +1833,8 @@ class AudioLoop:
     async def handle_google_upload_to_drive(self, file_path, folder_id=None, file_name=None):
         """Handle uploading file to Drive."""
         print(f"[ADA DEBUG] [GOOGLE] Uploading to Drive: {file_path}")
-        result = await self.google_workspace_agent.upload_to_drive(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.upload_to_drive(
             file_path=file_path,
             folder_id=folder_id,
             file_name=file_name
@@ -1442,7 +1850,8 @@ class AudioLoop:
     async def handle_google_download_from_drive(self, file_id, destination_path):
         """Handle downloading file from Drive."""
         print(f"[ADA DEBUG] [GOOGLE] Downloading from Drive: {file_id}")
-        result = await self.google_workspace_agent.download_from_drive(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.download_from_drive(
             file_id=file_id,
             destination_path=destination_path
         )
@@ -1457,7 +1866,8 @@ class AudioLoop:
     async def handle_google_create_drive_folder(self, folder_name, parent_id=None):
         """Handle creating a Drive folder."""
         print(f"[ADA DEBUG] [GOOGLE] Creating Drive folder: {folder_name}")
-        result = await self.google_workspace_agent.create_drive_folder(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.create_drive_folder(
             folder_name=folder_name,
             parent_id=parent_id
         )
@@ -1472,7 +1882,8 @@ class AudioLoop:
     async def handle_google_send_email(self, to, subject, body, cc=None, bcc=None):
         """Handle sending an email."""
         print(f"[ADA DEBUG] [GOOGLE] Sending email to: {to}")
-        result = await self.google_workspace_agent.send_email(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.send_email(
             to=to,
             subject=subject,
             body=body,
@@ -1490,7 +1901,8 @@ class AudioLoop:
     async def handle_google_list_emails(self, max_results=10, query=None):
         """Handle listing emails."""
         print(f"[ADA DEBUG] [GOOGLE] Listing emails...")
-        result = await self.google_workspace_agent.list_emails(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.list_emails(
             max_results=max_results,
             query=query
         )
@@ -1512,7 +1924,8 @@ class AudioLoop:
     async def handle_google_read_email(self, message_id):
         """Handle reading a specific email."""
         print(f"[ADA DEBUG] [GOOGLE] Reading email: {message_id}")
-        result = await self.google_workspace_agent.read_email(message_id=message_id)
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.read_email(message_id=message_id)
         
         if result.get("success"):
             message = f"From: {result.get('from')}\nSubject: {result.get('subject')}\nDate: {result.get('date')}\n\n{result.get('body', result.get('snippet', ''))}"
@@ -1524,7 +1937,8 @@ class AudioLoop:
     async def handle_google_create_document(self, title, content=None):
         """Handle creating a Google Document."""
         print(f"[ADA DEBUG] [GOOGLE] Creating document: {title}")
-        result = await self.google_workspace_agent.create_document(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.create_document(
             title=title,
             content=content
         )
@@ -1539,7 +1953,8 @@ class AudioLoop:
     async def handle_google_read_document(self, document_id):
         """Handle reading a Google Document."""
         print(f"[ADA DEBUG] [GOOGLE] Reading document: {document_id}")
-        result = await self.google_workspace_agent.read_document(document_id=document_id)
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.read_document(document_id=document_id)
         
         if result.get("success"):
             content = result.get("content", "")
@@ -1554,7 +1969,8 @@ class AudioLoop:
     async def handle_google_append_document(self, document_id, content):
         """Handle appending to a Google Document."""
         print(f"[ADA DEBUG] [GOOGLE] Appending to document: {document_id}")
-        result = await self.google_workspace_agent.append_to_document(
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.append_to_document(
             document_id=document_id,
             content=content
         )
@@ -1571,7 +1987,8 @@ class AudioLoop:
     async def handle_n8n_connect(self):
         """Handle connecting to n8n MCP Server."""
         print(f"[ADA DEBUG] [N8N] Connecting to n8n MCP Server...")
-        result = await self.n8n_mcp_agent.connect()
+        agent = await self.agents.aget("n8n")
+        result = await agent.connect()
         
         if result.get("success"):
             message = f"Connected to n8n MCP Server! Server: {result.get('server_name', 'n8n')}"
@@ -1584,7 +2001,8 @@ class AudioLoop:
     async def handle_n8n_list_workflows(self):
         """Handle listing available n8n workflows."""
         print(f"[ADA DEBUG] [N8N] Listing workflows...")
-        result = await self.n8n_mcp_agent.list_workflows()
+        agent = await self.agents.aget("n8n")
+        result = await agent.list_workflows()
         
         if result.get("success"):
             workflows = result.get("workflows", [])
@@ -1615,7 +2033,8 @@ class AudioLoop:
     async def handle_n8n_search_workflows(self, query):
         """Handle searching n8n workflows."""
         print(f"[ADA DEBUG] [N8N] Searching workflows: {query}")
-        result = await self.n8n_mcp_agent.search_workflows(query)
+        agent = await self.agents.aget("n8n")
+        result = await agent.search_workflows(query)
         
         if result.get("success"):
             workflows = result.get("workflows", [])
@@ -1655,7 +2074,8 @@ class AudioLoop:
                 parsed_data = {"input": input_data}
         
         # workflow_name is actually the workflow ID
-        result = await self.n8n_mcp_agent.execute_workflow(workflow_name, parsed_data)
+        agent = await self.agents.aget("n8n")
+        result = await agent.execute_workflow(workflow_name, parsed_data)
         
         if result.get("success"):
             exec_result = result.get("result", {})
@@ -1676,7 +2096,8 @@ class AudioLoop:
     async def handle_n8n_get_workflow_info(self, workflow_name):
         """Handle getting workflow details."""
         print(f"[ADA DEBUG] [N8N] Getting info for workflow: {workflow_name}")
-        result = await self.n8n_mcp_agent.get_workflow_info(workflow_name)
+        agent = await self.agents.aget("n8n")
+        result = await agent.get_workflow_info(workflow_name)
         
         if result.get("success"):
             workflow = result.get("workflow", {})
@@ -1700,7 +2121,8 @@ class AudioLoop:
     async def handle_pc_create_file(self, path, content=""):
         """Handle creating a file on local PC."""
         print(f"[ADA DEBUG] [PC] Creating file: {path}")
-        result = await self.local_pc_agent.create_file(path, content)
+        agent = await self.agents.aget("local_pc")
+        result = await agent.create_file(path, content)
         
         if result.get("success"):
             message = f"File created successfully at: {result.get('path')}"
@@ -1712,7 +2134,8 @@ class AudioLoop:
     async def handle_pc_read_file(self, path):
         """Handle reading a file from local PC."""
         print(f"[ADA DEBUG] [PC] Reading file: {path}")
-        result = await self.local_pc_agent.read_file(path)
+        agent = await self.agents.aget("local_pc")
+        result = await agent.read_file(path)
         
         if result.get("success"):
             content = result.get("content", "")
@@ -1727,7 +2150,8 @@ class AudioLoop:
     async def handle_pc_write_file(self, path, content):
         """Handle writing to a file on local PC."""
         print(f"[ADA DEBUG] [PC] Writing to file: {path}")
-        result = await self.local_pc_agent.write_file(path, content)
+        agent = await self.agents.aget("local_pc")
+        result = await agent.write_file(path, content)
         
         if result.get("success"):
             message = f"File written successfully: {result.get('path')}"
@@ -1739,7 +2163,8 @@ class AudioLoop:
     async def handle_pc_list_folder(self, path="Documents"):
         """Handle listing folder contents on local PC."""
         print(f"[ADA DEBUG] [PC] Listing folder: {path}")
-        result = await self.local_pc_agent.list_folder(path)
+        agent = await self.agents.aget("local_pc")
+        result = await agent.list_folder(path)
         
         if result.get("success"):
             items = result.get("items", [])
@@ -1761,7 +2186,8 @@ class AudioLoop:
     async def handle_pc_create_folder(self, path):
         """Handle creating a folder on local PC."""
         print(f"[ADA DEBUG] [PC] Creating folder: {path}")
-        result = await self.local_pc_agent.create_folder(path)
+        agent = await self.agents.aget("local_pc")
+        result = await agent.create_folder(path)
         
         if result.get("success"):
             message = f"Folder created successfully: {result.get('path')}"
@@ -1773,7 +2199,8 @@ class AudioLoop:
     async def handle_pc_open_app(self, app_name, args=None):
         """Handle opening an application on local PC."""
         print(f"[ADA DEBUG] [PC] Opening app: {app_name}")
-        result = await self.local_pc_agent.open_application(app_name, args)
+        agent = await self.agents.aget("local_pc")
+        result = await agent.open_application(app_name, args)
         
         if result.get("success"):
             message = f"Application '{app_name}' opened successfully!"
@@ -1787,7 +2214,8 @@ class AudioLoop:
                                       search_content=False):
         """Handle searching for files on local PC."""
         print(f"[ADA DEBUG] [PC] Searching for files: {query}")
-        result = await self.local_pc_agent.search_files(
+        agent = await self.agents.aget("local_pc")
+        result = await agent.search_files(
             query, search_path, file_extension, max_results, search_content
         )
         
@@ -1830,7 +2258,8 @@ class AudioLoop:
         else:
             parsed_data = data
         
-        result = await self.webhook_agent.send_webhook(url, parsed_data, method)
+        agent = await self.agents.aget("webhook")
+        result = await agent.send_webhook(url, parsed_data, method)
         
         if result.get("success"):
             message = f"Webhook sent successfully! Status: {result.get('status_code', 'OK')}"
@@ -1853,7 +2282,8 @@ class AudioLoop:
         else:
             parsed_data = data
         
-        result = await self.webhook_agent.send_to_saved_webhook(webhook_name, parsed_data)
+        agent = await self.agents.aget("webhook")
+        result = await agent.send_to_saved_webhook(webhook_name, parsed_data)
         
         if result.get("success"):
             message = f"Webhook '{webhook_name}' sent successfully!"
@@ -1866,8 +2296,9 @@ class AudioLoop:
         """Handle listing all webhooks."""
         print(f"[ADA DEBUG] [WEBHOOK] Listing webhooks")
         
-        saved = self.webhook_agent.list_saved_webhooks()
-        registered = self.webhook_agent.list_registered_webhooks()
+        agent = await self.agents.aget("webhook")
+        saved = agent.list_saved_webhooks()
+        registered = agent.list_registered_webhooks()
         
         message = "Webhooks:\n"
         
@@ -1890,7 +2321,8 @@ class AudioLoop:
     async def handle_wa_send_message(self, phone, message):
         """Handle sending a WhatsApp message."""
         print(f"[ADA DEBUG] [WA] Sending message to: {phone}")
-        result = await self.whatsapp_agent.send_message(phone, message)
+        agent = await self.agents.aget("whatsapp")
+        result = await agent.send_message(phone, message)
         
         if result.get("success"):
             msg = f"Pesan WhatsApp berhasil dikirim ke {result.get('phone', phone)}!"
@@ -1902,7 +2334,8 @@ class AudioLoop:
     async def handle_wa_check_status(self):
         """Handle checking WhatsApp connection status."""
         print(f"[ADA DEBUG] [WA] Checking status")
-        result = await self.whatsapp_agent.check_connection()
+        agent = await self.agents.aget("whatsapp")
+        result = await agent.check_connection()
         
         if result.get("success"):
             status = result.get("status", "unknown")
@@ -1917,7 +2350,8 @@ class AudioLoop:
     async def handle_doc_list_printers(self):
         """Handle listing available printers."""
         print(f"[ADA DEBUG] [PRINTER] Listing printers")
-        result = await self.document_printer_agent.list_printers()
+        agent = await self.agents.aget("document_printer")
+        result = await agent.list_printers()
         
         if result.get("success"):
             printers = result.get("printers", [])
@@ -1936,7 +2370,8 @@ class AudioLoop:
     async def handle_doc_print_file(self, file_path, printer_name=None, copies=1):
         """Handle printing a file."""
         print(f"[ADA DEBUG] [PRINTER] Printing file: {file_path}")
-        result = await self.document_printer_agent.print_file(file_path, printer_name, copies)
+        agent = await self.agents.aget("document_printer")
+        result = await agent.print_file(file_path, printer_name, copies)
         
         if result.get("success"):
             msg = f"File '{result.get('file')}' berhasil dikirim ke printer {result.get('printer')}!"
@@ -1948,7 +2383,8 @@ class AudioLoop:
     async def handle_doc_print_text(self, text, printer_name=None):
         """Handle printing text directly."""
         print(f"[ADA DEBUG] [PRINTER] Printing text")
-        result = await self.document_printer_agent.print_text(text, printer_name)
+        agent = await self.agents.aget("document_printer")
+        result = await agent.print_text(text, printer_name)
         
         if result.get("success"):
             msg = f"Teks berhasil dikirim ke printer!"
@@ -1960,7 +2396,8 @@ class AudioLoop:
     async def handle_doc_printer_status(self, printer_name=None):
         """Handle getting printer status."""
         print(f"[ADA DEBUG] [PRINTER] Getting status")
-        result = await self.document_printer_agent.get_printer_status(printer_name)
+        agent = await self.agents.aget("document_printer")
+        result = await agent.get_printer_status(printer_name)
         
         if result.get("success"):
             msg = f"Printer: {result.get('printer')}\nStatus: {result.get('status')}"
@@ -1976,7 +2413,8 @@ class AudioLoop:
     async def handle_google_create_form(self, title, document_title=None):
         """Handle creating a Google Form."""
         print(f"[ADA DEBUG] [GOOGLE] Creating form: {title}")
-        result = await self.google_workspace_agent.create_form(title, document_title)
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.create_form(title, document_title)
         
         if result.get("success"):
             msg = f"Form '{title}' berhasil dibuat!\nURL: {result.get('url')}\nEdit: {result.get('edit_url')}"
@@ -1990,7 +2428,8 @@ class AudioLoop:
     async def handle_google_create_presentation(self, title):
         """Handle creating a Google Slides presentation."""
         print(f"[ADA DEBUG] [GOOGLE] Creating presentation: {title}")
-        result = await self.google_workspace_agent.create_presentation(title)
+        agent = await self.agents.aget("google_workspace")
+        result = await agent.create_presentation(title)
         
         if result.get("success"):
             msg = f"Presentasi '{title}' berhasil dibuat!\nURL: {result.get('edit_url')}"
@@ -2003,9 +2442,10 @@ class AudioLoop:
 
     async def handle_yahoo_send_email(self, to, subject, body):
         """Handle sending email via Yahoo Mail."""
+        agent = await self.agents.aget("yahoo")
         print(f"[ADA DEBUG] [YAHOO] Sending email to: {to}")
         result = await asyncio.to_thread(
-            self.yahoo_mail_agent.send_email, to, subject, body
+            agent.send_email, to, subject, body
         )
         
         if result.get("success"):
@@ -2017,9 +2457,10 @@ class AudioLoop:
 
     async def handle_yahoo_list_emails(self, limit=5):
         """Handle listing Yahoo emails."""
+        agent = await self.agents.aget("yahoo")
         print(f"[ADA DEBUG] [YAHOO] Listing emails (limit={limit})")
         result = await asyncio.to_thread(
-            self.yahoo_mail_agent.get_recent_emails, limit
+            agent.get_recent_emails, limit
         )
         
         if result.get("success"):
@@ -2037,19 +2478,142 @@ class AudioLoop:
         return {"result": msg}
 
 
+    async def _confirm_tool(self, fc):
+        """
+        Ask the frontend to approve a tool call.
+
+        Returns:
+            True if approved (or nobody to ask), False if denied, None if
+            unanswered within confirmation_timeout
+        """
+        if not self.on_tool_confirmation:
+            return True
+        import uuid
+        request_id = str(uuid.uuid4())
+        print(f"[ADA DEBUG] [STOP] Requesting confirmation for '{fc.name}' (ID: {request_id})")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_confirmations[request_id] = future
+
+        self.on_tool_confirmation({
+            "id": request_id,
+            "tool": fc.name,
+            "args": fc.args
+        })
+
+        executor = self.tool_executor
+        executor.pending_confirmations += 1
+        start = time.perf_counter()
+        try:
+            # Wait for user response (on the executor; receive_audio keeps reading meanwhile)
+            confirmed = bool(await asyncio.wait_for(future, self.confirmation_timeout))
+        except asyncio.TimeoutError:
+            print(f"[ADA DEBUG] [CONFIRM] Request {request_id} unanswered after {self.confirmation_timeout:.0f} s.")
+            executor.record_confirmation(time.perf_counter() - start, TIMED_OUT)
+            return None
+        finally:
+            executor.pending_confirmations -= 1
+            self._pending_confirmations.pop(request_id, None)
+
+        executor.record_confirmation(time.perf_counter() - start, CONFIRMED if confirmed else DENIED)
+        print(f"[ADA DEBUG] [CONFIRM] Request {request_id} resolved. Confirmed: {confirmed}")
+        return confirmed
+
+    async def _handle_function_call(self, fc):
+        """Validate, confirm and run one function call; always returns its FunctionResponse."""
+        try:
+            tool, kwargs = self.tool_registry.prepare(fc.name, fc.args)
+        except ToolError as e:
+            print(f"[ADA DEBUG] [TOOL] Rejected call '{fc.name}': {e}")
+            return types.FunctionResponse(id=fc.id, name=fc.name, response={"error": str(e)})
+
+        # Taken before the first await, so serial calls of one agent keep the order the model gave
+        slot = self.tool_registry.reserve(tool)
+        try:
+            # Check Permissions (Default to True if not set)
+            if self.permissions.get(tool.permission, True):
+                confirmed = await self._confirm_tool(fc)
+                if confirmed is None:
+                    return types.FunctionResponse(id=fc.id, name=fc.name, response={
+                        "result": f"The user did not confirm this tool within {self.confirmation_timeout:.0f} seconds; it was not run."
+                    })
+                if not confirmed:
+                    print(f"[ADA DEBUG] [DENY] Tool call '{fc.name}' denied by user.")
+                    return types.FunctionResponse(
+                        id=fc.id, name=fc.name, response={"result": "User denied the request to use this tool."}
+                    )
+            else:
+                print(f"[ADA DEBUG] [TOOL] Permission check: '{fc.name}' -> AUTO-ALLOW")
+
+            print(f"[ADA DEBUG] [TOOL] Tool Call: '{fc.name}' {kwargs}")
+            result = await self.tool_registry.run(tool, kwargs, slot)
+            return types.FunctionResponse(id=fc.id, name=fc.name, response=result)
+        finally:
+            if slot is not None:
+                slot.release()
+
+    async def _handle_function_calls(self, function_calls):
+        """
+        Run the calls of one tool_call message concurrently (serial tools of one
+        agent still one at a time); responses are returned in call order.
+        """
+        start = time.perf_counter()
+        responses = [None] * len(function_calls)
+        durations = [0.0] * len(function_calls)
+
+        async def call(index, fc):
+            call_start = time.perf_counter()
+            try:
+                responses[index] = await self._handle_function_call(fc)
+            except Exception as e:
+                print(f"[ADA DEBUG] [ERR] Tool call '{fc.name}' failed: {e}")
+                responses[index] = types.FunctionResponse(id=fc.id, name=fc.name, response={"error": str(e)})
+            durations[index] = time.perf_counter() - call_start
+
+        async with asyncio.TaskGroup() as tg:
+            for index, fc in enumerate(function_calls):
+                tg.create_task(call(index, fc))
+
+        wall = time.perf_counter() - start
+        self.tool_registry.record_batch(durations, wall)
+        if len(function_calls) > 1:
+            print(f"[ADA DEBUG] [TOOL] {len(function_calls)} calls answered in {wall * 1000:.0f} ms "
+                  f"(one after another: {sum(durations) * 1000:.0f} ms)")
+        return responses
+
     async def receive_audio(self):
         "Background task to reads from the websocket and write pcm chunks to the output queue"
+        self._in_turn = False
         try:
             while True:
                 turn = self.session.receive()
                 async for response in turn:
+                    self._in_turn = True
+                    # 0. Session lifecycle: keep the latest resumption handle, reconnect early on GoAway
+                    if response.session_resumption_update:
+                        self.resumption.on_update(response.session_resumption_update)
+                    if response.go_away:
+                        print(f"[ADA DEBUG] [CONNECT] Server GoAway (time left: {response.go_away.time_left}). Reconnecting now.")
+                        self.resumption.on_go_away(response.go_away)
+                        self._go_away = True
+                        raise ConnectionResetError("Live API GoAway")
+
                     # 1. Handle Audio Data
                     if data := response.data:
-                        self.audio_in_queue.put_nowait(data)
+                        # Drop the rest of a turn the user already talked over
+                        if self.barge_in.accept_audio():
+                            self.audio_player.write(data)
+                            if self.on_audio_data:
+                                self.on_audio_data(data)
                         # NOTE: 'continue' removed here to allow processing transcription/tools in same packet
 
                     # 2. Handle Transcription (User & Model)
                     if response.server_content:
+                        if response.server_content.interrupted:
+                            # Server confirmed the interruption; what follows is the next turn
+                            self.clear_audio_queue()
+                            self.barge_in.on_model_turn_end()
+
                         if response.server_content.input_transcription:
                             transcript = response.server_content.input_transcription.text
                             if transcript:
@@ -2113,817 +2677,19 @@ class AudioLoop:
                         # but usually better to wait for sender switch or explicit end.
                         # We can also check turn_complete signal if available in response.server_content.model_turn etc
 
-                    # 3. Handle Tool Calls
-                    if response.tool_call:
-                        print("The tool was called")
-                        function_responses = []
-                        for fc in response.tool_call.function_calls:
-                            # All known tools including Google Workspace
-                            known_tools = [
-                                "run_web_agent", "write_file", "read_directory", "read_file",
-                                "create_project", "switch_project", "list_projects",
-                                "list_smart_devices", "control_light",
-                                # Google Workspace tools
-                                "google_authenticate", "google_list_events", "google_create_event", "google_delete_event",
-                                "google_read_spreadsheet", "google_write_spreadsheet", "google_append_spreadsheet", "google_create_spreadsheet",
-                                "google_add_sheet", "google_delete_sheet",
-                                "google_list_drive_files", "google_upload_to_drive", "google_download_from_drive", "google_create_drive_folder",
-                                "google_send_email", "google_list_emails", "google_read_email",
-                                "google_create_document", "google_read_document", "google_append_document",
-                                # Google Forms/Slides tools
-                                "google_create_form", "google_create_presentation",
-                                # n8n MCP tools
-                                "n8n_connect", "n8n_list_workflows", "n8n_search_workflows", "n8n_execute_workflow", "n8n_get_workflow_info",
-                                # Local PC tools
-                                "pc_create_file", "pc_read_file", "pc_write_file", "pc_list_folder", "pc_create_folder", "pc_open_app", "pc_search_files",
-                                # Webhook tools
-                                "webhook_send", "webhook_send_saved", "webhook_list",
-                                # WhatsApp tools
-                                "wa_send_message", "wa_check_status",
-                                # Document Printer tools
-                                "doc_list_printers", "doc_print_file", "doc_print_text", "doc_printer_status",
-                                # Yahoo Mail tools
-                                "yahoo_send_email", "yahoo_list_emails"
-                            ]
-                            if fc.name in known_tools:
-                                prompt = fc.args.get("prompt", "") # Prompt is not present for all tools
-                                
-                                # Check Permissions (Default to True if not set)
-                                confirmation_required = self.permissions.get(fc.name, True)
-                                
-                                if not confirmation_required:
-                                    print(f"[ADA DEBUG] [TOOL] Permission check: '{fc.name}' -> AUTO-ALLOW")
-                                    # Skip confirmation block and jump to execution
-                                    pass
-                                else:
-                                    # Confirmation Logic
-                                    if self.on_tool_confirmation:
-                                        import uuid
-                                        request_id = str(uuid.uuid4())
-                                    print(f"[ADA DEBUG] [STOP] Requesting confirmation for '{fc.name}' (ID: {request_id})")
-                                    
-                                    future = asyncio.Future()
-                                    self._pending_confirmations[request_id] = future
-                                    
-                                    self.on_tool_confirmation({
-                                        "id": request_id, 
-                                        "tool": fc.name, 
-                                        "args": fc.args
-                                    })
-                                    
-                                    try:
-                                        # Wait for user response
-                                        confirmed = await future
-
-                                    finally:
-                                        self._pending_confirmations.pop(request_id, None)
-
-                                    print(f"[ADA DEBUG] [CONFIRM] Request {request_id} resolved. Confirmed: {confirmed}")
-
-                                    if not confirmed:
-                                        print(f"[ADA DEBUG] [DENY] Tool call '{fc.name}' denied by user.")
-                                        function_response = types.FunctionResponse(
-                                            id=fc.id,
-                                            name=fc.name,
-                                            response={
-                                                "result": "User denied the request to use this tool.",
-                                            }
-                                        )
-                                        function_responses.append(function_response)
-                                        continue
-
-                                # If confirmed (or no callback configured, or auto-allowed), proceed
-                                if fc.name == "run_web_agent":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'run_web_agent' with prompt='{prompt}'")
-                                    asyncio.create_task(self.handle_web_agent_request(prompt))
-                                    
-                                    result_text = "Web Navigation started. Do not reply to this message."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id,
-                                        name=fc.name,
-                                        response={
-                                            "result": result_text,
-                                        }
-                                    )
-                                    print(f"[ADA DEBUG] [RESPONSE] Sending function response: {function_response}")
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_create_spreadsheet":
-                                    title = fc.args.get("title")
-                                    sheets = fc.args.get("sheets")
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_spreadsheet' with title='{title}'")
-                                    function_responses.append(await self._execute_tool(
-                                        fc, self.handle_google_create_spreadsheet, title=title, sheets=sheets
-                                    ))
-                                
-                                elif fc.name == "google_add_sheet":
-                                    spreadsheet_id = fc.args.get("spreadsheet_id")
-                                    title = fc.args.get("title")
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_add_sheet' with title='{title}'")
-                                    function_responses.append(await self._execute_tool(
-                                        fc, self.handle_google_add_sheet, spreadsheet_id=spreadsheet_id, title=title
-                                    ))
-
-                                elif fc.name == "google_delete_sheet":
-                                    spreadsheet_id = fc.args.get("spreadsheet_id")
-                                    sheet_title = fc.args.get("sheet_title")
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_delete_sheet' with title='{sheet_title}'")
-                                    function_responses.append(await self._execute_tool(
-                                        fc, self.handle_google_delete_sheet, spreadsheet_id=spreadsheet_id, sheet_title=sheet_title
-                                    ))
-                                elif fc.name == "write_file":
-                                    path = fc.args["path"]
-                                    content = fc.args["content"]
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'write_file' path='{path}'")
-                                    asyncio.create_task(self.handle_write_file(path, content))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Writing file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "read_directory":
-                                    path = fc.args["path"]
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'read_directory' path='{path}'")
-                                    asyncio.create_task(self.handle_read_directory(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Reading directory..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "read_file":
-                                    path = fc.args["path"]
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'read_file' path='{path}'")
-                                    asyncio.create_task(self.handle_read_file(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Reading file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "create_project":
-                                    name = fc.args["name"]
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'create_project' name='{name}'")
-                                    success, msg = self.project_manager.create_project(name)
-                                    if success:
-                                        # Auto-switch to the newly created project
-                                        self.project_manager.switch_project(name)
-                                        msg += f" Switched to '{name}'."
-                                        if self.on_project_update:
-                                            self.on_project_update(name)
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "switch_project":
-                                    name = fc.args["name"]
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'switch_project' name='{name}'")
-                                    success, msg = self.project_manager.switch_project(name)
-                                    if success:
-                                        if self.on_project_update:
-                                            self.on_project_update(name)
-                                        # Gather project context and send to AI (silently, no response expected)
-                                        context = self.project_manager.get_project_context()
-                                        print(f"[ADA DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
-                                        try:
-                                            await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
-                                        except Exception as e:
-                                            print(f"[ADA DEBUG] [ERR] Failed to send project context: {e}")
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": msg}
-                                    )
-                                    function_responses.append(function_response)
-                                
-                                elif fc.name == "list_projects":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'list_projects'")
-                                    projects = self.project_manager.list_projects()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Available projects: {', '.join(projects)}"}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "list_smart_devices":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'list_smart_devices'")
-                                    # Use cached devices directly for speed
-                                    # devices_dict is {ip: SmartDevice}
-                                    
-                                    dev_summaries = []
-                                    frontend_list = []
-                                    
-                                    for ip, d in self.kasa_agent.devices.items():
-                                        dev_type = "unknown"
-                                        if d.is_bulb: dev_type = "bulb"
-                                        elif d.is_plug: dev_type = "plug"
-                                        elif d.is_strip: dev_type = "strip"
-                                        elif d.is_dimmer: dev_type = "dimmer"
-                                        
-                                        # Format for Model
-                                        info = f"{d.alias} (IP: {ip}, Type: {dev_type})"
-                                        if d.is_on:
-                                            info += " [ON]"
-                                        else:
-                                            info += " [OFF]"
-                                        dev_summaries.append(info)
-                                        
-                                        # Format for Frontend
-                                        frontend_list.append({
-                                            "ip": ip,
-                                            "alias": d.alias,
-                                            "model": d.model,
-                                            "type": dev_type,
-                                            "is_on": d.is_on,
-                                            "brightness": d.brightness if d.is_bulb or d.is_dimmer else None,
-                                            "hsv": d.hsv if d.is_bulb and d.is_color else None,
-                                            "has_color": d.is_color if d.is_bulb else False,
-                                            "has_brightness": d.is_dimmable if d.is_bulb or d.is_dimmer else False
-                                        })
-                                    
-                                    result_str = "No devices found in cache."
-                                    if dev_summaries:
-                                        result_str = "Found Devices (Cached):\n" + "\n".join(dev_summaries)
-                                    
-                                    # Trigger frontend update
-                                    if self.on_device_update:
-                                        self.on_device_update(frontend_list)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "control_light":
-                                    target = fc.args["target"]
-                                    action = fc.args["action"]
-                                    brightness = fc.args.get("brightness")
-                                    color = fc.args.get("color")
-                                    
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'control_light' Target='{target}' Action='{action}'")
-                                    
-                                    result_msg = f"Action '{action}' on '{target}' failed."
-                                    success = False
-                                    
-                                    if action == "turn_on":
-                                        success = await self.kasa_agent.turn_on(target)
-                                        if success:
-                                            result_msg = f"Turned ON '{target}'."
-                                    elif action == "turn_off":
-                                        success = await self.kasa_agent.turn_off(target)
-                                        if success:
-                                            result_msg = f"Turned OFF '{target}'."
-                                    elif action == "set":
-                                        success = True
-                                        result_msg = f"Updated '{target}':"
-                                    
-                                    # Apply extra attributes if 'set' or if we just turned it on and want to set them too
-                                    if success or action == "set":
-                                        if brightness is not None:
-                                            sb = await self.kasa_agent.set_brightness(target, brightness)
-                                            if sb:
-                                                result_msg += f" Set brightness to {brightness}."
-                                        if color is not None:
-                                            sc = await self.kasa_agent.set_color(target, color)
-                                            if sc:
-                                                result_msg += f" Set color to {color}."
-
-                                    # Notify Frontend of State Change
-                                    if success:
-                                        # We don't need full discovery, just refresh known state or push update
-                                        # But for simplicity, let's get the standard list representation
-                                        # KasaAgent updates its internal state on control, so we can rebuild the list
-                                        
-                                        # Quick rebuild of list from internal dict
-                                        updated_list = []
-                                        for ip, dev in self.kasa_agent.devices.items():
-                                            # We need to ensure we have the correct dict structure expected by frontend
-                                            # We duplicate logic from KasaAgent.discover_devices a bit, but that's okay for now or we can add a helper
-                                            # Ideally KasaAgent has a 'get_devices_list()' method.
-                                            # Use the cached objects in self.kasa_agent.devices
-                                            
-                                            dev_type = "unknown"
-                                            if dev.is_bulb: dev_type = "bulb"
-                                            elif dev.is_plug: dev_type = "plug"
-                                            elif dev.is_strip: dev_type = "strip"
-                                            elif dev.is_dimmer: dev_type = "dimmer"
-
-                                            d_info = {
-                                                "ip": ip,
-                                                "alias": dev.alias,
-                                                "model": dev.model,
-                                                "type": dev_type,
-                                                "is_on": dev.is_on,
-                                                "brightness": dev.brightness if dev.is_bulb or dev.is_dimmer else None,
-                                                "hsv": dev.hsv if dev.is_bulb and dev.is_color else None,
-                                                "has_color": dev.is_color if dev.is_bulb else False,
-                                                "has_brightness": dev.is_dimmable if dev.is_bulb or dev.is_dimmer else False
-                                            }
-                                            updated_list.append(d_info)
-                                            
-                                        if self.on_device_update:
-                                            self.on_device_update(updated_list)
-                                    else:
-                                        # Report Error
-                                        if self.on_error:
-                                            self.on_error(result_msg)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-
-
-
-
-
-
-
-
-                                # ==================== GOOGLE WORKSPACE TOOL ROUTING ====================
-                                
-                                elif fc.name == "google_authenticate":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_authenticate'")
-                                    result = await self.handle_google_authenticate()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result.get("message", str(result))}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_list_events":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_list_events'")
-                                    result = await self.handle_google_list_events(
-                                        max_results=fc.args.get("max_results", 10),
-                                        time_min=fc.args.get("time_min"),
-                                        time_max=fc.args.get("time_max")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_create_event":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_event'")
-                                    result = await self.handle_google_create_event(
-                                        summary=fc.args["summary"],
-                                        start_time=fc.args["start_time"],
-                                        end_time=fc.args.get("end_time"),
-                                        description=fc.args.get("description", ""),
-                                        location=fc.args.get("location", ""),
-                                        attendees=fc.args.get("attendees")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_delete_event":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_delete_event'")
-                                    result = await self.handle_google_delete_event(
-                                        event_id=fc.args["event_id"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_read_spreadsheet":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_read_spreadsheet'")
-                                    result = await self.handle_google_read_spreadsheet(
-                                        spreadsheet_id=fc.args["spreadsheet_id"],
-                                        range_name=fc.args.get("range_name", "Sheet1!A1:Z100")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_write_spreadsheet":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_write_spreadsheet'")
-                                    result = await self.handle_google_write_spreadsheet(
-                                        spreadsheet_id=fc.args["spreadsheet_id"],
-                                        range_name=fc.args["range_name"],
-                                        values=fc.args["values"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_append_spreadsheet":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_append_spreadsheet'")
-                                    result = await self.handle_google_append_spreadsheet(
-                                        spreadsheet_id=fc.args["spreadsheet_id"],
-                                        range_name=fc.args["range_name"],
-                                        values=fc.args["values"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_create_spreadsheet":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_spreadsheet'")
-                                    result = await self.handle_google_create_spreadsheet(
-                                        title=fc.args["title"],
-                                        sheets=fc.args.get("sheets")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_list_drive_files":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_list_drive_files'")
-                                    result = await self.handle_google_list_drive_files(
-                                        query=fc.args.get("query"),
-                                        max_results=fc.args.get("max_results", 20),
-                                        folder_id=fc.args.get("folder_id")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_upload_to_drive":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_upload_to_drive'")
-                                    result = await self.handle_google_upload_to_drive(
-                                        file_path=fc.args["file_path"],
-                                        folder_id=fc.args.get("folder_id"),
-                                        file_name=fc.args.get("file_name")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_download_from_drive":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_download_from_drive'")
-                                    result = await self.handle_google_download_from_drive(
-                                        file_id=fc.args["file_id"],
-                                        destination_path=fc.args["destination_path"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_create_drive_folder":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_drive_folder'")
-                                    result = await self.handle_google_create_drive_folder(
-                                        folder_name=fc.args["folder_name"],
-                                        parent_id=fc.args.get("parent_id")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_send_email":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_send_email'")
-                                    result = await self.handle_google_send_email(
-                                        to=fc.args["to"],
-                                        subject=fc.args["subject"],
-                                        body=fc.args["body"],
-                                        cc=fc.args.get("cc"),
-                                        bcc=fc.args.get("bcc")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_list_emails":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_list_emails'")
-                                    result = await self.handle_google_list_emails(
-                                        max_results=fc.args.get("max_results", 10),
-                                        query=fc.args.get("query")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_read_email":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_read_email'")
-                                    result = await self.handle_google_read_email(
-                                        message_id=fc.args["message_id"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_create_document":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_document'")
-                                    result = await self.handle_google_create_document(
-                                        title=fc.args["title"],
-                                        content=fc.args.get("content")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_read_document":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_read_document'")
-                                    result = await self.handle_google_read_document(
-                                        document_id=fc.args["document_id"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_append_document":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_append_document'")
-                                    result = await self.handle_google_append_document(
-                                        document_id=fc.args["document_id"],
-                                        content=fc.args["content"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== N8N MCP TOOL ROUTING ====================
-
-                                elif fc.name == "n8n_connect":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'n8n_connect'")
-                                    result = await self.handle_n8n_connect()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "n8n_list_workflows":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'n8n_list_workflows'")
-                                    result = await self.handle_n8n_list_workflows()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "n8n_search_workflows":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'n8n_search_workflows'")
-                                    result = await self.handle_n8n_search_workflows(
-                                        query=fc.args["query"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "n8n_execute_workflow":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'n8n_execute_workflow'")
-                                    result = await self.handle_n8n_execute_workflow(
-                                        workflow_name=fc.args["workflow_name"],
-                                        input_data=fc.args.get("input_data")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "n8n_get_workflow_info":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'n8n_get_workflow_info'")
-                                    result = await self.handle_n8n_get_workflow_info(
-                                        workflow_name=fc.args["workflow_name"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== LOCAL PC TOOLS ====================
-
-                                elif fc.name == "pc_create_file":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_create_file'")
-                                    result = await self.handle_pc_create_file(
-                                        path=fc.args["path"],
-                                        content=fc.args.get("content", "")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "pc_read_file":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_read_file'")
-                                    result = await self.handle_pc_read_file(
-                                        path=fc.args["path"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "pc_write_file":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_write_file'")
-                                    result = await self.handle_pc_write_file(
-                                        path=fc.args["path"],
-                                        content=fc.args["content"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "pc_list_folder":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_list_folder'")
-                                    result = await self.handle_pc_list_folder(
-                                        path=fc.args.get("path", "Documents")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "pc_create_folder":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_create_folder'")
-                                    result = await self.handle_pc_create_folder(
-                                        path=fc.args["path"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "pc_open_app":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_open_app'")
-                                    result = await self.handle_pc_open_app(
-                                        app_name=fc.args["app_name"],
-                                        args=fc.args.get("args")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "pc_search_files":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'pc_search_files'")
-                                    result = await self.handle_pc_search_files(
-                                        query=fc.args["query"],
-                                        search_path=fc.args.get("search_path"),
-                                        file_extension=fc.args.get("file_extension"),
-                                        max_results=fc.args.get("max_results", 50),
-                                        search_content=fc.args.get("search_content", False)
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== WEBHOOK TOOLS ====================
-
-                                elif fc.name == "webhook_send":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'webhook_send'")
-                                    result = await self.handle_webhook_send(
-                                        url=fc.args["url"],
-                                        data=fc.args["data"],
-                                        method=fc.args.get("method", "POST")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "webhook_send_saved":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'webhook_send_saved'")
-                                    result = await self.handle_webhook_send_saved(
-                                        webhook_name=fc.args["webhook_name"],
-                                        data=fc.args["data"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "webhook_list":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'webhook_list'")
-                                    result = await self.handle_webhook_list()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== WHATSAPP TOOLS ====================
-
-                                elif fc.name == "wa_send_message":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'wa_send_message'")
-                                    result = await self.handle_wa_send_message(
-                                        phone=fc.args["phone"],
-                                        message=fc.args["message"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "wa_check_status":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'wa_check_status'")
-                                    result = await self.handle_wa_check_status()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== DOCUMENT PRINTER TOOLS ====================
-
-                                elif fc.name == "doc_list_printers":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'doc_list_printers'")
-                                    result = await self.handle_doc_list_printers()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "doc_print_file":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'doc_print_file'")
-                                    result = await self.handle_doc_print_file(
-                                        file_path=fc.args["file_path"],
-                                        printer_name=fc.args.get("printer_name"),
-                                        copies=fc.args.get("copies", 1)
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "doc_print_text":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'doc_print_text'")
-                                    result = await self.handle_doc_print_text(
-                                        text=fc.args["text"],
-                                        printer_name=fc.args.get("printer_name")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "doc_printer_status":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'doc_printer_status'")
-                                    result = await self.handle_doc_printer_status(
-                                        printer_name=fc.args.get("printer_name")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== GOOGLE FORMS/SLIDES TOOLS ====================
-
-                                elif fc.name == "google_create_form":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_form'")
-                                    result = await self.handle_google_create_form(
-                                        title=fc.args["title"],
-                                        document_title=fc.args.get("document_title")
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "google_create_presentation":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'google_create_presentation'")
-                                    result = await self.handle_google_create_presentation(
-                                        title=fc.args["title"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                # ==================== YAHOO MAIL TOOLS ====================
-
-                                elif fc.name == "yahoo_send_email":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'yahoo_send_email'")
-                                    result = await self.handle_yahoo_send_email(
-                                        to=fc.args["to"],
-                                        subject=fc.args["subject"],
-                                        body=fc.args["body"]
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "yahoo_list_emails":
-                                    print(f"[ADA DEBUG] [TOOL] Tool Call: 'yahoo_list_emails'")
-                                    result = await self.handle_yahoo_list_emails(
-                                        limit=fc.args.get("limit", 5)
-                                    )
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response=result
-                                    )
-                                    function_responses.append(function_response)
-
-                        if function_responses:
-
-                            await self.session.send_tool_response(function_responses=function_responses)
+                    # 3. Handle Tool Calls: run by the executor, this loop keeps reading audio meanwhile
+                    if response.tool_call and response.tool_call.function_calls:
+                        self.tool_executor.submit(self.session, response.tool_call.function_calls, self._conversation)
                 
                 # Turn/Response Loop Finished
+                self._in_turn = False
                 self.flush_chat()
 
-                while not self.audio_in_queue.empty():
-                    self.audio_in_queue.get_nowait()
+                self.audio_player.flush()
+                self.barge_in.on_model_turn_end()
+                # Tool set changed during the turn (e.g. Google sign-in): responses are out, reconnect now
+                if self._tools_stale and not self.tool_executor.in_flight:
+                    self._apply_tool_refresh()
         except Exception as e:
             print(f"Error in receive_audio: {e}")
             traceback.print_exc()
@@ -2931,126 +2697,205 @@ class AudioLoop:
             raise e
 
     async def play_audio(self):
-        stream = await asyncio.to_thread(
-            pya.open,
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RECEIVE_SAMPLE_RATE,
-            output=True,
-            output_device_index=self.output_device_index,
-        )
-        while True:
-            bytestream = await self.audio_in_queue.get()
-            if self.on_audio_data:
-                self.on_audio_data(bytestream)
-            await asyncio.to_thread(stream.write, bytestream)
+        # The output stream pulls from the jitter buffer on PortAudio's thread;
+        # this task only owns the stream's lifetime.
+        await self.audio_player.open()
+        try:
+            await self.stop_event.wait()
+        finally:
+            print(f"[ADA DEBUG] [AUDIO] Playback stats: {self.audio_player.get_stats()}")
+            print(f"[ADA DEBUG] [AUDIO] Barge-in stats: {self.barge_in.get_stats()}")
+            print(f"[ADA DEBUG] [AUDIO] Echo canceller stats: {self.echo_canceller.get_stats()}")
+            self.audio_player.close()
 
     async def get_frames(self):
-        cap = await asyncio.to_thread(cv2.VideoCapture, 0, cv2.CAP_AVFOUNDATION)
-        while True:
-            if self.paused:
-                await asyncio.sleep(0.1)
-                continue
-            frame = await asyncio.to_thread(self._get_frame, cap)
-            if frame is None:
-                break
-            await asyncio.sleep(1.0)
-            if self.out_queue:
-                await self.out_queue.put(frame)
-        cap.release()
-
-    def _get_frame(self, cap):
-        ret, frame = cap.read()
-        if not ret:
-            return None
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)
-        img.thumbnail([1024, 1024])
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-        image_bytes = image_io.read()
-        return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
-
-    async def _get_screen(self):
-        pass 
-    async def get_screen(self):
-         pass
+        # Shared with face auth / gesture tracking: the device is opened once by the broker,
+        # this subscriber gets frames already resized to the encoder's max size
+        width, height = self.camera_size
+        sub = await asyncio.to_thread(acquire_camera, 0, max_size=self.camera_encoder.max_size, width=width, height=height)
+        if sub is None:
+            return
+        self.scene_detector.reset()
+        try:
+            while True:
+                await self._resume_event.wait()
+                frame = await asyncio.to_thread(sub.read)
+                if frame is None:
+                    # Webcam stalled: keep waiting for it unless the capture owner has shut down
+                    if sub.closed or sub.ring.owner_gone():
+                        break
+                    await asyncio.sleep(0.2)
+                    continue
+                # Cheap NumPy check first; JPEG/base64 only for frames that get sent
+                if self.scene_detector.update(downscale_gray(frame)) and self.uplink:
+                    payload = await asyncio.to_thread(self._encode_frame, frame)
+                    self.uplink.put_frame(payload)
+                await asyncio.sleep(1.0)
+        finally:
+            print(f"[ADA DEBUG] [VIDEO] Scene change stats: {self.scene_detector.get_stats()}")
+            print(f"[ADA DEBUG] [VIDEO] Camera encoder stats: {self.camera_encoder.get_stats()}")
+            sub.close()
+
+    def _encode_frame(self, frame):
+        return self.camera_encoder.encode_payload(frame)
+
+    def _put_screen_frame(self, payload):
+        # Paused: the capture thread keeps running, frames are just not sent
+        if self.uplink and self._resume_event.is_set():
+            self.uplink.put_frame(payload)
 
-    async def run(self, start_message=None):
+    async def get_screen(self):
+        self.screen_capture.reset()
+        try:
+            await stream_screen(self.screen_capture, self._put_screen_frame)
+        finally:
+            print(f"[ADA DEBUG] [VIDEO] Screen capture stats: {self.screen_capture.get_stats()}")
+
+    async def _restore_context(self):
+        """Fallback for a fresh session: replay recent chat text as a user turn."""
+        print(f"[ADA DEBUG] [RECONNECT] Fetching recent chat history to restore context...")
+        history = self.project_manager.get_recent_chat_history(limit=10)
+        
+        context_msg = "System Notification: Connection was lost and just re-established. Here is the recent chat history to help you resume seamlessly:\n\n"
+        for entry in history:
+            sender = entry.get('sender', 'Unknown')
+            text = entry.get('text', '')
+            context_msg += f"[{sender}]: {text}\n"
+        
+        context_msg += "\nPlease acknowledge the reconnection to the user (e.g. 'I lost connection for a moment, but I'm back...') and resume what you were doing."
+        
+        print(f"[ADA DEBUG] [RECONNECT] Sending restoration context to model...")
+        await self.session.send(input=context_msg, end_of_turn=True)
+        self.resumption.mark_replayed()
+
+    async def _resumed_session(self, conversation, closed):
+        """
+        The session to send a closed session's tool responses on: the current
+        one once it is ready, if it resumed that session's conversation.
+        None if the conversation started over (fresh or replayed) or no
+        session came back in time.
+        """
+        deadline = time.perf_counter() + TOOL_RESPONSE_RESUME_WAIT_S
+        while self.session is closed or not self._session_ready.is_set():
+            if self._conversation != conversation or self.stop_event.is_set() or time.perf_counter() > deadline:
+                return None
+            await asyncio.sleep(0.05)
+        return self.session if self._conversation == conversation else None
+
+    async def _run_network(self, session, on_ready):
+        """
+        Run the network tasks (uplink sender, receiver) on `session`.
+
+        A session failure propagates and _run_sessions() reconnects, resuming
+        with the stored handle when there is one. Only when the session cannot
+        be resumed does the loop swap to the warm standby (a new server-side
+        session, so its context is replayed from the chat log). Capture, video
+        and playback keep running either way; the uplink buffers speech while
+        no session is connected.
+        """
+        lease = None
+        failed_at = None
+        try:
+            while True:
+                try:
+                    async with asyncio.TaskGroup() as net:
+                        self.session = session
+                        tasks = [net.create_task(self.receive_audio())]
+                        if failed_at is not None:
+                            self.standby.record_swap(time.perf_counter() - failed_at)
+                            print(f"[ADA DEBUG] [STANDBY] Swapped to standby session in {(time.perf_counter() - failed_at) * 1000:.0f} ms.")
+                        await on_ready()
+                        self._session_ready.set()
+                        # Start/context turn first, then speech buffered during the gap (sent in catch-up batches)
+                        if self.uplink.audio_depth_ms:
+                            print(f"[ADA DEBUG] [UPLINK] Flushing {self.uplink.audio_depth_ms:.0f} ms of speech buffered while disconnected.")
+                        self.uplink.set_connected(True)
+                        tasks.append(net.create_task(self.send_realtime()))
+                        # Wait until stop; a failing network task cancels this and exits the group
+                        await self.stop_event.wait()
+                        for task in tasks:
+                            task.cancel()
+                    return
+                except Exception as e:
+                    self.uplink.set_connected(False)
+                    self._session_ready.clear()
+                    if self.stop_event.is_set() or self.standby is None:
+                        raise
+                    if self.resumption.handle is not None:
+                        # A resumed connect keeps the server-side context and pending tool calls
+                        print(f"[ADA DEBUG] [STANDBY] Session is resumable; reconnecting with its handle instead.")
+                        raise
+                    next_lease = await self.standby.take()
+                    if next_lease is None:
+                        print(f"[ADA DEBUG] [STANDBY] No healthy standby session; reconnecting.")
+                        raise
+                    print(f"[ADA DEBUG] [ERR] Connection Error: {e}")
+                    failed_at = time.perf_counter()
+                    self._go_away = False
+                    if lease:
+                        lease.release()
+                    lease = next_lease
+                    session = lease.session
+                    # Handles the standby was sent while idle now belong to the active session
+                    for message in lease.received:
+                        self.resumption.on_update(message.session_resumption_update)
+                    # A new session has seen no image yet; its context comes from the chat log
+                    self.frame_slot.reset()
+                    self._conversation += 1
+                    on_ready = self._restore_context
+        finally:
+            if lease:
+                lease.release()
+
+    async def _run_sessions(self, start_message=None):
+        """Connect, run the network tasks, and reconnect until stopped."""
         retry_delay = 1
         is_reconnect = False
         
         while not self.stop_event.is_set():
             try:
                 print(f"[ADA DEBUG] [CONNECT] Connecting to Gemini Live API...")
-                async with (
-                    client.aio.live.connect(model=MODEL, config=config) as session,
-                    asyncio.TaskGroup() as tg,
-                ):
+                async with self.resumption.connect(get_client(), MODEL, self._session_config()) as session:
                     self.session = session
-
-                    self.audio_in_queue = asyncio.Queue()
-                    self.out_queue = asyncio.Queue(maxsize=10)
-
-                    tg.create_task(self.send_realtime())
-                    tg.create_task(self.listen_audio())
-                    # tg.create_task(self._process_video_queue()) # Removed in favor of VAD
-
-                    if self.video_mode == "camera":
-                        tg.create_task(self.get_frames())
-                    elif self.video_mode == "screen":
-                        tg.create_task(self.get_screen())
-
-                    tg.create_task(self.receive_audio())
-                    tg.create_task(self.play_audio())
-
-                    # Handle Startup vs Reconnect Logic
-                    if not is_reconnect:
-                        if start_message:
-                            print(f"[ADA DEBUG] [INFO] Sending start message: {start_message}")
-                            await self.session.send(input=start_message, end_of_turn=True)
-                        
-                        # Sync Project State
-                        if self.on_project_update and self.project_manager:
-                            self.on_project_update(self.project_manager.current_project)
-                    
-                    else:
-                        print(f"[ADA DEBUG] [RECONNECT] Connection restored.")
-                        # Restore Context
-                        print(f"[ADA DEBUG] [RECONNECT] Fetching recent chat history to restore context...")
-                        history = self.project_manager.get_recent_chat_history(limit=10)
-                        
-                        context_msg = "System Notification: Connection was lost and just re-established. Here is the recent chat history to help you resume seamlessly:\n\n"
-                        for entry in history:
-                            sender = entry.get('sender', 'Unknown')
-                            text = entry.get('text', '')
-                            context_msg += f"[{sender}]: {text}\n"
-                        
-                        context_msg += "\nPlease acknowledge the reconnection to the user (e.g. 'I lost connection for a moment, but I'm back...') and resume what you were doing."
+                    if not self.resumption.resumed:
+                        self._conversation += 1
+
+                    self.audio_player.flush()
+                    # A new session has seen no image yet
+                    self.frame_slot.reset()
+
+                    async def on_ready():
+                        nonlocal retry_delay
+                        # Reset retry delay on successful connection
+                        retry_delay = 1
+
+                        # Session is live: build the expensive agents in the background,
+                        # then redeclare tools if a check changed (e.g. Google token refresh failed)
+                        self.agents.start_warmup(on_done=self.refresh_tools)
+
+                        # Handle Startup vs Reconnect Logic
+                        if not is_reconnect:
+                            if start_message:
+                                print(f"[ADA DEBUG] [INFO] Sending start message: {start_message}")
+                                await self.session.send(input=start_message, end_of_turn=True)
+                            
+                            # Sync Project State
+                            if self.on_project_update and self.project_manager:
+                                self.on_project_update(self.project_manager.current_project)
                         
-                        print(f"[ADA DEBUG] [RECONNECT] Sending restoration context to model...")
-                        await self.session.send(input=context_msg, end_of_turn=True)
+                        elif self.resumption.resumed:
+                            # Server restored the session (context and tool state); nothing to replay
+                            print(f"[ADA DEBUG] [RECONNECT] Session resumed.")
 
-                    # Reset retry delay on successful connection
-                    retry_delay = 1
-                    
-                    # Wait until stop event, or until the session task group exits (which happens on error)
-                    # Actually, the TaskGroup context manager will exit if any tasks fail/cancel.
-                    # We need to keep this block alive.
-                    # The original code just waited on stop_event, but that doesn't account for session death.
-                    # We should rely on the TaskGroup raising an exception when subtasks fail (like receive_audio).
-                    
-                    # However, since receive_audio is a task in the group, if it crashes (connection closed), 
-                    # the group will cancel others and exit. We catch that exit below.
-                    
-                    # We can await stop_event, but if the connection dies, receive_audio crashes -> group closes -> we exit `async with` -> restart loop.
-                    # To ensure we don't block indefinitely if connection dies silently (unlikely with receive_audio), we just wait.
-                    await self.stop_event.wait()
+                        else:
+                            print(f"[ADA DEBUG] [RECONNECT] Connection restored without a resumable session.")
+                            await self._restore_context()
+
+                    # Runs until stop; raises when the session fails and no standby can take over
+                    await self._run_network(session, on_ready)
 
             except asyncio.CancelledError:
-                print(f"[ADA DEBUG] [STOP] Main loop cancelled.")
-                break
+                raise
                 
             except Exception as e:
                 # This catches the ExceptionGroup from TaskGroup or direct exceptions
@@ -3059,18 +2904,77 @@ class AudioLoop:
                 if self.stop_event.is_set():
                     break
                 
-                print(f"[ADA DEBUG] [RETRY] Reconnecting in {retry_delay} seconds...")
+                self.resumption.mark_disconnected()
+                is_reconnect = True # Next loop will be a reconnect
+                if self._go_away:
+                    # Planned server disconnect: resume right away, no backoff
+                    self._go_away = False
+                    continue
+
+                print(f"[ADA DEBUG] [RETRY] Reconnecting in {retry_delay} seconds... (speech is buffered meanwhile)")
                 await asyncio.sleep(retry_delay)
                 retry_delay = min(retry_delay * 2, 10) # Exponential backoff capped at 10s
-                is_reconnect = True # Next loop will be a reconnect
                 
             finally:
                 # Cleanup before retry
-                if hasattr(self, 'audio_stream') and self.audio_stream:
-                    try:
-                        self.audio_stream.close()
-                    except: 
-                        pass
+                print(f"[ADA DEBUG] [CONNECT] Session resumption stats: {self.resumption.get_stats()}")
+                if self.standby:
+                    print(f"[ADA DEBUG] [STANDBY] Standby stats: {self.standby.get_stats()}")
+                if self.audio_sender:
+                    print(f"[ADA DEBUG] [UPLINK] Audio sender stats: {self.audio_sender.get_stats()}")
+                    self.audio_sender = None
+
+    async def run(self, start_message=None):
+        if self.standby:
+            self.standby.start()
+        # Capture, video and playback live for the whole run; only the session
+        # reconnects. Speech captured while disconnected waits in the uplink.
+        self.uplink = UplinkScheduler(
+            sample_rate=SEND_SAMPLE_RATE,
+            max_batch_ms=UPLINK_LATENCY_BUDGET_MS,
+            reconnect_buffer_ms=self.reconnect_buffer_ms,
+            connected=False,
+        )
+        try:
+            async with asyncio.TaskGroup() as tg:
+                media = [tg.create_task(self.listen_audio())]
+                # tg.create_task(self._process_video_queue()) # Removed in favor of VAD
+
+                if self.video_mode == "camera":
+                    media.append(tg.create_task(self.get_frames()))
+                elif self.video_mode == "screen":
+                    media.append(tg.create_task(self.get_screen()))
+
+                media.append(tg.create_task(self.play_audio()))
+                # Tool calls outlive reconnects too; responses go to the session that asked
+                media.append(tg.create_task(self.tool_executor.run()))
+
+                await self._run_sessions(start_message)
+                for task in media:
+                    task.cancel()
+
+        except asyncio.CancelledError:
+            print(f"[ADA DEBUG] [STOP] Main loop cancelled.")
+
+        except Exception as e:
+            print(f"[ADA DEBUG] [ERR] Capture/playback failed: {e}")
+
+        finally:
+            print(f"[ADA DEBUG] [UPLINK] Scheduler stats: {self.uplink.get_stats()}")
+            print(f"[ADA DEBUG] [UPLINK] Frame stats: {self.frame_slot.get_stats()}")
+            self.uplink = None
+            if self.mic_capture:
+                print(f"[ADA DEBUG] [AUDIO] Capture stats: {self.mic_capture.get_stats()}")
+                print(f"[ADA DEBUG] [AUDIO] Uplink gate stats: {self.speech_gate.get_stats()}")
+                self.mic_capture.close()
+                self.mic_capture = None
+            if self.standby:
+                await self.standby.close()
+            self.agents.stop()
+            print(f"[ADA DEBUG] [AGENTS] Agent stats: {self.agents.get_stats()}")
+            self.tool_registry.cancel_background()
+            print(f"[ADA DEBUG] [TOOLS] Tool call stats: {self.tool_registry.get_stats()}")
+            print(f"[ADA DEBUG] [TOOLS] Tool executor stats: {self.tool_executor.get_stats()}")
 
 def get_input_devices():
     p = pyaudio.PyAudio()
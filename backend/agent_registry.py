@@ -0,0 +1,163 @@
+"""
+Agent Registry - Creates tool agents on first use instead of up front.
+AudioLoop used to construct every agent (a genai.Client for the web agent,
+Google credential loading and refresh, HTTP clients, ...) synchronously in
+__init__, inside the start_audio handler, before the Live session was even
+opened. Agents are now registered as factories: the first access constructs
+one, and agents marked `warm` are constructed in worker threads (plus an
+optional async warmup such as opening an HTTP session) once the session is
+live, so they are usually ready before the model first calls them.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class _Entry:
+    def __init__(self, name: str, factory: Callable[[], Any], warm: bool,
+                 warmup: Optional[Callable[[Any], Awaitable[Any]]]):
+        self.name = name
+        self.factory = factory
+        self.warm = warm
+        self.warmup = warmup
+        self.instance = None
+        self.lock = threading.Lock()
+        self.state = PENDING
+        self.source: Optional[str] = None
+        self.init_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class AgentRegistry:
+    """
+    Lazily constructed agents.
+
+    Provides:
+    - get(): the agent, constructing it on first use (thread-safe, at most once)
+    - aget(): the same for async code; never blocks the event loop
+    - peek(): the agent only if it already exists
+    - start_warmup(): background construction and warmup of agents marked warm
+    - Per-agent state, init and warmup time, and whether first use or warmup built it
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, factory: Callable[[], Any], warm: bool = False,
+                 warmup: Optional[Callable[[Any], Awaitable[Any]]] = None):
+        """
+        Args:
+            name: Agent name
+            factory: Builds the agent (called once, possibly in a worker thread)
+            warm: Construct in the background after start_warmup()
+            warmup: Coroutine function run on the agent after background construction
+        """
+        self._entries[name] = _Entry(name, factory, warm, warmup)
+
+    def _build(self, entry: _Entry, source: str):
+        with entry.lock:
+            if entry.instance is not None:
+                return entry.instance
+            start = time.perf_counter()
+            try:
+                instance = entry.factory()
+            except Exception as e:
+                entry.state = FAILED
+                entry.error = str(e)
+                print(f"[AGENTS] [ERR] Failed to create '{entry.name}': {e}")
+                raise
+            entry.init_ms = (time.perf_counter() - start) * 1000
+            entry.source = source
+            entry.instance = instance
+            entry.state = READY
+            print(f"[AGENTS] Created '{entry.name}' in {entry.init_ms:.0f} ms ({source}).")
+            return instance
+
+    def get(self, name: str):
+        """The agent, constructed now if nothing has created it yet."""
+        entry = self._entries[name]
+        if entry.instance is not None:
+            return entry.instance
+        return self._build(entry, "first_use")
+
+    async def aget(self, name: str):
+        """
+        The agent, for async code. A first use builds it in a worker thread,
+        and a build already running (e.g. warmup) is waited for there too, so
+        the event loop never blocks on the factory or on the entry's lock.
+        """
+        entry = self._entries[name]
+        if entry.instance is not None:
+            return entry.instance
+        return await asyncio.to_thread(self._build, entry, "first_use")
+
+    def peek(self, name: str):
+        """The agent if it already exists, else None (never constructs)."""
+        entry = self._entries.get(name)
+        return entry.instance if entry is not None else None
+
+    async def _warm_one(self, entry: _Entry):
+        if entry.instance is None:
+            entry.state = WARMING
+            try:
+                await asyncio.to_thread(self._build, entry, "warmup")
+            except Exception:
+                return
+        if entry.warmup is not None:
+            start = time.perf_counter()
+            try:
+                await entry.warmup(entry.instance)
+                entry.warmup_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                entry.error = str(e)
+                print(f"[AGENTS] [WARN] Warmup of '{entry.name}' failed: {e}")
+
+    async def warm(self):
+        """Construct and warm every agent marked warm, concurrently."""
+        start = time.perf_counter()
+        await asyncio.gather(*(self._warm_one(e) for e in self._entries.values() if e.warm))
+        print(f"[AGENTS] Warmup finished in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+    def start_warmup(self, on_done: Optional[Callable[[], Any]] = None) -> asyncio.Task:
+        """Start warm() on the running loop once; on_done runs after it finishes."""
+        if self._warmup_task is None:
+            async def run():
+                await self.warm()
+                if on_done is not None:
+                    on_done()
+            self._warmup_task = asyncio.create_task(run())
+        return self._warmup_task
+
+    def stop(self):
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "state": e.state,
+                "source": e.source,
+                "init_ms": round(e.init_ms, 1) if e.init_ms is not None else None,
+                "warmup_ms": round(e.warmup_ms, 1) if e.warmup_ms is not None else None,
+                "error": e.error,
+            }
+            for name, e in self._entries.items()
+        }
+
+
+def agent_property(name: str) -> property:
+    """
+    Attribute that resolves `name` from the owner's `agents` registry on
+    access. A first access builds synchronously; async code uses
+    `await agents.aget(name)` instead.
+    """
+    return property(lambda self: self.agents.get(name), doc=f"The '{name}' agent (created on first use).")
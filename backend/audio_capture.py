@@ -0,0 +1,381 @@
+"""
+Audio Capture - Owns the microphone stream for AudioLoop.
+PortAudio delivers PCM on its own thread (callback mode, or one dedicated
+reader thread as a fallback) into a preallocated ring buffer, so capture never
+competes with asyncio.to_thread work in the default executor.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from resampler import PolyphaseResampler
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+# PortAudio constants (mirrored so this module imports without pyaudio)
+PA_INT16 = pyaudio.paInt16 if pyaudio else 8
+PA_CONTINUE = pyaudio.paContinue if pyaudio else 0
+PA_INPUT_UNDERFLOW = pyaudio.paInputUnderflow if pyaudio else 1
+PA_INPUT_OVERFLOW = pyaudio.paInputOverflow if pyaudio else 2
+
+
+class ChunkRingBuffer:
+    """
+    Fixed-size ring of PCM chunks for one producer thread and one consumer.
+
+    The backing bytearray is allocated once. Writers may hand in any number of
+    bytes; they are packed into chunk-sized slots. Readers get a memoryview of
+    a whole slot, which stays valid until their next read() call.
+    """
+
+    def __init__(self, chunk_bytes: int, capacity: int = 64):
+        """
+        Args:
+            chunk_bytes: Size of one slot in bytes
+            capacity: Number of slots (one is always reserved for the reader)
+        """
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.chunk_bytes = chunk_bytes
+        self.capacity = capacity
+        self._buf = bytearray(chunk_bytes * capacity)
+        self._view = memoryview(self._buf)
+        self._write_idx = 0  # Chunks committed by the producer
+        self._read_idx = 0   # Chunks handed to the consumer
+        self._fill = 0       # Bytes already in the slot being written
+        self._stamps = [0.0] * capacity  # time.monotonic() when each slot was completed
+        self.last_read_stamp = 0.0
+        self.overflow_chunks = 0
+
+    def __len__(self):
+        return self._write_idx - self._read_idx
+
+    def write(self, data) -> int:
+        """
+        Append PCM bytes from the producer thread.
+
+        Returns:
+            Number of bytes dropped because the ring was full
+        """
+        src = memoryview(data).cast("B")
+        size = len(src)
+        pos = 0
+        while pos < size:
+            # The slot the consumer currently holds must not be overwritten
+            if self._write_idx - self._read_idx >= self.capacity - 1:
+                dropped = size - pos
+                self.overflow_chunks += -(-dropped // self.chunk_bytes)
+                return dropped
+            offset = (self._write_idx % self.capacity) * self.chunk_bytes + self._fill
+            n = min(self.chunk_bytes - self._fill, size - pos)
+            self._view[offset:offset + n] = src[pos:pos + n]
+            self._fill += n
+            pos += n
+            if self._fill == self.chunk_bytes:
+                self._fill = 0
+                self._stamps[self._write_idx % self.capacity] = time.monotonic()
+                self._write_idx += 1  # Publish the slot only once it is complete
+        return 0
+
+    def read(self) -> Optional[memoryview]:
+        """Return the oldest complete chunk as a memoryview, or None if empty."""
+        if self._write_idx == self._read_idx:
+            return None
+        slot = self._read_idx % self.capacity
+        offset = slot * self.chunk_bytes
+        self.last_read_stamp = self._stamps[slot]
+        self._read_idx += 1
+        return self._view[offset:offset + self.chunk_bytes]
+
+    def clear(self):
+        """Drop everything the consumer hasn't read yet."""
+        self._read_idx = self._write_idx
+
+
+class MicCapture:
+    """
+    Microphone capture subsystem.
+
+    Provides:
+    - A PortAudio callback stream (or one owned reader thread) feeding a ChunkRingBuffer
+    - An awaitable read() returning zero-copy memoryview chunks on the event loop
+    - Overflow/underflow counters to prove nothing is dropped under load
+    - Optional conversion from the device's native rate/channels on the PortAudio thread
+    """
+
+    def __init__(self, pya, rate: int = 16000, channels: int = 1, chunk_size: int = 1024,
+                 input_device_index: Optional[int] = None, ring_chunks: int = 64,
+                 use_callback: bool = True, device_rate: Optional[int] = None,
+                 device_channels: Optional[int] = None):
+        """
+        Args:
+            pya: pyaudio.PyAudio instance used to open the stream
+            rate: Sample rate of the chunks handed to the consumer
+            channels: Channel count of the chunks handed to the consumer
+            chunk_size: Frames per chunk handed to the consumer
+            input_device_index: PortAudio device index (None = default)
+            ring_chunks: Ring capacity in chunks (64 x 1024 @ 16 kHz is ~4 s)
+            use_callback: Use PortAudio callback mode; False starts a reader thread
+            device_rate: Rate to open the device at (None = rate)
+            device_channels: Channels to open the device with (None = channels)
+        """
+        self.pya = pya
+        self.rate = rate
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.input_device_index = input_device_index
+        self.use_callback = use_callback
+        self.device_rate = device_rate or rate
+        self.device_channels = device_channels or channels
+        # Device buffer covering the same duration as one consumer chunk
+        self.device_chunk_size = max(1, round(chunk_size * self.device_rate / rate))
+        self.resampler = None
+        if (self.device_rate, self.device_channels) != (rate, channels):
+            self.resampler = PolyphaseResampler(self.device_rate, rate, self.device_channels, channels)
+
+        self.ring = ChunkRingBuffer(chunk_size * channels * 2, ring_chunks)
+        self.stream = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._data_ready: Optional[asyncio.Event] = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._running = False
+        # Set while capturing; cleared by pause(). The reader thread owns the stream in thread mode.
+        self._active = threading.Event()
+        self._stream_stopped = False
+
+        # Counters
+        self.callbacks = 0
+        self.chunks_read = 0
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self.read_errors = 0
+        self._started_at = None
+
+    # ------------------------------------------------------------------
+    # Producer side (PortAudio thread)
+    # ------------------------------------------------------------------
+
+    def _notify(self):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._data_ready.set)
+            except RuntimeError:
+                # Loop shut down between the check and the call
+                pass
+
+    def _on_pcm(self, in_data, status: int = 0):
+        self.callbacks += 1
+        if status & PA_INPUT_OVERFLOW:
+            self.input_overflows += 1
+        if status & PA_INPUT_UNDERFLOW:
+            self.input_underflows += 1
+        if in_data:
+            if self.resampler is not None:
+                in_data = self.resampler.process(in_data)
+            self.ring.write(in_data)
+            self._notify()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self._on_pcm(in_data, status)
+        return (None, PA_CONTINUE)
+
+    def _reader_loop(self):
+        while self._running:
+            if not self._active.is_set():
+                if not self._stream_stopped:
+                    self._stop_stream_quietly()
+                if not self._active.wait(0.1):
+                    continue
+                if not self._running:
+                    break
+            if self._stream_stopped:
+                self.stream.start_stream()
+                self._stream_stopped = False
+            try:
+                data = self.stream.read(self.device_chunk_size, exception_on_overflow=False)
+            except Exception as e:
+                if not self._running:
+                    break
+                self.read_errors += 1
+                print(f"[CAPTURE] [ERR] Read failed: {e}")
+                time.sleep(0.05)
+                continue
+            self._on_pcm(data)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Open the device and begin capturing. Blocking; call via asyncio.to_thread.
+
+        Args:
+            loop: Event loop that read() will be awaited on
+        """
+        if loop is not None:
+            self._loop = loop
+        if self._data_ready is None:
+            self._data_ready = asyncio.Event()
+
+        kwargs = {
+            "format": PA_INT16,
+            "channels": self.device_channels,
+            "rate": self.device_rate,
+            "input": True,
+            "input_device_index": self.input_device_index,
+            "frames_per_buffer": self.device_chunk_size,
+        }
+        if self.use_callback:
+            kwargs["stream_callback"] = self._callback
+
+        self.stream = self.pya.open(**kwargs)
+        self._running = True
+        self._active.set()
+        self._started_at = time.perf_counter()
+
+        if self.use_callback:
+            self.stream.start_stream()
+        else:
+            self._reader_thread = threading.Thread(target=self._reader_loop, name="MicCapture", daemon=True)
+            self._reader_thread.start()
+        converted = f" -> {self.rate} Hz" if self.resampler else ""
+        print(f"[CAPTURE] Started ({'callback' if self.use_callback else 'thread'} mode, "
+              f"{self.device_rate} Hz x{self.device_channels}{converted}, ring={self.ring.capacity} chunks)")
+
+    async def open(self):
+        """Async convenience wrapper around start() bound to the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._data_ready = asyncio.Event()
+        await asyncio.to_thread(self.start)
+
+    def _stop_stream_quietly(self):
+        try:
+            self.stream.stop_stream()
+        except Exception:
+            pass
+        self._stream_stopped = True
+
+    def pause(self):
+        """
+        Stop the hardware stream without closing the device. Blocking; call via
+        asyncio.to_thread.
+        """
+        if not self._running or not self._active.is_set():
+            return
+        self._active.clear()
+        if self.use_callback:
+            self._stop_stream_quietly()
+        self.ring.clear()
+
+    def resume(self):
+        """Restart a paused stream. Blocking; call via asyncio.to_thread."""
+        if not self._running or self._active.is_set():
+            return
+        self.ring.clear()
+        if self.resampler is not None:
+            self.resampler.reset()
+        if self.use_callback:
+            self.stream.start_stream()
+            self._stream_stopped = False
+        self._active.set()
+
+    @property
+    def is_paused(self) -> bool:
+        return self._running and not self._active.is_set()
+
+    def close(self):
+        """Stop capturing and release the device."""
+        self._running = False
+        self._active.set()  # Wake a paused reader thread so it can exit
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+            except Exception:
+                pass
+            try:
+                stream.close()
+            except Exception:
+                pass
+        if self._reader_thread is not None:
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def latency(self) -> float:
+        """Input latency reported by PortAudio in seconds (estimate if not open)."""
+        try:
+            return self.stream.get_input_latency()
+        except Exception:
+            return self.chunk_size / self.rate
+
+    @property
+    def last_chunk_time(self) -> float:
+        """time.monotonic() at which the chunk last returned by read() finished capturing."""
+        return self.ring.last_read_stamp
+
+    # ------------------------------------------------------------------
+    # Consumer side (event loop)
+    # ------------------------------------------------------------------
+
+    async def read(self) -> memoryview:
+        """
+        Wait for the next chunk.
+
+        Returns:
+            memoryview into the ring buffer, valid until the next read()
+        """
+        while True:
+            chunk = self.ring.read()
+            if chunk is not None:
+                self.chunks_read += 1
+                return chunk
+            # Clear before re-checking so a write between the two can't be missed
+            self._data_ready.clear()
+            chunk = self.ring.read()
+            if chunk is not None:
+                self.chunks_read += 1
+                return chunk
+            await self._data_ready.wait()
+
+    def discard(self) -> int:
+        """Drop any buffered audio (e.g. while paused). Returns chunks dropped."""
+        pending = len(self.ring)
+        self.ring.clear()
+        return pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Capture health counters.
+
+        Returns:
+            dict with ring depth, drop counters and callback counts
+        """
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "mode": "callback" if self.use_callback else "thread",
+            "running": self._running,
+            "paused": self.is_paused,
+            "uptime_s": round(uptime, 3),
+            "callbacks": self.callbacks,
+            "chunks_captured": self.ring._write_idx,
+            "chunks_read": self.chunks_read,
+            "ring_depth": len(self.ring),
+            "ring_capacity": self.ring.capacity,
+            "ring_overflows": self.ring.overflow_chunks,
+            "input_overflows": self.input_overflows,
+            "input_underflows": self.input_underflows,
+            "read_errors": self.read_errors,
+            "resampler": self.resampler.get_stats() if self.resampler else None,
+        }
@@ -0,0 +1,343 @@
+"""
+Audio Playback - Plays model audio for AudioLoop.
+Received PCM goes into a bounded byte-level jitter buffer; a PortAudio
+callback stream pulls from it on its own thread, so playback never waits on
+the asyncio default executor and barge-in can flush in O(1).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any, Callable
+
+import numpy as np
+
+from resampler import PolyphaseResampler
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+# PortAudio constants (mirrored so this module imports without pyaudio)
+PA_INT16 = pyaudio.paInt16 if pyaudio else 8
+PA_CONTINUE = pyaudio.paContinue if pyaudio else 0
+PA_OUTPUT_UNDERFLOW = pyaudio.paOutputUnderflow if pyaudio else 4
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+
+class JitterBuffer:
+    """
+    Bounded ring of PCM bytes between the network and the sound card.
+
+    Provides:
+    - Preallocated storage with a hard size cap (no growth under bursts)
+    - Prebuffering: output starts only once `start_bytes` are queued
+    - Drop-oldest on overrun, so latency stays bounded
+    - O(1) flush for barge-in
+    """
+
+    def __init__(self, capacity_bytes: int, start_bytes: int = 0, start_timeout: float = 0.06):
+        """
+        Args:
+            capacity_bytes: Hard cap on buffered audio
+            start_bytes: Bytes required before output (re)starts after being empty
+            start_timeout: Seconds after which a short tail plays even below start_bytes
+        """
+        self.capacity = capacity_bytes
+        self.start_bytes = min(start_bytes, capacity_bytes)
+        self.start_timeout = start_timeout
+        self._pending_since = None
+        self._buf = bytearray(capacity_bytes)
+        self._view = memoryview(self._buf)
+        self._read_pos = 0
+        self._size = 0
+        self._primed = False
+        self._starved = False
+        self._lock = threading.Lock()
+
+        self.bytes_written = 0
+        self.bytes_played = 0
+        self.overrun_bytes = 0
+        self.overruns = 0
+        self.underruns = 0
+        self.flushes = 0
+        self.peak_bytes = 0
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data) -> int:
+        """
+        Queue PCM for playback.
+
+        Returns:
+            Number of old bytes dropped to make room
+        """
+        src = memoryview(data).cast("B")
+        n = len(src)
+        if n == 0:
+            return 0
+        with self._lock:
+            if self._starved:
+                # More audio after the buffer ran dry: there was an audible gap
+                self.underruns += 1
+                self._starved = False
+            dropped = 0
+            if n >= self.capacity:
+                # Larger than the whole buffer: keep only the newest audio
+                dropped = self._size + (n - self.capacity)
+                src = src[n - self.capacity:]
+                n = self.capacity
+                self._read_pos = 0
+                self._size = 0
+            elif self._size + n > self.capacity:
+                dropped = self._size + n - self.capacity
+                self._read_pos = (self._read_pos + dropped) % self.capacity
+                self._size -= dropped
+            if dropped:
+                self.overruns += 1
+                self.overrun_bytes += dropped
+
+            if self._size == 0 and not self._primed:
+                self._pending_since = time.monotonic()
+            write_pos = (self._read_pos + self._size) % self.capacity
+            first = min(n, self.capacity - write_pos)
+            self._view[write_pos:write_pos + first] = src[:first]
+            if first < n:
+                self._view[:n - first] = src[first:]
+            self._size += n
+            self.bytes_written += n
+            if self._size > self.peak_bytes:
+                self.peak_bytes = self._size
+            return dropped
+
+    def read_into(self, out: memoryview) -> int:
+        """
+        Fill `out` with queued PCM, padding with silence.
+
+        Returns:
+            Number of real (non-silence) bytes copied
+        """
+        want = len(out)
+        with self._lock:
+            if not self._primed:
+                ready = self._size >= self.start_bytes or (
+                    self._size and time.monotonic() - self._pending_since >= self.start_timeout
+                )
+                if not self._size or not ready:
+                    out[:] = bytes(want)
+                    return 0
+                self._primed = True
+
+            n = min(want, self._size)
+            first = min(n, self.capacity - self._read_pos)
+            out[:first] = self._view[self._read_pos:self._read_pos + first]
+            if first < n:
+                out[first:n] = self._view[:n - first]
+            self._read_pos = (self._read_pos + n) % self.capacity
+            self._size -= n
+            self.bytes_played += n
+
+            if n < want:
+                out[n:] = bytes(want - n)
+                # Ran dry: prebuffer again before resuming. Only counted as an
+                # underrun if more audio arrives before the next flush.
+                self._starved = True
+                self._primed = False
+            return n
+
+    def flush(self) -> int:
+        """Drop all queued audio in O(1). Returns bytes dropped."""
+        with self._lock:
+            dropped = self._size
+            self._read_pos = 0
+            self._size = 0
+            self._primed = False
+            self._starved = False
+            if dropped:
+                self.flushes += 1
+            return dropped
+
+
+class AudioPlayer:
+    """
+    Callback-driven playback engine.
+
+    Provides:
+    - write(): non-blocking enqueue from the event loop
+    - flush(): immediate barge-in
+    - A PortAudio callback output stream that never touches asyncio
+    - Buffer depth / underrun / overrun stats
+    - Optional conversion to the device's native rate/channels on write()
+    """
+
+    def __init__(self, pya, rate: int = 24000, channels: int = 1,
+                 frames_per_buffer: int = 480, max_buffer_ms: int = 30000,
+                 prebuffer_ms: int = 60, output_device_index: Optional[int] = None,
+                 on_output: Optional[Callable[[memoryview], None]] = None,
+                 device_rate: Optional[int] = None, device_channels: Optional[int] = None):
+        """
+        Args:
+            pya: pyaudio.PyAudio instance used to open the stream
+            rate: Sample rate of the PCM passed to write()
+            channels: Channel count of the PCM passed to write()
+            frames_per_buffer: Frames per callback at `rate` (480 @ 24 kHz is 20 ms)
+            max_buffer_ms: Jitter buffer cap; model audio arrives faster than real time
+            prebuffer_ms: Audio queued before output starts, absorbs network jitter
+            output_device_index: PortAudio device index (None = default)
+            on_output: Called on the audio thread with every buffer handed to the
+                device (after gain, in device format), e.g. as the echo canceller's reference
+            device_rate: Rate to open the device at (None = rate)
+            device_channels: Channels to open the device with (None = channels)
+        """
+        self.pya = pya
+        self.on_output = on_output
+        self.rate = rate
+        self.channels = channels
+        self.output_device_index = output_device_index
+        self.device_rate = device_rate or rate
+        self.device_channels = device_channels or channels
+        self.frames_per_buffer = max(1, round(frames_per_buffer * self.device_rate / rate))
+        self.resampler = None
+        if (self.device_rate, self.device_channels) != (rate, channels):
+            self.resampler = PolyphaseResampler(rate, self.device_rate, channels, self.device_channels)
+
+        # The jitter buffer holds audio already in device format
+        bytes_per_ms = self.device_rate * self.device_channels * SAMPLE_WIDTH / 1000
+        self.bytes_per_ms = bytes_per_ms
+        frame_bytes = self.device_channels * SAMPLE_WIDTH
+        capacity = int(bytes_per_ms * max_buffer_ms) // frame_bytes * frame_bytes
+        start = int(bytes_per_ms * prebuffer_ms) // frame_bytes * frame_bytes
+        self.buffer = JitterBuffer(capacity, start, prebuffer_ms / 1000)
+
+        self._out = bytearray(self.frames_per_buffer * frame_bytes)
+        self._out_view = memoryview(self._out)
+        self._out_samples = np.frombuffer(self._out, dtype=np.int16)
+        self.gain = 1.0
+        self.stream = None
+        self.callbacks = 0
+        self.output_underflows = 0
+        self._last_audio_time = 0.0
+
+    # ------------------------------------------------------------------
+    # PortAudio thread
+    # ------------------------------------------------------------------
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self.callbacks += 1
+        if status & PA_OUTPUT_UNDERFLOW:
+            self.output_underflows += 1
+        size = frame_count * self.device_channels * SAMPLE_WIDTH
+        if size != len(self._out):
+            self._out = bytearray(size)
+            self._out_view = memoryview(self._out)
+            self._out_samples = np.frombuffer(self._out, dtype=np.int16)
+        if self.buffer.read_into(self._out_view):
+            self._last_audio_time = time.monotonic()
+            gain = self.gain
+            if gain != 1.0:
+                # Ducking: scale in place, no allocation on the audio thread
+                np.multiply(self._out_samples, gain, out=self._out_samples, casting="unsafe")
+        if self.on_output:
+            self.on_output(self._out_view)
+        return (bytes(self._out), PA_CONTINUE)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Open and start the output stream. Blocking; call via asyncio.to_thread."""
+        self.stream = self.pya.open(
+            format=PA_INT16,
+            channels=self.device_channels,
+            rate=self.device_rate,
+            output=True,
+            output_device_index=self.output_device_index,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback,
+        )
+        self.stream.start_stream()
+        converted = f"{self.rate} Hz -> " if self.resampler else ""
+        print(f"[PLAYBACK] Started (callback mode, {converted}{self.device_rate} Hz x{self.device_channels}, "
+              f"{self.frames_per_buffer} frames/buffer)")
+
+    async def open(self):
+        await asyncio.to_thread(self.start)
+
+    @property
+    def latency(self) -> float:
+        """Output latency reported by PortAudio in seconds (estimate if not open)."""
+        try:
+            return self.stream.get_output_latency()
+        except Exception:
+            return self.frames_per_buffer / self.device_rate * 2
+
+    def close(self):
+        """Stop the output stream and release the device."""
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+            except Exception:
+                pass
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------------
+
+    def write(self, data) -> int:
+        """Queue model audio. Never blocks. Returns bytes dropped on overrun."""
+        if self.resampler is not None:
+            data = self.resampler.process(data)
+        return self.buffer.write(data)
+
+    def flush(self) -> int:
+        """Stop playback immediately by discarding queued audio. Returns bytes dropped."""
+        if self.resampler is not None:
+            self.resampler.reset()
+        return self.buffer.flush()
+
+    def set_gain(self, gain: float):
+        """Set the output gain (1.0 = unity). Takes effect on the next callback."""
+        self.gain = max(0.0, min(1.0, float(gain)))
+
+    @property
+    def buffered_ms(self) -> float:
+        return len(self.buffer) / self.bytes_per_ms
+
+    @property
+    def is_playing(self) -> bool:
+        """True while audio is queued or was audible within the last callback period."""
+        if len(self.buffer):
+            return True
+        return time.monotonic() - self._last_audio_time < self.frames_per_buffer / self.device_rate * 2
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict with buffer depth and under/overrun counters
+        """
+        buf = self.buffer
+        return {
+            "running": self.stream is not None,
+            "gain": self.gain,
+            "buffered_ms": round(self.buffered_ms, 1),
+            "peak_buffered_ms": round(buf.peak_bytes / self.bytes_per_ms, 1),
+            "capacity_ms": round(buf.capacity / self.bytes_per_ms, 1),
+            "bytes_written": buf.bytes_written,
+            "bytes_played": buf.bytes_played,
+            "underruns": buf.underruns,
+            "overruns": buf.overruns,
+            "overrun_ms": round(buf.overrun_bytes / self.bytes_per_ms, 1),
+            "flushes": buf.flushes,
+            "callbacks": self.callbacks,
+            "output_underflows": self.output_underflows,
+            "resampler": self.resampler.get_stats() if self.resampler else None,
+        }
@@ -8,6 +8,8 @@ import base64
 import numpy as np
 import urllib.request
 
+from camera_broker import acquire_camera
+
 class FaceAuthenticator:
     # MediaPipe Face Landmarker model URL
     MODEL_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
@@ -158,27 +160,12 @@ class FaceAuthenticator:
         self.running = False
 
     def _run_cv_loop(self, loop):
-        def try_open_camera(index):
-            print(f"[AUTH] Trying to open camera with index {index}...")
-            cap = cv2.VideoCapture(index, cv2.CAP_AVFOUNDATION)
-            if not cap.isOpened():
-                print(f"[AUTH] [ERR] Could not open video device {index}.")
-                return None
-            
-            ret, frame = cap.read()
-            if not ret:
-                 print(f"[AUTH] [ERR] Opened device {index} but failed to read first frame.")
-                 cap.release()
-                 return None
-            
-            print(f"[AUTH] [OK] Successfully opened and read from device {index}.")
-            return cap
+        # The camera broker owns the device; AudioLoop and gesture tracking share it
+        video_capture = acquire_camera(0, rgb=True)
 
-        video_capture = try_open_camera(0)
-        
         if video_capture is None:
              print("[AUTH] Device 0 failed. Trying device 1...")
-             video_capture = try_open_camera(1)
+             video_capture = acquire_camera(1, rgb=True)
 
         if video_capture is None:
              print("[AUTH] [ERR] All camera attempts failed. Authentication cannot proceed.")
@@ -188,14 +175,12 @@ class FaceAuthenticator:
         process_this_frame = True
         
         while self.running and not self.authenticated:
-            ret, frame = video_capture.read()
-            if not ret:
+            # Already RGB (converted into the subscriber's own buffer)
+            rgb_frame = video_capture.read()
+            if rgb_frame is None:
                 print("[AUTH] [ERR] Failed to read frame from camera loop.")
                 break
             
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
             # Process every other frame for performance
             if process_this_frame:
                 current_landmarks = self._extract_landmarks(rgb_frame)
@@ -212,10 +197,10 @@ class FaceAuthenticator:
 
             # Send frame to frontend if callback exists
             if self.on_frame:
-                small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
+                small_frame = cv2.cvtColor(cv2.resize(rgb_frame, (0, 0), fx=0.5, fy=0.5), cv2.COLOR_RGB2BGR)
                 _, buffer = cv2.imencode('.jpg', small_frame)
                 b64_str = base64.b64encode(buffer).decode('utf-8')
                 
                 asyncio.run_coroutine_threadsafe(self.on_frame(b64_str), loop)
 
-        video_capture.release()
+        video_capture.close()
@@ -0,0 +1,164 @@
+"""
+Barge-In Controller - Interrupts model playback as soon as the user talks.
+Driven by the local VAD on the capture path instead of waiting for the
+server's input transcription, so playback ducks within one capture chunk.
+"""
+
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable
+
+IDLE = "idle"
+DUCKED = "ducked"
+INTERRUPTED = "interrupted"
+
+
+class BargeInController:
+    """
+    Local barge-in state machine.
+
+    Provides:
+    - Immediate ducking of playback on the first speech-like chunk
+    - A confirmation window: speech must persist before playback is flushed,
+      shorter bursts (coughs, clicks) restore the volume instead
+    - Suppression of the model's remaining audio until its turn ends
+    - Onset-to-duck and onset-to-flush latency metrics
+    """
+
+    def __init__(self, player, confirm_ms: float = 120.0, duck_gain: float = 0.2,
+                 suppress_timeout: float = 2.0, enabled: bool = True,
+                 on_interrupt: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            player: AudioPlayer (needs is_playing, set_gain() and flush())
+            confirm_ms: Speech required before playback is flushed
+            duck_gain: Playback gain while a barge-in is being confirmed
+            suppress_timeout: Seconds after a flush to ignore model audio if the
+                server never ends its turn (e.g. it didn't hear the interruption)
+            enabled: If False, process() never acts
+            on_interrupt: Called after a confirmed barge-in flushes playback
+        """
+        self.player = player
+        self.confirm_ms = confirm_ms
+        self.duck_gain = duck_gain
+        self.suppress_timeout = suppress_timeout
+        self.enabled = enabled
+        self.on_interrupt = on_interrupt
+
+        self.state = IDLE
+        self._onset = 0.0
+        self._speech_ms = 0.0
+        self._interrupted_at = 0.0
+
+        self.ducks = 0
+        self.interruptions = 0
+        self.rejected = 0
+        self.suppressed_chunks = 0
+        self._duck_latencies = deque(maxlen=100)
+        self._interrupt_latencies = deque(maxlen=100)
+
+    def process(self, vad_result, chunk_ms: float, captured_at: Optional[float] = None) -> Optional[str]:
+        """
+        Feed one capture chunk's VAD result.
+
+        Args:
+            vad_result: VADResult from the capture path
+            chunk_ms: Duration of the chunk
+            captured_at: time.monotonic() when the chunk finished capturing
+
+        Returns:
+            "duck", "restore", "interrupt" or None
+        """
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        if captured_at is None:
+            captured_at = now
+
+        if self.state == INTERRUPTED:
+            if now - self._interrupted_at < self.suppress_timeout:
+                return None
+            self.state = IDLE
+
+        if self.state == IDLE:
+            if not (vad_result.raw_speech and self.player.is_playing):
+                return None
+            # Onset is the start of the chunk that contained speech
+            self._onset = captured_at - chunk_ms / 1000
+            self._speech_ms = chunk_ms
+            self.state = DUCKED
+            self.player.set_gain(self.duck_gain)
+            self.ducks += 1
+            self._duck_latencies.append((time.monotonic() - self._onset) * 1000)
+            if self._speech_ms >= self.confirm_ms:
+                return self._interrupt()
+            return "duck"
+
+        # DUCKED: waiting for confirmation
+        if vad_result.raw_speech:
+            self._speech_ms += chunk_ms
+            if self._speech_ms >= self.confirm_ms:
+                return self._interrupt()
+            return None
+
+        self.player.set_gain(1.0)
+        self.state = IDLE
+        self.rejected += 1
+        return "restore"
+
+    def _interrupt(self) -> str:
+        self.player.flush()
+        self.player.set_gain(1.0)
+        self.state = INTERRUPTED
+        self._interrupted_at = time.monotonic()
+        self.interruptions += 1
+        self._interrupt_latencies.append((self._interrupted_at - self._onset) * 1000)
+        if self.on_interrupt:
+            self.on_interrupt()
+        return "interrupt"
+
+    def accept_audio(self) -> bool:
+        """Whether newly received model audio should be played."""
+        if self.state != INTERRUPTED:
+            return True
+        if time.monotonic() - self._interrupted_at >= self.suppress_timeout:
+            self.state = IDLE
+            return True
+        self.suppressed_chunks += 1
+        return False
+
+    def on_model_turn_end(self):
+        """The server finished (or abandoned) the interrupted turn; play audio again."""
+        if self.state == DUCKED:
+            self.player.set_gain(1.0)
+        self.state = IDLE
+
+    @staticmethod
+    def _summary(values) -> Dict[str, float]:
+        if not values:
+            return {"count": 0}
+        ordered = sorted(values)
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict with barge-in counters and latency summaries
+        """
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "confirm_ms": self.confirm_ms,
+            "ducks": self.ducks,
+            "interruptions": self.interruptions,
+            "rejected": self.rejected,
+            "suppressed_chunks": self.suppressed_chunks,
+            "duck_latency": self._summary(self._duck_latencies),
+            "interrupt_latency": self._summary(self._interrupt_latencies),
+        }
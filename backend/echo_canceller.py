@@ -0,0 +1,336 @@
+"""
+Echo Canceller - Removes the assistant's own voice from the microphone signal.
+A partitioned-block frequency-domain NLMS filter (overlap-save, vectorized
+with NumPy) models the speaker-to-mic path using the playback stream as the
+reference, and subtracts the predicted echo before VAD and the uplink.
+"""
+
+import math
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+from resampler import PolyphaseResampler
+
+
+class ReferenceBuffer:
+    """
+    Thread-safe FIFO of far-end (playback) samples.
+
+    The playback callback pushes what it just sent to the sound card; the
+    capture side pulls the same number of samples it captured. The fill level
+    is held near `delay` samples so the reference lines up with the echo.
+    """
+
+    def __init__(self, capacity: int, delay: int = 0, slack: int = 0):
+        self.capacity = capacity
+        self.delay = delay
+        self.slack = slack
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._read = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.underflows = 0
+        self.resyncs = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, samples: np.ndarray):
+        n = samples.size
+        if n == 0:
+            return
+        with self._lock:
+            if n >= self.capacity:
+                samples = samples[-self.capacity:]
+                n = self.capacity
+                self._read = 0
+                self._size = 0
+            elif self._size + n > self.capacity:
+                drop = self._size + n - self.capacity
+                self._read = (self._read + drop) % self.capacity
+                self._size -= drop
+            write = (self._read + self._size) % self.capacity
+            first = min(n, self.capacity - write)
+            self._buf[write:write + first] = samples[:first]
+            if first < n:
+                self._buf[:n - first] = samples[first:]
+            self._size += n
+
+    def pull(self, out: np.ndarray):
+        """Fill `out` with the next reference samples (zeros if none)."""
+        n = out.size
+        with self._lock:
+            # Too far behind the echo: drop the excess so delay stays bounded
+            excess = self._size - n - self.delay - self.slack
+            if self.slack and excess > 0:
+                self._read = (self._read + excess) % self.capacity
+                self._size -= excess
+                self.resyncs += 1
+            # Keep `delay` samples queued: the reference must be older than the echo
+            available = max(0, self._size - self.delay)
+            take = min(n, available)
+            pad = n - take
+            if pad:
+                out[:pad] = 0.0
+                if self._size:
+                    self.underflows += 1
+            first = min(take, self.capacity - self._read)
+            out[pad:pad + first] = self._buf[self._read:self._read + first]
+            if first < take:
+                out[pad + first:] = self._buf[:take - first]
+            self._read = (self._read + take) % self.capacity
+            self._size -= take
+
+    def clear(self):
+        with self._lock:
+            self._read = 0
+            self._size = 0
+
+
+class EchoCanceller:
+    """
+    Acoustic echo canceller (PBFDAF / frequency-domain NLMS).
+
+    Provides:
+    - push_reference(): feed played PCM from the output callback thread
+    - process(): cancel echo in a captured chunk (in place when writable)
+    - Geigel double-talk detection to freeze adaptation while the user talks
+    - ERLE (echo return loss enhancement) stats
+    """
+
+    def __init__(self, sample_rate: int = 16000, block_size: int = 256,
+                 filter_ms: float = 128.0, step_size: float = 0.5,
+                 delay_ms: float = 60.0, max_drift_ms: float = 200.0,
+                 reference_rate: Optional[int] = None, double_talk_ratio: float = 0.6,
+                 reference_floor: float = 1e-4, enabled: bool = True,
+                 reference_channels: int = 1):
+        """
+        Args:
+            sample_rate: Microphone sample rate
+            block_size: Samples per filter block (chunks must be a multiple)
+            filter_ms: Echo tail modelled by the filter
+            step_size: NLMS step size (0..1)
+            delay_ms: Bulk delay between pushed reference and its echo (device latencies)
+            max_drift_ms: Extra reference allowed to accumulate before resyncing
+            reference_rate: Sample rate of pushed reference PCM (default: sample_rate)
+            double_talk_ratio: Geigel threshold; near-end peaks above ratio * far-end
+                peak freeze adaptation
+            reference_floor: Reference power (normalized) below which nothing adapts
+            enabled: If False, process() passes audio through
+            reference_channels: Interleaved channels in pushed reference PCM (mixed to mono)
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.partitions = max(1, int(math.ceil(filter_ms / 1000 * sample_rate / block_size)))
+        self.step_size = step_size
+        self.reference_rate = reference_rate or sample_rate
+        self.reference_channels = reference_channels
+        self._reference_resampler = PolyphaseResampler(self.reference_rate, sample_rate, reference_channels, 1)
+        self.double_talk_ratio = double_talk_ratio
+        self.reference_floor = reference_floor
+        self.enabled = enabled
+
+        bins = block_size + 1
+        self._W = np.zeros((self.partitions, bins), dtype=np.complex64)
+        self._X = np.zeros((self.partitions, bins), dtype=np.complex64)
+        self._power = np.full(bins, 1e-3, dtype=np.float32)
+        self._x_prev = np.zeros(block_size, dtype=np.float32)
+        self._frame = np.zeros(2 * block_size, dtype=np.float32)
+        self._err_frame = np.zeros(2 * block_size, dtype=np.float32)
+        self._ref_block = np.zeros(block_size, dtype=np.float32)
+        self._ref_peaks = np.zeros(self.partitions, dtype=np.float32)
+
+        self.reference = ReferenceBuffer(
+            capacity=sample_rate * 2,
+            delay=int(sample_rate * delay_ms / 1000),
+            slack=int(sample_rate * max_drift_ms / 1000),
+        )
+
+        self.blocks = 0
+        self.adapt_blocks = 0
+        self.double_talk_blocks = 0
+        self._in_power = 0.0
+        self._out_power = 0.0
+
+    # ------------------------------------------------------------------
+    # Far end (playback callback thread)
+    # ------------------------------------------------------------------
+
+    def push_reference(self, pcm):
+        """
+        Feed audio that was just handed to the output device.
+
+        Args:
+            pcm: int16 PCM bytes/memoryview at reference_rate
+        """
+        if not self.enabled:
+            return
+        frames = np.frombuffer(pcm, dtype=np.int16).reshape(-1, self.reference_channels)
+        mono = self._reference_resampler.resample(frames.astype(np.float32) / 32768.0)
+        self.reference.push(mono[:, 0])
+
+    def set_delay_ms(self, delay_ms: float):
+        """Update the bulk delay, e.g. from the streams' reported latencies."""
+        self.reference.delay = int(self.sample_rate * delay_ms / 1000)
+
+    def reset(self):
+        """Forget the learned echo path and any queued reference."""
+        self._W[:] = 0
+        self._X[:] = 0
+        self._x_prev[:] = 0
+        self._ref_peaks[:] = 0
+        self._power[:] = 1e-3
+        self._reference_resampler.reset()
+        self.reference.clear()
+
+    # ------------------------------------------------------------------
+    # Near end (capture path)
+    # ------------------------------------------------------------------
+
+    def _process_block(self, d: np.ndarray, x: np.ndarray) -> np.ndarray:
+        B = self.block_size
+
+        # Far-end spectrum of the last two blocks (overlap-save)
+        self._frame[:B] = self._x_prev
+        self._frame[B:] = x
+        self._x_prev[:] = x
+        self._X = np.roll(self._X, 1, axis=0)
+        self._X[0] = np.fft.rfft(self._frame)
+
+        self._ref_peaks = np.roll(self._ref_peaks, 1)
+        self._ref_peaks[0] = np.max(np.abs(x))
+        ref_peak = float(self._ref_peaks.max())
+        if ref_peak < self.reference_floor:
+            # Nothing played recently: no echo to remove
+            return d
+
+        # Echo estimate and error
+        Y = np.einsum("pk,pk->k", self._W, self._X)
+        y = np.fft.irfft(Y, n=2 * B)[B:]
+        e = d - y
+
+        # Geigel double-talk detector: near-end louder than the far-end can explain
+        if np.max(np.abs(d)) > self.double_talk_ratio * ref_peak:
+            self.double_talk_blocks += 1
+            return e
+
+        # Normalized step per frequency bin, shared across the partitions
+        self._power *= 0.9
+        self._power += 0.1 * (self._X[0].real ** 2 + self._X[0].imag ** 2)
+        self._err_frame[B:] = e
+        E = np.fft.rfft(self._err_frame)
+        mu = self.step_size / (self.partitions * self._power + 1e-6)
+        G = np.conj(self._X) * (E * mu)
+
+        # Gradient constraint: keep the filter causal and B taps per partition
+        g = np.fft.irfft(G, n=2 * B, axis=1)
+        g[:, B:] = 0.0
+        self._W += np.fft.rfft(g, axis=1).astype(np.complex64)
+        self.adapt_blocks += 1
+        return e
+
+    def process(self, chunk):
+        """
+        Cancel echo in one captured chunk.
+
+        Args:
+            chunk: int16 PCM (length must be a multiple of block_size samples)
+
+        Returns:
+            The cleaned chunk: the same buffer if it was writable, else new bytes
+        """
+        if not self.enabled:
+            return chunk
+
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        n = samples.size
+        B = self.block_size
+        if n % B:
+            raise ValueError(f"Chunk of {n} samples is not a multiple of block_size={B}")
+
+        near = samples.astype(np.float32) / 32768.0
+        cleaned = np.empty_like(near)
+        for start in range(0, n, B):
+            self.reference.pull(self._ref_block)
+            cleaned[start:start + B] = self._process_block(near[start:start + B], self._ref_block)
+        self.blocks += n // B
+
+        # Smoothed powers for ERLE
+        self._in_power = 0.95 * self._in_power + 0.05 * float(np.dot(near, near))
+        self._out_power = 0.95 * self._out_power + 0.05 * float(np.dot(cleaned, cleaned))
+
+        out = np.clip(cleaned * 32768.0, -32768, 32767)
+        if samples.flags.writeable:
+            np.copyto(samples, out, casting="unsafe")
+            return chunk
+        return out.astype(np.int16).tobytes()
+
+    @property
+    def erle_db(self) -> float:
+        if self._out_power <= 0 or self._in_power <= 0:
+            return 0.0
+        return 10 * math.log10(self._in_power / self._out_power)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict with filter size, adaptation counters and ERLE
+        """
+        return {
+            "enabled": self.enabled,
+            "filter_ms": round(self.partitions * self.block_size / self.sample_rate * 1000, 1),
+            "delay_ms": round(self.reference.delay / self.sample_rate * 1000, 1),
+            "blocks": self.blocks,
+            "adapt_blocks": self.adapt_blocks,
+            "double_talk_blocks": self.double_talk_blocks,
+            "reference_underflows": self.reference.underflows,
+            "reference_resyncs": self.reference.resyncs,
+            "erle_db": round(self.erle_db, 1),
+        }
+
+
+def benchmark(seconds: float = 10.0, chunk_size: int = 1024, sample_rate: int = 16000) -> Dict[str, Any]:
+    """
+    Measure the real-time factor of the canceller on one core.
+
+    A synthetic far-end signal is convolved with a decaying room response to
+    make the echo; the canceller must converge on it.
+
+    Returns:
+        dict with real-time factor, per-chunk cost and final ERLE
+    """
+    rng = np.random.default_rng(0)
+    total = int(seconds * sample_rate) // chunk_size * chunk_size
+    far = (rng.standard_normal(total) * 0.1).astype(np.float32)
+    room = (rng.standard_normal(800) * np.exp(-np.arange(800) / 150)).astype(np.float32) * 0.03
+    echo = np.convolve(far, room)[:total]
+    near = (np.clip(echo, -1, 1) * 32767).astype(np.int16)
+    far_pcm = (np.clip(far, -1, 1) * 32767).astype(np.int16)
+
+    aec = EchoCanceller(sample_rate=sample_rate, delay_ms=0, max_drift_ms=0)
+    chunks = total // chunk_size
+    start = time.process_time()
+    for i in range(chunks):
+        sl = slice(i * chunk_size, (i + 1) * chunk_size)
+        aec.push_reference(far_pcm[sl].tobytes())
+        aec.process(bytearray(near[sl].tobytes()))
+    elapsed = time.process_time() - start
+
+    return {
+        "audio_seconds": total / sample_rate,
+        "cpu_seconds": round(elapsed, 3),
+        "real_time_factor": round(elapsed / (total / sample_rate), 4),
+        "ms_per_chunk": round(elapsed / chunks * 1000, 3),
+        "erle_db": round(aec.erle_db, 1),
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark()
+    print(f"Processed {stats['audio_seconds']:.1f} s of audio in {stats['cpu_seconds']:.2f} s CPU")
+    print(f"Real-time factor: {stats['real_time_factor']:.3f} (1 core)")
+    print(f"Per 64 ms chunk:  {stats['ms_per_chunk']:.2f} ms")
+    print(f"ERLE after run:   {stats['erle_db']:.1f} dB")
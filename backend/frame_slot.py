@@ -0,0 +1,226 @@
+"""
+Frame Slot - Holds the most recent camera/screen frame for the vision uplink.
+Frames arrive far more often than they are sent (only on speech onset or text
+input), so the slot keeps the raw JPEG bytes and does all per-frame work
+lazily: the perceptual hash and the base64 payload are computed only for a
+frame that is about to be sent, and a frame that looks the same as the last
+one sent to the model is skipped (by perceptual hash, or by a
+SceneChangeDetector when one is attached).
+"""
+
+import base64
+import io
+import math
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import numpy as np
+
+# Gemini bills images up to 384x384 as one 258-token tile, larger ones per 768x768 tile
+TOKENS_PER_TILE = 258
+
+
+def image_tokens(width: int, height: int) -> int:
+    """Approximate model tokens for one image of the given size."""
+    if width <= 384 and height <= 384:
+        return TOKENS_PER_TILE
+    return math.ceil(width / 768) * math.ceil(height / 768) * TOKENS_PER_TILE
+
+
+def decode_small_gray(jpeg: bytes, width: int = 64) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Small grayscale decode of a JPEG.
+
+    Uses the decoder's DCT scaling (draft mode) so only a ~1/8 size image is
+    actually decoded.
+
+    Returns:
+        (float32 array about `width` pixels wide, (width, height) of the original image)
+    """
+    import PIL.Image
+
+    img = PIL.Image.open(io.BytesIO(jpeg))
+    size = img.size
+    height = max(1, round(width * size[1] / size[0]))
+    img.draft("L", (width, height))
+    gray = img.convert("L")
+    if gray.size != (width, height):
+        gray = gray.resize((width, height), PIL.Image.BILINEAR)
+    return np.asarray(gray, dtype=np.float32), size
+
+
+def dhash_gray(gray: np.ndarray, hash_size: int = 8) -> int:
+    """64-bit difference hash of a small grayscale image."""
+    import PIL.Image
+
+    small = PIL.Image.fromarray(gray.astype(np.uint8)).resize((hash_size + 1, hash_size), PIL.Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash(jpeg: bytes, hash_size: int = 8) -> Tuple[int, Tuple[int, int]]:
+    """
+    64-bit difference hash of a JPEG.
+
+    Returns:
+        (hash, (width, height) of the original image)
+    """
+    gray, size = decode_small_gray(jpeg)
+    return dhash_gray(gray, hash_size), size
+
+
+class FrameSlot:
+    """
+    Latest-frame holder with lazy encoding and perceptual dedupe.
+
+    Provides:
+    - update(): O(1) store of the newest frame (no decode, no base64)
+    - take(): payload for the model, or None if there is no frame or it
+      matches the last frame sent
+    - Stats for encode time and image tokens saved
+    """
+
+    def __init__(self, mime_type: str = "image/jpeg", dedupe: bool = True, max_distance: int = 4,
+                 scene_detector=None):
+        """
+        Args:
+            mime_type: Default mime type for raw frames
+            dedupe: Skip frames whose hash is within max_distance of the last sent one
+            max_distance: Hamming distance (of 64 bits) still treated as the same scene
+            scene_detector: SceneChangeDetector that decides instead of the hash
+                (adds a minimum interval and forced keyframes)
+        """
+        self.mime_type = mime_type
+        self.dedupe = dedupe
+        self.max_distance = max_distance
+        self.scene_detector = scene_detector
+
+        self._data: Optional[bytes] = None
+        self._frame_mime = mime_type
+        self._frame_taken = True
+        self._last_sent_hash: Optional[int] = None
+        self._last_tokens = 0
+
+        self.frames_received = 0
+        self.frames_sent = 0
+        self.frames_deduped = 0
+        self.frames_processed = 0
+        self.encode_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+        self._started_at = time.monotonic()
+
+    def update(self, data, mime_type: Optional[str] = None):
+        """
+        Store the newest frame.
+
+        Args:
+            data: JPEG bytes, or an already base64-encoded str
+        """
+        if isinstance(data, str):
+            # Legacy callers hand over base64; decode lazily in take()
+            self._data = data
+        else:
+            self._data = bytes(data)
+        self._frame_mime = mime_type or self.mime_type
+        self._frame_taken = False
+        self.frames_received += 1
+
+    @property
+    def has_frame(self) -> bool:
+        return self._data is not None
+
+    def take(self, force: bool = False) -> Optional[Dict[str, str]]:
+        """
+        Build the payload for the current frame if it should be sent.
+
+        Args:
+            force: Send even if the scene matches the last frame sent
+
+        Returns:
+            {"mime_type", "data": base64 str} or None
+        """
+        if self._data is None:
+            return None
+        if self.dedupe and not force and self._frame_taken and self._last_sent_hash is not None:
+            # Nothing new since the last take(): same frame, no need to hash it again
+            self.frames_deduped += 1
+            self.tokens_saved += self._last_tokens
+            return None
+
+        data = self._data
+        raw = base64.b64decode(data) if isinstance(data, str) else data
+
+        start = time.perf_counter()
+        try:
+            gray, (width, height) = decode_small_gray(raw)
+            frame_hash = dhash_gray(gray)
+        except Exception:
+            gray, frame_hash, (width, height) = None, None, (768, 768)
+        self.hash_seconds += time.perf_counter() - start
+        self.frames_processed += 1
+        tokens = image_tokens(width, height)
+
+        if self.dedupe and not force and gray is not None and self.scene_detector is not None:
+            duplicate = not self.scene_detector.update(gray)
+        elif force and gray is not None and self.scene_detector is not None:
+            self.scene_detector.mark_sent(gray)
+            duplicate = False
+        else:
+            duplicate = (self.dedupe and not force and frame_hash is not None and self._last_sent_hash is not None
+                         and (frame_hash ^ self._last_sent_hash).bit_count() <= self.max_distance)
+        if duplicate:
+            self.frames_deduped += 1
+            self.tokens_saved += tokens
+            self._frame_taken = True
+            return None
+
+        start = time.perf_counter()
+        b64 = data if isinstance(data, str) else base64.b64encode(data).decode("ascii")
+        self.encode_seconds += time.perf_counter() - start
+
+        self._last_sent_hash = frame_hash
+        self._last_tokens = tokens
+        self._frame_taken = True
+        self.frames_sent += 1
+        self.tokens_sent += tokens
+        return {"mime_type": self._frame_mime, "data": b64}
+
+    @property
+    def take_seconds(self) -> float:
+        """Mean decode + hash + encode time per frame take() processed (0.0 before the first)."""
+        if not self.frames_processed:
+            return 0.0
+        return (self.hash_seconds + self.encode_seconds) / self.frames_processed
+
+    def reset(self):
+        """Forget the last sent frame (e.g. new session: the model has no image yet)."""
+        self._last_sent_hash = None
+        if self.scene_detector is not None:
+            self.scene_detector.reset()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict with frame counters, encode time saved and image tokens saved
+        """
+        hours = max(time.monotonic() - self._started_at, 1e-9) / 3600
+        mean_encode = self.encode_seconds / self.frames_sent if self.frames_sent else 0.0
+        # Eager encoding paid for every received frame; now only sent frames are encoded
+        skipped = self.frames_received - self.frames_sent
+        encode_saved_ms = skipped * mean_encode * 1000
+        return {
+            "frames_received": self.frames_received,
+            "frames_sent": self.frames_sent,
+            "frames_deduped": self.frames_deduped,
+            "encode_ms": round(self.encode_seconds * 1000, 2),
+            "hash_ms": round(self.hash_seconds * 1000, 2),
+            "encode_ms_saved": round(encode_saved_ms, 2),
+            "encode_ms_saved_per_hour": round(encode_saved_ms / hours, 1),
+            "image_tokens_sent": self.tokens_sent,
+            "image_tokens_saved": self.tokens_saved,
+            "image_tokens_saved_per_hour": round(self.tokens_saved / hours),
+            "scene": self.scene_detector.get_stats() if self.scene_detector else None,
+        }
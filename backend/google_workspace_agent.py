@@ -10,14 +10,18 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
-# Google API Libraries
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 import io
 
+from lazy_import import lazy_attr
+
+# Google API Libraries, imported on first use so the sign-in check below stays cheap
+Credentials = lazy_attr("google.oauth2.credentials", "Credentials")
+InstalledAppFlow = lazy_attr("google_auth_oauthlib.flow", "InstalledAppFlow")
+Request = lazy_attr("google.auth.transport.requests", "Request")
+build = lazy_attr("googleapiclient.discovery", "build")
+MediaFileUpload = lazy_attr("googleapiclient.http", "MediaFileUpload")
+MediaIoBaseDownload = lazy_attr("googleapiclient.http", "MediaIoBaseDownload")
+
 # Scopes for all Google Workspace services
 SCOPES = [
     'https://www.googleapis.com/auth/calendar',
@@ -30,6 +34,14 @@ SCOPES = [
     'https://www.googleapis.com/auth/presentations',
 ]
 
+# Where the user's OAuth token is saved after signing in
+DEFAULT_TOKEN_PATH = Path(__file__).parent / "google_token.json"
+
+
+def has_saved_credentials() -> bool:
+    """Cheap sign-in check that does not load (or refresh) the credentials."""
+    return DEFAULT_TOKEN_PATH.exists()
+
 class GoogleWorkspaceAgent:
     """
     Agent for interacting with Google Workspace services.
@@ -46,7 +58,7 @@ class GoogleWorkspaceAgent:
         """
         self.backend_dir = Path(__file__).parent
         self.credentials_path = credentials_path or str(self.backend_dir / "credentials.json")
-        self.token_path = token_path or str(self.backend_dir / "google_token.json")
+        self.token_path = token_path or str(DEFAULT_TOKEN_PATH)
         
         self.creds = None
         self._calendar_service = None
@@ -1,5 +1,9 @@
 import asyncio
-from kasa import Discover, SmartDevice, SmartBulb, SmartPlug
+
+from lazy_import import lazy_attr
+
+# python-kasa is imported on first discovery, not when the server starts
+Discover = lazy_attr("kasa", "Discover")
 
 class KasaAgent:
     def __init__(self, known_devices=None):
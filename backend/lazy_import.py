@@ -0,0 +1,202 @@
+"""
+Lazy Import - Defers heavy optional stacks until they are actually used.
+Importing server.py used to pull in MediaPipe, OpenCV, python-kasa,
+playwright, the Google API client and the whole google-genai SDK, open
+PortAudio and create a genai.Client before the Socket.IO server could accept
+the Electron UI's connection. Modules that are only needed by one feature are
+now bound to proxies that import on first attribute access, and AudioLoop's
+module (ada) is loaded in a background thread once the server is up.
+
+Provides:
+- lazy_module(): module proxy, imported on first attribute access
+- lazy_attr(): proxy for a class/function inside a module (call sites stay unchanged)
+- preload(): import modules on a background thread
+- measure_import_time(): `python -X importtime` in a clean interpreter, parsed
+- The import budget the test suite enforces (run this file for a report)
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable, List
+
+# Modules importing server/ada must not load; each belongs to a feature that loads it on use
+DEFERRED_MODULES = (
+    "mediapipe",          # face authentication
+    "cv2",                # camera/screen encoding, face authentication
+    "kasa",               # smart home
+    "playwright",         # web agent
+    "googleapiclient",    # Google Workspace
+    "google_auth_oauthlib",
+    "web_agent",
+    "authenticator",
+)
+
+# Cumulative -X importtime budget per entry module, in ms. Generous on purpose:
+# the module list above is the strict regression check, this catches new heavy imports.
+IMPORT_BUDGET_MS = {
+    "server": 2500,
+    "ada": 2500,
+}
+
+# name -> ms spent importing through a proxy
+_load_ms: Dict[str, float] = {}
+
+
+def _import(name: str):
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _load_ms.setdefault(name, (time.perf_counter() - start) * 1000)
+    return module
+
+
+class LazyModule:
+    """Stands in for a module; the first attribute access imports it."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = _import(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}' ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+class LazyAttr:
+    """Stands in for `module.name`; calling it or reading an attribute imports the module."""
+
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+
+    def resolve(self):
+        return getattr(_import(self._module), self._name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str):
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        return f"<lazy {self._module}.{self._name}>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """
+    Args:
+        name: Dotted module name, e.g. "cv2" or "google.oauth2.credentials"
+    """
+    return LazyModule(name)
+
+
+def lazy_attr(module: str, name: str) -> LazyAttr:
+    """`from module import name`, performed when the name is first used."""
+    return LazyAttr(module, name)
+
+
+def preload(names: Iterable[str], on_error=None) -> threading.Thread:
+    """
+    Import modules on a daemon thread (the import lock makes a concurrent
+    import of the same module on another thread wait for this one).
+
+    Args:
+        names: Module names, imported in order
+        on_error: Called as on_error(name, exception); default prints a warning
+    """
+    def run():
+        for name in names:
+            try:
+                _import(name)
+            except Exception as e:
+                if on_error is not None:
+                    on_error(name, e)
+                else:
+                    print(f"[IMPORT] [WARN] Preloading '{name}' failed: {e}")
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_stats() -> Dict[str, Any]:
+    """Deferred imports performed so far and what each cost."""
+    return {name: round(ms, 1) for name, ms in _load_ms.items()}
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+def measure_import_time(module: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                        python: str = sys.executable) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import
+        cwd: Working directory (default: this file's directory)
+        env: Extra environment variables
+        python: Interpreter to run
+
+    Returns:
+        {"total_ms": cumulative ms of `module`, "modules": {name: cumulative ms},
+         "top": [(name, ms), ...] direct imports of `module`, slowest first}
+
+    Raises:
+        RuntimeError: The import failed
+    """
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env={**os.environ, **(env or {})}, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    modules: Dict[str, float] = {}
+    children: List = []
+    top: List = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        ms = int(cumulative) / 1000
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        modules[name] = max(ms, modules.get(name, 0.0))
+        # A module's imports are listed (one level deeper) right before it
+        if depth == 3:
+            children.append((name, ms))
+        elif depth == 1:
+            if name == module:
+                top = children
+            children = []
+    top.sort(key=lambda item: item[1], reverse=True)
+    return {"total_ms": modules.get(module, 0.0), "modules": modules, "top": top}
+
+
+if __name__ == "__main__":
+    for entry, budget in IMPORT_BUDGET_MS.items():
+        result = measure_import_time(entry)
+        loaded = [m for m in DEFERRED_MODULES if m in result["modules"]]
+        print(f"import {entry}: {result['total_ms']:.0f} ms (budget {budget} ms)"
+              + (f"; loads deferred modules: {', '.join(loaded)}" if loaded else ""))
+        for name, ms in result["top"][:12]:
+            print(f"    {ms:8.1f} ms  {name}")
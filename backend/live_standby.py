@@ -0,0 +1,278 @@
+"""
+Live Standby - Keeps a second Live API session connected and ready.
+A cold reconnect (websocket + TLS handshake + setup round trip, plus the
+backoff in AudioLoop.run) leaves the user talking into nothing for one to
+several seconds. With a warm standby the loop takes an already-established
+session the moment the active one fails and only restarts its network tasks;
+a replacement standby is then opened in the background.
+
+Each standby session is owned by its own holder task, which keeps the
+connection open until the consumer releases it, so sessions can be handed
+between tasks without exiting the SDK's connect() context early. While idle
+the holder reads the session: a receive error means the standby died, and
+messages that arrive meanwhile are kept on the lease for the consumer.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, AsyncContextManager, List
+
+# Recycle an unused standby before the server's idle/connection limits close it
+STANDBY_MAX_IDLE_S = 8 * 60
+HEALTH_INTERVAL_S = 1.0
+
+OFF = "off"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class StandbyLease:
+    """A connected standby session handed to the consumer; release() closes it."""
+
+    def __init__(self):
+        self.session = None
+        self.opened_at = 0.0
+        self.taken = False
+        self.stale = False
+        self.error: Optional[BaseException] = None
+        # Receive error while idle: the connection is gone
+        self.lost: Optional[BaseException] = None
+        # Messages the server sent while the standby was idle (e.g. resumption handles)
+        self.received: List[Any] = []
+        self._reader: Optional[asyncio.Task] = None
+        self._settled = asyncio.Event()
+        self._released = asyncio.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self.lost is None
+
+    def release(self):
+        """Done with the session: its holder task exits connect() and closes it."""
+        self._released.set()
+
+    async def _read(self):
+        # receive() ends at each turn_complete; keep reading until it raises
+        try:
+            while True:
+                async for message in self.session.receive():
+                    self.received.append(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.lost = e
+
+    async def _stop_reading(self):
+        # Finish the idle reader before anyone else calls receive(): one reader per socket
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+
+class HotStandby:
+    """
+    One pre-established Live session, kept warm.
+
+    Provides:
+    - take(): the warm session (or None) without waiting for a connect
+    - A keeper task that opens a replacement after each take, retries failed
+      opens with backoff, and recycles standbys that died or sat idle too long
+    - Standby health and swap latency stats
+    """
+
+    def __init__(self, open_session: Callable[[], AsyncContextManager], max_idle: float = STANDBY_MAX_IDLE_S,
+                 health_interval: float = HEALTH_INTERVAL_S, retry_delay: float = 1.0, max_retry_delay: float = 10.0):
+        """
+        Args:
+            open_session: Returns an async context manager yielding a connected session,
+                e.g. lambda: client.aio.live.connect(model=..., config=...)
+            max_idle: Seconds an untaken standby is kept before it is replaced
+            health_interval: Seconds between connection checks while idle
+            retry_delay, max_retry_delay: Backoff for failed opens
+        """
+        self.open_session = open_session
+        self.max_idle = max_idle
+        self.health_interval = health_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._standby: Optional[StandbyLease] = None
+        self._task: Optional[asyncio.Task] = None
+        self._holders = set()
+        self.state = OFF
+
+        self.opens = 0
+        self.open_failures = 0
+        self.died_idle = 0
+        self.recycled = 0
+        self.swaps = 0
+        self.last_error: Optional[str] = None
+        self._open_ms = deque(maxlen=50)
+        self._swap_ms = deque(maxlen=50)
+
+    # ------------------------------------------------------------------
+    # Keeper
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start keeping a standby on the running event loop."""
+        if self._task is None or self._task.done():
+            self.state = WARMING
+            self._task = asyncio.create_task(self._keep_warm())
+
+    async def close(self):
+        """Stop the keeper and close every session it opened (including taken ones)."""
+        tasks = [t for t in [self._task, *self._holders] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._standby = None
+        self.state = OFF
+
+    async def _keep_warm(self):
+        delay = self.retry_delay
+        while True:
+            lease = StandbyLease()
+            holder = asyncio.create_task(self._hold(lease))
+            self._holders.add(holder)
+            holder.add_done_callback(self._holders.discard)
+            await lease._settled.wait()
+            if lease.taken:
+                delay = self.retry_delay
+            elif lease.error is not None:
+                self.state = FAILED
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                self.state = WARMING
+
+    async def _hold(self, lease: StandbyLease):
+        start = time.perf_counter()
+        try:
+            async with self.open_session() as session:
+                lease.session = session
+                lease.opened_at = time.monotonic()
+                self.opens += 1
+                self._open_ms.append((time.perf_counter() - start) * 1000)
+                self._standby = lease
+                self.state = READY
+                if not await self._idle(lease):
+                    return
+                # Taken: keep the connection open for the consumer
+                await lease._released.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not lease.taken:
+                lease.error = e
+                self.open_failures += 1
+                self.last_error = str(e)
+                print(f"[STANDBY] [WARN] Standby session failed: {e}")
+        finally:
+            if self._standby is lease:
+                self._standby = None
+            lease._settled.set()
+
+    async def _idle(self, lease: StandbyLease) -> bool:
+        """Wait until the lease is taken (True), or dies / ages out (False)."""
+        lease._reader = asyncio.create_task(lease._read())
+        try:
+            while True:
+                # take() stops the reader itself; the holder only has to stop checking
+                await asyncio.sleep(self.health_interval)
+                if lease.taken:
+                    return True
+                if lease.stale:
+                    self.recycled += 1
+                    break
+                if lease.lost is not None:
+                    self.died_idle += 1
+                    print(f"[STANDBY] [WARN] Standby connection closed while idle ({lease.lost}); reopening.")
+                    break
+                if time.monotonic() - lease.opened_at > self.max_idle:
+                    self.recycled += 1
+                    break
+            self._standby = None
+            self.state = WARMING
+            return False
+        finally:
+            await lease._stop_reading()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self._standby is not None and self._standby.alive
+
+    async def take(self) -> Optional[StandbyLease]:
+        """
+        Hand over the warm session, if there is a healthy one.
+
+        Returns:
+            The lease (call release() when done with lease.session; messages
+            that arrived while it was idle are in lease.received), or None
+        """
+        lease = self._standby
+        if lease is None or not lease.alive:
+            return None
+        self._standby = None
+        self.state = WARMING
+        lease.taken = True
+        await lease._stop_reading()
+        if lease.lost is not None:
+            # Died just now; the holder closes it on release() and a replacement is opened
+            self.died_idle += 1
+            lease.release()
+            return None
+        lease._settled.set()
+        return lease
+
+    def invalidate(self):
+        """The session config changed: replace the current standby with a new one."""
+        lease = self._standby
+        if lease is not None:
+            self._standby = None
+            self.state = WARMING
+            lease.stale = True
+
+    def record_swap(self, seconds: float):
+        """Failure detected -> network tasks running on the standby session."""
+        self.swaps += 1
+        self._swap_ms.append(seconds * 1000)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _summary(values) -> Dict[str, float]:
+        if not values:
+            return {"count": 0}
+        ordered = sorted(values)
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "max_ms": round(ordered[-1], 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        standby = self._standby
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "standby_age_s": round(time.monotonic() - standby.opened_at, 1) if standby else None,
+            "opens": self.opens,
+            "open_failures": self.open_failures,
+            "died_idle": self.died_idle,
+            "recycled": self.recycled,
+            "swaps": self.swaps,
+            "last_error": self.last_error,
+            "open": self._summary(self._open_ms),
+            "swap": self._summary(self._swap_ms),
+        }
@@ -1,6 +1,7 @@
 import os
 import json
 import shutil
+import threading
 import time
 from pathlib import Path
 
@@ -14,15 +15,27 @@ class ProjectManager:
         if not self.projects_dir.exists():
             self.projects_dir.mkdir(parents=True)
             
-        # Clear temp project on startup if it exists
+        # Clear temp project on startup if it exists: a rename is instant, the
+        # (possibly large) old tree is deleted on a background thread
+        self.trash_dir = self.projects_dir / ".trash"
         temp_path = self.projects_dir / "temp"
         if temp_path.exists():
             print("[ProjectManager] Clearing temp project...")
-            shutil.rmtree(temp_path)
+            self.trash_dir.mkdir(exist_ok=True)
+            try:
+                temp_path.rename(self.trash_dir / f"temp-{time.time_ns()}")
+            except OSError:
+                shutil.rmtree(temp_path)
+        if self.trash_dir.exists():
+            threading.Thread(target=self._empty_trash, daemon=True).start()
             
         # Ensure temp project receives fresh creation
         self.create_project("temp")
 
+    def _empty_trash(self):
+        for path in list(self.trash_dir.iterdir()):
+            shutil.rmtree(path, ignore_errors=True)
+
     def create_project(self, name: str):
         """Creates a new project directory with subfolders."""
         # Sanitize name to be safe for filesystem
@@ -50,7 +63,7 @@ class ProjectManager:
 
     def list_projects(self):
         """Returns a list of available projects."""
-        return [d.name for d in self.projects_dir.iterdir() if d.is_dir()]
+        return [d.name for d in self.projects_dir.iterdir() if d.is_dir() and not d.name.startswith(".")]
 
     def get_current_project_path(self):
         return self.projects_dir / self.current_project
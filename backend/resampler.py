@@ -0,0 +1,254 @@
+"""
+Resampler - Converts PCM between device-native and model sample rates.
+A rational polyphase FIR (Kaiser-windowed sinc) vectorized with NumPy, with
+filter history and output phase carried across chunks so a stream can be fed
+in arbitrary pieces. Also downmixes to mono / upmixes from mono.
+
+Lets AudioLoop open microphones and speakers at the rate they actually run
+at (48 kHz USB/Bluetooth headsets, 44.1 kHz DACs) instead of asking the host
+API to convert to 16 kHz / 24 kHz.
+"""
+
+import math
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def design_filter(up: int, down: int, taps_per_phase: int = 32,
+                  rolloff: float = 0.9, beta: float = 8.0) -> np.ndarray:
+    """
+    Low-pass prototype for an up/down polyphase resampler.
+
+    Args:
+        up: Interpolation factor L
+        down: Decimation factor M
+        taps_per_phase: Filter taps per polyphase branch
+        rolloff: Cutoff as a fraction of the lower Nyquist frequency
+        beta: Kaiser window shape (8 is roughly 80 dB stopband)
+
+    Returns:
+        float32 array of up * taps_per_phase coefficients (gain L)
+    """
+    n = up * taps_per_phase
+    cutoff = rolloff * 0.5 / max(up, down)  # cycles per sample at the upsampled rate
+    t = np.arange(n) - (n - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, beta)
+    h *= up / h.sum()
+    return h.astype(np.float32)
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler for int16 PCM.
+
+    Provides:
+    - Any integer rate pair (48k->16k is 1/3, 24k->48k is 2/1, 44.1k->16k is 160/441)
+    - Stereo->mono downmix before filtering, mono->N upmix after
+    - Filter history and output phase kept across process() calls
+    - Passthrough when rates and channel counts already match
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, in_channels: int = 1,
+                 out_channels: int = 1, taps_per_phase: int = 32):
+        """
+        Args:
+            src_rate: Input sample rate
+            dst_rate: Output sample rate
+            in_channels: Interleaved channels in the input
+            out_channels: Channels to produce (must be 1, in_channels, or any N from mono)
+            taps_per_phase: Filter length per polyphase branch (quality vs CPU)
+        """
+        if out_channels != 1 and in_channels not in (1, out_channels):
+            raise ValueError(f"Cannot map {in_channels} channels to {out_channels}")
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.in_channels = in_channels
+        self.out_channels = out_channels
+        g = math.gcd(src_rate, dst_rate)
+        self.up = dst_rate // g
+        self.down = src_rate // g
+        self.taps = taps_per_phase
+        self.passthrough = src_rate == dst_rate and in_channels == out_channels
+
+        # Channels actually filtered: mix down first, mix up last
+        self._channels = 1 if out_channels == 1 else in_channels
+        h = design_filter(self.up, self.down, taps_per_phase)
+        # Row p holds branch p reversed, so it lines up with a sliding window
+        self._phases = np.ascontiguousarray(h.reshape(taps_per_phase, self.up).T[:, ::-1])
+        self.reset()
+
+        self.frames_in = 0
+        self.frames_out = 0
+
+    def reset(self):
+        """Forget filter history, e.g. after a flush or a device change."""
+        self._history = np.zeros((self.taps - 1, self._channels), dtype=np.float32)
+        self._t = 0  # Next output position on the upsampled grid, relative to the next input
+
+    @property
+    def latency_ms(self) -> float:
+        """Group delay of the filter."""
+        if self.passthrough:
+            return 0.0
+        return (self.taps * self.up - 1) / 2 / (self.src_rate * self.up) * 1000
+
+    def output_frames(self, input_frames: int) -> int:
+        """Frames the next resample() call would return for `input_frames` of input."""
+        if self.passthrough:
+            return input_frames
+        span = input_frames * self.up - self._t
+        return max(0, -(-span // self.down))
+
+    def resample(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Resample float audio.
+
+        Args:
+            frames: float32 array shaped (n_frames, in_channels)
+
+        Returns:
+            float32 array shaped (n_out, out_channels)
+        """
+        if self.passthrough:
+            return frames
+        if self.in_channels > 1 and self.out_channels == 1:
+            frames = frames.mean(axis=1, keepdims=True, dtype=np.float32)
+
+        n = frames.shape[0]
+        self.frames_in += n
+        ext = np.concatenate((self._history, frames), axis=0)
+        self._history = ext[ext.shape[0] - (self.taps - 1):]
+
+        count = self.output_frames(n)
+        if count == 0:
+            self._t -= n * self.up
+            return np.zeros((0, self.out_channels), dtype=np.float32)
+
+        positions = self._t + self.down * np.arange(count)
+        # windows[i] covers inputs i-taps+1 .. i of this chunk
+        windows = sliding_window_view(ext, self.taps, axis=0)
+        out = np.einsum("nck,nk->nc", windows[positions // self.up], self._phases[positions % self.up])
+        self._t += self.down * count - n * self.up
+        self.frames_out += count
+
+        if self.out_channels > self._channels:
+            out = np.repeat(out, self.out_channels, axis=1)
+        return out
+
+    def process(self, pcm) -> bytes:
+        """
+        Resample interleaved int16 PCM.
+
+        Args:
+            pcm: bytes / bytearray / memoryview of whole frames
+
+        Returns:
+            Interleaved int16 PCM at dst_rate with out_channels
+        """
+        if self.passthrough:
+            return pcm
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, self.in_channels)
+        out = self.resample(samples.astype(np.float32))
+        np.clip(out, -32768, 32767, out=out)
+        return np.rint(out).astype(np.int16).tobytes()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "src_rate": self.src_rate,
+            "dst_rate": self.dst_rate,
+            "ratio": f"{self.up}/{self.down}",
+            "channels": f"{self.in_channels}->{self.out_channels}",
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "latency_ms": round(self.latency_ms, 2),
+        }
+
+
+def native_format(pya, device_index: Optional[int] = None, output: bool = False,
+                  fallback_rate: int = 16000, channels: int = 1) -> Tuple[int, int]:
+    """
+    Rate and channel count a device natively runs at.
+
+    Args:
+        pya: pyaudio.PyAudio instance
+        device_index: PortAudio device index (None = default device)
+        output: Query the output side instead of the input side
+        fallback_rate: Returned if the device can't be queried
+        channels: Preferred channel count; raised to 2 if the device rejects it
+
+    Returns:
+        (sample_rate, channels)
+    """
+    try:
+        if device_index is not None:
+            info = pya.get_device_info_by_index(device_index)
+        elif output:
+            info = pya.get_default_output_device_info()
+        else:
+            info = pya.get_default_input_device_info()
+    except Exception:
+        return fallback_rate, channels
+
+    rate = int(info.get("defaultSampleRate") or fallback_rate)
+    index = info.get("index", device_index)
+    max_channels = int(info.get("maxOutputChannels" if output else "maxInputChannels") or channels)
+    if max_channels < channels:
+        return rate, max(1, max_channels)
+
+    # Some headsets only expose a stereo endpoint
+    try:
+        if output:
+            pya.is_format_supported(rate, output_device=index, output_channels=channels, output_format=8)
+        else:
+            pya.is_format_supported(rate, input_device=index, input_channels=channels, input_format=8)
+    except ValueError:
+        if max_channels >= 2:
+            return rate, 2
+    except Exception:
+        pass
+    return rate, channels
+
+
+def benchmark(seconds: float = 10.0) -> Dict[str, Any]:
+    """
+    Measure CPU cost of the two conversions AudioLoop uses.
+
+    Args:
+        seconds: Audio duration pushed through each resampler
+
+    Returns:
+        dict with microseconds per chunk and real-time factor per path
+    """
+    rng = np.random.default_rng(0)
+    cases = {
+        # 48 kHz stereo headset mic -> 16 kHz mono uplink (64 ms chunks)
+        "capture_48k_stereo_to_16k": (48000, 16000, 2, 1, 3072),
+        # 44.1 kHz mic -> 16 kHz (awkward 160/441 ratio)
+        "capture_44k1_to_16k": (44100, 16000, 1, 1, 2822),
+        # 24 kHz model audio -> 48 kHz stereo speakers (20 ms writes)
+        "playback_24k_to_48k_stereo": (24000, 48000, 1, 2, 480),
+    }
+    results = {}
+    for name, (src, dst, cin, cout, chunk) in cases.items():
+        resampler = PolyphaseResampler(src, dst, cin, cout)
+        pcm = (rng.standard_normal(chunk * cin) * 3000).astype(np.int16).tobytes()
+        chunks = max(1, int(seconds * src / chunk))
+        start = time.process_time()
+        for _ in range(chunks):
+            resampler.process(pcm)
+        elapsed = time.process_time() - start
+        results[name] = {
+            "us_per_chunk": round(elapsed / chunks * 1e6, 1),
+            "chunk_ms": round(chunk / src * 1000, 1),
+            "real_time_factor": round(elapsed / (chunks * chunk / src), 4),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for name, stats in benchmark().items():
+        print(f"{name:30s} {stats['us_per_chunk']:8.1f} us per {stats['chunk_ms']} ms chunk  "
+              f"RTF {stats['real_time_factor']:.4f}")
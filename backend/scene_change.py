@@ -0,0 +1,137 @@
+"""
+Scene Change Detector - Decides whether a camera/screen frame is worth sending.
+Frames are reduced to a small grayscale image (strided subsampling + a dot
+product with the luma weights, all NumPy) and compared against the last frame
+that was sent. Static scenes stop costing image tokens; a forced keyframe
+keeps the model's view from going stale.
+"""
+
+import time
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+# BGR order (OpenCV frames)
+_LUMA_BGR = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+CHANGE = "change"
+KEYFRAME = "keyframe"
+FIRST = "first"
+STATIC = "static"
+TOO_SOON = "min_interval"
+
+
+def downscale_gray(frame: np.ndarray, width: int = 64) -> np.ndarray:
+    """
+    Small grayscale view of a frame.
+
+    Args:
+        frame: HxW (gray) or HxWx3 (BGR) uint8 array
+        width: Approximate output width; strided subsampling, no filtering
+
+    Returns:
+        float32 2-D array
+    """
+    step = max(1, frame.shape[1] // width)
+    small = frame[::step, ::step]
+    if small.ndim == 3:
+        return small[..., :3].astype(np.float32) @ _LUMA_BGR
+    return small.astype(np.float32)
+
+
+class SceneChangeDetector:
+    """
+    Send/skip decision for a stream of frames.
+
+    Provides:
+    - Vectorized per-pixel diff against the last sent frame
+    - min_interval: never send more often than this
+    - keyframe_period: always send at least this often while frames arrive
+    - Per-reason counters
+    """
+
+    def __init__(self, min_interval: float = 1.0, keyframe_period: float = 30.0,
+                 pixel_threshold: float = 18.0, area_threshold: float = 0.02):
+        """
+        Args:
+            min_interval: Seconds between sends, however much the scene changes
+            keyframe_period: Seconds after which a frame is sent even if static
+                (0 disables keyframes)
+            pixel_threshold: Gray-level difference (0-255) for a pixel to count as changed
+            area_threshold: Fraction of changed pixels that makes a scene change
+        """
+        self.min_interval = min_interval
+        self.keyframe_period = keyframe_period
+        self.pixel_threshold = pixel_threshold
+        self.area_threshold = area_threshold
+
+        self._reference: Optional[np.ndarray] = None
+        self._last_sent = 0.0
+        self.last_change = 0.0
+        self.counts = {FIRST: 0, CHANGE: 0, KEYFRAME: 0, STATIC: 0, TOO_SOON: 0}
+
+    def reset(self):
+        """Forget the last sent frame; the next frame is always sent."""
+        self._reference = None
+
+    def changed_fraction(self, gray: np.ndarray) -> float:
+        """Fraction of pixels that differ from the last sent frame (1.0 if none)."""
+        ref = self._reference
+        if ref is None or ref.shape != gray.shape:
+            return 1.0
+        return float(np.count_nonzero(np.abs(gray - ref) > self.pixel_threshold)) / gray.size
+
+    def check(self, gray: np.ndarray, now: Optional[float] = None) -> str:
+        """
+        Classify a frame without recording it as sent.
+
+        Returns:
+            One of "first", "change", "keyframe", "static", "min_interval"
+        """
+        if now is None:
+            now = time.monotonic()
+        if self._reference is None or self._reference.shape != gray.shape:
+            return FIRST
+        if now - self._last_sent < self.min_interval:
+            return TOO_SOON
+        if self.changed_fraction(gray) >= self.area_threshold:
+            return CHANGE
+        if self.keyframe_period and now - self._last_sent >= self.keyframe_period:
+            return KEYFRAME
+        return STATIC
+
+    def mark_sent(self, gray: np.ndarray, now: Optional[float] = None):
+        self._reference = gray
+        self._last_sent = time.monotonic() if now is None else now
+
+    def update(self, gray: np.ndarray, now: Optional[float] = None) -> bool:
+        """
+        Decide whether to send this frame; if so, it becomes the new reference.
+
+        Args:
+            gray: Output of downscale_gray() (or any small 2-D float array)
+            now: time.monotonic() override for tests
+
+        Returns:
+            True if the frame should be sent
+        """
+        if now is None:
+            now = time.monotonic()
+        reason = self.check(gray, now)
+        self.counts[reason] += 1
+        if reason in (FIRST, CHANGE, KEYFRAME):
+            if reason != KEYFRAME:
+                self.last_change = now
+            self.mark_sent(gray, now)
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        sent = self.counts[FIRST] + self.counts[CHANGE] + self.counts[KEYFRAME]
+        total = sent + self.counts[STATIC] + self.counts[TOO_SOON]
+        return {
+            "frames": total,
+            "sent": sent,
+            "skipped": total - sent,
+            **self.counts,
+        }
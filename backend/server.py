@@ -11,9 +11,11 @@ import uvicorn
 from fastapi import FastAPI, Request
 import asyncio
 import threading
+import time
 import sys
 import os
 import json
+import importlib
 from datetime import datetime
 from pathlib import Path
 
@@ -22,9 +24,14 @@ from pathlib import Path
 # Ensure we can import ada
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-import ada
-from authenticator import FaceAuthenticator
+from lazy_import import lazy_module, lazy_attr, preload
+# ada (google-genai, OpenCV, audio stack) is preloaded on a background thread after startup;
+# the face authenticator (MediaPipe) is only imported when face auth is enabled
+ada = lazy_module("ada")
+FaceAuthenticator = lazy_attr("authenticator", "FaceAuthenticator")
 from kasa_agent import KasaAgent
+from visualizer_feed import VisualizerFeed
+from video_flow import VideoFlowController
 
 # Create a Socket.IO server
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
@@ -53,6 +60,12 @@ signal.signal(signal.SIGTERM, signal_handler)
 # Global state
 audio_loop = None
 loop_task = None
+visualizer_feed = None
+# Tells clients how much camera video to send (rate follows the Live session state)
+video_flow = VideoFlowController(
+    sio.emit,
+    lambda: audio_loop.get_vision_state() if audio_loop else None,
+)
 authenticator = None
 kasa_agent = KasaAgent()
 SETTINGS_FILE = "settings.json"
@@ -68,8 +81,49 @@ DEFAULT_SETTINGS = {
         "switch_project": True,
         "list_projects": True
     },
+    "tool_confirmation_timeout_s": 60, # Unanswered confirmation requests count as denied after this long
     "kasa_devices": [], # List of {ip, alias, model}
-    "camera_flipped": False # Invert cursor horizontal direction
+    "tool_profiles": ["full"], # Tool sets declared to the model: full, office, home (agents that are not configured are always left out)
+    "camera_flipped": False, # Invert cursor horizontal direction
+    "video_mode": "client", # What the model sees: "client" (browser camera frames) or "screen" (backend screen capture); applies on the next start
+    "audio_uplink": {
+        "silence_suppression": True, # Only stream speech (plus pre-roll) to Gemini
+        "preroll_ms": 300 # Audio kept from just before speech onset
+    },
+    "barge_in": {
+        "enabled": True, # Interrupt playback from the local VAD
+        "confirm_ms": 120 # Speech needed before playback is flushed (rejects coughs)
+    },
+    "echo_cancellation": True, # Subtract our own playback from the mic (laptop speakers)
+    "native_audio_rate": True, # Open devices at their own rate and resample internally
+    "vision": {
+        "min_interval_s": 1.0, # Camera frames are sent at most this often, and only on scene change
+        "keyframe_s": 30.0 # A frame is sent at least this often even if nothing changed
+    },
+    "live_session": {
+        "resume": True, # Reconnect with the Live API resumption handle (kept per project) instead of replaying chat text
+        "compression_trigger_tokens": None, # Sliding-window context compression; None = server default
+        "compression_target_tokens": None,
+        "hot_standby": False, # Keep a second Live session connected; on failure swap to it instead of reconnecting
+        "reconnect_buffer_ms": 10000 # Speech kept while reconnecting and sent to the new session
+    },
+    "camera": {
+        "width": 1280, # Capture resolution requested from the device
+        "height": 720,
+        "max_size": 1024, # Longest side of frames sent to the model
+        "target_kb": 60 # JPEG quality adapts to keep frames near this size
+    },
+    "screen": {
+        "monitor": 1, # mss monitor index (1 = primary, 0 = all monitors)
+        "region": None, # Optional {left, top, width, height} within the monitor
+        "fps": 1.0, # Capture rate cap; unchanged screens are not sent
+        "token_budget": 1032 # Max image tokens per frame (4 tiles)
+    },
+    "visualizer": {
+        "tick_hz": 30, # Max level/spectrum frames per second sent to the UI
+        "bins": 32, # Spectrum bands per frame
+        "raw_pcm": False # Also stream raw playback PCM as binary 'audio_pcm' events
+    }
 }
 
 SETTINGS = DEFAULT_SETTINGS.copy()
@@ -133,8 +187,12 @@ async def startup_event():
     except Exception as e:
         print(f"[SERVER DEBUG] Error checking loop: {e}")
 
-    print("[SERVER] Startup: Initializing Kasa Agent...")
-    await kasa_agent.initialize()
+    print("[SERVER] Startup: Preloading audio loop modules in the background...")
+    preload(["ada"])
+
+    # Known devices are connected in the background; discovery can take seconds per device
+    print("[SERVER] Startup: Initializing Kasa Agent in the background...")
+    asyncio.create_task(kasa_agent.initialize())
     
     print("[SERVER] Startup: Initializing Webhook Agent...")
     webhook_agent = get_webhook_agent(on_webhook_received=on_webhook_received)
@@ -181,6 +239,9 @@ async def connect(sid, environ):
     print(f"Client connected: {sid}")
     await sio.emit('status', {'msg': 'Connected to K.E.N.E.S Backend'}, room=sid)
 
+    video_flow.add_client(sid)
+    video_flow.start()
+
     global authenticator
     
     # Callback for Auth Status
@@ -192,9 +253,16 @@ async def connect(sid, environ):
     async def on_auth_frame(frame_b64):
         await sio.emit('auth_frame', {'image': frame_b64})
 
-    # Initialize Authenticator if not already done
+    if not SETTINGS.get("face_auth_enabled", False):
+        # Bypass Auth (MediaPipe and the face model are not loaded at all)
+        print("Face Auth Disabled. Auto-authenticating.")
+        await sio.emit('auth_status', {'authenticated': True})
+        return
+
+    # Initialize Authenticator if not already done (loads MediaPipe and the model off the event loop)
     if authenticator is None:
-        authenticator = FaceAuthenticator(
+        authenticator = await asyncio.to_thread(
+            FaceAuthenticator,
             reference_image_path="reference.jpg",
             on_status_change=on_auth_status,
             on_frame=on_auth_frame
@@ -204,25 +272,18 @@ async def connect(sid, environ):
     if authenticator.authenticated:
         await sio.emit('auth_status', {'authenticated': True})
     else:
-        # Check Settings for Auth
-        if SETTINGS.get("face_auth_enabled", False):
-            await sio.emit('auth_status', {'authenticated': False})
-            # Start the auth loop in background
-            asyncio.create_task(authenticator.start_authentication_loop())
-        else:
-            # Bypass Auth
-            print("Face Auth Disabled. Auto-authenticating.")
-            # We don't change authenticator state to true to avoid confusion if re-enabled? 
-            # Or we should just tell client it's auth'd.
-            await sio.emit('auth_status', {'authenticated': True})
+        await sio.emit('auth_status', {'authenticated': False})
+        # Start the auth loop in background
+        asyncio.create_task(authenticator.start_authentication_loop())
 
 @sio.event
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
+    video_flow.remove_client(sid)
 
 @sio.event
 async def start_audio(sid, data=None):
-    global audio_loop, loop_task
+    global audio_loop, loop_task, visualizer_feed
     
     # Optional: Block if not authenticated
     # Only block if auth is ENABLED and not authenticated
@@ -233,14 +294,23 @@ async def start_audio(sid, data=None):
             return
 
     print("Starting Audio Loop...")
+    # Usually already imported by the startup preload; otherwise wait for it off the event loop
+    await asyncio.to_thread(importlib.import_module, "ada")
     
     device_index = None
     device_name = None
+    # Camera frames come from the client unless the backend captures the screen
+    # (video_mode setting; a client may still pick the mode in its request)
+    video_mode = SETTINGS.get("video_mode", "client")
     if data:
         if 'device_index' in data:
             device_index = data['device_index']
         if 'device_name' in data:
             device_name = data['device_name']
+        if data.get('video_mode') in ("client", "screen"):
+            video_mode = data['video_mode']
+    if video_mode not in ("client", "screen"):
+        video_mode = "client"
             
     print(f"Using input device: Name='{device_name}', Index={device_index}")
     
@@ -255,11 +325,21 @@ async def start_audio(sid, data=None):
              return
 
 
-    # Callback to send audio data to frontend
+    # Playback audio feeds a rate-limited binary level/spectrum stream for the visualizer
+    visualizer_settings = SETTINGS.get("visualizer", {})
+    if visualizer_feed:
+        visualizer_feed.stop()
+    visualizer_feed = VisualizerFeed(
+        sio.emit,
+        sample_rate=ada.RECEIVE_SAMPLE_RATE,
+        bins=visualizer_settings.get("bins", 32),
+        tick_hz=visualizer_settings.get("tick_hz", 30),
+        raw_pcm=visualizer_settings.get("raw_pcm", False),
+    )
+    visualizer_feed.start()
+
     def on_audio_data(data_bytes):
-        # We need to schedule this on the event loop
-        # This is high frequency, so we might want to downsample or batch if it's too much
-        asyncio.create_task(sio.emit('audio_data', {'data': list(data_bytes)}))
+        visualizer_feed.push(data_bytes)
 
     # Callback to send Browser data to frontend
     def on_web_data(data):
@@ -298,8 +378,15 @@ async def start_audio(sid, data=None):
     # Initialize ADA
     try:
         print(f"Initializing AudioLoop with device_index={device_index}")
+        uplink_settings = SETTINGS.get("audio_uplink", {})
+        barge_in_settings = SETTINGS.get("barge_in", {})
+        vision_settings = SETTINGS.get("vision", {})
+        screen_settings = SETTINGS.get("screen", {})
+        camera_settings = SETTINGS.get("camera", {})
+        live_settings = SETTINGS.get("live_session", {})
+        init_start = time.perf_counter()
         audio_loop = ada.AudioLoop(
-            video_mode="none", 
+            video_mode=video_mode, 
             on_audio_data=on_audio_data,
             on_web_data=on_web_data,
             on_transcription=on_transcription,
@@ -310,9 +397,32 @@ async def start_audio(sid, data=None):
 
             input_device_index=device_index,
             input_device_name=device_name,
-            kasa_agent=kasa_agent
+            kasa_agent=kasa_agent,
+            silence_suppression=uplink_settings.get("silence_suppression", True),
+            preroll_ms=uplink_settings.get("preroll_ms", ada.UPLINK_PREROLL_MS),
+            barge_in_enabled=barge_in_settings.get("enabled", True),
+            barge_in_confirm_ms=barge_in_settings.get("confirm_ms", ada.BARGE_IN_CONFIRM_MS),
+            echo_cancellation=SETTINGS.get("echo_cancellation", True),
+            native_audio_rate=SETTINGS.get("native_audio_rate", True),
+            scene_min_interval=vision_settings.get("min_interval_s", ada.VISION_MIN_INTERVAL_S),
+            scene_keyframe_s=vision_settings.get("keyframe_s", ada.VISION_KEYFRAME_S),
+            screen_monitor=screen_settings.get("monitor", 1),
+            screen_region=screen_settings.get("region"),
+            screen_fps=screen_settings.get("fps", 1.0),
+            screen_token_budget=screen_settings.get("token_budget", ada.SCREEN_TOKEN_BUDGET),
+            camera_width=camera_settings.get("width", 1280),
+            camera_height=camera_settings.get("height", 720),
+            camera_max_size=camera_settings.get("max_size", 1024),
+            camera_target_kb=camera_settings.get("target_kb", 60),
+            session_resumption=live_settings.get("resume", True),
+            compression_trigger_tokens=live_settings.get("compression_trigger_tokens"),
+            compression_target_tokens=live_settings.get("compression_target_tokens"),
+            hot_standby=live_settings.get("hot_standby", False),
+            reconnect_buffer_ms=live_settings.get("reconnect_buffer_ms", 10000),
+            tool_profiles=SETTINGS.get("tool_profiles", ["full"]),
+            confirmation_timeout=SETTINGS.get("tool_confirmation_timeout_s", ada.TOOL_CONFIRMATION_TIMEOUT_S)
         )
-        print("AudioLoop initialized successfully.")
+        print(f"AudioLoop initialized successfully in {(time.perf_counter() - init_start) * 1000:.0f} ms.")
 
         # Apply current permissions
         audio_loop.update_permissions(SETTINGS["tool_permissions"])
@@ -358,13 +468,24 @@ async def start_audio(sid, data=None):
 
 @sio.event
 async def stop_audio(sid):
-    global audio_loop
+    global audio_loop, visualizer_feed
+    if visualizer_feed:
+        print(f"Visualizer feed stats: {visualizer_feed.get_stats()}")
+        visualizer_feed.stop()
+        visualizer_feed = None
     if audio_loop:
         audio_loop.stop() 
         print("Stopping Audio Loop")
         audio_loop = None
         await sio.emit('status', {'msg': 'K.E.N.E.S Stopped'})
 
+@sio.event
+async def get_audio_stats(sid):
+    stats = audio_loop.get_pipeline_stats() if audio_loop else None
+    if stats is not None:
+        stats["video_flow"] = video_flow.get_stats()
+    await sio.emit('audio_stats', stats, room=sid)
+
 @sio.event
 async def pause_audio(sid):
     global audio_loop
@@ -447,11 +568,12 @@ async def user_input(sid, data):
             
         # Use the same 'send' method that worked for audio, as 'send_realtime_input' and 'send_client_content' seem unstable in this env
         # INJECT VIDEO FRAME IF AVAILABLE (VAD-style logic for Text Input)
-        if audio_loop and audio_loop._latest_image_payload:
+        frame_payload = audio_loop.frame_slot.take() if audio_loop else None
+        if frame_payload:
             print(f"[SERVER DEBUG] Piggybacking video frame with text input.")
             try:
                 # Send frame first
-                await audio_loop.session.send(input=audio_loop._latest_image_payload, end_of_turn=False)
+                await audio_loop.session.send(input=frame_payload, end_of_turn=False)
             except Exception as e:
                 print(f"[SERVER DEBUG] Failed to send piggyback frame: {e}")
                 
@@ -469,9 +591,10 @@ async def video_frame(sid, data):
     # data should contain 'image' which is binary (blob) or base64 encoded
     image_data = data.get('image')
     if image_data and audio_loop:
-        # We don't await this because we don't want to block the socket handler
-        # But send_frame is async, so we create a task
-        asyncio.create_task(audio_loop.send_frame(image_data))
+        # Only stores the raw bytes in the frame slot, so no task per frame
+        start = time.perf_counter()
+        await audio_loop.send_frame(image_data)
+        video_flow.record_ingest(sid, len(image_data), time.perf_counter() - start)
 
 @sio.event
 async def save_memory(sid, data):
@@ -582,7 +705,8 @@ async def prompt_web_agent(sid, data):
     prompt = data.get('prompt')
     print(f"Received web agent prompt: '{prompt}'")
     
-    if not audio_loop or not audio_loop.web_agent:
+    agent = await audio_loop.agents.aget("web") if audio_loop else None
+    if not agent:
         await sio.emit('error', {'msg': "Web Agent not available"})
         return
 
@@ -599,7 +723,7 @@ async def prompt_web_agent(sid, data):
         # But we want to catch errors here.
         
         # Based on typical agent design, run() is the entry point.
-        await audio_loop.web_agent.run(prompt)
+        await agent.run(prompt)
         
         await sio.emit('status', {'msg': 'Web Agent finished'})
         
@@ -610,12 +734,13 @@ async def prompt_web_agent(sid, data):
 @sio.event
 async def discover_printers(sid):
     print("Received discover_printers request (Office)")
-    if not audio_loop or not audio_loop.document_printer_agent:
+    agent = await audio_loop.agents.aget("document_printer") if audio_loop else None
+    if not agent:
         await sio.emit('error', {'msg': "Document Printer Agent not ready"})
         return
     
     try:
-        result = await audio_loop.document_printer_agent.list_printers()
+        result = await agent.list_printers()
         if result.get("success"):
             printers = result.get("printers", [])
             mapped_printers = []
@@ -645,7 +770,8 @@ async def create_google_form(sid, data):
     title = data.get('title', 'Untitled Form')
     print(f"Received create_google_form request: '{title}'")
     
-    if not audio_loop or not audio_loop.google_workspace_agent:
+    agent = await audio_loop.agents.aget("google_workspace") if audio_loop else None
+    if not agent:
         # Check if google_workspace_agent is available on audio_loop
         # It seems server.py doesn't initialize it directly, but ada.py might.
         # Let's check ada.py next, but for now assuming it's available or we need to add it to AudioLoop
@@ -656,7 +782,7 @@ async def create_google_form(sid, data):
 
     try:
         await sio.emit('status', {'msg': 'Creating Google Form...'})
-        result = await audio_loop.google_workspace_agent.create_form(title)
+        result = await agent.create_form(title)
         
         if result.get('success'):
             await sio.emit('google_form_created', result)
@@ -674,13 +800,14 @@ async def create_google_slide(sid, data):
     title = data.get('title', 'Untitled Presentation')
     print(f"Received create_google_slide request: '{title}'")
     
-    if not audio_loop or not audio_loop.google_workspace_agent:
+    agent = await audio_loop.agents.aget("google_workspace") if audio_loop else None
+    if not agent:
         await sio.emit('error', {'msg': "Google Workspace Agent not available"})
         return
 
     try:
         await sio.emit('status', {'msg': 'Creating Google Slide...'})
-        result = await audio_loop.google_workspace_agent.create_presentation(title)
+        result = await agent.create_presentation(title)
         
         if result.get('success'):
             await sio.emit('google_slide_created', result)
@@ -701,14 +828,15 @@ async def send_yahoo_email(sid, data):
     
     print(f"Received send_yahoo_email to: {to_email}")
     
-    if not audio_loop or not audio_loop.yahoo_mail_agent:
+    agent = await audio_loop.agents.aget("yahoo") if audio_loop else None
+    if not agent:
         await sio.emit('error', {'msg': "Yahoo Mail Agent not available"})
         return
 
     try:
         await sio.emit('status', {'msg': 'Sending Yahoo Email...'})
         result = await asyncio.to_thread(
-            audio_loop.yahoo_mail_agent.send_email, to_email, subject, body
+            agent.send_email, to_email, subject, body
         )
         
         if result.get('success'):
@@ -726,14 +854,15 @@ async def list_yahoo_emails(sid, data):
     limit = data.get('limit', 5)
     print(f"Received list_yahoo_emails request (limit={limit})")
     
-    if not audio_loop or not audio_loop.yahoo_mail_agent:
+    agent = await audio_loop.agents.aget("yahoo") if audio_loop else None
+    if not agent:
         await sio.emit('error', {'msg': "Yahoo Mail Agent not available"})
         return
 
     try:
         await sio.emit('status', {'msg': 'Checking Yahoo Mail...'})
         result = await asyncio.to_thread(
-            audio_loop.yahoo_mail_agent.get_recent_emails, limit
+            agent.get_recent_emails, limit
         )
         
         if result.get('success'):
@@ -815,6 +944,17 @@ async def update_settings(sid, data):
         SETTINGS["camera_flipped"] = data["camera_flipped"]
         print(f"[SERVER] Camera flip set to: {data['camera_flipped']}")
 
+    if data.get("video_mode") in ("client", "screen"):
+        # Screen capture runs in the backend and client camera frames are not used; takes effect on the next start_audio
+        SETTINGS["video_mode"] = data["video_mode"]
+        print(f"[SERVER] Video mode set to: {data['video_mode']}")
+
+    if "tool_profiles" in data:
+        SETTINGS["tool_profiles"] = data["tool_profiles"]
+        if audio_loop:
+            # Reconnects (resuming the session) if the declared tools change
+            audio_loop.set_tool_profiles(SETTINGS["tool_profiles"])
+
     save_settings()
     # Broadcast new full settings
     await sio.emit('settings', SETTINGS)
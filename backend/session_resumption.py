@@ -0,0 +1,246 @@
+"""
+Session Resumption - Reconnects to the Live API without losing the conversation.
+The server periodically sends a session-resumption handle; reconnecting with
+the latest one restores the whole session (context, tool state) server-side,
+so AudioLoop no longer has to replay recent chat text as a new user turn. The
+handle is persisted in the current project's directory, so it survives a
+backend restart and each project resumes its own conversation.
+
+Sliding-window context compression is configured on the same
+LiveConnectConfig, so long sessions are trimmed by the server instead of
+hitting the context limit and being dropped.
+"""
+
+import contextlib
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+from google.genai import types
+
+# Server-side resumption handles stay valid for about two hours after a disconnect
+HANDLE_MAX_AGE_S = 2 * 60 * 60
+HANDLE_FILE = "live_session.json"
+
+RESUMED = "resumed"
+FRESH = "fresh"
+REPLAYED = "replayed"
+
+
+def compression_config(trigger_tokens: Optional[int] = None,
+                       target_tokens: Optional[int] = None) -> types.ContextWindowCompressionConfig:
+    """Sliding-window compression; None leaves a value at the server default."""
+    return types.ContextWindowCompressionConfig(
+        trigger_tokens=trigger_tokens,
+        sliding_window=types.SlidingWindow(target_tokens=target_tokens),
+    )
+
+
+class SessionResumption:
+    """
+    Resumption handle bookkeeping for one AudioLoop.
+
+    Provides:
+    - connect(): client.aio.live.connect() with the stored handle and compression applied
+    - on_update(): persist handles from session_resumption_update messages
+    - Fallback signal: `resumed` is False when the caller must restore context itself
+    - Reconnect-to-ready timing
+    """
+
+    def __init__(self, project_path: Optional[Callable[[], Path]] = None, enabled: bool = True,
+                 compression: Optional[types.ContextWindowCompressionConfig] = None,
+                 max_age: float = HANDLE_MAX_AGE_S):
+        """
+        Args:
+            project_path: Returns the current project directory (handle file lives there);
+                None keeps the handle in memory only
+            enabled: Request and use resumption handles
+            compression: Context window compression to add to every connect
+            max_age: Seconds after which a stored handle is not tried
+        """
+        self.project_path = project_path
+        self.enabled = enabled
+        self.compression = compression
+        self.max_age = max_age
+
+        self._handle: Optional[str] = None
+        self._saved_at = 0.0
+        self._loaded_from: Optional[Path] = None
+        self._disconnected_at: Optional[float] = None
+
+        self.resumed = False
+        self.last_path = FRESH
+        self.connects = 0
+        self.resumes = 0
+        self.resume_failures = 0
+        self.replays = 0
+        self.handle_updates = 0
+        self.go_aways = 0
+        self._reconnect_ms = deque(maxlen=50)
+        self._connect_ms = deque(maxlen=50)
+
+    # ------------------------------------------------------------------
+    # Handle storage
+    # ------------------------------------------------------------------
+
+    def _file(self) -> Optional[Path]:
+        if self.project_path is None:
+            return None
+        try:
+            return Path(self.project_path()) / HANDLE_FILE
+        except Exception:
+            return None
+
+    def _load(self):
+        path = self._file()
+        if path == self._loaded_from:
+            return
+        # Project changed (or first use): take that project's handle
+        self._loaded_from = path
+        self._handle, self._saved_at = None, 0.0
+        if path is None or not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self._handle = data.get("handle")
+            self._saved_at = float(data.get("saved_at", 0.0))
+        except Exception as e:
+            print(f"[RESUME] [WARN] Could not read {path}: {e}")
+
+    def _store(self):
+        path = self._file()
+        self._loaded_from = path
+        if path is None:
+            return
+        try:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"handle": self._handle, "saved_at": self._saved_at}), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[RESUME] [WARN] Could not save handle to {path}: {e}")
+
+    @property
+    def handle(self) -> Optional[str]:
+        """Handle to resume with, if any and not expired."""
+        if not self.enabled:
+            return None
+        self._load()
+        if self._handle and time.time() - self._saved_at < self.max_age:
+            return self._handle
+        return None
+
+    def on_update(self, update: Optional[types.LiveServerSessionResumptionUpdate]):
+        """Record a session_resumption_update from the server."""
+        if not update or not self.enabled:
+            return
+        if update.resumable and update.new_handle:
+            self._load()
+            self._handle = update.new_handle
+            self._saved_at = time.time()
+            self.handle_updates += 1
+            self._store()
+
+    def invalidate(self):
+        """Drop the stored handle (the server rejected it)."""
+        self._load()
+        self._handle, self._saved_at = None, 0.0
+        self._store()
+
+    # ------------------------------------------------------------------
+    # Connecting
+    # ------------------------------------------------------------------
+
+    def config_for(self, config: types.LiveConnectConfig, handle: Optional[str] = None) -> types.LiveConnectConfig:
+        """Copy of `config` with resumption and compression set."""
+        update: Dict[str, Any] = {}
+        if self.enabled:
+            # Without a handle this still asks the server to start sending handles
+            update["session_resumption"] = types.SessionResumptionConfig(handle=handle)
+        if self.compression is not None:
+            update["context_window_compression"] = self.compression
+        return config.model_copy(update=update) if update else config
+
+    def mark_disconnected(self):
+        """Call when the session dropped; the next connect reports reconnect time."""
+        if self._disconnected_at is None:
+            self._disconnected_at = time.perf_counter()
+
+    def mark_replayed(self):
+        """The caller restored context from text after a fresh connect (fallback path)."""
+        self.replays += 1
+        self.last_path = REPLAYED
+
+    def on_go_away(self, go_away: Optional[types.LiveServerGoAway] = None):
+        self.go_aways += 1
+        self.mark_disconnected()
+
+    @contextlib.asynccontextmanager
+    async def connect(self, client, model: str, config: types.LiveConnectConfig):
+        """
+        Open a Live session, resuming the stored one when possible.
+
+        If the server rejects the handle the error propagates as usual, the
+        handle is dropped, and the next attempt starts a fresh session
+        (`resumed` is False so the caller can restore context from text).
+        """
+        handle = self.handle
+        start = time.perf_counter()
+        ready = False
+        try:
+            async with client.aio.live.connect(model=model, config=self.config_for(config, handle)) as session:
+                ready = True
+                self._on_ready(handle is not None, start)
+                yield session
+        except Exception:
+            if not ready and handle is not None:
+                print("[RESUME] [WARN] Resuming with the stored handle failed; next attempt starts fresh.")
+                self.resume_failures += 1
+                self.invalidate()
+            raise
+
+    def _on_ready(self, resumed: bool, start: float):
+        now = time.perf_counter()
+        self.connects += 1
+        self.resumed = resumed
+        self.last_path = RESUMED if resumed else FRESH
+        if resumed:
+            self.resumes += 1
+        self._connect_ms.append((now - start) * 1000)
+        if self._disconnected_at is not None:
+            self._reconnect_ms.append((now - self._disconnected_at) * 1000)
+            self._disconnected_at = None
+        print(f"[RESUME] Session ready ({self.last_path}) in {self._connect_ms[-1]:.0f} ms")
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _summary(values) -> Dict[str, float]:
+        if not values:
+            return {"count": 0}
+        ordered = sorted(values)
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "max_ms": round(ordered[-1], 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "has_handle": self.handle is not None,
+            "last_path": self.last_path,
+            "connects": self.connects,
+            "resumes": self.resumes,
+            "resume_failures": self.resume_failures,
+            "replays": self.replays,
+            "handle_updates": self.handle_updates,
+            "go_aways": self.go_aways,
+            "connect": self._summary(self._connect_ms),
+            "reconnect_to_ready": self._summary(self._reconnect_ms),
+        }
@@ -0,0 +1,124 @@
+"""
+Speech Gate - Client-side silence suppression for the Gemini uplink.
+Only speech-bearing microphone audio (plus a short pre-roll) is forwarded;
+after an utterance ends the gate asks for an explicit end-of-audio-stream
+signal so the server flushes its own VAD instead of waiting for more audio.
+"""
+
+from collections import deque
+from typing import Dict, Any, List, Tuple
+
+
+class SpeechGate:
+    """
+    Gates microphone chunks using the VAD decision.
+
+    Provides:
+    - Pre-roll: the last N ms before speech onset are sent with the first speech chunk
+    - Pass-through while the VAD reports speech (including its hangover tail)
+    - An end-of-stream flag once per utterance when speech ends
+    - Counters for suppressed vs sent audio
+    """
+
+    def __init__(self, sample_rate: int = 16000, chunk_size: int = 1024,
+                 preroll_ms: float = 300.0, enabled: bool = True):
+        """
+        Args:
+            sample_rate: Sample rate of the gated PCM
+            chunk_size: Frames per chunk, used to size the pre-roll buffer
+            preroll_ms: Audio kept from before speech onset (covers VAD attack time)
+            enabled: If False every chunk passes and no end-of-stream is emitted
+        """
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.enabled = enabled
+        self.preroll_ms = preroll_ms
+        preroll_chunks = int(round(preroll_ms / 1000 * sample_rate / chunk_size))
+        self._preroll = deque(maxlen=preroll_chunks) if preroll_chunks > 0 else None
+        self._open = False
+
+        self.chunks_in = 0
+        self.chunks_sent = 0
+        self.chunks_suppressed = 0
+        self.utterances = 0
+        self.stream_ends = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def reset(self):
+        """Close the gate and forget the pre-roll (e.g. after pause or reconnect)."""
+        self._open = False
+        if self._preroll is not None:
+            self._preroll.clear()
+
+    def process(self, chunk, vad_result) -> Tuple[List[bytes], bool]:
+        """
+        Decide what to send for one chunk.
+
+        Args:
+            chunk: PCM bytes or memoryview (copied if it has to be kept)
+            vad_result: VADResult for this chunk
+
+        Returns:
+            (chunks_to_send, send_stream_end)
+        """
+        self.chunks_in += 1
+
+        if not self.enabled:
+            self.chunks_sent += 1
+            return [bytes(chunk)], False
+
+        if vad_result.is_speech:
+            out = []
+            if not self._open:
+                self._open = True
+                self.utterances += 1
+                if self._preroll:
+                    out.extend(self._preroll)
+                    # Pre-roll chunks were counted as suppressed when buffered
+                    self.chunks_suppressed -= len(self._preroll)
+                    self._preroll.clear()
+            out.append(bytes(chunk))
+            self.chunks_sent += len(out)
+            return out, False
+
+        if self._open:
+            # VAD hangover elapsed: this chunk is the tail of the utterance
+            self._open = False
+            self.chunks_sent += 1
+            self.stream_ends += 1
+            return [bytes(chunk)], True
+
+        self.chunks_suppressed += 1
+        if self._preroll is not None:
+            self._preroll.append(bytes(chunk))
+        return [], False
+
+    def close_stream(self) -> bool:
+        """
+        Force the gate shut (pause, mute). Returns True if an utterance was
+        in flight and an end-of-stream signal should be sent.
+        """
+        was_open = self._open
+        self.reset()
+        if was_open:
+            self.stream_ends += 1
+        return was_open
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict with chunk counters and the fraction of audio suppressed
+        """
+        return {
+            "enabled": self.enabled,
+            "preroll_ms": self.preroll_ms,
+            "chunks_in": self.chunks_in,
+            "chunks_sent": self.chunks_sent,
+            "chunks_suppressed": self.chunks_suppressed,
+            "suppressed_ratio": round(self.chunks_suppressed / self.chunks_in, 3) if self.chunks_in else 0.0,
+            "utterances": self.utterances,
+            "stream_ends": self.stream_ends,
+        }
@@ -0,0 +1,145 @@
+"""
+Tool Executor - Runs tool calls beside the receive loop instead of inside it.
+receive_audio used to await the user's confirmation and every tool handler
+before reading the next message from the websocket, so while a confirmation
+popup was open or a Google call ran, model audio, transcriptions and GoAway
+notices waited unread and the session could time out. receive_audio now only
+submits each tool_call message; a worker runs the calls (confirmations
+included) and sends the responses on the session the calls arrived on, or
+on the session resumed from it if that one closed meanwhile.
+
+Provides:
+- submit(): queue one tool_call message (never blocks)
+- run(): the worker; one task per message, so a pending confirmation does not hold up later calls
+- Queue wait, turnaround, in-flight messages, confirmation outcomes
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Awaitable, List, Optional
+
+CONFIRMED = "confirmed"
+DENIED = "denied"
+TIMED_OUT = "timed_out"
+
+
+class ToolExecutor:
+    """
+    Tool call worker for one AudioLoop.
+
+    Provides:
+    - submit()/run(): decouple the websocket reader from tool execution
+    - record_confirmation(): confirmation wait and outcome statistics
+    - get_stats()
+    """
+
+    def __init__(
+        self,
+        handle_calls: Callable[[List[Any]], Awaitable[List[Any]]],
+        resumed_session: Optional[Callable[[Any, Any], Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            handle_calls: Runs the function calls of one message, returns their FunctionResponses in order
+            resumed_session: Called with (conversation, closed session) when sending fails; returns the
+                session that resumed that conversation, or None if it did not continue (fresh or replayed)
+        """
+        self.handle_calls = handle_calls
+        self.resumed_session = resumed_session
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._running = set()
+        # Messages submitted whose responses have not been sent (or dropped) yet
+        self._unanswered = 0
+        self.submitted = 0
+        self.sent = 0
+        self.dropped = 0
+        self.redelivered = 0
+        self.max_in_flight = 0
+        self._wait_ms = deque(maxlen=50)
+        self._turnaround_ms = deque(maxlen=50)
+        self.confirmations = {CONFIRMED: 0, DENIED: 0, TIMED_OUT: 0}
+        self.pending_confirmations = 0
+        self._confirm_ms = deque(maxlen=50)
+
+    @property
+    def in_flight(self) -> int:
+        return self._unanswered
+
+    def submit(self, session, function_calls: List[Any], conversation: Any = None):
+        """Queue a tool_call message; its responses go to `session` (or its resumption in `conversation`)."""
+        self.submitted += 1
+        self._unanswered += 1
+        self._queue.put_nowait((session, conversation, list(function_calls), time.perf_counter()))
+
+    async def run(self):
+        """Start each queued message as its own task until cancelled (then cancel those still running)."""
+        try:
+            while True:
+                session, conversation, function_calls, queued_at = await self._queue.get()
+                self._wait_ms.append((time.perf_counter() - queued_at) * 1000)
+                task = asyncio.create_task(self._execute(session, conversation, function_calls, queued_at))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                self.max_in_flight = max(self.max_in_flight, len(self._running))
+        finally:
+            for task in list(self._running):
+                task.cancel()
+            while not self._queue.empty():
+                self._queue.get_nowait()
+                self._unanswered -= 1
+
+    async def _execute(self, session, conversation, function_calls: List[Any], queued_at: float):
+        try:
+            try:
+                responses = await self.handle_calls(function_calls)
+            except Exception as e:
+                print(f"[TOOLS] [ERR] Tool calls {[fc.name for fc in function_calls]} failed: {e}")
+                return
+            if not responses:
+                return
+            try:
+                await session.send_tool_response(function_responses=responses)
+            except Exception as e:
+                # The session closed while the calls ran. A session resumed from its
+                # handle still waits for these; a fresh or replayed one never asked.
+                resumed = await self.resumed_session(conversation, session) if self.resumed_session else None
+                if resumed is None:
+                    self.dropped += 1
+                    print(f"[TOOLS] [WARN] Dropped {len(responses)} tool response(s), session is gone: {e}")
+                    return
+                try:
+                    await resumed.send_tool_response(function_responses=responses)
+                except Exception as e:
+                    self.dropped += 1
+                    print(f"[TOOLS] [WARN] Dropped {len(responses)} tool response(s), resumed session is gone too: {e}")
+                    return
+                self.redelivered += 1
+                print(f"[TOOLS] Sent {len(responses)} tool response(s) on the resumed session.")
+            self.sent += 1
+            self._turnaround_ms.append((time.perf_counter() - queued_at) * 1000)
+        finally:
+            self._unanswered -= 1
+
+    def record_confirmation(self, seconds: float, outcome: str):
+        """One confirmation request: how long the user took and CONFIRMED, DENIED or TIMED_OUT."""
+        self.confirmations[outcome] += 1
+        self._confirm_ms.append(seconds * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        def p50(values):
+            return round(sorted(values)[len(values) // 2], 1) if values else None
+
+        return {
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "redelivered": self.redelivered,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_wait_p50_ms": p50(self._wait_ms),
+            "turnaround_p50_ms": p50(self._turnaround_ms),
+            "confirmations": dict(self.confirmations),
+            "confirmations_pending": self.pending_confirmations,
+            "confirm_p50_ms": p50(self._confirm_ms),
+        }
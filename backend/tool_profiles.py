@@ -0,0 +1,279 @@
+"""
+Tool Profiles - Builds each Live session's tool declarations from what can run.
+Every declaration is sent in the setup message and sits in the model's
+context for the whole session, so 70+ declarations for agents that are not
+configured (Google not authenticated, no n8n URL, no Yahoo credentials) cost
+setup time and prompt tokens on every turn and invite calls that can only
+fail. Declarations are grouped per agent; a session declares the groups that
+are in one of the user's profiles and whose agent is currently available.
+The set is rebuilt on every (re)connect.
+
+Profiles:
+    full    Every available group
+    office  Workspace, mail, automation, files, printing
+    home    Smart home, messaging, files
+"""
+
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Callable, Iterable, List
+
+from google.genai import types
+
+CORE = "core"
+SMART_HOME = "smart_home"
+GOOGLE_AUTH = "google_auth"
+GOOGLE_WORKSPACE = "google_workspace"
+N8N = "n8n"
+LOCAL_PC = "local_pc"
+WEBHOOKS = "webhooks"
+WHATSAPP = "whatsapp"
+PRINTER = "printer"
+YAHOO = "yahoo"
+
+# None: every group
+PROFILES = {
+    "full": None,
+    "office": {CORE, GOOGLE_AUTH, GOOGLE_WORKSPACE, N8N, LOCAL_PC, WEBHOOKS, PRINTER, YAHOO},
+    "home": {CORE, SMART_HOME, WHATSAPP, LOCAL_PC, WEBHOOKS},
+}
+DEFAULT_PROFILES = ("full",)
+
+# Rough size of a declaration in prompt tokens (JSON characters per token)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(declarations: Iterable[Dict[str, Any]]) -> int:
+    """Approximate prompt tokens taken by function declarations."""
+    return sum(len(json.dumps(d, separators=(",", ":"))) for d in declarations) // CHARS_PER_TOKEN
+
+
+class ToolGroup:
+    """Declarations of one agent plus a check for whether it can run right now."""
+
+    def __init__(self, name: str, declarations: List[Dict[str, Any]], available: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            name: Group name (see the constants above)
+            declarations: Function declarations (dicts as in ada.py)
+            available: Returns False when the agent is not configured; None means always available
+        """
+        self.name = name
+        self.declarations = declarations
+        self.available = available
+
+    def is_available(self) -> bool:
+        if self.available is None:
+            return True
+        try:
+            return bool(self.available())
+        except Exception as e:
+            print(f"[TOOLS] [WARN] Availability check for '{self.name}' failed: {e}")
+            return False
+
+
+class ToolProfiles:
+    """
+    Per-session tool set.
+
+    Provides:
+    - select(): groups declared for the current profiles and agent availability
+    - config_for(): LiveConnectConfig copy with that tool set
+    - changed(): whether a reconnect would declare a different set
+    - Declared/pruned counts and token estimates
+    """
+
+    def __init__(self, groups: List[ToolGroup], profiles: Iterable[str] = DEFAULT_PROFILES,
+                 builtin_tools: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            groups: All tool groups
+            profiles: Selected profile names (union); unknown names are ignored with a warning
+            builtin_tools: Non-function tools always declared (e.g. [{'google_search': {}}])
+        """
+        self.groups = groups
+        self.builtin_tools = builtin_tools if builtin_tools is not None else []
+        self.profiles: List[str] = []
+        self.set_profiles(profiles)
+
+        self._declared: Optional[List[str]] = None
+        self.builds = 0
+        self.last: Dict[str, Any] = {}
+
+    def set_profiles(self, profiles: Iterable[str]):
+        """Select profiles; takes effect on the next (re)connect."""
+        selected = []
+        for name in profiles or DEFAULT_PROFILES:
+            if name in PROFILES:
+                selected.append(name)
+            else:
+                print(f"[TOOLS] [WARN] Unknown tool profile '{name}' (known: {', '.join(PROFILES)}).")
+        self.profiles = selected or list(DEFAULT_PROFILES)
+
+    def _wanted(self, group: ToolGroup) -> bool:
+        for name in self.profiles:
+            members = PROFILES[name]
+            if members is None or group.name in members:
+                return True
+        return False
+
+    def select(self) -> Dict[str, List[ToolGroup]]:
+        """
+        Returns:
+            {"declared": [...], "not_in_profile": [...], "unavailable": [...]}
+        """
+        result = {"declared": [], "not_in_profile": [], "unavailable": []}
+        for group in self.groups:
+            if not self._wanted(group):
+                result["not_in_profile"].append(group)
+            elif not group.is_available():
+                result["unavailable"].append(group)
+            else:
+                result["declared"].append(group)
+        return result
+
+    def declarations(self) -> List[Dict[str, Any]]:
+        return [d for g in self.select()["declared"] for d in g.declarations]
+
+    def changed(self) -> bool:
+        """True if the next session would declare different groups than the current one."""
+        return self._declared is not None and [g.name for g in self.select()["declared"]] != self._declared
+
+    def config_for(self, config: types.LiveConnectConfig) -> types.LiveConnectConfig:
+        """Copy of `config` declaring only the selected tools."""
+        selection = self.select()
+        declarations = [d for g in selection["declared"] for d in g.declarations]
+        tools = list(self.builtin_tools)
+        if declarations:
+            tools.append({"function_declarations": declarations})
+
+        names = [g.name for g in selection["declared"]]
+        if names != self._declared:
+            skipped = [g.name for g in selection["unavailable"]]
+            print(f"[TOOLS] Declaring {len(declarations)} tools ({', '.join(names)})"
+                  + (f"; unavailable: {', '.join(skipped)}" if skipped else ""))
+        self._declared = names
+        self.builds += 1
+        self.last = {
+            "declared_groups": names,
+            "unavailable_groups": [g.name for g in selection["unavailable"]],
+            "not_in_profile_groups": [g.name for g in selection["not_in_profile"]],
+            "declared_tools": len(declarations),
+            "pruned_tools": sum(len(g.declarations) for g in selection["unavailable"] + selection["not_in_profile"]),
+            "declared_tokens_est": estimate_tokens(declarations),
+        }
+        # model_copy does not validate; build the Tool models the constructor would have
+        return config.model_copy(update={"tools": [types.Tool.model_validate(t) for t in tools]})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"profiles": self.profiles, "builds": self.builds, **self.last}
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+class _SetupCapture:
+    """Stands in for the websocket: records the setup message, answers setupComplete."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def recv(self, decode=True):
+        return b'{"setupComplete": {}}' if not decode else '{"setupComplete": {}}'
+
+    async def close(self):
+        pass
+
+
+def benchmark(config: types.LiveConnectConfig, variants: Dict[str, ToolProfiles], model: str = "models/benchmark",
+              repeats: int = 20, client=None) -> Dict[str, Any]:
+    """
+    Session setup cost and per-turn prompt overhead of different tool sets.
+
+    Setup time is the SDK's client-side connect path (config validation,
+    conversion, JSON) measured against a captured websocket; pass a real
+    `client` to also time live connects. Prompt tokens are estimated from the
+    declarations' JSON size; they are added to every turn's context.
+
+    Args:
+        config: Base LiveConnectConfig
+        variants: name -> ToolProfiles to compare (e.g. full vs pruned)
+        model: Model name used in the setup message
+        repeats: Connects per variant
+        client: Optional genai.Client for timing real connects
+
+    Returns:
+        dict per variant: tools, setup_bytes, setup_ms, tokens_est (and live_connect_ms)
+    """
+    import asyncio
+    from google import genai
+    from google.genai import live
+
+    capture_client = genai.Client(api_key="benchmark")
+
+    @asynccontextmanager
+    async def fake_ws_connect(uri, **kwargs):
+        yield capture
+
+    async def run():
+        results = {}
+        original = live.ws_connect
+        for name, profiles in variants.items():
+            variant_config = profiles.config_for(config)
+            declarations = profiles.declarations()
+            live.ws_connect = fake_ws_connect
+            try:
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    async with capture_client.aio.live.connect(model=model, config=variant_config):
+                        pass
+                setup_ms = (time.perf_counter() - start) / repeats * 1000
+            finally:
+                live.ws_connect = original
+            results[name] = {
+                "tools": len(declarations),
+                "setup_bytes": len(capture.sent[-1]),
+                "setup_ms": round(setup_ms, 2),
+                "tokens_est": estimate_tokens(declarations),
+            }
+            if client is not None:
+                start = time.perf_counter()
+                for _ in range(min(repeats, 3)):
+                    async with client.aio.live.connect(model=model, config=variant_config):
+                        pass
+                results[name]["live_connect_ms"] = round((time.perf_counter() - start) / min(repeats, 3) * 1000, 1)
+        return results
+
+    capture = _SetupCapture()
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    from ada import tool_groups, config
+    from agent_registry import AgentRegistry
+    from google_workspace_agent import get_workspace_agent
+    from n8n_mcp_agent import get_n8n_agent
+    from yahoo_mail_agent import get_yahoo_agent
+
+    agents = AgentRegistry()
+    agents.register("google_workspace", get_workspace_agent)
+    agents.register("n8n", get_n8n_agent)
+    agents.register("yahoo", get_yahoo_agent)
+    groups = tool_groups(agents)
+    builtin = [{'google_search': {}}]
+    variants = {
+        # Previous behaviour: every declaration, configured or not
+        "unpruned": ToolProfiles([ToolGroup(g.name, g.declarations) for g in groups], builtin_tools=builtin),
+        "full": ToolProfiles(groups, ["full"], builtin),
+        "office": ToolProfiles(groups, ["office"], builtin),
+        "home": ToolProfiles(groups, ["home"], builtin),
+    }
+    stats = benchmark(config, variants)
+    print(f"{'set':10s} {'tools':>5s} {'setup bytes':>12s} {'setup ms':>9s} {'tokens/turn':>12s}")
+    for name, row in stats.items():
+        print(f"{name:10s} {row['tools']:5d} {row['setup_bytes']:12d} {row['setup_ms']:9.2f} {row['tokens_est']:12d}")
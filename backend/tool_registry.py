@@ -0,0 +1,325 @@
+"""
+Tool Registry - One table describing every tool the Live model can call.
+receive_audio used to rebuild a list of ~60 names for every function call,
+search it linearly, then walk an ~800-line if/elif chain in which each
+branch copied arguments into a handle_* method by hand. Each tool is now a
+ToolSpec: its declaration (schema), the AudioLoop method that handles it,
+the permission key, a timeout and a concurrency class. Argument validators
+are compiled from the schema once, at import; dispatch is a dict lookup;
+the declarations sent in LiveConnectConfig are generated from the same table.
+
+Concurrency classes (calls of one tool_call message run concurrently):
+    parallel  Reads and independent remote calls; may run alongside any other call
+    serial    Changes state; waits for earlier serial calls of the same group (agent), in call order
+"""
+
+import asyncio
+import inspect
+import json
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
+
+PARALLEL = "parallel"
+SERIAL = "serial"
+
+# Seconds before a call is abandoned and the model is told it timed out
+DEFAULT_TIMEOUT_S = 30.0
+
+_PY_TYPES = {
+    "STRING": (str,),
+    "INTEGER": (int,),
+    "NUMBER": (int, float),
+    "BOOLEAN": (bool,),
+    "ARRAY": (list, tuple),
+    "OBJECT": (dict,),
+}
+
+
+class ToolError(Exception):
+    """A call the registry rejected (unknown tool, invalid arguments)."""
+
+
+def _compile_validator(declaration: Dict[str, Any]) -> Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]:
+    """Build the argument check for one declaration (done once per tool)."""
+    parameters = declaration.get("parameters") or {}
+    properties = parameters.get("properties") or {}
+    required = tuple(parameters.get("required") or ())
+    checks = {
+        name: (schema.get("type", "STRING").upper(), _PY_TYPES.get(schema.get("type", "STRING").upper()),
+               tuple(schema["enum"]) if schema.get("enum") else None)
+        for name, schema in properties.items()
+    }
+
+    def validate(args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        args = args or {}
+        kwargs = {}
+        for name, value in args.items():
+            check = checks.get(name)
+            if check is None or value is None:
+                # Undeclared arguments would not match the handler's signature
+                continue
+            kind, py_types, enum = check
+            if kind == "INTEGER" and isinstance(value, float) and value.is_integer():
+                value = int(value)
+            elif kind == "STRING" and isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            elif kind == "STRING" and isinstance(value, (dict, list)):
+                # e.g. JSON input passed as an object instead of a string
+                value = json.dumps(value)
+            if py_types is not None and (not isinstance(value, py_types) or (isinstance(value, bool) and kind != "BOOLEAN")):
+                raise ToolError(f"Argument '{name}' must be of type {kind}, got {type(value).__name__}.")
+            if enum is not None and value not in enum:
+                raise ToolError(f"Argument '{name}' must be one of {', '.join(map(str, enum))}.")
+            kwargs[name] = value
+        missing = [name for name in required if name not in kwargs]
+        if missing:
+            raise ToolError(f"Missing required argument(s): {', '.join(missing)}.")
+        return kwargs
+
+    return validate
+
+
+class ToolSpec:
+    """Declaration plus how to run it."""
+
+    def __init__(self, declaration: Dict[str, Any], handler: str, group: str, permission: Optional[str] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT_S, concurrency: str = PARALLEL,
+                 background: Optional[str] = None):
+        """
+        Args:
+            declaration: Function declaration sent to the model (dict as in ada.py)
+            handler: Name of the AudioLoop coroutine method called with the validated arguments
+            group: Tool group (tool_profiles constants)
+            permission: Key in the tool permissions settings (default: the tool name)
+            timeout: Seconds the handler may run; None for no limit (e.g. interactive sign-in)
+            concurrency: PARALLEL or SERIAL
+            background: Run the handler as a task and answer immediately with this text
+                (the handler reports its result to the model itself)
+        """
+        self.declaration = declaration
+        self.name = declaration["name"]
+        self.handler = handler
+        self.group = group
+        self.permission = permission or self.name
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.background = background
+        self.validate = _compile_validator(declaration)
+
+
+class SerialSlot:
+    """Place of one serial call in its group's queue."""
+
+    def __init__(self, previous: Optional["SerialSlot"]):
+        self._previous = previous
+        self._done = asyncio.Event()
+
+    async def wait(self):
+        """Wait until every earlier serial call of the group has finished."""
+        if self._previous is not None:
+            await self._previous._done.wait()
+            self._previous = None
+
+    def release(self):
+        self._done.set()
+
+
+class BoundTool:
+    """A ToolSpec with its handler resolved on one AudioLoop."""
+
+    def __init__(self, spec: ToolSpec, handler: Callable[..., Any]):
+        self.spec = spec
+        self.handler = handler
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self._ms = deque(maxlen=50)
+
+    def __getattr__(self, attr):
+        return getattr(self.spec, attr)
+
+
+class ToolRegistry:
+    """
+    Table of ToolSpecs.
+
+    Provides:
+    - declarations(): declarations for the config, optionally per group
+    - bind(): resolve handlers on an AudioLoop (checked against each schema)
+    - prepare()/run(): O(1) lookup, argument validation, timeout, error capture
+    - reserve(): per-group ordering of serial calls running in one batch
+    - Per-tool call counts, errors, timeouts and latency
+    """
+
+    def __init__(self, specs: Iterable[ToolSpec]):
+        self.specs: Dict[str, ToolSpec] = {}
+        for spec in specs:
+            if spec.name in self.specs:
+                raise ValueError(f"Tool '{spec.name}' registered twice")
+            self.specs[spec.name] = spec
+        self._bound: Dict[str, BoundTool] = {}
+        self._background = set()
+        self._tails: Dict[str, SerialSlot] = {}
+        self.unknown_calls = 0
+        self.invalid_calls = 0
+        self.batches = 0
+        self.batched_calls = 0
+        self.max_batch = 0
+        self._batch_ms = deque(maxlen=50)
+        self._batch_saved_ms = deque(maxlen=50)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def declarations(self, group: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Declarations in registration order, all or one group's."""
+        return [s.declaration for s in self.specs.values() if group is None or s.group == group]
+
+    @staticmethod
+    def check_handler(spec: ToolSpec, handler: Callable[..., Any]):
+        """Raise ValueError if the handler cannot take every declared argument."""
+        if not inspect.iscoroutinefunction(handler):
+            raise ValueError(f"Handler for '{spec.name}' must be a coroutine function")
+        params = inspect.signature(handler).parameters
+        if any(p.kind == p.VAR_KEYWORD for p in params.values()):
+            return
+        declared = ((spec.declaration.get("parameters") or {}).get("properties") or {}).keys()
+        missing = [name for name in declared if name not in params]
+        if missing:
+            raise ValueError(f"Handler '{spec.handler}' for '{spec.name}' does not accept: {', '.join(missing)}")
+
+    def bind(self, owner) -> "ToolRegistry":
+        """
+        A registry whose tools call `owner`'s handler methods.
+
+        Raises:
+            ValueError: A handler is missing or does not match its declaration
+        """
+        bound = ToolRegistry(self.specs.values())
+        for spec in self.specs.values():
+            handler = getattr(owner, spec.handler, None)
+            if handler is None:
+                raise ValueError(f"No handler '{spec.handler}' for tool '{spec.name}'")
+            self.check_handler(spec, handler)
+            bound._bound[spec.name] = BoundTool(spec, handler)
+        return bound
+
+    def get(self, name: str) -> Optional[BoundTool]:
+        return self._bound.get(name)
+
+    def prepare(self, name: str, args: Optional[Dict[str, Any]]) -> Tuple[BoundTool, Dict[str, Any]]:
+        """
+        Look up a call and validate its arguments.
+
+        Raises:
+            ToolError: Unknown tool or invalid arguments
+        """
+        tool = self._bound.get(name)
+        if tool is None:
+            self.unknown_calls += 1
+            raise ToolError(f"Unknown tool '{name}'.")
+        try:
+            return tool, tool.validate(args)
+        except ToolError:
+            self.invalid_calls += 1
+            raise
+
+    def reserve(self, tool: BoundTool) -> Optional[SerialSlot]:
+        """
+        Queue a serial call behind earlier serial calls of its group.
+
+        Call in call order, before the first await of each call; pass the slot
+        to run() and release() it on every path. Returns None for parallel tools.
+        """
+        if tool.concurrency != SERIAL:
+            return None
+        slot = SerialSlot(self._tails.get(tool.group))
+        self._tails[tool.group] = slot
+        return slot
+
+    async def run(self, tool: BoundTool, kwargs: Dict[str, Any], slot: Optional[SerialSlot] = None) -> Dict[str, Any]:
+        """
+        Call the handler and shape its result as a function response body.
+
+        Args:
+            tool, kwargs: From prepare()
+            slot: From reserve(); the call waits for its turn and releases the slot
+
+        Returns:
+            The handler's dict, {"result": text} for other results, or {"error": ...}
+        """
+        if slot is not None:
+            await slot.wait()
+        tool.calls += 1
+        start = time.perf_counter()
+        try:
+            if tool.background is not None:
+                task = asyncio.create_task(tool.handler(**kwargs))
+                self._background.add(task)
+                task.add_done_callback(self._background_done)
+                return {"result": tool.background}
+            if tool.timeout is None:
+                result = await tool.handler(**kwargs)
+            else:
+                result = await asyncio.wait_for(tool.handler(**kwargs), tool.timeout)
+        except asyncio.TimeoutError:
+            tool.timeouts += 1
+            print(f"[TOOLS] [WARN] '{tool.name}' timed out after {tool.timeout:.0f} s")
+            return {"error": f"'{tool.name}' did not finish within {tool.timeout:.0f} seconds."}
+        except Exception as e:
+            tool.errors += 1
+            print(f"[TOOLS] [ERR] '{tool.name}' failed: {e}")
+            return {"error": f"'{tool.name}' failed: {e}"}
+        finally:
+            tool._ms.append((time.perf_counter() - start) * 1000)
+            if slot is not None:
+                slot.release()
+        return result if isinstance(result, dict) else {"result": "Done." if result is None else str(result)}
+
+    def record_batch(self, call_seconds: List[float], wall_seconds: float):
+        """One tool_call message: per-call durations and the time until all had answered."""
+        self.batches += 1
+        self.batched_calls += len(call_seconds)
+        self.max_batch = max(self.max_batch, len(call_seconds))
+        self._batch_ms.append(wall_seconds * 1000)
+        # What running the calls one after another would have added
+        self._batch_saved_ms.append(max(0.0, sum(call_seconds) - wall_seconds) * 1000)
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[TOOLS] [ERR] Background tool failed: {task.exception()}")
+
+    def cancel_background(self):
+        for task in list(self._background):
+            task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        used = {}
+        for name, tool in self._bound.items():
+            if not tool.calls:
+                continue
+            ordered = sorted(tool._ms)
+            used[name] = {
+                "calls": tool.calls,
+                "errors": tool.errors,
+                "timeouts": tool.timeouts,
+                "p50_ms": round(ordered[len(ordered) // 2], 1),
+                "max_ms": round(ordered[-1], 1),
+            }
+        return {
+            "registered": len(self.specs),
+            "unknown_calls": self.unknown_calls,
+            "invalid_calls": self.invalid_calls,
+            "background_running": len(self._background),
+            "batches": self.batches,
+            "batched_calls": self.batched_calls,
+            "max_batch": self.max_batch,
+            "batch_p50_ms": round(sorted(self._batch_ms)[len(self._batch_ms) // 2], 1) if self._batch_ms else None,
+            "batch_saved_ms": round(sum(self._batch_saved_ms), 1),
+            "tools": used,
+        }
@@ -0,0 +1,341 @@
+"""
+Uplink Scheduler - Orders everything AudioLoop sends to the Live API.
+Replaces the shared asyncio.Queue(maxsize=10): producers never block, audio
+always goes out before video frames, frames are dropped oldest-first, and
+queued audio is coalesced into sends sized from the measured send latency.
+
+The scheduler outlives individual Live sessions. While disconnected it keeps
+up to reconnect_buffer_ms of speech; after reconnecting that backlog is sent
+in large batches, as fast as the connection takes it, so what the user said
+during the gap reaches the new session in a fraction of its real duration.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional, Dict, Any
+
+AUDIO = "audio"
+AUDIO_END = "audio_end"
+FRAME = "frame"
+
+_END_MARKER = None  # Stored in the audio lane in place of PCM
+
+
+class UplinkItem:
+    """One unit of work for the sender task."""
+
+    __slots__ = ("kind", "payload", "enqueued_at", "duration_ms")
+
+    def __init__(self, kind: str, payload=None, enqueued_at: float = 0.0, duration_ms: float = 0.0):
+        self.kind = kind
+        self.payload = payload
+        self.enqueued_at = enqueued_at
+        self.duration_ms = duration_ms
+
+    def __repr__(self):
+        return f"UplinkItem({self.kind}, {self.duration_ms:.0f} ms)"
+
+
+class UplinkScheduler:
+    """
+    Two-lane priority queue for the uplink.
+
+    Provides:
+    - put_audio()/put_audio_end()/put_frame(): synchronous, never block the capture loop
+    - get(): audio lane first, then the newest frames
+    - Audio coalescing: whole queued chunks merged up to min_batch_ms..max_batch_ms,
+      scaled by send latency (a single larger chunk is sent as is)
+    - Bounded lanes: oldest audio beyond max_audio_ms and oldest frames beyond
+      max_frames are dropped and counted
+    - set_connected(): reconnect buffering and catch-up flushing of the backlog
+    - requeue(): put back an item whose send failed
+    - Depth, drop, latency and reconnect stats
+    """
+
+    def __init__(self, sample_rate: int = 16000, sample_width: int = 2,
+                 min_batch_ms: float = 20.0, max_batch_ms: float = 100.0,
+                 latency_factor: float = 2.0, max_audio_ms: float = 5000.0,
+                 max_frames: int = 2, reconnect_buffer_ms: float = 10000.0,
+                 catchup_batch_ms: float = 1000.0, connected: bool = True):
+        """
+        Args:
+            sample_rate: Rate of queued PCM (mono)
+            sample_width: Bytes per sample
+            min_batch_ms: Smallest merge ceiling when more audio is queued
+            max_batch_ms: Largest merge ceiling (chunks are never split to fit it)
+            latency_factor: Batch duration = send latency * factor, clamped to the range
+            max_audio_ms: Audio backlog cap; older audio is dropped beyond it
+            max_frames: Frames kept waiting; older frames are dropped beyond it
+            reconnect_buffer_ms: Audio kept while disconnected (and until it is flushed)
+            catchup_batch_ms: Batch size while flushing the reconnect backlog
+            connected: Initial state; False buffers speech until the first session is up
+        """
+        self.bytes_per_ms = sample_rate * sample_width / 1000
+        self.sample_width = sample_width
+        self.min_batch_ms = min_batch_ms
+        self.max_batch_ms = max_batch_ms
+        self.latency_factor = latency_factor
+        self.max_audio_bytes = int(max_audio_ms * self.bytes_per_ms)
+        self.max_frames = max_frames
+        self.reconnect_buffer_bytes = int(max(reconnect_buffer_ms, max_audio_ms) * self.bytes_per_ms)
+        self.catchup_batch_ms = catchup_batch_ms
+
+        self._audio = deque()   # (memoryview | _END_MARKER, enqueued_at)
+        self._audio_bytes = 0
+        self._frames = deque()  # (payload, enqueued_at)
+        self._ready = asyncio.Event()
+        self._send_latency = None  # EWMA seconds
+        self.connected = connected
+        self._disconnected_at = None if connected else time.monotonic()
+        self._gap_start_bytes = 0
+        self._in_gap = False  # The initial connect is not counted as a gap
+        self._catchup_bytes = 0  # Backlog from the last gap still to be flushed
+        self._catchup_started = None
+
+        self.audio_sends = 0
+        self.frame_sends = 0
+        self.audio_dropped_bytes = 0
+        self.frames_dropped = 0
+        self.peak_audio_bytes = 0
+        self._send_latencies = deque(maxlen=200)
+        self._queue_delays = deque(maxlen=200)
+        self._batch_sizes = deque(maxlen=200)
+        self.gaps = 0
+        self.gap_buffered_bytes = 0
+        self.gap_dropped_bytes = 0
+        self.requeued = 0
+        self._gap_ms = deque(maxlen=50)
+        self._catchup_ms = deque(maxlen=50)
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def put_audio(self, pcm):
+        """Queue captured PCM. Drops the oldest audio if the backlog is over its cap."""
+        view = memoryview(pcm).cast("B")
+        if not len(view):
+            return
+        self._audio.append((view, time.monotonic()))
+        self._audio_bytes += len(view)
+        if self._audio_bytes > self.peak_audio_bytes:
+            self.peak_audio_bytes = self._audio_bytes
+        cap = self._audio_cap()
+        while self._audio_bytes > cap:
+            self._drop_oldest_audio(self._audio_bytes - cap)
+        self._ready.set()
+
+    def put_audio_end(self):
+        """Queue an end-of-stream marker after the audio already queued."""
+        self._audio.append((_END_MARKER, time.monotonic()))
+        self._ready.set()
+
+    def put_frame(self, payload):
+        """Queue a video frame. Keeps only the newest max_frames."""
+        self._frames.append((payload, time.monotonic()))
+        while len(self._frames) > self.max_frames:
+            self._frames.popleft()
+            self.frames_dropped += 1
+        self._ready.set()
+
+    def _audio_cap(self) -> int:
+        if not self.connected or self._catchup_bytes:
+            return self.reconnect_buffer_bytes
+        return self.max_audio_bytes
+
+    def _drop_oldest_audio(self, excess: int):
+        for i, (data, stamp) in enumerate(self._audio):
+            if data is _END_MARKER:
+                continue
+            take = min(excess, len(data))
+            # Keep whole samples
+            take -= take % self.sample_width
+            if take <= 0:
+                take = len(data)
+            if take >= len(data):
+                del self._audio[i]
+            else:
+                self._audio[i] = (data[take:], stamp)
+            self._audio_bytes -= take
+            self.audio_dropped_bytes += take
+            if not self.connected:
+                self.gap_dropped_bytes += take
+            self._catchup_bytes = max(0, self._catchup_bytes - take)
+            return
+        # Only markers left: nothing to drop
+        self._audio_bytes = 0
+
+    def requeue(self, item: "UplinkItem"):
+        """Put back an item whose send failed, ahead of everything queued after it."""
+        if item.kind == AUDIO:
+            view = memoryview(item.payload).cast("B")
+            self._audio.appendleft((view, item.enqueued_at))
+            self._audio_bytes += len(view)
+        elif item.kind == AUDIO_END:
+            self._audio.appendleft((_END_MARKER, item.enqueued_at))
+        else:
+            self._frames.appendleft((item.payload, item.enqueued_at))
+        self.requeued += 1
+        self._ready.set()
+
+    def set_connected(self, connected: bool):
+        """
+        Session lost (False) or established (True).
+
+        While disconnected audio is kept up to reconnect_buffer_ms. On
+        reconnect the backlog is marked for catch-up: it goes out in
+        catchup_batch_ms batches ahead of normal latency-sized batching.
+        """
+        if connected == self.connected:
+            return
+        now = time.monotonic()
+        self.connected = connected
+        if not connected:
+            self.gaps += 1
+            self._in_gap = True
+            self._disconnected_at = now
+            self._gap_start_bytes = self._audio_bytes
+            return
+        if self._in_gap:
+            self._in_gap = False
+            self._gap_ms.append((now - self._disconnected_at) * 1000)
+            self.gap_buffered_bytes += max(0, self._audio_bytes - self._gap_start_bytes)
+        self._catchup_bytes = self._audio_bytes
+        self._catchup_started = now if self._audio_bytes else None
+
+    def clear(self):
+        """Drop everything queued (e.g. when the session is torn down)."""
+        self._audio.clear()
+        self._frames.clear()
+        self._audio_bytes = 0
+        self._catchup_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+
+    @property
+    def batch_ms(self) -> float:
+        """Current audio batch target derived from the measured send latency."""
+        if self._catchup_bytes:
+            return self.catchup_batch_ms
+        if self._send_latency is None:
+            return self.min_batch_ms
+        target = self._send_latency * 1000 * self.latency_factor
+        return max(self.min_batch_ms, min(self.max_batch_ms, target))
+
+    def _next_audio(self) -> UplinkItem:
+        data, stamp = self._audio[0]
+        if data is _END_MARKER:
+            self._audio.popleft()
+            return UplinkItem(AUDIO_END, enqueued_at=stamp)
+
+        # Queued chunks go out whole; batch_ms only caps how many are merged
+        budget = self.batch_ms * self.bytes_per_ms
+        self._audio.popleft()
+        first_stamp = stamp
+        parts = [data]
+        size = len(data)
+        while self._audio:
+            data, stamp = self._audio[0]
+            if data is _END_MARKER or size + len(data) > budget:
+                break
+            self._audio.popleft()
+            parts.append(data)
+            size += len(data)
+        self._audio_bytes -= size
+        if self._catchup_bytes:
+            self._catchup_bytes = max(0, self._catchup_bytes - size)
+            if not self._catchup_bytes and self._catchup_started is not None:
+                self._catchup_ms.append((time.monotonic() - self._catchup_started) * 1000)
+        payload = parts[0].tobytes() if len(parts) == 1 else b"".join(parts)
+        return UplinkItem(AUDIO, payload, first_stamp, size / self.bytes_per_ms)
+
+    def get_nowait(self) -> Optional[UplinkItem]:
+        """Next item by priority, or None if both lanes are empty."""
+        if self._audio:
+            return self._next_audio()
+        if self._frames:
+            payload, stamp = self._frames.popleft()
+            return UplinkItem(FRAME, payload, stamp)
+        return None
+
+    async def get(self) -> UplinkItem:
+        """Wait for the next item to send."""
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                break
+            self._ready.clear()
+            item = self.get_nowait()
+            if item is not None:
+                break
+            await self._ready.wait()
+        self._queue_delays.append((time.monotonic() - item.enqueued_at) * 1000)
+        return item
+
+    def record_send(self, item: UplinkItem, latency: float):
+        """Report how long sending `item` took (seconds); drives the batch size."""
+        if item.kind == AUDIO:
+            self.audio_sends += 1
+            self._batch_sizes.append(item.duration_ms)
+            # Only audio sends steer coalescing; frames are much larger
+            if self._send_latency is None:
+                self._send_latency = latency
+            else:
+                self._send_latency += 0.2 * (latency - self._send_latency)
+        elif item.kind == FRAME:
+            self.frame_sends += 1
+        self._send_latencies.append(latency * 1000)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    @property
+    def audio_depth_ms(self) -> float:
+        return self._audio_bytes / self.bytes_per_ms
+
+    @property
+    def frame_depth(self) -> int:
+        return len(self._frames)
+
+    @staticmethod
+    def _summary(values) -> Dict[str, float]:
+        if not values:
+            return {"count": 0}
+        ordered = sorted(values)
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict with lane depths, drop counters, batch size and latency summaries
+        """
+        return {
+            "audio_depth_ms": round(self.audio_depth_ms, 1),
+            "peak_audio_depth_ms": round(self.peak_audio_bytes / self.bytes_per_ms, 1),
+            "frame_depth": self.frame_depth,
+            "audio_sends": self.audio_sends,
+            "frame_sends": self.frame_sends,
+            "audio_dropped_ms": round(self.audio_dropped_bytes / self.bytes_per_ms, 1),
+            "frames_dropped": self.frames_dropped,
+            "batch_ms": round(self.batch_ms, 1),
+            "batch": self._summary(self._batch_sizes),
+            "send_latency": self._summary(self._send_latencies),
+            "queue_delay": self._summary(self._queue_delays),
+            "connected": self.connected,
+            "gaps": self.gaps,
+            "gap": self._summary(self._gap_ms),
+            "gap_buffered_ms": round(self.gap_buffered_bytes / self.bytes_per_ms, 1),
+            "gap_dropped_ms": round(self.gap_dropped_bytes / self.bytes_per_ms, 1),
+            "catchup_backlog_ms": round(self._catchup_bytes / self.bytes_per_ms, 1),
+            "catchup": self._summary(self._catchup_ms),
+            "requeued": self.requeued,
+        }
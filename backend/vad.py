@@ -0,0 +1,287 @@
+"""
+Voice Activity Detection - Decides whether a microphone chunk contains speech.
+Used by AudioLoop to detect the start/end of user utterances on the uplink.
+
+The energy path is vectorized with NumPy: each PyAudio chunk is viewed in
+place with np.frombuffer, so the per-chunk cost does not grow with a Python
+loop over samples.
+"""
+
+import math
+import struct
+import time
+from typing import Optional, Dict, Any, Type
+
+import numpy as np
+
+
+class VADResult:
+    """Outcome of processing one audio chunk."""
+
+    __slots__ = ("is_speech", "speech_started", "speech_ended", "rms", "noise_floor", "threshold", "zcr", "raw_speech")
+
+    def __init__(self, is_speech: bool, speech_started: bool, speech_ended: bool,
+                 rms: float, noise_floor: float, threshold: float, zcr: Optional[float] = None,
+                 raw_speech: Optional[bool] = None):
+        self.is_speech = is_speech
+        # Unsmoothed per-chunk decision (no attack/hangover), for latency-critical consumers
+        self.raw_speech = is_speech if raw_speech is None else raw_speech
+        self.speech_started = speech_started
+        self.speech_ended = speech_ended
+        self.rms = rms
+        self.noise_floor = noise_floor
+        self.threshold = threshold
+        self.zcr = zcr
+
+    def __repr__(self):
+        return (f"VADResult(is_speech={self.is_speech}, started={self.speech_started}, "
+                f"ended={self.speech_ended}, rms={self.rms:.0f}, floor={self.noise_floor:.0f})")
+
+
+class BaseVAD:
+    """
+    Interface for pluggable VAD engines.
+
+    Implementations receive raw 16-bit little-endian mono PCM and return a
+    VADResult with the smoothed speech state and start/end edges.
+    """
+
+    def process(self, data) -> VADResult:
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    @property
+    def is_speaking(self) -> bool:
+        raise NotImplementedError
+
+
+class EnergyVAD(BaseVAD):
+    """
+    RMS energy VAD with an adaptive noise floor.
+
+    Provides:
+    - Vectorized RMS (and optional zero-crossing rate) per chunk
+    - Noise floor tracking so the threshold follows fans/air-con instead of a fixed value
+    - Attack time: speech must persist before an utterance starts (rejects clicks)
+    - Hangover time: silence must persist before an utterance ends
+    """
+
+    def __init__(self, sample_rate: int = 16000, min_threshold: float = 250.0,
+                 max_threshold: float = 4000.0, snr_ratio: float = 2.5,
+                 attack_ms: float = 40.0, hangover_ms: float = 500.0,
+                 noise_rise_rate: float = 0.02, noise_fall_rate: float = 0.3,
+                 speech_noise_rate: float = 0.002, adaptive: bool = True,
+                 use_zcr: bool = False, zcr_min: float = 0.02, zcr_max: float = 0.45,
+                 max_chunk_samples: int = 4096):
+        """
+        Initialize the energy VAD.
+
+        Args:
+            sample_rate: Sample rate of the incoming PCM, used for attack/hangover timing
+            min_threshold: Lowest RMS that can ever count as speech
+            max_threshold: Cap for the adaptive threshold so loud rooms don't go deaf
+            snr_ratio: Threshold = noise_floor * snr_ratio (2.5 is roughly 8 dB)
+            attack_ms: Speech duration required before speech_started fires
+            hangover_ms: Silence duration required before speech_ended fires
+            noise_rise_rate: EWMA rate for the floor rising while not speaking
+            noise_fall_rate: EWMA rate for the floor falling (noise went away)
+            speech_noise_rate: Very slow floor rise while "speaking", so a fan that
+                switches on is eventually absorbed instead of latching speech forever
+            adaptive: If False, the threshold is fixed at min_threshold
+            use_zcr: Also require the zero-crossing rate to look like speech
+            zcr_min: Lower ZCR bound (rejects low-frequency rumble)
+            zcr_max: Upper ZCR bound (rejects broadband hiss)
+            max_chunk_samples: Size of the preallocated scratch buffer
+        """
+        self.sample_rate = sample_rate
+        self.min_threshold = float(min_threshold)
+        self.max_threshold = float(max_threshold)
+        self.snr_ratio = snr_ratio
+        self.attack_samples = int(sample_rate * attack_ms / 1000)
+        self.hangover_samples = int(sample_rate * hangover_ms / 1000)
+        self.noise_rise_rate = noise_rise_rate
+        self.noise_fall_rate = noise_fall_rate
+        self.speech_noise_rate = speech_noise_rate
+        self.adaptive = adaptive
+        self.use_zcr = use_zcr
+        self.zcr_min = zcr_min
+        self.zcr_max = zcr_max
+
+        # Scratch buffer for the int16 -> float32 conversion (no per-chunk allocation)
+        self._scratch = np.empty(max_chunk_samples, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Forget the noise floor and any in-progress utterance."""
+        self.noise_floor: Optional[float] = None
+        self._speaking = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+    @property
+    def is_speaking(self) -> bool:
+        return self._speaking
+
+    @property
+    def threshold(self) -> float:
+        if not self.adaptive or self.noise_floor is None:
+            return self.min_threshold
+        return min(self.max_threshold, max(self.min_threshold, self.noise_floor * self.snr_ratio))
+
+    def _features(self, data):
+        samples = np.frombuffer(data, dtype=np.int16)
+        count = samples.size
+        if count == 0:
+            return 0, 0.0, None
+
+        if count > self._scratch.size:
+            self._scratch = np.empty(count, dtype=np.float32)
+        scratch = self._scratch[:count]
+        np.copyto(scratch, samples, casting="unsafe")
+        rms = math.sqrt(float(np.dot(scratch, scratch)) / count)
+
+        zcr = None
+        if self.use_zcr and count > 1:
+            signs = np.signbit(samples)
+            zcr = np.count_nonzero(signs[1:] != signs[:-1]) / (count - 1)
+        return count, rms, zcr
+
+    def _update_noise_floor(self, rms: float, raw_speech: bool):
+        if self.noise_floor is None:
+            # Don't let a first chunk of speech seed the floor too high
+            self.noise_floor = min(rms, self.min_threshold)
+            return
+        if rms < self.noise_floor:
+            rate = self.noise_fall_rate
+        elif raw_speech:
+            rate = self.speech_noise_rate
+        else:
+            rate = self.noise_rise_rate
+        self.noise_floor += rate * (rms - self.noise_floor)
+
+    def process(self, data) -> VADResult:
+        """
+        Run the VAD on one chunk of 16-bit PCM.
+
+        Args:
+            data: bytes / bytearray / memoryview of int16 little-endian samples
+
+        Returns:
+            VADResult with the smoothed speech state and start/end edges
+        """
+        count, rms, zcr = self._features(data)
+        threshold = self.threshold
+
+        raw_speech = rms > threshold
+        if raw_speech and zcr is not None:
+            raw_speech = self.zcr_min <= zcr <= self.zcr_max
+
+        if self.adaptive:
+            self._update_noise_floor(rms, raw_speech)
+
+        started = False
+        ended = False
+        if raw_speech:
+            self._silence_run = 0
+            self._speech_run += count
+            if not self._speaking and self._speech_run >= self.attack_samples:
+                self._speaking = True
+                started = True
+        else:
+            self._speech_run = 0
+            if self._speaking:
+                self._silence_run += count
+                if self._silence_run >= self.hangover_samples:
+                    self._speaking = False
+                    self._silence_run = 0
+                    ended = True
+
+        return VADResult(
+            is_speech=self._speaking,
+            speech_started=started,
+            speech_ended=ended,
+            rms=rms,
+            noise_floor=self.noise_floor if self.noise_floor is not None else 0.0,
+            threshold=threshold,
+            zcr=zcr,
+            raw_speech=raw_speech,
+        )
+
+
+# Registry of available VAD engines, selectable by name
+VAD_ENGINES: Dict[str, Type[BaseVAD]] = {
+    "energy": EnergyVAD,
+}
+
+
+def create_vad(engine: str = "energy", **kwargs) -> BaseVAD:
+    """
+    Create a VAD engine by name.
+
+    Args:
+        engine: Key in VAD_ENGINES
+        **kwargs: Passed to the engine constructor
+
+    Returns:
+        A BaseVAD instance
+    """
+    if engine not in VAD_ENGINES:
+        raise ValueError(f"Unknown VAD engine '{engine}'. Available: {', '.join(VAD_ENGINES)}")
+    return VAD_ENGINES[engine](**kwargs)
+
+
+def legacy_rms(data) -> int:
+    """The original per-sample RMS from AudioLoop.listen_audio, kept for benchmarking."""
+    count = len(data) // 2
+    if count > 0:
+        shorts = struct.unpack(f"<{count}h", data)
+        sum_squares = sum(s**2 for s in shorts)
+        return int(math.sqrt(sum_squares / count))
+    return 0
+
+
+def benchmark(iterations: int = 2000, chunk_size: int = 1024) -> Dict[str, Any]:
+    """
+    Measure per-chunk CPU cost of the legacy RMS loop versus EnergyVAD.
+
+    Args:
+        iterations: Number of chunks to process per variant
+        chunk_size: Samples per chunk (AudioLoop uses 1024)
+
+    Returns:
+        dict with microseconds per chunk for each variant
+    """
+    rng = np.random.default_rng(0)
+    chunk = (rng.standard_normal(chunk_size) * 1500).astype(np.int16).tobytes()
+
+    results = {}
+
+    start = time.process_time()
+    for _ in range(iterations):
+        legacy_rms(chunk)
+    results["legacy_us_per_chunk"] = (time.process_time() - start) / iterations * 1e6
+
+    vad = EnergyVAD()
+    start = time.process_time()
+    for _ in range(iterations):
+        vad.process(chunk)
+    results["energy_us_per_chunk"] = (time.process_time() - start) / iterations * 1e6
+
+    vad = EnergyVAD(use_zcr=True)
+    start = time.process_time()
+    for _ in range(iterations):
+        vad.process(chunk)
+    results["energy_zcr_us_per_chunk"] = (time.process_time() - start) / iterations * 1e6
+
+    results["speedup"] = results["legacy_us_per_chunk"] / max(results["energy_us_per_chunk"], 1e-9)
+    return results
+
+
+if __name__ == "__main__":
+    stats = benchmark()
+    print(f"Legacy struct/sum RMS:  {stats['legacy_us_per_chunk']:.1f} us/chunk")
+    print(f"EnergyVAD (NumPy):      {stats['energy_us_per_chunk']:.1f} us/chunk")
+    print(f"EnergyVAD + ZCR:        {stats['energy_zcr_us_per_chunk']:.1f} us/chunk")
+    print(f"Speedup:                {stats['speedup']:.1f}x")
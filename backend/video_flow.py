@@ -0,0 +1,210 @@
+"""
+Video Flow Control - Tells each browser client how much camera video to send.
+The client used to upload a JPEG every 5th animation frame whether or not
+anything consumed it. The backend now decides the rate: it looks at whether
+a Live session is listening, who is speaking, how many clients are sending
+and what each frame costs to ingest and process, and pushes a policy
+{mode, fps, width, height, quality} to every client whenever it changes.
+
+Modes:
+    off             No session, the mic is paused, or the loop captures its own
+                    video (camera/screen) or none: no frames at all
+    model_speaking  Model is talking and the user is silent: a trickle
+    listening       Session live, user silent: enough for a fresh frame at speech onset
+    user_speaking   User is talking: frames feed the current turn
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+OFF = "off"
+MODEL_SPEAKING = "model_speaking"
+LISTENING = "listening"
+USER_SPEAKING = "user_speaking"
+
+# AudioLoop video mode in which camera frames come from the client
+CLIENT_MODE = "client"
+
+# Base policy per mode before load/cost scaling
+MODES = {
+    OFF:            {"fps": 0.0, "width": 640, "height": 360, "quality": 0.6},
+    MODEL_SPEAKING: {"fps": 0.2, "width": 640, "height": 360, "quality": 0.6},
+    LISTENING:      {"fps": 1.0, "width": 640, "height": 360, "quality": 0.6},
+    USER_SPEAKING:  {"fps": 2.0, "width": 640, "height": 360, "quality": 0.7},
+}
+
+
+def mode_for(state: Optional[Dict[str, bool]]) -> str:
+    """
+    Args:
+        state: AudioLoop.get_vision_state() output, or None if no AudioLoop
+
+    Returns:
+        One of the mode names
+    """
+    if not state or not state.get("session") or state.get("paused"):
+        return OFF
+    if state.get("video_mode", CLIENT_MODE) != CLIENT_MODE:
+        # Nothing reads client frames
+        return OFF
+    if state.get("user_speaking"):
+        return USER_SPEAKING
+    if state.get("model_speaking"):
+        return MODEL_SPEAKING
+    return LISTENING
+
+
+class VideoFlowController:
+    """
+    Backend-driven frame rate, resolution and quality for client video.
+
+    Provides:
+    - record_ingest(): per-frame ingest cost (handler time, bytes) per client
+    - compute(): policy for the current state, scaled down when the combined
+      ingest and processing cost (state's frame_cost_s: decode, hash, encode)
+      exceeds cpu_budget or frames exceed target_bytes
+    - A ticker that emits 'video_policy' to each client only when its policy changes
+    """
+
+    def __init__(self, emit: Callable[..., Awaitable[Any]], get_state: Callable[[], Optional[Dict[str, bool]]],
+                 tick_hz: float = 4.0, cpu_budget: float = 0.02, target_bytes: int = 40_000,
+                 min_quality: float = 0.4, max_quality: float = 0.8):
+        """
+        Args:
+            emit: Coroutine function called as emit(event, payload, room=sid), e.g. sio.emit
+            get_state: Returns the AudioLoop's vision state (or None)
+            tick_hz: Policy evaluations per second
+            cpu_budget: Fraction of one core the backend may spend ingesting client frames
+            target_bytes: Desired frame size; quality is lowered above it
+            min_quality, max_quality: Bounds for the JPEG quality sent to clients
+        """
+        self.emit = emit
+        self.get_state = get_state
+        self.tick = 1.0 / tick_hz
+        self.cpu_budget = cpu_budget
+        self.target_bytes = target_bytes
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+
+        self._clients: Dict[str, Dict[str, Any]] = {}
+        self._ingest_s: Optional[float] = None  # EWMA seconds per frame
+        self._frame_bytes: Optional[float] = None  # EWMA bytes per frame
+        self._process_s = 0.0  # Latest per-frame processing cost reported in the state
+        self._task: Optional[asyncio.Task] = None
+
+        self.frames_ingested = 0
+        self.bytes_ingested = 0
+        self.policies_sent = 0
+        self._mode_seconds: Dict[str, float] = {}
+        self._mode = OFF
+        self._mode_since = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Clients and measurements
+    # ------------------------------------------------------------------
+
+    def add_client(self, sid: str):
+        self._clients[sid] = {"policy": None, "frames": 0}
+
+    def remove_client(self, sid: str):
+        self._clients.pop(sid, None)
+
+    def record_ingest(self, sid: str, size: int, seconds: float):
+        """Report one received frame and how long the backend spent on it."""
+        client = self._clients.get(sid)
+        if client is not None:
+            client["frames"] += 1
+            client["sending"] = True
+        self.frames_ingested += 1
+        self.bytes_ingested += size
+        if self._ingest_s is None:
+            self._ingest_s, self._frame_bytes = seconds, float(size)
+        else:
+            self._ingest_s += 0.1 * (seconds - self._ingest_s)
+            self._frame_bytes += 0.1 * (size - self._frame_bytes)
+
+    # ------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------
+
+    def compute(self, state: Optional[Dict[str, bool]] = None, senders: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Policy for the given state.
+
+        Args:
+            state: Vision state (default: get_state())
+            senders: Clients sending video (default: clients that have sent a frame, at least 1)
+        """
+        if state is None:
+            state = self.get_state()
+        mode = mode_for(state)
+        policy = dict(MODES[mode], mode=mode)
+        if senders is None:
+            senders = max(1, sum(1 for c in self._clients.values() if c.get("sending")))
+
+        # Budgeted as if every received frame were processed: any of them may be the one taken
+        if state:
+            self._process_s = state.get("frame_cost_s") or 0.0
+        cost = (self._ingest_s or 0.0) + self._process_s
+        fps = policy["fps"]
+        if fps > 0 and cost:
+            # Total ingest and processing cost across clients must stay within the CPU budget
+            affordable = self.cpu_budget / (cost * senders)
+            fps = min(fps, affordable)
+        policy["fps"] = round(fps, 2)
+
+        quality = policy["quality"]
+        if self._frame_bytes and self._frame_bytes > self.target_bytes:
+            quality *= self.target_bytes / self._frame_bytes
+        policy["quality"] = round(min(self.max_quality, max(self.min_quality, quality)), 2)
+        return policy
+
+    def _track_mode(self, mode: str):
+        now = time.monotonic()
+        self._mode_seconds[self._mode] = self._mode_seconds.get(self._mode, 0.0) + now - self._mode_since
+        self._mode, self._mode_since = mode, now
+
+    async def tick_once(self):
+        """Recompute and push the policy to clients whose policy changed."""
+        policy = self.compute()
+        if policy["mode"] != self._mode:
+            self._track_mode(policy["mode"])
+        for sid, client in list(self._clients.items()):
+            if client["policy"] == policy:
+                continue
+            client["policy"] = policy
+            self.policies_sent += 1
+            try:
+                await self.emit("video_policy", policy, room=sid)
+            except Exception as e:
+                print(f"[VIDEO FLOW] [ERR] Emit failed: {e}")
+
+    async def run(self):
+        while True:
+            await self.tick_once()
+            await asyncio.sleep(self.tick)
+
+    def start(self):
+        """Start the ticker on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._track_mode(self._mode)
+        return {
+            "clients": len(self._clients),
+            "mode": self._mode,
+            "frames_ingested": self.frames_ingested,
+            "bytes_ingested": self.bytes_ingested,
+            "ingest_ms": round(self._ingest_s * 1000, 3) if self._ingest_s else 0.0,
+            "process_ms": round(self._process_s * 1000, 3),
+            "frame_bytes": int(self._frame_bytes or 0),
+            "policies_sent": self.policies_sent,
+            "mode_seconds": {k: round(v, 1) for k, v in self._mode_seconds.items()},
+        }
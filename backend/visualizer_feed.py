@@ -0,0 +1,230 @@
+"""
+Visualizer Feed - Turns model playback audio into a small UI payload.
+Instead of emitting every PCM chunk as a JSON list of ints, the feed keeps the
+most recent window of samples and, at a fixed tick, emits one binary frame with
+the overall level and a handful of log-spaced spectrum bands.
+
+Frame layout (Socket.IO binary attachment, event 'audio_levels'):
+    byte 0      level, 0-255 (RMS mapped from -60..0 dBFS)
+    bytes 1..N  band magnitudes, 0-255 (same dB mapping), low to high frequency
+
+Optional raw mode also emits the PCM received since the last tick as one
+binary 'audio_pcm' frame (int16 little-endian).
+"""
+
+import asyncio
+import json
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+import numpy as np
+
+FLOOR_DB = -60.0
+
+
+class VisualizerFeed:
+    """
+    Rate-limited level/spectrum feed for the frontend visualizer.
+
+    Provides:
+    - push(): O(1)-ish copy of PCM into a sliding window, no task per chunk
+    - A ticker task that emits at most tick_hz binary frames per second
+    - One final all-zero frame when audio stops, then silence on the wire
+    - Opt-in raw PCM forwarding, batched per tick
+    """
+
+    def __init__(self, emit: Callable[..., Awaitable[Any]], sample_rate: int = 24000,
+                 bins: int = 32, tick_hz: float = 30.0, window: int = 1024,
+                 min_freq: float = 60.0, raw_pcm: bool = False):
+        """
+        Args:
+            emit: Coroutine function called as emit(event, payload), e.g. sio.emit
+            sample_rate: Sample rate of the pushed PCM
+            bins: Number of spectrum bands per frame
+            tick_hz: Maximum frames per second
+            window: FFT size in samples
+            min_freq: Lowest band edge in Hz
+            raw_pcm: Also forward the raw PCM as binary 'audio_pcm' frames
+        """
+        self.emit = emit
+        self.sample_rate = sample_rate
+        self.bins = bins
+        self.tick = 1.0 / tick_hz
+        self.window = window
+        self.raw_pcm = raw_pcm
+
+        self._samples = np.zeros(window, dtype=np.float32)
+        self._hann = np.hanning(window).astype(np.float32)
+        # Log-spaced band edges mapped to rfft bin indices
+        nyquist = sample_rate / 2
+        edges = np.geomspace(min_freq, nyquist, bins + 1) / nyquist * (window // 2)
+        self._edges = np.clip(np.round(edges).astype(int), 1, window // 2)
+        for i in range(1, self._edges.size):
+            # At least one FFT bin per band (low bands are narrower than a bin)
+            self._edges[i] = max(self._edges[i], self._edges[i - 1] + 1)
+        self._edges = np.minimum(self._edges, window // 2)
+        self._fft_scale = 2.0 / self._hann.sum()
+
+        self._dirty = False
+        self._idle = True
+        self._pcm = bytearray()
+        self._task: Optional[asyncio.Task] = None
+
+        self.frames_emitted = 0
+        self.bytes_emitted = 0
+        self.chunks_pushed = 0
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def push(self, pcm):
+        """Record played PCM (int16 mono). Cheap; safe to call per chunk."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n = samples.size
+        if n == 0:
+            return
+        self.chunks_pushed += 1
+        if n >= self.window:
+            np.multiply(samples[-self.window:], 1 / 32768, out=self._samples, casting="unsafe")
+        else:
+            self._samples[:-n] = self._samples[n:]
+            np.multiply(samples, 1 / 32768, out=self._samples[-n:], casting="unsafe")
+        if self.raw_pcm:
+            self._pcm += pcm
+        self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Frame computation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_byte(db):
+        return np.clip((np.asarray(db) - FLOOR_DB) * (255.0 / -FLOOR_DB), 0, 255).astype(np.uint8)
+
+    def compute_frame(self) -> bytes:
+        """Level + band magnitudes for the current window as a binary frame."""
+        x = self._samples
+        rms = float(np.sqrt(np.dot(x, x) / x.size))
+        level_db = 20 * np.log10(max(rms, 1e-6))
+
+        spectrum = np.abs(np.fft.rfft(x * self._hann)) * self._fft_scale
+        # Peak magnitude per band via reduceat over the band edges
+        bands = np.maximum.reduceat(spectrum, self._edges[:-1])[:self.bins]
+        bands_db = 20 * np.log10(np.maximum(bands, 1e-6))
+
+        frame = bytearray(1 + self.bins)
+        frame[0] = int(self._to_byte(level_db))
+        frame[1:1 + bands.size] = self._to_byte(bands_db).tobytes()
+        return bytes(frame)
+
+    # ------------------------------------------------------------------
+    # Ticker
+    # ------------------------------------------------------------------
+
+    async def _emit(self, event: str, payload: bytes):
+        self.frames_emitted += 1
+        self.bytes_emitted += len(payload)
+        try:
+            await self.emit(event, payload)
+        except Exception as e:
+            print(f"[VISUALIZER] [ERR] Emit failed: {e}")
+
+    async def tick_once(self):
+        """Emit one frame if anything changed since the last tick."""
+        if self._dirty:
+            self._dirty = False
+            self._idle = False
+            await self._emit("audio_levels", self.compute_frame())
+            if self._pcm:
+                pcm, self._pcm = bytes(self._pcm), bytearray()
+                await self._emit("audio_pcm", pcm)
+        elif not self._idle:
+            # Audio stopped: settle the UI once, then stay quiet
+            self._idle = True
+            self._samples[:] = 0
+            await self._emit("audio_levels", bytes(1 + self.bins))
+
+    async def run(self):
+        next_tick = time.monotonic()
+        while True:
+            await self.tick_once()
+            next_tick += self.tick
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Fell behind (busy loop); don't try to catch up with a burst
+                next_tick = time.monotonic()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """Start the ticker on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "chunks_pushed": self.chunks_pushed,
+            "frames_emitted": self.frames_emitted,
+            "bytes_emitted": self.bytes_emitted,
+            "raw_pcm": self.raw_pcm,
+        }
+
+
+def benchmark(seconds: float = 10.0, sample_rate: int = 24000, chunk_samples: int = 960) -> Dict[str, Any]:
+    """
+    Compare the legacy JSON int-list payload with the binary feed.
+
+    Args:
+        seconds: Audio duration to simulate
+        sample_rate: Model output rate
+        chunk_samples: Samples per received chunk (Live API sends ~40 ms)
+
+    Returns:
+        dict with bytes on the wire and CPU time per second of audio for each variant
+    """
+    rng = np.random.default_rng(0)
+    chunk = (rng.standard_normal(chunk_samples) * 3000).astype(np.int16).tobytes()
+    chunks = int(seconds * sample_rate / chunk_samples)
+
+    # Legacy: one JSON list of byte values per chunk (what python-socketio serializes)
+    start = time.process_time()
+    legacy_bytes = 0
+    for _ in range(chunks):
+        legacy_bytes += len(json.dumps({"data": list(chunk)}))
+    legacy_cpu = time.process_time() - start
+
+    feed = VisualizerFeed(emit=None, sample_rate=sample_rate)
+    ticks_per_chunk = feed.tick / (chunk_samples / sample_rate)
+    start = time.process_time()
+    feed_bytes = 0
+    pending = 0.0
+    for _ in range(chunks):
+        feed.push(chunk)
+        pending += 1 / ticks_per_chunk if ticks_per_chunk else 1
+        while pending >= 1:
+            pending -= 1
+            feed_bytes += len(feed.compute_frame())
+    feed_cpu = time.process_time() - start
+
+    return {
+        "legacy_bytes_per_s": int(legacy_bytes / seconds),
+        "legacy_cpu_ms_per_s": round(legacy_cpu / seconds * 1000, 2),
+        "feed_bytes_per_s": int(feed_bytes / seconds),
+        "feed_cpu_ms_per_s": round(feed_cpu / seconds * 1000, 2),
+        "raw_pcm_bytes_per_s": sample_rate * 2,
+        "size_reduction": round(legacy_bytes / max(feed_bytes, 1), 1),
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark()
+    print(f"Legacy JSON int list: {stats['legacy_bytes_per_s']:>9,} B/s  {stats['legacy_cpu_ms_per_s']:6.2f} ms CPU/s")
+    print(f"Binary level/FFT:     {stats['feed_bytes_per_s']:>9,} B/s  {stats['feed_cpu_ms_per_s']:6.2f} ms CPU/s")
+    print(f"Raw PCM (binary):     {stats['raw_pcm_bytes_per_s']:>9,} B/s")
+    print(f"Size reduction:       {stats['size_reduction']}x")
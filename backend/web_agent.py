@@ -11,9 +11,6 @@ from google.genai import types
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not API_KEY:
-    raise ValueError("Please set GEMINI_API_KEY in your .env file")
-
 # 2. Configuration
 SCREEN_WIDTH = 1440
 SCREEN_HEIGHT = 900
@@ -24,6 +21,9 @@ SESSION_TIMEOUT = 120  # 2 minute max session
 
 class WebAgent:
     def __init__(self):
+        # Checked here rather than at import, so a missing key fails only the web agent
+        if not API_KEY:
+            raise ValueError("Please set GEMINI_API_KEY in your .env file")
         self.client = genai.Client(api_key=API_KEY)
         self.browser = None
         self.context = None
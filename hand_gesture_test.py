@@ -1,7 +1,12 @@
+import os
+import sys
 import cv2
 import mediapipe as mp
 import math
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from camera_broker import acquire_camera
+
 def get_distance(p1, p2):
     return math.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2)
 
@@ -16,17 +21,18 @@ def main():
     )
     mp_draw = mp.solutions.drawing_utils
 
-    # Initialize Camera
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+    # Initialize Camera (attaches to the backend's camera broker if it is already running)
+    cap = acquire_camera(0, width=1920, height=1080)
+    if cap is None:
+        print("Could not open camera.")
+        return
 
     print("Hand Gesture Tracking Started...")
     print("Press 'q' to quit.")
 
-    while cap.isOpened():
-        success, img = cap.read()
-        if not success:
+    while True:
+        img = cap.read()
+        if img is None:
             print("Ignoring empty camera frame.")
             continue
 
@@ -89,7 +95,7 @@ def main():
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-    cap.release()
+    cap.close()
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -69,7 +69,8 @@ function App() {
 
 
     // RESTORED STATE
-    const [aiAudioData, setAiAudioData] = useState(new Array(64).fill(0));
+    const [aiAudioData, setAiAudioData] = useState(new Array(32).fill(0));
+    const [aiAudioLevel, setAiAudioLevel] = useState(0);
     const [micAudioData, setMicAudioData] = useState(new Array(32).fill(0));
     const [fps, setFps] = useState(0);
 
@@ -144,6 +145,10 @@ function App() {
     const lastFrameTimeRef = useRef(0);
     const frameCountRef = useRef(0);
     const lastVideoTimeRef = useRef(-1);
+    // Backend-driven video flow control (see backend/video_flow.py); nothing is sent until the first policy
+    const videoPolicyRef = useRef({ mode: 'off', fps: 0, width: 640, height: 360, quality: 0.6 });
+    const lastFrameSentRef = useRef(0);
+    const frameEncodingRef = useRef(false);
 
     // Ref to track video state for the loop (avoids closure staleness)
     const isVideoOnRef = useRef(false);
@@ -335,8 +340,14 @@ function App() {
                 setStatus('Connected');
             }
         });
-        socket.on('audio_data', (data) => {
-            setAiAudioData(data.data);
+        // Binary frame: [level, band0..bandN], each 0-255 (see backend/visualizer_feed.py)
+        socket.on('audio_levels', (payload) => {
+            const frame = new Uint8Array(payload);
+            setAiAudioLevel(frame[0] / 255);
+            setAiAudioData(Array.from(frame.subarray(1)));
+        });
+        socket.on('video_policy', (policy) => {
+            videoPolicyRef.current = policy;
         });
         socket.on('auth_status', (data) => {
             console.log("Auth Status:", data);
@@ -621,7 +632,8 @@ function App() {
             socket.off('connect');
             socket.off('disconnect');
             socket.off('status');
-            socket.off('audio_data');
+            socket.off('audio_levels');
+            socket.off('video_policy');
             socket.off('cad_data');
             socket.off('cad_thought');
             socket.off('cad_status');
@@ -775,26 +787,29 @@ function App() {
 
         ctx.drawImage(videoRef.current, 0, 0, canvasRef.current.width, canvasRef.current.height);
 
-        // 2. Send Frame to Backend (Throttled & Resized)
-        // Only send if connected
-        if (isConnected) {
-            // Simple throttle: every 5th frame roughly
-            if (frameCountRef.current % 5 === 0) {
-
-                // Use dedicated transmission canvas for resizing
-                const transCanvas = transmissionCanvasRef.current;
-                if (transCanvas) {
-                    const transCtx = transCanvas.getContext('2d');
-                    // Draw resized image
-                    transCtx.drawImage(videoRef.current, 0, 0, transCanvas.width, transCanvas.height);
-
-                    // Convert resized image to blob
-                    transCanvas.toBlob((blob) => {
-                        if (blob) {
-                            socket.emit('video_frame', { image: blob });
-                        }
-                    }, 'image/jpeg', 0.6); // Slightly higher compression for speed
+        // 2. Send Frame to Backend at the rate/size/quality the backend asked for
+        const policy = videoPolicyRef.current;
+        const now = performance.now();
+        if (isConnected && policy.fps > 0 && !frameEncodingRef.current && now - lastFrameSentRef.current >= 1000 / policy.fps) {
+            const transCanvas = transmissionCanvasRef.current;
+            if (transCanvas) {
+                if (transCanvas.width !== policy.width || transCanvas.height !== policy.height) {
+                    transCanvas.width = policy.width;
+                    transCanvas.height = policy.height;
                 }
+                const transCtx = transCanvas.getContext('2d');
+                // Draw resized image
+                transCtx.drawImage(videoRef.current, 0, 0, transCanvas.width, transCanvas.height);
+
+                lastFrameSentRef.current = now;
+                // One encode in flight at a time
+                frameEncodingRef.current = true;
+                transCanvas.toBlob((blob) => {
+                    frameEncodingRef.current = false;
+                    if (blob) {
+                        socket.emit('video_frame', { image: blob });
+                    }
+                }, 'image/jpeg', policy.quality);
             }
         }
 
@@ -1326,7 +1341,7 @@ function App() {
     };
 
     // Calculate Average Audio Amplitude for Background Pulse
-    const audioAmp = aiAudioData.reduce((a, b) => a + b, 0) / aiAudioData.length / 255;
+    const audioAmp = aiAudioLevel;
 
     const toggleKasaWindow = () => {
         if (!showKasaWindow) {
@@ -38,6 +38,7 @@ const SettingsWindow = ({
 }) => {
     const [permissions, setPermissions] = useState({});
     const [faceAuthEnabled, setFaceAuthEnabled] = useState(false);
+    const [videoMode, setVideoMode] = useState('client');
 
     useEffect(() => {
         // Request initial permissions
@@ -52,6 +53,7 @@ const SettingsWindow = ({
                     setFaceAuthEnabled(settings.face_auth_enabled);
                     localStorage.setItem('face_auth_enabled', settings.face_auth_enabled);
                 }
+                if (settings.video_mode) setVideoMode(settings.video_mode);
             }
         };
 
@@ -88,6 +90,13 @@ const SettingsWindow = ({
         socket.emit('update_settings', { camera_flipped: newVal });
     };
 
+    const toggleScreenShare = () => {
+        // Backend screen capture instead of webcam frames; applies on the next connect
+        const newVal = videoMode === 'screen' ? 'client' : 'screen';
+        setVideoMode(newVal);
+        socket.emit('update_settings', { video_mode: newVal });
+    };
+
     return (
         <div className="absolute top-20 right-10 bg-black/90 border border-cyan-500/50 p-4 rounded-lg z-50 w-80 backdrop-blur-xl shadow-[0_0_30px_rgba(6,182,212,0.2)]">
             <div className="flex justify-between items-center mb-4 border-b border-cyan-900/50 pb-2">
@@ -159,6 +168,17 @@ const SettingsWindow = ({
                         </option>
                     ))}
                 </select>
+                <div className="flex items-center justify-between text-xs bg-gray-900/50 p-2 mt-2 rounded border border-cyan-900/30">
+                    <span className="text-cyan-100/80">Share Screen Instead (next connect)</span>
+                    <button
+                        onClick={toggleScreenShare}
+                        className={`relative w-8 h-4 rounded-full transition-colors duration-200 ${videoMode === 'screen' ? 'bg-cyan-500/80' : 'bg-gray-700'}`}
+                    >
+                        <div
+                            className={`absolute top-0.5 left-0.5 w-3 h-3 bg-white rounded-full transition-transform duration-200 ${videoMode === 'screen' ? 'translate-x-4' : 'translate-x-0'}`}
+                        />
+                    </button>
+                </div>
             </div>
 
             {/* Cursor Section */}
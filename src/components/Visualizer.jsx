@@ -32,10 +32,8 @@ const Visualizer = ({ audioData, isListening, intensity = 0, width = 600, height
             const centerX = w / 2;
             const centerY = h / 2;
 
-            // Use current audio data from ref if we were using it for visualization
-            // Currently the effect only uses 'intensity', passed as prop. 
-            // To ensure we aren't re-triggering this effect constantly, we use refs.
-
+            // Refs keep this loop stable while the backend pushes ~30 spectrum frames/s
+            const currentBands = audioDataRef.current || [];
             const currentIntensity = intensityRef.current;
             const currentIsListening = isListeningRef.current;
 
@@ -74,6 +72,26 @@ const Visualizer = ({ audioData, isListening, intensity = 0, width = 600, height
                 ctx.shadowColor = '#22d3ee';
                 ctx.stroke();
                 ctx.shadowBlur = 0;
+
+                // Spectrum bands (0-255) as bars around the ring, mirrored left/right
+                const count = currentBands.length;
+                if (count) {
+                    ctx.strokeStyle = 'rgba(34, 211, 238, 0.6)';
+                    ctx.lineWidth = 3;
+                    ctx.beginPath();
+                    for (let i = 0; i < count; i++) {
+                        const length = (currentBands[i] / 255) * radius * 0.5;
+                        if (length < 1) continue;
+                        for (const side of [1, -1]) {
+                            const angle = -Math.PI / 2 + side * (i + 0.5) * Math.PI / count;
+                            const cos = Math.cos(angle);
+                            const sin = Math.sin(angle);
+                            ctx.moveTo(centerX + cos * (radius + 6), centerY + sin * (radius + 6));
+                            ctx.lineTo(centerX + cos * (radius + 6 + length), centerY + sin * (radius + 6 + length));
+                        }
+                    }
+                    ctx.stroke();
+                }
             }
 
             animationId = requestAnimationFrame(draw);
@@ -0,0 +1,84 @@
+"""
+Local stand-in for the Gemini Live websocket endpoint.
+
+Speaks just enough of the BidiGenerateContent protocol for connection-level
+tests: answers the setup message, sends session-resumption updates and an
+optional GoAway, and records every setup it receives.
+"""
+import asyncio
+import json
+
+import websockets
+from google import genai
+from google.genai import live, types
+
+
+class FakeLiveServer:
+    """
+    Fake Live endpoint on 127.0.0.1.
+
+    Each accepted connection gets handle "h<n>" (n = connection count) as a
+    resumable session_resumption_update after setupComplete.
+    """
+
+    def __init__(self, go_away: bool = False, rejected_handles=(), setup_delay: float = 0.0):
+        self.go_away = go_away
+        self.rejected_handles = set(rejected_handles)
+        self.setup_delay = setup_delay
+        self.setups = []
+        self.connections = 0
+        self.active = []
+        self.port = None
+        self._server = None
+
+    async def _handler(self, ws):
+        setup = json.loads(await ws.recv())["setup"]
+        self.setups.append(setup)
+        handle = (setup.get("sessionResumption") or {}).get("handle")
+        if handle in self.rejected_handles:
+            await ws.close(1008, "Session resumption handle is invalid")
+            return
+        if self.setup_delay:
+            await asyncio.sleep(self.setup_delay)
+        self.connections += 1
+        await ws.send(json.dumps({"setupComplete": {}}))
+        await ws.send(json.dumps({"sessionResumptionUpdate": {"newHandle": f"h{self.connections}", "resumable": True}}))
+        if self.go_away:
+            await ws.send(json.dumps({"goAway": {"timeLeft": "10s"}}))
+        self.active.append(ws)
+        try:
+            await ws.wait_closed()
+        except Exception:
+            pass
+        finally:
+            self.active.remove(ws)
+
+    async def drop(self, index: int = 0, code: int = 1011):
+        """Close the index-th open connection (oldest first) from the server side."""
+        await self.active[index].close(code, "Internal error")
+
+    async def __aenter__(self):
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def client(self) -> genai.Client:
+        return genai.Client(
+            api_key="test",
+            http_options=types.HttpOptions(base_url=f"http://127.0.0.1:{self.port}", api_version="v1beta"),
+        )
+
+
+def use_plain_websockets(monkeypatch):
+    """The SDK always dials wss://; point it at the plain ws:// fake instead."""
+    real = live.ws_connect
+
+    def plain(uri, **kwargs):
+        kwargs.pop("ssl", None)
+        return real(uri.replace("wss://", "ws://", 1), **kwargs)
+
+    monkeypatch.setattr(live, "ws_connect", plain)
@@ -0,0 +1,153 @@
+"""
+Tests for the lazy agent registry and background warmup.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent_registry import AgentRegistry, agent_property, READY, FAILED, PENDING
+from project_manager import ProjectManager
+
+
+class Counter:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return object()
+
+
+class TestAgentRegistry:
+    """Tests for first-use construction, warmup and stats."""
+
+    def test_nothing_built_until_used(self):
+        factory = Counter()
+        agents = AgentRegistry()
+        agents.register("web", factory)
+        assert factory.calls == 0
+        assert agents.peek("web") is None
+        first = agents.get("web")
+        assert agents.get("web") is first
+        assert factory.calls == 1
+        stats = agents.get_stats()["web"]
+        assert stats["state"] == READY
+        assert stats["source"] == "first_use"
+        assert stats["init_ms"] is not None
+
+    def test_concurrent_first_use_builds_once(self):
+        factory = Counter(delay=0.05)
+        agents = AgentRegistry()
+        agents.register("google", factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(agents.get("google"))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert factory.calls == 1
+        assert len({id(r) for r in results}) == 1
+
+    def test_warmup_builds_warm_agents_in_background(self):
+        slow = Counter(delay=0.1)
+        lazy = Counter()
+        warmed = []
+
+        async def open_session(agent):
+            warmed.append(agent)
+
+        async def run():
+            agents = AgentRegistry()
+            agents.register("web", slow, warm=True, warmup=open_session)
+            agents.register("printer", lazy)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            done = asyncio.Event()
+            agents.start_warmup(on_done=done.set)
+            # start_warmup returns immediately; the loop keeps running while agents are built
+            assert loop.time() - start < 0.05
+            await asyncio.wait_for(done.wait(), 2)
+            return agents
+
+        agents = asyncio.run(run())
+        stats = agents.get_stats()
+        assert stats["web"]["source"] == "warmup"
+        assert stats["web"]["warmup_ms"] is not None
+        assert warmed == [agents.peek("web")]
+        assert stats["printer"]["state"] == PENDING
+        assert lazy.calls == 0
+
+    def test_aget_waits_for_warmup_without_blocking_the_loop(self):
+        slow = Counter(delay=0.2)
+
+        async def run():
+            agents = AgentRegistry()
+            agents.register("google", slow, warm=True)
+            agents.start_warmup()
+            await asyncio.sleep(0.02)  # Warmup now holds the entry's lock
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(tick())
+            agent = await agents.aget("google")
+            ticker.cancel()
+            return agents, agent, ticks
+
+        agents, agent, ticks = asyncio.run(run())
+        # The loop kept running while aget() waited for the warmup's build
+        assert ticks >= 5
+        assert agent is agents.peek("google") and slow.calls == 1
+        assert agents.get_stats()["google"]["source"] == "warmup"
+
+    def test_failed_factory_reported(self):
+        def broken():
+            raise RuntimeError("no credentials")
+
+        agents = AgentRegistry()
+        agents.register("yahoo", broken, warm=True)
+        with pytest.raises(RuntimeError):
+            agents.get("yahoo")
+        asyncio.run(agents.warm())  # Warmup logs and carries on
+        stats = agents.get_stats()["yahoo"]
+        assert stats["state"] == FAILED
+        assert stats["error"] == "no credentials"
+
+    def test_agent_property(self):
+        class Owner:
+            web_agent = agent_property("web")
+
+            def __init__(self):
+                self.agents = AgentRegistry()
+                self.agents.register("web", Counter())
+
+        owner = Owner()
+        assert owner.agents.peek("web") is None
+        assert owner.web_agent is owner.agents.peek("web")
+
+
+class TestProjectManagerStartup:
+    """The temp project is reset without deleting it on the caller's thread."""
+
+    def test_temp_cleared_in_background(self, tmp_path):
+        temp = tmp_path / "projects" / "temp"
+        (temp / "browser").mkdir(parents=True)
+        (temp / "browser" / "shot.png").write_bytes(b"x" * 1000)
+        manager = ProjectManager(str(tmp_path))
+        assert not (temp / "browser" / "shot.png").exists()
+        assert (temp / "cad").exists()
+        assert manager.list_projects() == ["temp"]
+        deadline = time.time() + 2
+        while any(manager.trash_dir.iterdir()) and time.time() < deadline:
+            time.sleep(0.01)
+        assert not any(manager.trash_dir.iterdir())
@@ -0,0 +1,211 @@
+"""
+Tests for the microphone capture subsystem.
+A fake PyAudio drives the stream callback from a thread, so no device is needed.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from audio_capture import ChunkRingBuffer, MicCapture, PA_INPUT_OVERFLOW, PA_CONTINUE
+
+CHUNK = 1024
+CHUNK_BYTES = CHUNK * 2
+
+
+class FakeStream:
+    """Minimal PyAudio stream that can run a callback or serve blocking reads."""
+
+    def __init__(self, callback=None, chunks=None, interval=0.0):
+        self.callback = callback
+        self.chunks = list(chunks or [])
+        self.interval = interval
+        self.started = False
+        self.closed = False
+        self._thread = None
+
+    def start_stream(self):
+        self.started = True
+        if self.callback and self.chunks:
+            self._thread = threading.Thread(target=self._pump, daemon=True)
+            self._thread.start()
+
+    def _pump(self):
+        for chunk in self.chunks:
+            if self.closed:
+                break
+            self.callback(chunk, len(chunk) // 2, {}, 0)
+            time.sleep(self.interval)
+
+    def read(self, frames, exception_on_overflow=True):
+        if not self.chunks:
+            time.sleep(0.01)
+            return b""
+        time.sleep(self.interval)
+        return self.chunks.pop(0)
+
+    def stop_stream(self):
+        self.started = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePyAudio:
+    def __init__(self, chunks=None, interval=0.0):
+        self.chunks = chunks or []
+        self.interval = interval
+        self.open_kwargs = None
+        self.stream = None
+
+    def open(self, **kwargs):
+        self.open_kwargs = kwargs
+        self.stream = FakeStream(kwargs.get("stream_callback"), self.chunks, self.interval)
+        return self.stream
+
+
+def numbered_chunks(n):
+    return [bytes([i % 256]) * CHUNK_BYTES for i in range(n)]
+
+
+class TestChunkRingBuffer:
+    """Tests for the preallocated ring."""
+
+    def test_write_then_read(self):
+        ring = ChunkRingBuffer(4, capacity=4)
+        ring.write(b"abcd")
+        chunk = ring.read()
+        assert isinstance(chunk, memoryview)
+        assert bytes(chunk) == b"abcd"
+        assert ring.read() is None
+
+    def test_partial_writes_are_packed(self):
+        ring = ChunkRingBuffer(4, capacity=4)
+        ring.write(b"ab")
+        assert ring.read() is None
+        ring.write(b"cdef")
+        assert bytes(ring.read()) == b"abcd"
+        assert ring.read() is None
+        ring.write(b"gh")
+        assert bytes(ring.read()) == b"efgh"
+
+    def test_overflow_drops_new_data_and_counts(self):
+        ring = ChunkRingBuffer(2, capacity=3)
+        assert ring.write(b"aabb") == 0
+        assert ring.write(b"cc") == 2
+        assert ring.overflow_chunks == 1
+        assert bytes(ring.read()) == b"aa"
+        assert bytes(ring.read()) == b"bb"
+
+    def test_held_slot_is_not_overwritten(self):
+        ring = ChunkRingBuffer(2, capacity=3)
+        ring.write(b"aa")
+        held = ring.read()
+        ring.write(b"bbccdd")
+        assert bytes(held) == b"aa"
+
+    def test_clear(self):
+        ring = ChunkRingBuffer(2, capacity=4)
+        ring.write(b"aabb")
+        ring.clear()
+        assert len(ring) == 0
+        assert ring.read() is None
+
+
+class TestMicCapture:
+    """Tests for the capture stream wrapper."""
+
+    async def test_callback_mode_delivers_all_chunks(self):
+        chunks = numbered_chunks(20)
+        pya = FakePyAudio(chunks, interval=0.001)
+        capture = MicCapture(pya, chunk_size=CHUNK, input_device_index=3)
+        await capture.open()
+        assert pya.open_kwargs["stream_callback"] is not None
+        assert pya.open_kwargs["input_device_index"] == 3
+
+        received = []
+        for _ in range(20):
+            chunk = await asyncio.wait_for(capture.read(), timeout=2)
+            received.append(bytes(chunk))
+        capture.close()
+
+        assert received == chunks
+        assert pya.stream.closed
+        stats = capture.get_stats()
+        assert stats["chunks_read"] == 20
+        assert stats["ring_overflows"] == 0
+
+    async def test_thread_mode(self):
+        chunks = numbered_chunks(5)
+        pya = FakePyAudio(chunks)
+        capture = MicCapture(pya, chunk_size=CHUNK, use_callback=False)
+        await capture.open()
+        assert "stream_callback" not in pya.open_kwargs
+
+        received = [bytes(await asyncio.wait_for(capture.read(), timeout=2)) for _ in range(5)]
+        capture.close()
+        assert received == chunks
+        assert capture.get_stats()["mode"] == "thread"
+
+    async def test_pause_stops_stream_and_resume_restarts(self):
+        pya = FakePyAudio()
+        capture = MicCapture(pya, chunk_size=CHUNK)
+        await capture.open()
+        assert pya.stream.started
+
+        capture._on_pcm(b"\x00" * CHUNK_BYTES)
+        await asyncio.to_thread(capture.pause)
+        assert capture.is_paused
+        assert not pya.stream.started
+        assert len(capture.ring) == 0
+
+        await asyncio.to_thread(capture.resume)
+        assert not capture.is_paused
+        assert pya.stream.started
+        capture.close()
+
+    def test_status_flags_are_counted(self):
+        capture = MicCapture(FakePyAudio(), chunk_size=CHUNK)
+        result = capture._callback(b"\x00" * CHUNK_BYTES, CHUNK, {}, PA_INPUT_OVERFLOW)
+        assert result == (None, PA_CONTINUE)
+        assert capture.get_stats()["input_overflows"] == 1
+
+    async def test_no_drops_while_default_executor_is_saturated(self):
+        """Capture keeps up while every to_thread worker is blocked by slow 'tools'."""
+        n = 100
+        chunks = numbered_chunks(n)
+        pya = FakePyAudio(chunks, interval=0.002)
+        capture = MicCapture(pya, chunk_size=CHUNK, ring_chunks=16)
+
+        async def consume():
+            out = []
+            for _ in range(n):
+                out.append(bytes(await asyncio.wait_for(capture.read(), timeout=5)))
+            return out
+
+        await capture.open()
+        # Flood the default executor with blocking work
+        blockers = [asyncio.to_thread(time.sleep, 0.3) for _ in range(64)]
+        received, *_ = await asyncio.gather(consume(), *blockers)
+        capture.close()
+
+        assert received == chunks
+        assert capture.get_stats()["ring_overflows"] == 0
+
+    async def test_converts_native_rate_to_consumer_chunks(self):
+        # 48 kHz stereo device, 3072-frame buffers -> 1024-frame 16 kHz mono chunks
+        device_chunk = b"\x00\x01" * 3072 * 2
+        pya = FakePyAudio([device_chunk] * 4, interval=0.001)
+        capture = MicCapture(pya, rate=16000, channels=1, chunk_size=CHUNK,
+                             device_rate=48000, device_channels=2)
+        await capture.open()
+        assert pya.open_kwargs["rate"] == 48000
+        assert pya.open_kwargs["channels"] == 2
+        assert pya.open_kwargs["frames_per_buffer"] == 3072
+
+        for _ in range(3):
+            chunk = await asyncio.wait_for(capture.read(), timeout=2)
+            assert len(chunk) == CHUNK_BYTES
+        capture.close()
+        assert capture.get_stats()["resampler"]["ratio"] == "1/3"
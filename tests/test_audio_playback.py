@@ -0,0 +1,158 @@
+"""
+Tests for the model audio playback engine.
+The PortAudio callback is invoked directly, so no output device is needed.
+"""
+import time
+
+import pytest
+
+from audio_playback import JitterBuffer, AudioPlayer, PA_CONTINUE
+
+
+class FakeStream:
+    def __init__(self):
+        self.started = False
+        self.closed = False
+
+    def start_stream(self):
+        self.started = True
+
+    def stop_stream(self):
+        self.started = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePyAudio:
+    def __init__(self):
+        self.open_kwargs = None
+
+    def open(self, **kwargs):
+        self.open_kwargs = kwargs
+        return FakeStream()
+
+
+def read(buf, n):
+    out = bytearray(n)
+    copied = buf.read_into(memoryview(out))
+    return bytes(out), copied
+
+
+class TestJitterBuffer:
+    """Tests for the bounded byte ring."""
+
+    def test_fifo_with_wraparound(self):
+        buf = JitterBuffer(8)
+        buf.write(b"abcdef")
+        assert read(buf, 4) == (b"abcd", 4)
+        buf.write(b"ghijk")
+        assert read(buf, 7) == (b"efghijk", 7)
+
+    def test_underrun_pads_with_silence(self):
+        buf = JitterBuffer(16)
+        buf.write(b"ab")
+        out, copied = read(buf, 4)
+        assert out == b"ab\x00\x00"
+        assert copied == 2
+        # The gap only counts as an underrun once more audio arrives
+        assert buf.underruns == 0
+        buf.write(b"cd")
+        assert buf.underruns == 1
+
+    def test_overrun_drops_oldest(self):
+        buf = JitterBuffer(8)
+        buf.write(b"abcdef")
+        dropped = buf.write(b"ghij")
+        assert dropped == 2
+        assert buf.overruns == 1
+        assert len(buf) == 8
+        assert read(buf, 8)[0] == b"cdefghij"
+
+    def test_write_larger_than_capacity(self):
+        buf = JitterBuffer(4)
+        buf.write(b"ab")
+        buf.write(b"cdefgh")
+        assert read(buf, 4)[0] == b"efgh"
+        assert buf.overrun_bytes == 4
+
+    def test_flush_is_immediate(self):
+        buf = JitterBuffer(1024)
+        buf.write(b"x" * 1000)
+        assert buf.flush() == 1000
+        assert len(buf) == 0
+        assert read(buf, 4) == (b"\x00" * 4, 0)
+        assert buf.flushes == 1
+
+    def test_prebuffer_waits_for_start_bytes(self):
+        buf = JitterBuffer(64, start_bytes=8, start_timeout=10)
+        buf.write(b"abcd")
+        assert read(buf, 4) == (b"\x00" * 4, 0)
+        buf.write(b"efgh")
+        assert read(buf, 4) == (b"abcd", 4)
+
+    def test_short_tail_plays_after_timeout(self):
+        buf = JitterBuffer(64, start_bytes=32, start_timeout=0.01)
+        buf.write(b"tail")
+        assert read(buf, 4)[1] == 0
+        time.sleep(0.02)
+        assert read(buf, 4) == (b"tail", 4)
+
+
+class TestAudioPlayer:
+    """Tests for the callback playback engine."""
+
+    def test_opens_callback_stream(self):
+        pya = FakePyAudio()
+        player = AudioPlayer(pya, rate=24000, output_device_index=2)
+        player.start()
+        assert pya.open_kwargs["stream_callback"] == player._callback
+        assert pya.open_kwargs["output_device_index"] == 2
+        assert player.stream.started
+        player.close()
+        assert player.stream is None
+
+    def test_callback_returns_exact_frame_count(self):
+        player = AudioPlayer(FakePyAudio(), prebuffer_ms=0)
+        player.write(b"\x01\x00" * 100)
+        data, flag = player._callback(None, 480, {}, 0)
+        assert flag == PA_CONTINUE
+        assert len(data) == 960
+        assert data[:200] == b"\x01\x00" * 100
+        assert data[200:] == bytes(760)
+
+    def test_buffer_is_bounded(self):
+        player = AudioPlayer(FakePyAudio(), rate=24000, max_buffer_ms=100)
+        for _ in range(50):
+            player.write(b"\x00" * 4800)  # 100 ms each
+        stats = player.get_stats()
+        assert stats["buffered_ms"] == pytest.approx(100, abs=1)
+        assert stats["overruns"] == 49
+
+    def test_flush_stops_playback(self):
+        player = AudioPlayer(FakePyAudio(), prebuffer_ms=0)
+        player.write(b"\x01\x00" * 24000)
+        assert player.is_playing
+        assert player.flush() == 48000
+        assert player.buffered_ms == 0
+        data, _ = player._callback(None, 480, {}, 0)
+        assert data == bytes(960)
+
+    def test_output_tap_sees_played_audio(self):
+        played = []
+        player = AudioPlayer(FakePyAudio(), prebuffer_ms=0, on_output=lambda view: played.append(bytes(view)))
+        player.write(b"\x01\x00" * 480)
+        data, _ = player._callback(None, 480, {}, 0)
+        player._callback(None, 480, {}, 0)
+        assert played == [data, bytes(960)]
+
+    def test_converts_to_device_format(self):
+        pya = FakePyAudio()
+        player = AudioPlayer(pya, rate=24000, prebuffer_ms=0, device_rate=48000, device_channels=2)
+        player.start()
+        assert pya.open_kwargs["rate"] == 48000
+        assert pya.open_kwargs["channels"] == 2
+        assert pya.open_kwargs["frames_per_buffer"] == 960
+        player.write(b"\x00\x10" * 2400)  # 100 ms at 24 kHz
+        assert player.buffered_ms == pytest.approx(100, abs=2)
+        player.close()
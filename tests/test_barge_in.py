@@ -0,0 +1,104 @@
+"""
+Tests for local barge-in (duck / confirm / flush).
+"""
+import time
+
+import pytest
+
+from barge_in import BargeInController, IDLE, DUCKED, INTERRUPTED
+from audio_playback import AudioPlayer
+from vad import VADResult
+
+CHUNK_MS = 64.0
+
+
+class FakePyAudio:
+    def open(self, **kwargs):
+        raise AssertionError("no device in tests")
+
+
+def vad(raw):
+    return VADResult(is_speech=raw, speech_started=False, speech_ended=False,
+                     rms=0.0, noise_floor=0.0, threshold=0.0, raw_speech=raw)
+
+
+@pytest.fixture
+def player():
+    player = AudioPlayer(FakePyAudio(), prebuffer_ms=0)
+    player.write(b"\x10\x00" * 24000)  # 1 s of model audio queued
+    return player
+
+
+class TestBargeIn:
+    """Tests for the BargeInController state machine."""
+
+    def test_no_action_when_model_silent(self):
+        player = AudioPlayer(FakePyAudio())
+        controller = BargeInController(player)
+        assert controller.process(vad(True), CHUNK_MS) is None
+        assert controller.state == IDLE
+
+    def test_first_speech_chunk_ducks_playback(self, player):
+        controller = BargeInController(player, confirm_ms=120, duck_gain=0.2)
+        assert controller.process(vad(True), CHUNK_MS) == "duck"
+        assert controller.state == DUCKED
+        assert player.gain == 0.2
+        # Ducking doesn't discard audio
+        assert player.buffered_ms > 900
+
+    def test_confirmed_speech_flushes(self, player):
+        interrupted = []
+        controller = BargeInController(player, confirm_ms=120, on_interrupt=lambda: interrupted.append(True))
+        controller.process(vad(True), CHUNK_MS)
+        assert controller.process(vad(True), CHUNK_MS) == "interrupt"
+        assert player.buffered_ms == 0
+        assert player.gain == 1.0
+        assert interrupted == [True]
+
+    def test_cough_is_rejected(self, player):
+        controller = BargeInController(player, confirm_ms=200)
+        controller.process(vad(True), CHUNK_MS)
+        assert controller.process(vad(False), CHUNK_MS) == "restore"
+        assert player.gain == 1.0
+        assert player.buffered_ms > 900
+        assert controller.get_stats()["rejected"] == 1
+
+    def test_model_audio_suppressed_until_turn_end(self, player):
+        controller = BargeInController(player, confirm_ms=0)
+        assert controller.process(vad(True), CHUNK_MS) == "interrupt"
+        assert controller.state == INTERRUPTED
+        assert not controller.accept_audio()
+        controller.on_model_turn_end()
+        assert controller.accept_audio()
+
+    def test_suppression_times_out(self, player):
+        controller = BargeInController(player, confirm_ms=0, suppress_timeout=0.01)
+        controller.process(vad(True), CHUNK_MS)
+        time.sleep(0.02)
+        assert controller.accept_audio()
+        assert controller.state == IDLE
+
+    def test_latency_metrics(self, player):
+        controller = BargeInController(player, confirm_ms=120)
+        captured_at = time.monotonic()
+        controller.process(vad(True), CHUNK_MS, captured_at)
+        controller.process(vad(True), CHUNK_MS, captured_at + CHUNK_MS / 1000)
+        stats = controller.get_stats()
+        assert stats["duck_latency"]["count"] == 1
+        # Duck happens within the onset chunk plus processing time
+        assert stats["duck_latency"]["mean_ms"] < 100
+        assert stats["interrupt_latency"]["count"] == 1
+
+    def test_disabled(self, player):
+        controller = BargeInController(player, enabled=False)
+        assert controller.process(vad(True), CHUNK_MS) is None
+        assert player.gain == 1.0
+
+
+class TestPlayerGain:
+    def test_ducked_callback_scales_samples(self):
+        player = AudioPlayer(FakePyAudio(), prebuffer_ms=0)
+        player.write(b"\x00\x10" * 480)  # int16 4096
+        player.set_gain(0.5)
+        data, _ = player._callback(None, 480, {}, 0)
+        assert data[:2] == b"\x00\x08"
@@ -0,0 +1,226 @@
+"""
+Tests for the shared-memory camera broker.
+"""
+import multiprocessing
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import camera_broker
+from camera_broker import CameraBroker, CameraSubscriber, acquire_camera
+
+
+class FakeCapture:
+    """VideoCapture stand-in: frames whose pixels equal the frame number."""
+
+    opens = 0
+
+    def __init__(self, width=640, height=480, fps=200.0):
+        FakeCapture.opens += 1
+        self.shape = (height, width, 3)
+        self.delay = 1.0 / fps
+        self.count = 0
+
+    def read(self, image=None):
+        time.sleep(self.delay)
+        self.count += 1
+        if image is not None:
+            image[...] = self.count % 256
+            return True, image
+        return True, np.full(self.shape, self.count % 256, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+def ring_name():
+    return f"ada_cam_test_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def broker():
+    b = CameraBroker(name=ring_name(), opener=FakeCapture)
+    assert b.start()
+    yield b
+    b.stop()
+
+
+def _read_in_child(name, queue):
+    sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+    from camera_broker import CameraSubscriber
+
+    sub = CameraSubscriber(name)
+    frame = sub.read()
+    queue.put((frame.shape, int(frame[0, 0, 0]) > 0))
+    sub.close()
+
+
+class TestCameraBroker:
+    """Tests for the ring and its subscribers."""
+
+    def test_zero_copy_view(self, broker):
+        sub = broker.subscribe()
+        frame = sub.read()
+        assert frame.shape == (480, 640, 3)
+        assert sub.get_stats()["zero_copy"]
+        assert np.shares_memory(frame, sub.ring.frames)
+        sub.close()
+
+    def test_frames_advance(self, broker):
+        sub = broker.subscribe()
+        first = int(sub.read()[0, 0, 0])
+        second = int(sub.read()[0, 0, 0])
+        assert second != first
+        assert sub.last_seq >= 1
+        sub.close()
+
+    def test_resized_and_rgb(self, broker):
+        sub = broker.subscribe(max_size=320, rgb=True)
+        frame = sub.read()
+        assert frame.shape == (240, 320, 3)
+        assert not sub.get_stats()["zero_copy"]
+        sub.close()
+
+    def test_subscriber_rate_cap(self, broker):
+        sub = broker.subscribe(fps=10)
+        start = time.monotonic()
+        for _ in range(4):
+            sub.read()
+        assert time.monotonic() - start >= 0.28
+        sub.close()
+
+    def test_view_invalidated_after_wrap(self, broker):
+        sub = broker.subscribe()
+        sub.read()
+        assert sub.valid()
+        time.sleep(0.2)  # >> slots frames at 200 fps
+        assert not sub.valid()
+        sub.close()
+
+    def test_read_returns_none_after_owner_stops(self):
+        b = CameraBroker(name=ring_name(), opener=FakeCapture)
+        b.start()
+        sub = b.subscribe()
+        assert sub.read() is not None
+        b.stop()
+        # At most the frame written just before stop, then nothing
+        sub.read(timeout=0.2)
+        start = time.monotonic()
+        assert sub.read(timeout=5.0) is None
+        assert time.monotonic() - start < 1.0
+        sub.close()
+
+    def test_stalled_camera_is_not_a_gone_owner(self):
+        stalled = {"on": False}
+
+        class StallingCapture(FakeCapture):
+            def read(self, image=None):
+                while stalled["on"]:
+                    time.sleep(0.01)
+                return super().read(image)
+
+        b = CameraBroker(name=ring_name(), opener=StallingCapture)
+        b.start()
+        sub = b.subscribe()
+        assert sub.read() is not None
+        stalled["on"] = True
+        sub.read(timeout=0.1)
+        # Reads time out and the ring looks stale, but the owner is still there
+        assert sub.read(timeout=0.3) is None
+        assert not sub.ring.alive(stale_after=0.2)
+        assert not sub.ring.owner_gone()
+        stalled["on"] = False
+        assert sub.read() is not None
+        b.stop()
+        assert sub.ring.owner_gone()
+        sub.close()
+
+    def test_second_broker_joins_live_owner(self, broker):
+        other = CameraBroker(name=broker.name, opener=FakeCapture)
+        opens = FakeCapture.opens
+        assert other.start()
+        assert not other.owner
+        assert FakeCapture.opens == opens
+
+    def test_subscriber_in_other_process(self, broker):
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_read_in_child, args=(broker.name, queue))
+        proc.start()
+        shape, nonzero = queue.get(timeout=20)
+        proc.join(5)
+        assert shape == (480, 640, 3)
+        assert nonzero
+
+
+class TestAcquireCamera:
+    """Tests for process-wide reference counting."""
+
+    def test_device_opened_once_and_released_with_last(self):
+        index = 90
+        opens = FakeCapture.opens
+        a = acquire_camera(index, name=ring_name(), opener=FakeCapture)
+        b = acquire_camera(index, max_size=320)
+        assert FakeCapture.opens == opens + 1
+        assert a.read() is not None and b.read() is not None
+        a.close()
+        assert index in camera_broker._brokers
+        b.close()
+        assert index not in camera_broker._brokers
+
+
+class TestCameraVision:
+    """AudioLoop.get_frames on top of a subscriber."""
+
+    def test_stall_does_not_end_vision(self, monkeypatch):
+        ada = pytest.importorskip("ada")
+        import asyncio
+        from types import SimpleNamespace
+
+        class StalledSub:
+            """Times out three reads (webcam stall), then delivers frames."""
+
+            def __init__(self):
+                self.ring = SimpleNamespace(owner_gone=lambda: False)
+                self.closed = False
+                self.timeouts = 3
+
+            def read(self):
+                if self.timeouts:
+                    self.timeouts -= 1
+                    return None
+                return np.full((48, 64, 3), 200, dtype=np.uint8)
+
+            def close(self):
+                self.closed = True
+
+        sub = StalledSub()
+        monkeypatch.setattr(ada, "acquire_camera", lambda *args, **kwargs: sub)
+        sent = []
+
+        loop = ada.AudioLoop.__new__(ada.AudioLoop)
+        loop.camera_size = (64, 48)
+        loop.camera_encoder = SimpleNamespace(max_size=64, get_stats=dict)
+        loop.scene_detector = SimpleNamespace(update=lambda gray: True, reset=lambda: None, get_stats=dict)
+        loop._encode_frame = lambda frame: "jpeg"
+        loop.uplink = SimpleNamespace(put_frame=sent.append)
+
+        async def run():
+            loop._resume_event = asyncio.Event()
+            loop._resume_event.set()
+            task = asyncio.create_task(loop.get_frames())
+
+            async def first_frame():
+                while not sent:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(first_frame(), 5)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(run())
+        assert sent == ["jpeg"] and sub.timeouts == 0 and sub.closed
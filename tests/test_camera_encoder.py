@@ -0,0 +1,78 @@
+"""
+Tests for the cv2 camera encode path.
+"""
+import base64
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+from camera_encoder import CameraEncoder, camera_backends
+
+
+def frame(width=1280, height=720, seed=0):
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 255, (height // 40, width // 40, 3), dtype=np.uint8)
+    return cv2.resize(coarse, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+class TestCameraBackends:
+    """Tests for platform backend selection."""
+
+    def test_auto_detect_last(self):
+        backends = camera_backends()
+        assert backends[-1][0] == cv2.CAP_ANY
+
+    def test_avfoundation_only_on_macos(self):
+        ids = [b for b, _ in camera_backends()]
+        assert (cv2.CAP_AVFOUNDATION in ids) == (sys.platform == "darwin")
+
+
+class TestCameraEncoder:
+    """Tests for resize, encode and adaptive quality."""
+
+    def test_output_is_jpeg_within_max_size(self):
+        encoder = CameraEncoder(max_size=640)
+        jpeg = encoder.encode(frame())
+        decoded = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == (360, 640, 3)
+
+    def test_colors_stay_bgr(self):
+        img = np.zeros((480, 640, 3), dtype=np.uint8)
+        img[..., 0] = 255  # Blue in BGR
+        jpeg = CameraEncoder(max_size=320, target_bytes=None).encode(img)
+        decoded = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        b, g, r = decoded[100, 100]
+        assert b > 200 and r < 50
+
+    def test_buffer_reused(self):
+        encoder = CameraEncoder()
+        for i in range(5):
+            encoder.encode(frame(seed=i))
+        assert encoder.get_stats()["buffer_allocations"] == 1
+        encoder.encode(frame(1920, 1080))
+        assert encoder.get_stats()["buffer_allocations"] == 2
+
+    def test_small_frame_not_resized(self):
+        encoder = CameraEncoder(max_size=1024)
+        encoder.encode(frame(640, 480))
+        assert encoder.get_stats()["output_size"] == (640, 480)
+        assert encoder.get_stats()["buffer_allocations"] == 0
+
+    def test_quality_adapts_to_target(self):
+        noisy = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        encoder = CameraEncoder(quality=90, target_bytes=20_000)
+        for _ in range(10):
+            encoder.encode(noisy)
+        assert encoder.quality == encoder.min_quality
+
+        encoder = CameraEncoder(quality=60, target_bytes=10_000_000)
+        for _ in range(10):
+            encoder.encode(frame())
+        assert encoder.quality == encoder.max_quality
+
+    def test_payload(self):
+        payload = CameraEncoder().encode_payload(frame())
+        assert payload["mime_type"] == "image/jpeg"
+        assert base64.b64decode(payload["data"])[:2] == b"\xff\xd8"
@@ -0,0 +1,108 @@
+"""
+Tests for the frequency-domain NLMS echo canceller.
+Echo is synthesized by convolving a far-end signal with a decaying room response.
+"""
+import numpy as np
+import pytest
+
+from echo_canceller import EchoCanceller, ReferenceBuffer
+
+RATE = 16000
+CHUNK = 1024
+
+
+def room_echo(far, delay=64, taps=512, gain=0.03, seed=1):
+    rng = np.random.default_rng(seed)
+    response = rng.standard_normal(taps) * np.exp(-np.arange(taps) / 80.0) * gain
+    response = np.concatenate([np.zeros(delay), response])
+    return np.convolve(far, response)[:far.size]
+
+
+def to_pcm(signal):
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+class TestReferenceBuffer:
+    """Tests for the far-end FIFO."""
+
+    def test_delay_is_held_back(self):
+        ref = ReferenceBuffer(1000, delay=4)
+        ref.push(np.arange(1, 9, dtype=np.float32))
+        out = np.empty(6, dtype=np.float32)
+        ref.pull(out)
+        # Only 4 samples may leave while 4 stay queued; the gap is padded in front
+        assert list(out) == [0, 0, 1, 2, 3, 4]
+
+    def test_resync_drops_excess(self):
+        ref = ReferenceBuffer(1000, delay=0, slack=4)
+        ref.push(np.arange(20, dtype=np.float32))
+        out = np.empty(4, dtype=np.float32)
+        ref.pull(out)
+        assert ref.resyncs == 1
+        assert list(out) == [12, 13, 14, 15]
+
+    def test_clear(self):
+        ref = ReferenceBuffer(16)
+        ref.push(np.ones(8, dtype=np.float32))
+        ref.clear()
+        assert len(ref) == 0
+
+
+class TestEchoCanceller:
+    """Tests for echo removal on the capture path."""
+
+    def test_converges_on_synthetic_echo(self):
+        rng = np.random.default_rng(0)
+        far = rng.standard_normal(RATE * 4).astype(np.float32) * 0.3
+        echo = room_echo(far)
+        aec = EchoCanceller(sample_rate=RATE, delay_ms=0)
+
+        for start in range(0, far.size, CHUNK):
+            aec.push_reference(to_pcm(far[start:start + CHUNK]))
+            aec.process(bytearray(to_pcm(echo[start:start + CHUNK])))
+
+        assert aec.erle_db > 15
+        assert aec.get_stats()["adapt_blocks"] > 0
+
+    def test_processes_writable_chunk_in_place(self):
+        aec = EchoCanceller(sample_rate=RATE, delay_ms=0)
+        aec.push_reference(to_pcm(np.full(CHUNK, 0.5)))
+        chunk = bytearray(to_pcm(np.full(CHUNK, 0.1)))
+        assert aec.process(chunk) is chunk
+        assert aec.process(bytes(CHUNK * 2)) is not None
+
+    def test_read_only_chunk_returns_new_bytes(self):
+        aec = EchoCanceller(sample_rate=RATE)
+        data = bytes(CHUNK * 2)
+        out = aec.process(data)
+        assert isinstance(out, bytes) and len(out) == len(data)
+
+    def test_passthrough_without_reference(self):
+        aec = EchoCanceller(sample_rate=RATE)
+        speech = to_pcm(np.sin(np.arange(CHUNK) / 5.0) * 0.2)
+        assert aec.process(speech) == speech
+
+    def test_disabled_is_passthrough(self):
+        aec = EchoCanceller(enabled=False)
+        chunk = bytearray(b"\x01\x02" * CHUNK)
+        aec.push_reference(bytes(CHUNK * 2))
+        assert aec.process(chunk) is chunk
+        assert len(aec.reference) == 0
+
+    def test_rejects_partial_block(self):
+        aec = EchoCanceller(block_size=256)
+        with pytest.raises(ValueError):
+            aec.process(bytes(300 * 2))
+
+    def test_reference_is_resampled(self):
+        aec = EchoCanceller(sample_rate=16000, reference_rate=24000)
+        aec.push_reference(bytes(480 * 2))  # 20 ms at 24 kHz
+        assert len(aec.reference) == 320
+
+    def test_double_talk_freezes_adaptation(self):
+        aec = EchoCanceller(sample_rate=RATE, delay_ms=0)
+        aec.push_reference(to_pcm(np.full(CHUNK, 0.01)))
+        aec.process(bytearray(to_pcm(np.full(CHUNK, 0.5))))
+        stats = aec.get_stats()
+        assert stats["double_talk_blocks"] > 0
+        assert stats["adapt_blocks"] == 0
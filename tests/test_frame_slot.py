@@ -0,0 +1,126 @@
+"""
+Tests for lazy frame encoding and perceptual dedupe.
+"""
+import base64
+import io
+
+import numpy as np
+import PIL.Image
+import pytest
+
+from frame_slot import FrameSlot, dhash, image_tokens
+
+
+def jpeg(seed=0, size=(640, 480), shift=0):
+    rng = np.random.default_rng(seed)
+    # Smooth random scene so small shifts/noise keep a similar structure
+    coarse = rng.integers(0, 255, (6, 8, 3), dtype=np.uint8)
+    img = PIL.Image.fromarray(coarse).resize(size, PIL.Image.BILINEAR)
+    if shift:
+        arr = np.asarray(img).astype(np.int16) + shift
+        img = PIL.Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+    out = io.BytesIO()
+    img.save(out, format="jpeg", quality=80)
+    return out.getvalue()
+
+
+class TestFrameSlot:
+    """Tests for the latest-frame slot."""
+
+    def test_update_does_not_encode(self):
+        slot = FrameSlot()
+        for i in range(50):
+            slot.update(jpeg(i))
+        stats = slot.get_stats()
+        assert stats["frames_received"] == 50
+        assert stats["frames_sent"] == 0
+        assert stats["encode_ms"] == 0
+
+    def test_take_returns_base64_payload(self):
+        slot = FrameSlot()
+        data = jpeg()
+        slot.update(data)
+        payload = slot.take()
+        assert payload["mime_type"] == "image/jpeg"
+        assert base64.b64decode(payload["data"]) == data
+
+    def test_same_scene_is_skipped(self):
+        slot = FrameSlot()
+        slot.update(jpeg(1))
+        assert slot.take() is not None
+        slot.update(jpeg(1, shift=3))  # Slight exposure change, same scene
+        assert slot.take() is None
+        slot.update(jpeg(2))
+        assert slot.take() is not None
+        stats = slot.get_stats()
+        assert stats["frames_deduped"] == 1
+        assert stats["image_tokens_saved"] == image_tokens(640, 480)
+
+    def test_no_new_frame_is_skipped_without_hashing(self):
+        slot = FrameSlot()
+        slot.update(jpeg(3))
+        slot.take()
+        hashed = slot.hash_seconds
+        assert slot.take() is None
+        assert slot.hash_seconds == hashed
+
+    def test_force_and_reset(self):
+        slot = FrameSlot()
+        slot.update(jpeg(4))
+        slot.take()
+        assert slot.take(force=True) is not None
+        slot.reset()
+        slot.update(jpeg(4))
+        assert slot.take() is not None
+
+    def test_base64_input_is_passed_through(self):
+        slot = FrameSlot()
+        b64 = base64.b64encode(jpeg(5)).decode()
+        slot.update(b64)
+        assert slot.take()["data"] == b64
+
+    def test_dhash_and_tokens(self):
+        h, size = dhash(jpeg(6, size=(1024, 768)))
+        assert 0 <= h < 2 ** 64
+        assert size == (1024, 768)
+        assert image_tokens(320, 240) == 258
+        assert image_tokens(1024, 768) == 2 * 258
+
+
+class TestSpeechOnsetFrame:
+    """AudioLoop._send_onset_frame: which source a speech onset sends from."""
+
+    def make_loop(self, screen):
+        ada = pytest.importorskip("ada")
+        from types import SimpleNamespace
+
+        loop = ada.AudioLoop.__new__(ada.AudioLoop)
+        loop.video_mode = "screen" if screen else "client"
+        loop.frame_slot = FrameSlot()
+        loop.frame_slot.update(jpeg(1))
+        loop.sent = []
+        loop.uplink = SimpleNamespace(put_frame=loop.sent.append)
+        loop.requests = []
+        loop.screen_capture = SimpleNamespace(request_frame=lambda: loop.requests.append(1)) if screen else None
+        return loop
+
+    def test_screen_mode_leaves_client_frames_alone(self):
+        loop = self.make_loop(screen=True)
+        loop._send_onset_frame()
+        assert loop.requests == [1] and loop.sent == []
+        stats = loop.frame_slot.get_stats()
+        assert stats["frames_sent"] == 0 and stats["hash_ms"] == 0
+
+    def test_client_mode_sends_the_slot_frame(self):
+        loop = self.make_loop(screen=False)
+        loop._send_onset_frame()
+        assert len(loop.sent) == 1 and loop.sent[0]["mime_type"] == "image/jpeg"
+        loop._send_onset_frame()  # Same frame: skipped
+        assert len(loop.sent) == 1
+        assert loop.frame_slot.take_seconds > 0
+
+    def test_other_modes_ignore_client_frames(self):
+        loop = self.make_loop(screen=False)
+        loop.video_mode = "none"
+        loop._send_onset_frame()
+        assert loop.sent == [] and loop.frame_slot.frames_processed == 0
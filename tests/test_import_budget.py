@@ -0,0 +1,96 @@
+"""
+Tests for lazy imports and the backend import-time budget.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from lazy_import import (
+    lazy_module, lazy_attr, preload, measure_import_time, DEFERRED_MODULES, IMPORT_BUDGET_MS,
+)
+
+# No API key: modules must still import (agents fail when created instead)
+NO_KEY = {"GEMINI_API_KEY": ""}
+
+
+@pytest.fixture
+def fake_module(tmp_path, monkeypatch):
+    """A module that records how often it was executed."""
+    name = f"lazy_probe_{tmp_path.name.replace('-', '_')}"
+    (tmp_path / f"{name}.py").write_text(
+        "import builtins\n"
+        "builtins.lazy_probe_loads = getattr(builtins, 'lazy_probe_loads', 0) + 1\n"
+        "VALUE = 42\n"
+        "def double(x):\n"
+        "    return x * 2\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import builtins
+    builtins.lazy_probe_loads = 0
+    yield name
+    sys.modules.pop(name, None)
+
+
+class TestLazyProxies:
+    """Proxies import on first use, once."""
+
+    def test_module_imported_on_first_attribute(self, fake_module):
+        import builtins
+        proxy = lazy_module(fake_module)
+        assert not proxy.loaded
+        assert fake_module not in sys.modules
+        assert proxy.VALUE == 42
+        assert proxy.double(2) == 4
+        assert proxy.loaded
+        assert builtins.lazy_probe_loads == 1
+
+    def test_attr_callable_and_attributes(self, fake_module):
+        import builtins
+        double = lazy_attr(fake_module, "double")
+        assert builtins.lazy_probe_loads == 0
+        assert double(21) == 42
+        assert double.__name__ == "double"
+        assert builtins.lazy_probe_loads == 1
+
+    def test_preload_on_background_thread(self, fake_module):
+        preload([fake_module]).join(5)
+        assert fake_module in sys.modules
+
+    def test_preload_reports_failures(self):
+        errors = []
+        preload(["lazy_probe_does_not_exist"], on_error=lambda name, e: errors.append(name)).join(5)
+        assert errors == ["lazy_probe_does_not_exist"]
+
+
+class TestImportBudget:
+    """Importing the backend must not load feature-only stacks or touch hardware."""
+
+    @pytest.mark.parametrize("entry", sorted(IMPORT_BUDGET_MS))
+    def test_entry_import(self, entry):
+        pytest.importorskip("google.genai")
+        if entry == "server":
+            pytest.importorskip("socketio")
+            pytest.importorskip("fastapi")
+        result = measure_import_time(entry, cwd=str(BACKEND_DIR), env=NO_KEY)
+        loaded = [m for m in DEFERRED_MODULES if m in result["modules"]]
+        assert loaded == [], f"import {entry} loads deferred modules: {loaded}"
+        slowest = ", ".join(f"{name} {ms:.0f} ms" for name, ms in result["top"][:5])
+        assert result["total_ms"] < IMPORT_BUDGET_MS[entry], f"import {entry}: {result['total_ms']:.0f} ms ({slowest})"
+
+    def test_ada_import_has_no_side_effects(self):
+        pytest.importorskip("google.genai")
+        import ada
+        # PortAudio is opened and the Gemini client created only when used
+        assert ada._pya is None
+        assert ada._client is None
+
+    def test_web_agent_imports_without_key(self, monkeypatch):
+        pytest.importorskip("playwright")
+        import web_agent
+        monkeypatch.setattr(web_agent, "API_KEY", None)
+        with pytest.raises(ValueError):
+            web_agent.WebAgent()
@@ -0,0 +1,239 @@
+"""
+Tests for the hot-standby Live session against a local fake endpoint.
+"""
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from live_standby import HotStandby, READY, FAILED
+from tests.fake_live import FakeLiveServer, use_plain_websockets
+
+MODEL = "models/test"
+CONFIG = types.LiveConnectConfig(response_modalities=["AUDIO"])
+
+
+@pytest.fixture(autouse=True)
+def plain_websockets(monkeypatch):
+    use_plain_websockets(monkeypatch)
+
+
+def opener(server):
+    client = server.client()
+    return lambda: client.aio.live.connect(model=MODEL, config=CONFIG)
+
+
+async def wait_for(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+async def first_message(session):
+    async for response in session.receive():
+        return response
+
+
+class TestHotStandby:
+    """Tests for keeping, handing over and replacing the standby session."""
+
+    def test_standby_warms_up(self):
+        async def run():
+            async with FakeLiveServer() as server:
+                standby = HotStandby(opener(server))
+                standby.start()
+                await wait_for(lambda: standby.ready)
+                stats = standby.get_stats()
+                await standby.close()
+                return stats
+
+        stats = asyncio.run(run())
+        assert stats["state"] == READY
+        assert stats["opens"] == 1
+        assert stats["open"]["count"] == 1
+
+    def test_swap_to_standby_after_primary_drops(self):
+        async def run():
+            async with FakeLiveServer() as server:
+                standby = HotStandby(opener(server))
+                standby.start()
+                await wait_for(lambda: standby.ready)
+                async with opener(server)() as primary:
+                    await first_message(primary)
+                    await server.drop(index=1)  # primary connected second
+                    with pytest.raises(Exception):
+                        async for _ in primary.receive():
+                            pass
+                    failed_at = asyncio.get_running_loop().time()
+                    lease = await standby.take()
+                    assert lease is not None
+                    standby.record_swap(asyncio.get_running_loop().time() - failed_at)
+                    # The update sent while the standby was idle is kept on the lease
+                    (response,) = lease.received
+                    # The standby session is live: the consumer can read it
+                    await server.drop(index=0)
+                    with pytest.raises(Exception):
+                        await first_message(lease.session)
+                    # A replacement is opened in the background
+                    await wait_for(lambda: standby.ready)
+                    lease.release()
+                stats = standby.get_stats()
+                await standby.close()
+                return response, stats, server.connections
+
+        response, stats, connections = asyncio.run(run())
+        assert response.session_resumption_update.new_handle == "h1"
+        assert stats["swaps"] == 1
+        assert stats["swap"]["count"] == 1
+        assert stats["opens"] == 2
+        assert connections == 3
+
+    def test_take_without_standby_returns_none(self):
+        standby = HotStandby(lambda: None)
+        assert asyncio.run(standby.take()) is None
+        assert not standby.ready
+
+    def test_dead_standby_is_replaced(self):
+        async def run():
+            async with FakeLiveServer() as server:
+                standby = HotStandby(opener(server), health_interval=0.02)
+                standby.start()
+                await wait_for(lambda: standby.ready)
+                await server.drop(index=0)
+                await wait_for(lambda: standby.opens == 2 and standby.ready)
+                stats = standby.get_stats()
+                await standby.close()
+                return stats
+
+        stats = asyncio.run(run())
+        assert stats["died_idle"] == 1
+
+    def test_idle_standby_is_recycled(self):
+        async def run():
+            async with FakeLiveServer() as server:
+                standby = HotStandby(opener(server), max_idle=0.05, health_interval=0.02)
+                standby.start()
+                await wait_for(lambda: standby.recycled >= 1 and standby.ready)
+                await standby.close()
+                return standby
+
+        standby = asyncio.run(run())
+        assert standby.opens >= 2
+
+    def test_open_failures_back_off(self):
+        @contextlib.asynccontextmanager
+        async def failing():
+            raise ConnectionRefusedError("no server")
+            yield
+
+        async def run():
+            standby = HotStandby(failing, retry_delay=0.05)
+            standby.start()
+            await wait_for(lambda: standby.open_failures >= 2)
+            stats = standby.get_stats()
+            await standby.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert stats["state"] == FAILED or stats["open_failures"] >= 2
+        assert stats["last_error"] == "no server"
+        assert not stats["ready"]
+
+    def test_close_closes_taken_session(self):
+        async def run():
+            async with FakeLiveServer() as server:
+                standby = HotStandby(opener(server))
+                standby.start()
+                await wait_for(lambda: standby.ready)
+                lease = await standby.take()
+                await standby.close()
+                # Reading the closed session fails
+                with pytest.raises(Exception):
+                    await first_message(lease.session)
+
+        asyncio.run(run())
+
+    def test_invalidate_replaces_standby(self):
+        async def run():
+            async with FakeLiveServer() as server:
+                standby = HotStandby(opener(server), health_interval=0.02)
+                standby.start()
+                await wait_for(lambda: standby.ready)
+                standby.invalidate()
+                assert not standby.ready
+                await wait_for(lambda: standby.opens == 2 and standby.ready)
+                await standby.close()
+                return standby
+
+        standby = asyncio.run(run())
+        assert standby.recycled == 1
+
+
+class TestNetworkSwap:
+    """AudioLoop._run_network: standby only when the session cannot be resumed."""
+
+    def run_failing_network(self, handle):
+        ada = pytest.importorskip("ada")
+
+        class Standby:
+            def __init__(self):
+                self.takes = 0
+
+            async def take(self):
+                # One standby session, then none
+                self.takes += 1
+                if self.takes > 1:
+                    return None
+                return SimpleNamespace(session=Session(), received=[], release=lambda: None)
+
+            def record_swap(self, seconds):
+                pass
+
+        class Session:
+            def __init__(self):
+                self.texts = []
+
+            async def send(self, input, end_of_turn=False):
+                self.texts.append(input)
+
+        async def receive_audio():
+            raise ConnectionError("connection dropped")
+
+        loop = ada.AudioLoop.__new__(ada.AudioLoop)
+        loop.session = Session()
+        loop.standby = Standby()
+        loop.resumption = SimpleNamespace(handle=handle, mark_replayed=lambda: None, on_update=lambda update: None)
+        loop.uplink = SimpleNamespace(set_connected=lambda connected: None, audio_depth_ms=0)
+        loop.frame_slot = SimpleNamespace(reset=lambda: None)
+        loop.project_manager = SimpleNamespace(get_recent_chat_history=lambda limit: [])
+        loop.receive_audio = receive_audio
+        loop.stop_event = asyncio.Event()
+        loop._session_ready = asyncio.Event()
+        loop._go_away = False
+        loop._conversation = 1
+
+        async def on_ready():
+            pass
+
+        async def run():
+            with pytest.raises(Exception):
+                await loop._run_network(loop.session, on_ready)
+
+        asyncio.run(run())
+        return loop
+
+    def test_resumable_session_reconnects_instead_of_swapping(self):
+        loop = self.run_failing_network(handle="h1")
+        assert loop.standby.takes == 0
+        assert loop._conversation == 1
+
+    def test_unresumable_session_swaps_to_standby(self):
+        loop = self.run_failing_network(handle=None)
+        assert loop.standby.takes == 2
+        # The standby is a new conversation; its context is replayed from the chat log
+        assert loop._conversation == 2
+        assert "Connection was lost" in loop.session.texts[0]
@@ -0,0 +1,79 @@
+"""
+Tests for the realtime audio sender, run against the real SDK session with a
+websocket that records frames instead of sending them.
+"""
+import json
+import warnings
+
+import pytest
+
+from google import genai
+from google.genai import live
+
+from realtime_sender import RealtimeAudioSender
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message):
+        self.messages.append(json.loads(message))
+
+
+@pytest.fixture
+def session():
+    warnings.simplefilter("ignore")
+    client = genai.Client(api_key="test", http_options={"api_version": "v1beta"})
+    return live.AsyncSession(api_client=client._api_client, websocket=RecordingWebSocket())
+
+
+def sdk_frame(session, pcm):
+    """What send_realtime_input itself produces for this PCM."""
+    from google.genai import types
+    ws = RecordingWebSocket()
+    probe = live.AsyncSession(api_client=session._api_client, websocket=ws)
+    return probe, ws, types.Blob(data=pcm, mime_type="audio/pcm;rate=16000")
+
+
+class TestRealtimeAudioSender:
+    """Tests for frame equivalence and Blob reuse."""
+
+    async def test_frame_matches_sdk(self, session):
+        pcm = bytes(range(256)) * 8
+        sender = RealtimeAudioSender(session)
+        await sender.send_audio(pcm)
+
+        probe, ws, blob = sdk_frame(session, pcm)
+        await probe.send_realtime_input(audio=blob)
+        assert session._ws.messages == ws.messages
+
+    async def test_sdk_path_reuses_blobs(self, session):
+        sender = RealtimeAudioSender(session, pool_size=2)
+        blobs = list(sender._blobs)
+        for i in range(4):
+            await sender.send_audio(bytes([i]) * 64)
+        assert sender._blobs == blobs
+        assert all(b.data == b"" for b in blobs)
+        assert len(session._ws.messages) == 4
+        assert sender.get_stats()["sends"] == 4
+
+    async def test_stream_end(self, session):
+        sender = RealtimeAudioSender(session)
+        await sender.send_audio_end()
+        assert len(session._ws.messages) == 1
+        assert list(session._ws.messages[0]) == ["realtime_input"]
+        assert sender.get_stats()["stream_ends"] == 1
+
+    async def test_any_session_with_the_public_api_works(self):
+        class PlainSession:
+            def __init__(self):
+                self.calls = []
+
+            async def send_realtime_input(self, **kwargs):
+                self.calls.append(kwargs)
+
+        plain = PlainSession()
+        sender = RealtimeAudioSender(plain)
+        await sender.send_audio(b"\x00\x01")
+        assert plain.calls[0]["audio"].mime_type == "audio/pcm;rate=16000"
@@ -0,0 +1,110 @@
+"""
+Tests for the streaming polyphase resampler and device format negotiation.
+"""
+import numpy as np
+import pytest
+
+from resampler import PolyphaseResampler, native_format
+
+
+def tone(freq, rate, seconds=1.0, amplitude=10000, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    mono = np.sin(2 * np.pi * freq * t) * amplitude
+    return np.repeat(mono[:, None], channels, axis=1).astype(np.int16).tobytes()
+
+
+def rms(pcm, skip=500):
+    samples = np.frombuffer(pcm, dtype=np.int16)[skip:].astype(np.float64)
+    return float(np.sqrt(np.mean(samples ** 2)))
+
+
+class TestPolyphaseResampler:
+    """Tests for rate and channel conversion."""
+
+    @pytest.mark.parametrize("src,dst", [(48000, 16000), (24000, 48000), (44100, 16000), (16000, 24000)])
+    def test_output_length_and_passband(self, src, dst):
+        r = PolyphaseResampler(src, dst)
+        out = r.process(tone(1000, src))
+        assert abs(len(out) // 2 - dst) <= 1
+        assert rms(out) == pytest.approx(10000 / np.sqrt(2), rel=0.02)
+
+    def test_state_carries_across_uneven_chunks(self):
+        pcm = tone(700, 48000, channels=2)
+        whole = PolyphaseResampler(48000, 16000, 2, 1).process(pcm)
+        r = PolyphaseResampler(48000, 16000, 2, 1)
+        frame = 4
+        pieces = [r.process(pcm[i:i + 1001 * frame]) for i in range(0, len(pcm), 1001 * frame)]
+        assert b"".join(pieces) == whole
+
+    def test_rejects_content_above_new_nyquist(self):
+        out = PolyphaseResampler(48000, 16000).process(tone(12000, 48000))
+        assert rms(out) < 10
+
+    def test_stereo_downmix(self):
+        left = np.full(4800, 1000, dtype=np.int16)
+        right = np.full(4800, 3000, dtype=np.int16)
+        pcm = np.stack([left, right], axis=1).tobytes()
+        out = np.frombuffer(PolyphaseResampler(48000, 48000, 2, 1).process(pcm), dtype=np.int16)
+        assert out.size == 4800
+        assert out[100:].min() == out[100:].max() == 2000
+
+    def test_mono_upmix(self):
+        out = PolyphaseResampler(24000, 48000, 1, 2).process(tone(440, 24000))
+        frames = np.frombuffer(out, dtype=np.int16).reshape(-1, 2)
+        assert frames.shape[0] == 48000
+        assert np.array_equal(frames[:, 0], frames[:, 1])
+
+    def test_passthrough(self):
+        r = PolyphaseResampler(16000, 16000)
+        pcm = tone(300, 16000, 0.1)
+        assert r.process(pcm) is pcm
+        assert r.latency_ms == 0
+
+    def test_reset_clears_history(self):
+        r = PolyphaseResampler(48000, 16000)
+        first = r.process(tone(500, 48000, 0.1))
+        r.process(tone(900, 48000, 0.1))
+        r.reset()
+        assert r.process(tone(500, 48000, 0.1)) == first
+
+    def test_invalid_channel_mapping(self):
+        with pytest.raises(ValueError):
+            PolyphaseResampler(48000, 16000, 2, 4)
+
+
+class FakeDevicePyAudio:
+    def __init__(self, rate, max_channels, mono_ok=True):
+        self.info = {"index": 0, "defaultSampleRate": float(rate),
+                     "maxInputChannels": max_channels, "maxOutputChannels": max_channels}
+        self.mono_ok = mono_ok
+
+    def get_device_info_by_index(self, index):
+        return self.info
+
+    def get_default_input_device_info(self):
+        return self.info
+
+    def get_default_output_device_info(self):
+        return self.info
+
+    def is_format_supported(self, rate, **kwargs):
+        channels = kwargs.get("input_channels", kwargs.get("output_channels"))
+        if channels == 1 and not self.mono_ok:
+            raise ValueError("Invalid number of channels")
+        return True
+
+
+class TestNativeFormat:
+    """Tests for device format negotiation."""
+
+    def test_reports_device_rate(self):
+        assert native_format(FakeDevicePyAudio(48000, 2), 0) == (48000, 1)
+
+    def test_stereo_only_device(self):
+        assert native_format(FakeDevicePyAudio(44100, 2, mono_ok=False), output=True) == (44100, 2)
+
+    def test_query_failure_falls_back(self):
+        class Broken:
+            def get_default_input_device_info(self):
+                raise IOError("no device")
+        assert native_format(Broken(), fallback_rate=16000) == (16000, 1)
@@ -20,6 +20,29 @@ MODULES = {
     "web": "test_web_agent.py",
     "auth": "test_authenticator.py",
     "tools": "test_ada_tools.py",
+    "vad": "test_vad.py",
+    "capture": "test_audio_capture.py",
+    "gate": "test_speech_gate.py",
+    "playback": "test_audio_playback.py",
+    "barge_in": "test_barge_in.py",
+    "aec": "test_echo_canceller.py",
+    "resampler": "test_resampler.py",
+    "visualizer": "test_visualizer_feed.py",
+    "uplink": "test_uplink.py",
+    "sender": "test_realtime_sender.py",
+    "frames": "test_frame_slot.py",
+    "scene": "test_scene_change.py",
+    "screen": "test_screen_capture.py",
+    "camera": "test_camera_encoder.py",
+    "broker": "test_camera_broker.py",
+    "video_flow": "test_video_flow.py",
+    "resume": "test_session_resumption.py",
+    "standby": "test_live_standby.py",
+    "tool_profiles": "test_tool_profiles.py",
+    "agents": "test_agent_registry.py",
+    "imports": "test_import_budget.py",
+    "tool_registry": "test_tool_registry.py",
+    "tool_executor": "test_tool_executor.py",
 }
 
 TESTS_DIR = Path(__file__).parent
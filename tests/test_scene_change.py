@@ -0,0 +1,97 @@
+"""
+Tests for scene-change gating of the vision uplink.
+"""
+import numpy as np
+import pytest
+
+from scene_change import SceneChangeDetector, downscale_gray
+from frame_slot import FrameSlot
+
+
+def scene(seed=0, size=(480, 640)):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (*size, 3), dtype=np.uint8)
+
+
+class TestDownscale:
+    """Tests for the NumPy grayscale reduction."""
+
+    def test_bgr_to_small_gray(self):
+        gray = downscale_gray(scene(), width=64)
+        assert gray.ndim == 2
+        assert gray.shape == (48, 64)
+        assert gray.dtype == np.float32
+
+    def test_luma_weights_bgr_order(self):
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        frame[..., 2] = 255  # Red in BGR
+        gray = downscale_gray(frame, width=8)
+        assert gray[0, 0] == pytest.approx(0.299 * 255, abs=0.5)
+
+
+class TestSceneChangeDetector:
+    """Tests for the send/skip decision."""
+
+    def test_first_frame_sent(self):
+        detector = SceneChangeDetector(min_interval=0)
+        assert detector.update(downscale_gray(scene()), now=0.0)
+        assert detector.counts["first"] == 1
+
+    def test_static_scene_skipped(self):
+        detector = SceneChangeDetector(min_interval=0, keyframe_period=0)
+        gray = downscale_gray(scene())
+        detector.update(gray, now=0.0)
+        noisy = gray + np.random.default_rng(1).normal(0, 2, gray.shape).astype(np.float32)
+        sent = [detector.update(noisy, now=float(t)) for t in range(1, 100)]
+        assert not any(sent)
+        assert detector.get_stats()["skipped"] == 99
+
+    def test_change_detected(self):
+        detector = SceneChangeDetector(min_interval=0)
+        detector.update(downscale_gray(scene(0)), now=0.0)
+        assert detector.update(downscale_gray(scene(1)), now=1.0)
+        assert detector.counts["change"] == 1
+        assert detector.last_change == 1.0
+
+    def test_min_interval(self):
+        detector = SceneChangeDetector(min_interval=2.0)
+        detector.update(downscale_gray(scene(0)), now=0.0)
+        assert not detector.update(downscale_gray(scene(1)), now=1.0)
+        assert detector.counts["min_interval"] == 1
+        assert detector.update(downscale_gray(scene(1)), now=2.5)
+
+    def test_keyframe(self):
+        detector = SceneChangeDetector(min_interval=0, keyframe_period=30.0)
+        gray = downscale_gray(scene())
+        detector.update(gray, now=0.0)
+        assert not detector.update(gray, now=10.0)
+        assert detector.update(gray, now=31.0)
+        assert detector.counts["keyframe"] == 1
+        # Keyframes don't count as a scene change
+        assert detector.last_change == 0.0
+
+    def test_reset_sends_next_frame(self):
+        detector = SceneChangeDetector(min_interval=0)
+        gray = downscale_gray(scene())
+        detector.update(gray, now=0.0)
+        detector.reset()
+        assert detector.update(gray, now=0.5)
+
+
+class TestFrameSlotWithDetector:
+    """The speech-onset frame slot can use the detector instead of dHash."""
+
+    def test_static_frame_deduped(self):
+        import io
+        import PIL.Image
+
+        out = io.BytesIO()
+        PIL.Image.fromarray(scene()).save(out, format="jpeg")
+        data = out.getvalue()
+
+        slot = FrameSlot(scene_detector=SceneChangeDetector(min_interval=0, keyframe_period=0))
+        slot.update(data)
+        assert slot.take() is not None
+        slot.update(data)
+        assert slot.take() is None
+        assert slot.get_stats()["scene"]["static"] == 1
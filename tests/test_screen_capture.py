@@ -0,0 +1,122 @@
+"""
+Tests for threaded screen capture with dirty-region gating.
+"""
+import base64
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from screen_capture import ScreenCapture, BlockHasher, fit_to_token_budget
+from frame_slot import image_tokens
+
+
+def screen(width=640, height=360, value=255):
+    return np.full((height, width, 4), value, dtype=np.uint8)
+
+
+class TestTokenBudget:
+    """Tests for downscaling to an image-token budget."""
+
+    def test_small_image_unchanged(self):
+        assert fit_to_token_budget(300, 200, 258) == (300, 200)
+
+    @pytest.mark.parametrize("budget", [258, 516, 1032, 2064])
+    def test_fits_budget(self, budget):
+        width, height = fit_to_token_budget(3840, 2160, budget)
+        assert image_tokens(width, height) <= budget
+        assert abs(width / height - 3840 / 2160) < 0.01
+
+    def test_uses_budget(self):
+        # 4 tiles for 16:9 is 1536x864
+        assert fit_to_token_budget(2560, 1440, 1032)[0] >= 1500
+
+
+class TestBlockHasher:
+    """Tests for per-block hashing."""
+
+    def test_shape_with_partial_blocks(self):
+        hashes = BlockHasher(block=32).hashes(screen(100, 70))
+        assert hashes.shape == (3, 4)
+
+    def test_single_pixel_change_marks_one_block(self):
+        hasher = BlockHasher(block=32)
+        frame = screen()
+        before = hasher.hashes(frame)
+        frame[100, 200, 0] ^= 1
+        diff = before != hasher.hashes(frame)
+        assert np.count_nonzero(diff) == 1
+        assert diff[100 // 32, 200 // 32]
+
+
+class TestScreenCapture:
+    """Tests for the send/skip decision and the capture thread."""
+
+    def test_static_screen_encoded_once(self):
+        capture = ScreenCapture(keyframe_period=0)
+        frame = screen()
+        sent = [capture.process(frame, now=float(i)) for i in range(10)]
+        assert sent[0] is not None
+        assert all(s is None for s in sent[1:])
+        assert capture.get_stats()["skipped"] == 9
+
+    def test_dirty_region_sent(self):
+        capture = ScreenCapture(keyframe_period=0)
+        frame = screen()
+        capture.process(frame, now=0.0)
+        edited = frame.copy()
+        edited[40:50, 300:340, :3] = 0
+        assert capture.process(edited, now=1.0) is not None
+        left, top, right, bottom = capture.last_dirty
+        assert left <= 300 and right >= 340 and top <= 40 and bottom >= 50
+
+    def test_force_and_keyframe(self):
+        capture = ScreenCapture(keyframe_period=30.0)
+        frame = screen()
+        capture.process(frame, now=0.0)
+        assert capture.process(frame, now=1.0, force=True) is not None
+        assert capture.process(frame, now=10.0) is None
+        assert capture.process(frame, now=31.5) is not None
+
+    def test_encode_is_jpeg_within_budget(self):
+        import PIL.Image
+        import io
+
+        capture = ScreenCapture(token_budget=258)
+        jpeg = capture.encode(screen(1920, 1080))
+        img = PIL.Image.open(io.BytesIO(jpeg))
+        assert img.format == "JPEG"
+        assert image_tokens(*img.size) <= 258
+
+    def test_thread_respects_fps_and_request_frame(self):
+        grabs = []
+
+        def grabber():
+            grabs.append(time.monotonic())
+            return screen()
+
+        frames = []
+        got = threading.Event()
+
+        def on_frame(payload):
+            frames.append(payload)
+            got.set()
+
+        capture = ScreenCapture(fps=5.0, keyframe_period=0, grabber=grabber)
+        capture.start(on_frame)
+        try:
+            assert got.wait(2.0)
+            time.sleep(0.5)
+            # Static screen: only the first frame goes out
+            assert len(frames) == 1
+            assert len(grabs) <= 5
+            got.clear()
+            capture.request_frame()
+            assert got.wait(1.0)
+        finally:
+            capture.stop()
+        assert len(frames) == 2
+        assert frames[0]["mime_type"] == "image/jpeg"
+        assert base64.b64decode(frames[0]["data"])[:2] == b"\xff\xd8"
+        assert capture.get_stats()["forced"] == 1
@@ -0,0 +1,127 @@
+"""
+Tests for Live API session resumption against a local fake endpoint.
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from google.genai import types
+
+from session_resumption import SessionResumption, compression_config, HANDLE_FILE, RESUMED, FRESH
+from tests.fake_live import FakeLiveServer, use_plain_websockets
+
+MODEL = "models/test"
+CONFIG = types.LiveConnectConfig(response_modalities=["AUDIO"])
+
+
+@pytest.fixture(autouse=True)
+def plain_websockets(monkeypatch):
+    use_plain_websockets(monkeypatch)
+
+
+async def run_session(resumption, server):
+    """Connect, consume messages like AudioLoop.receive_audio, return on GoAway or after the update."""
+    async with resumption.connect(server.client(), MODEL, CONFIG) as session:
+        async for response in session.receive():
+            if response.session_resumption_update:
+                resumption.on_update(response.session_resumption_update)
+                if not server.go_away:
+                    return
+            if response.go_away:
+                resumption.on_go_away(response.go_away)
+                return
+
+
+class TestSessionResumption:
+    """Tests for handle persistence, resume and fallback."""
+
+    def test_first_connect_requests_handles_and_compression(self, tmp_path):
+        resumption = SessionResumption(lambda: tmp_path, compression=compression_config(20000, 10000))
+
+        async def run():
+            async with FakeLiveServer() as server:
+                await run_session(resumption, server)
+                return server.setups
+
+        setups = asyncio.run(run())
+        assert "sessionResumption" in setups[0]
+        assert not setups[0]["sessionResumption"].get("handle")
+        assert "contextWindowCompression" in setups[0]
+        assert resumption.last_path == FRESH
+        stored = json.loads((tmp_path / HANDLE_FILE).read_text())
+        assert stored["handle"] == "h1"
+
+    def test_reconnect_resumes_with_persisted_handle(self, tmp_path):
+        async def run():
+            async with FakeLiveServer() as server:
+                await run_session(SessionResumption(lambda: tmp_path), server)
+                # New instance: handle comes from the project directory
+                resumption = SessionResumption(lambda: tmp_path)
+                resumption.mark_disconnected()
+                await run_session(resumption, server)
+                return server.setups, resumption
+
+        setups, resumption = asyncio.run(run())
+        assert setups[1]["sessionResumption"]["handle"] == "h1"
+        assert resumption.resumed
+        assert resumption.last_path == RESUMED
+        stats = resumption.get_stats()
+        assert stats["resumes"] == 1
+        assert stats["reconnect_to_ready"]["count"] == 1
+        assert stats["reconnect_to_ready"]["mean_ms"] > 0
+
+    def test_rejected_handle_falls_back_to_fresh(self, tmp_path):
+        (tmp_path / HANDLE_FILE).write_text(json.dumps({"handle": "stale", "saved_at": time.time()}))
+        resumption = SessionResumption(lambda: tmp_path)
+
+        async def run():
+            async with FakeLiveServer(rejected_handles={"stale"}) as server:
+                with pytest.raises(Exception):
+                    await run_session(resumption, server)
+                assert resumption.handle is None
+                await run_session(resumption, server)
+                return server.setups
+
+        setups = asyncio.run(run())
+        assert setups[0]["sessionResumption"]["handle"] == "stale"
+        assert not setups[1]["sessionResumption"].get("handle")
+        assert not resumption.resumed
+        assert resumption.get_stats()["resume_failures"] == 1
+
+    def test_go_away_reconnect(self, tmp_path):
+        resumption = SessionResumption(lambda: tmp_path)
+
+        async def run():
+            async with FakeLiveServer(go_away=True) as server:
+                await run_session(resumption, server)
+                await run_session(resumption, server)
+                return server.setups
+
+        setups = asyncio.run(run())
+        assert resumption.go_aways == 2
+        assert setups[1]["sessionResumption"]["handle"] == "h1"
+        assert resumption.get_stats()["reconnect_to_ready"]["count"] == 1
+
+    def test_handle_per_project(self, tmp_path):
+        project = {"path": tmp_path / "a"}
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        resumption = SessionResumption(lambda: project["path"])
+        resumption.on_update(types.LiveServerSessionResumptionUpdate(new_handle="ha", resumable=True))
+        assert resumption.handle == "ha"
+        project["path"] = tmp_path / "b"
+        assert resumption.handle is None
+        project["path"] = tmp_path / "a"
+        assert resumption.handle == "ha"
+
+    def test_expired_or_unresumable_handle_ignored(self, tmp_path):
+        (tmp_path / HANDLE_FILE).write_text(json.dumps({"handle": "old", "saved_at": time.time() - 3 * 3600}))
+        resumption = SessionResumption(lambda: tmp_path)
+        assert resumption.handle is None
+        resumption.on_update(types.LiveServerSessionResumptionUpdate(new_handle="x", resumable=False))
+        assert resumption.handle is None
+
+    def test_disabled_sends_no_resumption(self):
+        resumption = SessionResumption(enabled=False)
+        assert resumption.config_for(CONFIG).session_resumption is None
@@ -0,0 +1,65 @@
+"""
+Tests for uplink silence suppression.
+"""
+import pytest
+
+from speech_gate import SpeechGate
+from vad import VADResult
+
+
+def vad(is_speech):
+    return VADResult(is_speech=is_speech, speech_started=False, speech_ended=False,
+                     rms=0.0, noise_floor=0.0, threshold=0.0)
+
+
+def chunk(i):
+    return bytes([i]) * 8
+
+
+class TestSpeechGate:
+    """Tests for the SpeechGate state machine."""
+
+    def test_silence_is_suppressed(self):
+        gate = SpeechGate(preroll_ms=0)
+        for i in range(10):
+            assert gate.process(chunk(i), vad(False)) == ([], False)
+        assert gate.get_stats()["chunks_suppressed"] == 10
+
+    def test_preroll_sent_with_first_speech_chunk(self):
+        # 1024-sample chunks at 16 kHz are 64 ms -> 192 ms is 3 chunks
+        gate = SpeechGate(preroll_ms=192)
+        for i in range(5):
+            gate.process(chunk(i), vad(False))
+        out, end = gate.process(chunk(5), vad(True))
+        assert out == [chunk(2), chunk(3), chunk(4), chunk(5)]
+        assert not end
+
+    def test_end_of_stream_after_speech(self):
+        gate = SpeechGate(preroll_ms=0)
+        gate.process(chunk(1), vad(True))
+        assert gate.process(chunk(2), vad(True)) == ([chunk(2)], False)
+        assert gate.process(chunk(3), vad(False)) == ([chunk(3)], True)
+        # Back to suppressing; end-of-stream is emitted once
+        assert gate.process(chunk(4), vad(False)) == ([], False)
+        stats = gate.get_stats()
+        assert stats["utterances"] == 1
+        assert stats["stream_ends"] == 1
+
+    def test_memoryview_chunks_are_copied(self):
+        gate = SpeechGate(preroll_ms=64)
+        buf = bytearray(chunk(1))
+        gate.process(memoryview(buf), vad(False))
+        buf[:] = chunk(9)
+        out, _ = gate.process(chunk(2), vad(True))
+        assert out[0] == chunk(1)
+
+    def test_disabled_gate_passes_everything(self):
+        gate = SpeechGate(enabled=False)
+        assert gate.process(chunk(1), vad(False)) == ([chunk(1)], False)
+
+    def test_close_stream_mid_utterance(self):
+        gate = SpeechGate()
+        assert not gate.close_stream()
+        gate.process(chunk(1), vad(True))
+        assert gate.close_stream()
+        assert not gate.is_open
@@ -0,0 +1,320 @@
+"""
+Tests for the tool executor: tool calls and confirmations run beside
+AudioLoop.receive_audio, which keeps reading the session meanwhile.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from tool_executor import ToolExecutor, TIMED_OUT
+from tool_profiles import ToolGroup, ToolProfiles
+from tool_registry import ToolRegistry, ToolSpec
+
+LIGHT = {
+    "name": "control_light",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {"target": {"type": "STRING"}, "action": {"type": "STRING"}},
+        "required": ["target", "action"],
+    },
+}
+
+
+class Session:
+    """Live session stand-in: scripted turns in, tool responses out."""
+
+    def __init__(self, turns=(), fail_send=False):
+        self.turns = list(turns)
+        self.fail_send = fail_send
+        self.responses = []
+        self.responded = asyncio.Event()
+        self.texts = []
+        self.closed_after = None
+
+    async def _turn(self, messages):
+        # Each message waits for a delay in seconds or for an event
+        for wait, message in messages:
+            if isinstance(wait, asyncio.Event):
+                await wait.wait()
+            else:
+                await asyncio.sleep(wait)
+            yield message
+
+    def receive(self):
+        if self.turns:
+            return self._turn(self.turns.pop(0))
+        return self._turn([(3600, None)])
+
+    async def send_tool_response(self, function_responses):
+        if self.fail_send:
+            raise ConnectionError("session closed")
+        if self.closed_after is not None:
+            raise ConnectionError("session closed")
+        self.responses.append(function_responses)
+        self.responded.set()
+
+    async def send(self, input, end_of_turn=False):
+        self.texts.append(input)
+
+    async def close(self):
+        # Responses that made it out before the session was closed
+        self.closed_after = list(self.responses)
+
+
+def tool_call(*calls):
+    return types.LiveServerMessage(tool_call=types.LiveServerToolCall(function_calls=[
+        types.FunctionCall(id=call_id, name=name, args=args) for call_id, name, args in calls
+    ]))
+
+
+TURN_COMPLETE = types.LiveServerMessage(server_content=types.LiveServerContent(turn_complete=True))
+
+
+def audio(chunk):
+    return types.LiveServerMessage(server_content=types.LiveServerContent(model_turn=types.Content(
+        parts=[types.Part(inline_data=types.Blob(data=chunk, mime_type="audio/pcm;rate=24000"))]
+    )))
+
+
+class TestToolExecutor:
+    def test_slow_message_does_not_hold_up_the_next(self):
+        async def handle(calls):
+            await asyncio.sleep(calls[0])
+            return [f"done {calls[0]}"]
+
+        async def run():
+            executor = ToolExecutor(handle)
+            worker = asyncio.create_task(executor.run())
+            session = Session()
+            executor.submit(session, [0.5])
+            executor.submit(session, [0.01])
+            await session.responded.wait()
+            first = list(session.responses)
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+            return first, executor
+
+        first, executor = asyncio.run(run())
+        assert first == [["done 0.01"]]
+        stats = executor.get_stats()
+        assert stats["submitted"] == 2 and stats["max_in_flight"] == 2
+        # Stopping the worker cancels the call still running
+        assert stats["in_flight"] == 0 and stats["sent"] == 1
+
+    def test_response_for_a_closed_session_is_dropped(self):
+        async def handle(calls):
+            return ["done"]
+
+        async def run():
+            executor = ToolExecutor(handle)
+            worker = asyncio.create_task(executor.run())
+            executor.submit(Session(fail_send=True), ["call"])
+            await asyncio.sleep(0.05)
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+            return executor.get_stats()
+
+        stats = asyncio.run(run())
+        assert stats["dropped"] == 1 and stats["sent"] == 0
+
+
+class TestReceiveLoop:
+    """AudioLoop.receive_audio with the executor (no audio devices needed)."""
+
+    def make_loop(self, session, confirmation_timeout):
+        ada = pytest.importorskip("ada")
+
+        class Handlers:
+            def __init__(self):
+                self.calls = []
+
+            async def light(self, target, action):
+                self.calls.append((target, action))
+                return {"result": f"{action} {target}"}
+
+        handlers = Handlers()
+        requests = []
+        played = []
+
+        loop = ada.AudioLoop.__new__(ada.AudioLoop)
+        loop.session = session
+        loop.tool_registry = ToolRegistry([ToolSpec(LIGHT, "light", "smart_home")]).bind(handlers)
+        loop.tool_executor = ToolExecutor(loop._handle_function_calls, resumed_session=loop._resumed_session)
+        loop.permissions = {}
+        loop._pending_confirmations = {}
+        loop.confirmation_timeout = confirmation_timeout
+        loop.on_tool_confirmation = requests.append
+        loop.on_audio_data = None
+        loop.on_transcription = None
+        loop.resumption = SimpleNamespace(on_update=lambda update: None)
+        loop.barge_in = SimpleNamespace(accept_audio=lambda: True, on_model_turn_end=lambda: None)
+        # Each chunk notes whether a confirmation was open when it was played
+        loop.audio_player = SimpleNamespace(
+            write=lambda data: played.append((data, loop.tool_executor.pending_confirmations)),
+            flush=lambda: 0,
+        )
+        loop.flush_chat = lambda: None
+        loop._in_turn = False
+        loop._tools_stale = False
+        loop._go_away = False
+        loop.standby = None
+        loop._conversation = 1
+        loop._session_ready = asyncio.Event()
+        loop._session_ready.set()
+        loop.stop_event = asyncio.Event()
+        return loop, handlers, requests, played
+
+    def reconnect_during_call(self, resumed):
+        """The session closes while a tool call runs; a resumed or fresh session replaces it."""
+        issuing = Session(turns=[[(0, tool_call(("c1", "control_light", {"target": "lamp", "action": "turn_on"})))]])
+        loop, handlers, _, _ = self.make_loop(issuing, confirmation_timeout=30)
+        loop.permissions = {"control_light": False}
+        release = asyncio.Event()
+        light = handlers.light
+
+        async def slow_light(target, action):
+            await release.wait()
+            return await light(target, action)
+
+        handlers.light = slow_light
+        loop.tool_registry = ToolRegistry([ToolSpec(LIGHT, "light", "smart_home")]).bind(handlers)
+        successor = Session()
+
+        async def run():
+            worker = asyncio.create_task(loop.tool_executor.run())
+            receiver = asyncio.create_task(loop.receive_audio())
+            while loop.tool_executor.in_flight == 0:
+                await asyncio.sleep(0.01)
+            # Connection drops mid-call; the reconnect is not ready yet when the call finishes
+            receiver.cancel()
+            await issuing.close()
+            loop._session_ready.clear()
+            loop.session = successor
+            if not resumed:
+                loop._conversation += 1
+            release.set()
+            await asyncio.sleep(0.1)
+            loop._session_ready.set()
+            while loop.tool_executor.in_flight:
+                await asyncio.sleep(0.01)
+            worker.cancel()
+            await asyncio.gather(receiver, worker, return_exceptions=True)
+
+        asyncio.run(run())
+        return issuing, successor, loop.tool_executor.get_stats()
+
+    def test_resumed_session_gets_the_closed_sessions_responses(self):
+        issuing, successor, stats = self.reconnect_during_call(resumed=True)
+        assert issuing.responses == []
+        (response,) = successor.responses[0]
+        assert response.id == "c1" and response.response == {"result": "turn_on lamp"}
+        assert stats["redelivered"] == 1 and stats["sent"] == 1 and stats["dropped"] == 0
+
+    def test_fresh_session_does_not_get_them(self):
+        issuing, successor, stats = self.reconnect_during_call(resumed=False)
+        assert issuing.responses == [] and successor.responses == []
+        assert stats["dropped"] == 1 and stats["redelivered"] == 0
+
+    def test_audio_keeps_flowing_during_confirmation_wait(self):
+        chunks = [bytes([i]) * 960 for i in range(20)]
+        session = Session(turns=[
+            [(0, tool_call(("c1", "control_light", {"target": "lamp", "action": "turn_on"})))],
+            [(0.01, audio(chunk)) for chunk in chunks],
+        ])
+        loop, handlers, requests, played = self.make_loop(session, confirmation_timeout=30)
+
+        async def run():
+            worker = asyncio.create_task(loop.tool_executor.run())
+            receiver = asyncio.create_task(loop.receive_audio())
+            async def all_played():
+                while len(played) < len(chunks):
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(all_played(), 5)
+            # All model audio arrived while the user had not answered yet
+            assert session.responses == [] and handlers.calls == []
+            loop.resolve_tool_confirmation(requests[0]["id"], True)
+            await asyncio.wait_for(session.responded.wait(), 1)
+            for task in (receiver, worker):
+                task.cancel()
+            await asyncio.gather(receiver, worker, return_exceptions=True)
+
+        asyncio.run(run())
+        assert [data for data, _ in played] == chunks
+        assert all(pending == 1 for _, pending in played)
+        assert handlers.calls == [("lamp", "turn_on")]
+        (response,) = session.responses[0]
+        assert response.id == "c1" and response.response == {"result": "turn_on lamp"}
+        assert loop.tool_executor.get_stats()["confirmations"]["confirmed"] == 1
+
+    def test_unanswered_confirmation_times_out(self):
+        session = Session(turns=[[(0, tool_call(("c1", "control_light", {"target": "lamp", "action": "turn_on"})))]])
+        loop, handlers, requests, _ = self.make_loop(session, confirmation_timeout=0.05)
+
+        async def run():
+            worker = asyncio.create_task(loop.tool_executor.run())
+            receiver = asyncio.create_task(loop.receive_audio())
+            await asyncio.wait_for(session.responded.wait(), 1)
+            for task in (receiver, worker):
+                task.cancel()
+            await asyncio.gather(receiver, worker, return_exceptions=True)
+
+        asyncio.run(run())
+        assert handlers.calls == []
+        assert "did not confirm" in session.responses[0][0].response["result"]
+        assert loop._pending_confirmations == {}
+        stats = loop.tool_executor.get_stats()
+        assert stats["confirmations"][TIMED_OUT] == 1 and stats["confirmations_pending"] == 0
+
+    def test_sign_in_reconnect_waits_for_the_tool_response(self):
+        ada = pytest.importorskip("ada")
+        session = Session()
+        session.turns = [[
+            (0, tool_call(("auth", "google_authenticate", {}))),
+            # The model answers the tool response, then ends the turn
+            (session.responded, TURN_COMPLETE),
+        ]]
+        loop, _, _, _ = self.make_loop(session, confirmation_timeout=30)
+
+        signed_in = {"value": False}
+
+        async def authenticate():
+            signed_in["value"] = True
+            return {"success": True}
+
+        async def aget(name):
+            return SimpleNamespace(authenticate=authenticate)
+
+        loop.agents = SimpleNamespace(aget=aget)
+        auth = {"name": "google_authenticate", "parameters": {"type": "OBJECT", "properties": {}}}
+        workspace = {"name": "google_list_events", "parameters": {"type": "OBJECT", "properties": {}}}
+        loop.tool_profiles = ToolProfiles([
+            ToolGroup("google_auth", [auth]),
+            ToolGroup("google_workspace", [workspace], available=lambda: signed_in["value"]),
+        ])
+        loop.tool_profiles.config_for(types.LiveConnectConfig())
+        loop.tool_registry = ToolRegistry([ToolSpec(auth, "handle_google_authenticate", "google_auth", timeout=None)]).bind(loop)
+        loop.permissions = {"google_authenticate": False}
+
+        async def run():
+            worker = asyncio.create_task(loop.tool_executor.run())
+            receiver = asyncio.create_task(loop.receive_audio())
+
+            async def closed():
+                while session.closed_after is None:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(closed(), 2)
+            for task in (receiver, worker):
+                task.cancel()
+            await asyncio.gather(receiver, worker, return_exceptions=True)
+
+        asyncio.run(run())
+        # The reconnect happened, after the sign-in's response was delivered
+        (response,) = session.closed_after[0]
+        assert response.id == "auth" and response.response == {"success": True}
+        assert loop._go_away and not loop._tools_stale
+        assert "Successfully authenticated" in session.texts[0]
+        assert loop.tool_executor.get_stats()["dropped"] == 0
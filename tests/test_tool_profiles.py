@@ -0,0 +1,94 @@
+"""
+Tests for per-session tool declarations (profiles and agent availability).
+"""
+from google.genai import types
+
+from tool_profiles import (
+    ToolGroup, ToolProfiles, benchmark, estimate_tokens,
+    CORE, SMART_HOME, GOOGLE_AUTH, GOOGLE_WORKSPACE, N8N, WHATSAPP,
+)
+
+CONFIG = types.LiveConnectConfig(response_modalities=["AUDIO"])
+
+
+def decl(name):
+    return {"name": name, "description": f"{name} tool", "parameters": {"type": "OBJECT", "properties": {}}}
+
+
+def make_groups(state):
+    return [
+        ToolGroup(CORE, [decl("read_file"), decl("write_file")]),
+        ToolGroup(SMART_HOME, [decl("control_light")]),
+        ToolGroup(GOOGLE_AUTH, [decl("google_authenticate")], lambda: not state["google"]),
+        ToolGroup(GOOGLE_WORKSPACE, [decl("google_list_events"), decl("google_send_email")], lambda: state["google"]),
+        ToolGroup(N8N, [decl("n8n_connect")], lambda: state["n8n"]),
+        ToolGroup(WHATSAPP, [decl("wa_send_message")]),
+    ]
+
+
+def names(config):
+    return [d.name for d in config.tools[-1].function_declarations]
+
+
+class TestToolProfiles:
+    """Tests for selecting and rebuilding the declared tool set."""
+
+    def test_unavailable_agents_are_pruned(self):
+        profiles = ToolProfiles(make_groups({"google": False, "n8n": False}))
+        declared = names(profiles.config_for(CONFIG))
+        assert "google_authenticate" in declared
+        assert "google_list_events" not in declared
+        assert "n8n_connect" not in declared
+        stats = profiles.get_stats()
+        assert stats["unavailable_groups"] == [GOOGLE_WORKSPACE, N8N]
+        assert stats["pruned_tools"] == 3
+
+    def test_profiles_select_groups(self):
+        state = {"google": True, "n8n": True}
+        office = names(ToolProfiles(make_groups(state), ["office"]).config_for(CONFIG))
+        home = names(ToolProfiles(make_groups(state), ["home"]).config_for(CONFIG))
+        assert "google_send_email" in office and "control_light" not in office
+        assert "control_light" in home and "google_send_email" not in home
+        both = names(ToolProfiles(make_groups(state), ["office", "home"]).config_for(CONFIG))
+        assert set(office) | set(home) == set(both)
+
+    def test_builtin_tools_kept(self):
+        profiles = ToolProfiles(make_groups({"google": False, "n8n": False}), builtin_tools=[{"google_search": {}}])
+        config = profiles.config_for(CONFIG)
+        assert config.tools[0].google_search is not None
+        # The base config is not modified
+        assert CONFIG.tools is None
+
+    def test_changed_after_sign_in(self):
+        state = {"google": False, "n8n": False}
+        profiles = ToolProfiles(make_groups(state))
+        assert not profiles.changed()  # Nothing declared yet
+        profiles.config_for(CONFIG)
+        assert not profiles.changed()
+        state["google"] = True
+        assert profiles.changed()
+        declared = names(profiles.config_for(CONFIG))
+        assert "google_send_email" in declared and "google_authenticate" not in declared
+        assert not profiles.changed()
+
+    def test_failing_check_counts_as_unavailable(self):
+        def broken():
+            raise RuntimeError("token file unreadable")
+
+        profiles = ToolProfiles([ToolGroup(CORE, [decl("read_file")]), ToolGroup(N8N, [decl("n8n_connect")], broken)])
+        assert names(profiles.config_for(CONFIG)) == ["read_file"]
+
+    def test_unknown_profile_falls_back_to_full(self):
+        profiles = ToolProfiles(make_groups({"google": True, "n8n": True}), ["garage"])
+        assert profiles.profiles == ["full"]
+        assert len(profiles.declarations()) == 7
+
+    def test_benchmark_pruned_is_smaller(self):
+        state = {"google": False, "n8n": False}
+        full = ToolProfiles([ToolGroup(g.name, g.declarations) for g in make_groups(state)])
+        pruned = ToolProfiles(make_groups(state), ["home"])
+        stats = benchmark(CONFIG, {"full": full, "pruned": pruned}, repeats=2)
+        assert stats["full"]["tools"] == 8
+        assert stats["pruned"]["tools"] < stats["full"]["tools"]
+        assert stats["pruned"]["setup_bytes"] < stats["full"]["setup_bytes"]
+        assert stats["pruned"]["tokens_est"] == estimate_tokens(pruned.declarations())
@@ -0,0 +1,318 @@
+"""
+Tests for the table-driven tool registry and AudioLoop's function call dispatch.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tool_registry import ToolRegistry, ToolSpec, ToolError, PARALLEL, SERIAL
+
+LIGHT = {
+    "name": "control_light",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "target": {"type": "STRING"},
+            "action": {"type": "STRING", "enum": ["turn_on", "turn_off", "set"]},
+            "brightness": {"type": "INTEGER"},
+            "data": {"type": "STRING"},
+        },
+        "required": ["target", "action"],
+    },
+}
+LIST = {"name": "list_things", "parameters": {"type": "OBJECT", "properties": {}}}
+
+
+class Handlers:
+    def __init__(self):
+        self.calls = []
+        self.done = asyncio.Event()
+
+    async def light(self, target, action, brightness=None, data=None):
+        self.calls.append((target, action, brightness, data))
+        return {"result": f"{action} {target}"}
+
+    async def things(self):
+        return "a, b"
+
+    async def slow(self):
+        await asyncio.sleep(5)
+
+    async def broken(self):
+        raise RuntimeError("device offline")
+
+    async def background(self):
+        await asyncio.sleep(0.01)
+        self.done.set()
+
+
+def registry(*specs):
+    handlers = Handlers()
+    return ToolRegistry(specs).bind(handlers), handlers
+
+
+class TestArgumentValidation:
+    """Validators are compiled from the schema."""
+
+    def setup_method(self):
+        self.validate = ToolSpec(LIGHT, "light", "smart_home").validate
+
+    def test_valid_and_coerced(self):
+        kwargs = self.validate({"target": "1.2.3.4", "action": "set", "brightness": 40.0, "data": {"a": 1}, "extra": 1})
+        assert kwargs == {"target": "1.2.3.4", "action": "set", "brightness": 40, "data": '{"a": 1}'}
+        assert isinstance(kwargs["brightness"], int)
+
+    def test_missing_required(self):
+        with pytest.raises(ToolError, match="action"):
+            self.validate({"target": "lamp"})
+
+    def test_wrong_type_and_enum(self):
+        with pytest.raises(ToolError, match="brightness"):
+            self.validate({"target": "lamp", "action": "set", "brightness": "bright"})
+        with pytest.raises(ToolError, match="brightness"):
+            self.validate({"target": "lamp", "action": "set", "brightness": True})
+        with pytest.raises(ToolError, match="one of"):
+            self.validate({"target": "lamp", "action": "explode"})
+
+    def test_none_is_omitted(self):
+        assert self.validate({"target": "lamp", "action": "turn_on", "brightness": None}) == {"target": "lamp", "action": "turn_on"}
+
+
+class TestRegistry:
+    """Lookup, binding and running."""
+
+    def test_declarations_and_groups(self):
+        tools = ToolRegistry([ToolSpec(LIGHT, "light", "smart_home", concurrency=SERIAL), ToolSpec(LIST, "things", "core")])
+        assert tools.declarations() == [LIGHT, LIST]
+        assert tools.declarations("core") == [LIST]
+        assert tools.specs["control_light"].concurrency == SERIAL
+        assert tools.specs["list_things"].concurrency == PARALLEL
+        assert tools.specs["control_light"].permission == "control_light"
+
+    def test_duplicate_name_rejected(self):
+        with pytest.raises(ValueError):
+            ToolRegistry([ToolSpec(LIST, "things", "core"), ToolSpec(LIST, "things", "core")])
+
+    def test_bind_checks_handlers(self):
+        with pytest.raises(ValueError, match="No handler"):
+            ToolRegistry([ToolSpec(LIST, "missing", "core")]).bind(Handlers())
+        with pytest.raises(ValueError, match="does not accept"):
+            ToolRegistry([ToolSpec(LIGHT, "things", "core")]).bind(Handlers())
+
+    def test_unknown_and_invalid_calls(self):
+        tools, _ = registry(ToolSpec(LIGHT, "light", "smart_home"))
+        with pytest.raises(ToolError, match="Unknown"):
+            tools.prepare("nope", {})
+        with pytest.raises(ToolError):
+            tools.prepare("control_light", {})
+        stats = tools.get_stats()
+        assert stats["unknown_calls"] == 1 and stats["invalid_calls"] == 1
+
+    def test_run_shapes_results(self):
+        tools, handlers = registry(ToolSpec(LIGHT, "light", "smart_home"), ToolSpec(LIST, "things", "core"))
+
+        async def run():
+            tool, kwargs = tools.prepare("control_light", {"target": "lamp", "action": "turn_on"})
+            first = await tools.run(tool, kwargs)
+            tool, kwargs = tools.prepare("list_things", None)
+            return first, await tools.run(tool, kwargs)
+
+        first, second = asyncio.run(run())
+        assert first == {"result": "turn_on lamp"}
+        assert second == {"result": "a, b"}
+        assert handlers.calls == [("lamp", "turn_on", None, None)]
+        assert tools.get_stats()["tools"]["control_light"]["calls"] == 1
+
+    def test_timeout_and_error_become_responses(self):
+        tools, _ = registry(
+            ToolSpec({"name": "slow"}, "slow", "core", timeout=0.05),
+            ToolSpec({"name": "broken"}, "broken", "core"),
+        )
+
+        async def run():
+            return [await tools.run(*tools.prepare(name, {})) for name in ("slow", "broken")]
+
+        slow, broken = asyncio.run(run())
+        assert "did not finish" in slow["error"]
+        assert "device offline" in broken["error"]
+        stats = tools.get_stats()["tools"]
+        assert stats["slow"]["timeouts"] == 1 and stats["broken"]["errors"] == 1
+
+    def test_background_answers_immediately(self):
+        tools, handlers = registry(ToolSpec({"name": "browse"}, "background", "core", background="Started."))
+
+        async def run():
+            response = await tools.run(*tools.prepare("browse", {}))
+            assert not handlers.done.is_set()
+            await asyncio.wait_for(handlers.done.wait(), 1)
+            return response
+
+        assert asyncio.run(run()) == {"result": "Started."}
+
+
+class TestAdaToolTable:
+    """The tool table in ada.py drives declarations and dispatch."""
+
+    def test_declarations_come_from_the_table(self):
+        ada = pytest.importorskip("ada")
+        declared = ada.tools[1]["function_declarations"]
+        assert declared == ada.TOOLS.declarations()
+        grouped = [d["name"] for g in ada.tool_groups(SimpleNamespace(peek=lambda n: None, get=lambda n: None)) for d in g.declarations]
+        assert sorted(grouped) == sorted(d["name"] for d in declared)
+
+    def test_every_handler_matches_its_schema(self):
+        ada = pytest.importorskip("ada")
+        # Binding to the class checks every handler name and signature without opening devices
+        ada.TOOLS.bind(ada.AudioLoop)
+
+    def test_only_read_tools_are_parallel(self):
+        ada = pytest.importorskip("ada")
+        parallel = {name for name, spec in ada.TOOLS.specs.items() if spec.concurrency == PARALLEL}
+        assert parallel == {
+            "list_projects", "read_directory", "read_file", "list_smart_devices",
+            "google_list_events", "google_read_spreadsheet", "google_list_drive_files",
+            "google_list_emails", "google_read_email", "google_read_document",
+            "n8n_list_workflows", "n8n_search_workflows", "n8n_get_workflow_info",
+            "pc_read_file", "pc_list_folder", "pc_search_files", "webhook_list",
+            "wa_check_status", "doc_list_printers", "doc_printer_status", "yahoo_list_emails",
+        }
+
+    def test_messages_to_one_agent_keep_their_order(self):
+        ada = pytest.importorskip("ada")
+
+        class WhatsApp:
+            def __init__(self):
+                self.sent = []
+
+            async def handle_wa_send_message(self, phone, message):
+                # The first message is the slowest; it must still go out first
+                await asyncio.sleep(0.1 if message == "first" else 0)
+                self.sent.append(message)
+                return {"result": "sent"}
+
+        whatsapp = WhatsApp()
+        loop = SimpleNamespace(tool_registry=ToolRegistry([ada.TOOLS.specs["wa_send_message"]]).bind(whatsapp),
+                               permissions={"wa_send_message": False})
+        loop._handle_function_call = lambda fc: ada.AudioLoop._handle_function_call(loop, fc)
+        fcs = [SimpleNamespace(id=str(i), name="wa_send_message", args={"phone": "0812", "message": text})
+               for i, text in enumerate(["first", "second", "third"])]
+        responses = asyncio.run(ada.AudioLoop._handle_function_calls(loop, fcs))
+        assert whatsapp.sent == ["first", "second", "third"]
+        assert [r.id for r in responses] == ["0", "1", "2"]
+
+    def test_dispatch(self):
+        ada = pytest.importorskip("ada")
+        tools, handlers = registry(ToolSpec(LIGHT, "light", "smart_home"))
+        confirmations = []
+
+        async def confirm(fc):
+            confirmations.append(fc.name)
+            return fc.args.get("target") != "forbidden"
+
+        loop = SimpleNamespace(tool_registry=tools, permissions={}, _confirm_tool=confirm)
+
+        def call(name, args):
+            fc = SimpleNamespace(id="1", name=name, args=args)
+            return asyncio.run(ada.AudioLoop._handle_function_call(loop, fc)).response
+
+        assert "Unknown" in call("nope", {})["error"]
+        assert "Missing" in call("control_light", {"target": "lamp"})["error"]
+        assert confirmations == []  # Invalid calls are not put to the user
+        assert call("control_light", {"target": "lamp", "action": "turn_on"}) == {"result": "turn_on lamp"}
+        assert "denied" in call("control_light", {"target": "forbidden", "action": "turn_on"})["result"]
+        loop.permissions["control_light"] = False
+        call("control_light", {"target": "lamp", "action": "turn_off"})
+        assert confirmations == ["control_light", "control_light"]
+        assert len(handlers.calls) == 2
+
+
+def _decl(name):
+    return {"name": name, "parameters": {"type": "OBJECT", "properties": {"delay": {"type": "NUMBER"}}}}
+
+
+class Timed:
+    """Handlers that sleep and log when they start and end."""
+
+    def __init__(self):
+        self.log = []
+
+    async def work(self, delay=0.2):
+        self.log.append(("start", delay))
+        await asyncio.sleep(delay)
+        self.log.append(("end", delay))
+        return f"slept {delay}"
+
+
+class TestParallelCalls:
+    """One tool_call message with several function calls."""
+
+    def setup_method(self):
+        self.ada = pytest.importorskip("ada")
+
+    def run_batch(self, specs, calls, confirm=None):
+        handlers = Timed()
+        tools = ToolRegistry(specs).bind(handlers)
+
+        async def allow(fc):
+            return True
+
+        loop = SimpleNamespace(tool_registry=tools, permissions={}, _confirm_tool=confirm or allow)
+        loop._handle_function_call = lambda fc: self.ada.AudioLoop._handle_function_call(loop, fc)
+        fcs = [SimpleNamespace(id=str(i), name=name, args=args) for i, (name, args) in enumerate(calls)]
+
+        async def run():
+            start = asyncio.get_running_loop().time()
+            responses = await self.ada.AudioLoop._handle_function_calls(loop, fcs)
+            return responses, asyncio.get_running_loop().time() - start
+
+        responses, elapsed = asyncio.run(run())
+        return responses, elapsed, handlers, tools
+
+    def test_parallel_calls_overlap_and_keep_order(self):
+        # Morning briefing: calendar, mail and weather-style reads of different latency
+        specs = [ToolSpec(_decl(n), "work", "google_workspace") for n in ("calendar", "mail", "search")]
+        calls = [("calendar", {"delay": 0.3}), ("mail", {"delay": 0.1}), ("search", {"delay": 0.2})]
+        responses, elapsed, _, tools = self.run_batch(specs, calls)
+        assert [r.id for r in responses] == ["0", "1", "2"]
+        assert [r.response["result"] for r in responses] == ["slept 0.3", "slept 0.1", "slept 0.2"]
+        assert elapsed < 0.5  # Roughly the slowest call, not the 0.6 s sum
+        stats = tools.get_stats()
+        assert stats["batches"] == 1 and stats["max_batch"] == 3
+        assert stats["batch_saved_ms"] > 200
+
+    def test_serial_calls_of_one_agent_do_not_overlap(self):
+        specs = [ToolSpec(_decl("write_a"), "work", "smart_home", concurrency=SERIAL),
+                 ToolSpec(_decl("write_b"), "work", "smart_home", concurrency=SERIAL)]
+
+        async def confirm(fc):
+            # The first call's confirmation is slower; it must still run first
+            await asyncio.sleep(0.1 if fc.id == "0" else 0)
+            return True
+
+        calls = [("write_a", {"delay": 0.11}), ("write_b", {"delay": 0.12})]
+        responses, elapsed, handlers, _ = self.run_batch(specs, calls, confirm)
+        assert handlers.log == [("start", 0.11), ("end", 0.11), ("start", 0.12), ("end", 0.12)]
+        assert elapsed >= 0.3
+
+    def test_serial_calls_of_different_agents_overlap(self):
+        specs = [ToolSpec(_decl("light"), "work", "smart_home", concurrency=SERIAL),
+                 ToolSpec(_decl("sheet"), "work", "google_workspace", concurrency=SERIAL),
+                 ToolSpec(_decl("read"), "work", "google_workspace")]
+        calls = [("light", {"delay": 0.2}), ("sheet", {"delay": 0.2}), ("read", {"delay": 0.2})]
+        responses, elapsed, _, _ = self.run_batch(specs, calls)
+        assert elapsed < 0.35
+        assert all("slept" in r.response["result"] for r in responses)
+
+    def test_denied_and_invalid_calls_release_their_slot(self):
+        specs = [ToolSpec(_decl("write_a"), "work", "core", concurrency=SERIAL)]
+
+        async def confirm(fc):
+            return fc.id != "0"
+
+        calls = [("write_a", {"delay": 0.01}), ("write_a", {"delay": "x"}), ("write_a", {"delay": 0.02})]
+        responses, elapsed, handlers, _ = self.run_batch(specs, calls, confirm)
+        assert "denied" in responses[0].response["result"]
+        assert "error" in responses[1].response
+        assert responses[2].response == {"result": "slept 0.02"}
+        assert handlers.log == [("start", 0.02), ("end", 0.02)]
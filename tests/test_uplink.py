@@ -0,0 +1,201 @@
+"""
+Tests for the priority uplink scheduler.
+"""
+import asyncio
+
+import pytest
+
+from uplink import UplinkScheduler, AUDIO, AUDIO_END, FRAME
+
+RATE = 16000
+MS = 32  # bytes per ms at 16 kHz mono int16
+
+
+def pcm(ms, value=1):
+    return bytes([value]) * (ms * MS)
+
+
+class TestUplinkScheduler:
+    """Tests for lane priority, coalescing and drop policy."""
+
+    def test_audio_before_frames(self):
+        up = UplinkScheduler(RATE)
+        up.put_frame({"mime_type": "image/jpeg", "data": "a"})
+        up.put_audio(pcm(20))
+        assert up.get_nowait().kind == AUDIO
+        assert up.get_nowait().kind == FRAME
+        assert up.get_nowait() is None
+
+    def test_frames_drop_oldest(self):
+        up = UplinkScheduler(RATE, max_frames=2)
+        for i in range(5):
+            up.put_frame(i)
+        assert [up.get_nowait().payload for _ in range(2)] == [3, 4]
+        assert up.get_stats()["frames_dropped"] == 3
+
+    def test_audio_backlog_drops_oldest(self):
+        up = UplinkScheduler(RATE, max_audio_ms=100, min_batch_ms=1000, max_batch_ms=1000)
+        up.put_audio(pcm(64, 1))
+        up.put_audio(pcm(64, 2))
+        assert up.audio_depth_ms == pytest.approx(100)
+        item = up.get_nowait()
+        assert item.payload == pcm(36, 1) + pcm(64, 2)
+        assert up.get_stats()["audio_dropped_ms"] == pytest.approx(28)
+
+    def test_batch_grows_with_send_latency(self):
+        up = UplinkScheduler(RATE, min_batch_ms=20, max_batch_ms=100)
+        for _ in range(20):
+            up.put_audio(pcm(10))
+        first = up.get_nowait()
+        assert first.duration_ms == pytest.approx(20)
+        up.record_send(first, 0.045)  # 45 ms sends -> up to 90 ms batches
+        second = up.get_nowait()
+        assert second.duration_ms == pytest.approx(90)
+        up.record_send(second, 0.5)
+        assert up.batch_ms == 100
+
+    def test_queued_chunks_are_never_split(self):
+        up = UplinkScheduler(RATE, min_batch_ms=20, max_batch_ms=100)
+        for value in (1, 2, 3):
+            up.put_audio(pcm(64, value))
+        # A chunk longer than the batch goes out whole, not as 20/20/20/4 ms
+        items = [up.get_nowait() for _ in range(3)]
+        assert [item.payload for item in items] == [pcm(64, 1), pcm(64, 2), pcm(64, 3)]
+        up.record_send(items[-1], 0.045)
+        # Chunks are merged only while the whole next one fits in the batch
+        for value in (4, 5, 6):
+            up.put_audio(pcm(40, value))
+        assert up.get_nowait().payload == pcm(40, 4) + pcm(40, 5)
+        assert up.get_nowait().payload == pcm(40, 6)
+
+    def test_stream_end_keeps_order(self):
+        up = UplinkScheduler(RATE, min_batch_ms=1000, max_batch_ms=1000)
+        up.put_audio(pcm(64, 1))
+        up.put_audio_end()
+        up.put_audio(pcm(64, 2))
+        kinds = [up.get_nowait() for _ in range(3)]
+        assert [k.kind for k in kinds] == [AUDIO, AUDIO_END, AUDIO]
+        assert kinds[0].payload == pcm(64, 1)
+
+    def test_producers_never_block(self):
+        up = UplinkScheduler(RATE, max_audio_ms=500)
+        for _ in range(1000):
+            up.put_audio(pcm(64))
+            up.put_frame("f")
+        stats = up.get_stats()
+        assert stats["audio_depth_ms"] <= 500
+        assert stats["frame_depth"] == 2
+
+    async def test_get_waits_for_data(self):
+        up = UplinkScheduler(RATE)
+        getter = asyncio.create_task(up.get())
+        await asyncio.sleep(0.01)
+        assert not getter.done()
+        up.put_audio(pcm(20))
+        item = await asyncio.wait_for(getter, timeout=1)
+        assert item.kind == AUDIO
+        assert up.get_stats()["queue_delay"]["count"] == 1
+
+    async def test_slow_sender_does_not_stall_capture(self):
+        """A stalled websocket grows the batch instead of blocking the producer."""
+        up = UplinkScheduler(RATE)
+        sent = []
+
+        async def sender():
+            while True:
+                item = await up.get()
+                await asyncio.sleep(0.05)
+                up.record_send(item, 0.05)
+                sent.append(item.duration_ms)
+
+        task = asyncio.create_task(sender())
+        for _ in range(20):
+            up.put_audio(pcm(16))
+            await asyncio.sleep(0.016)
+        await asyncio.sleep(0.2)
+        task.cancel()
+        assert sum(sent) == pytest.approx(20 * 16, abs=1)
+        assert max(sent) > 20
+
+
+class TestReconnectBuffer:
+    """Tests for buffering speech across reconnects and flushing it in catch-up batches."""
+
+    def test_disconnected_keeps_reconnect_buffer(self):
+        up = UplinkScheduler(RATE, max_audio_ms=500, reconnect_buffer_ms=2000)
+        up.set_connected(False)
+        for i in range(30):
+            up.put_audio(pcm(100, i))
+        stats = up.get_stats()
+        assert stats["audio_depth_ms"] == pytest.approx(2000)
+        assert stats["gap_dropped_ms"] == pytest.approx(1000)
+        # Newest speech is kept
+        up.set_connected(True)
+        item = up.get_nowait()
+        assert item.payload[:MS] == pcm(1, 10)
+
+    def test_reconnect_flushes_in_catchup_batches(self):
+        up = UplinkScheduler(RATE, min_batch_ms=20, max_batch_ms=100, catchup_batch_ms=1000)
+        up.set_connected(False)
+        for _ in range(25):
+            up.put_audio(pcm(100))
+        up.set_connected(True)
+        up.put_audio(pcm(100))  # Live speech after the reconnect
+        sizes = [up.get_nowait().duration_ms for _ in range(3)]
+        # The last catch-up batch also takes the live speech queued behind the backlog
+        assert sizes == [1000, 1000, 600]
+        # Backlog flushed: back to latency-sized batches
+        for _ in range(5):
+            up.put_audio(pcm(10))
+        assert up.get_nowait().duration_ms == pytest.approx(20)
+        stats = up.get_stats()
+        assert stats["gaps"] == 1
+        assert stats["gap_buffered_ms"] == pytest.approx(2500)
+        assert stats["catchup"]["count"] == 1
+        assert stats["catchup_backlog_ms"] == 0
+
+    def test_initial_connect_is_not_a_gap(self):
+        up = UplinkScheduler(RATE, connected=False)
+        up.put_audio(pcm(100))
+        up.set_connected(True)
+        stats = up.get_stats()
+        assert stats["gaps"] == 0
+        assert stats["gap"]["count"] == 0
+        assert up.get_nowait().duration_ms == pytest.approx(100)
+
+    def test_requeue_keeps_order(self):
+        up = UplinkScheduler(RATE, min_batch_ms=100, max_batch_ms=100)
+        up.put_audio(pcm(100, 1))
+        up.put_audio_end()
+        first = up.get_nowait()
+        up.requeue(first)
+        assert up.audio_depth_ms == pytest.approx(100)
+        assert up.get_nowait().payload == pcm(100, 1)
+        assert up.get_nowait().kind == AUDIO_END
+        assert up.get_stats()["requeued"] == 1
+
+    async def test_backlog_sent_in_compressed_time(self):
+        """10 s of buffered speech reaches the new session in a fraction of 10 s."""
+        up = UplinkScheduler(RATE, reconnect_buffer_ms=10000)
+        up.set_connected(False)
+        for _ in range(100):
+            up.put_audio(pcm(100))
+        up.set_connected(True)
+        sent = []
+
+        async def sender():
+            while True:
+                item = await up.get()
+                await asyncio.sleep(0.01)
+                up.record_send(item, 0.01)
+                sent.append(item.duration_ms)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        task = asyncio.create_task(sender())
+        while sum(sent) < 10000:
+            await asyncio.sleep(0.005)
+        elapsed = loop.time() - start
+        task.cancel()
+        assert len(sent) == 10
+        assert elapsed < 1.0
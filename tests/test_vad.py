@@ -0,0 +1,116 @@
+"""
+Tests for the Voice Activity Detection engine.
+Uses synthetic PCM so no microphone is required.
+"""
+import pytest
+import numpy as np
+
+from vad import EnergyVAD, VADResult, create_vad, legacy_rms
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+
+def make_chunk(amplitude, freq=220.0, noise=0.0, seed=0):
+    """Build one 1024-sample int16 chunk: a sine tone plus optional white noise."""
+    t = np.arange(CHUNK) / SAMPLE_RATE
+    signal = amplitude * np.sin(2 * np.pi * freq * t)
+    if noise:
+        signal += np.random.default_rng(seed).standard_normal(CHUNK) * noise
+    return np.clip(signal, -32768, 32767).astype(np.int16).tobytes()
+
+
+def feed(vad, chunk, n):
+    return [vad.process(chunk) for _ in range(n)]
+
+
+class TestEnergyFeatures:
+    """Tests for the vectorized feature extraction."""
+
+    def test_rms_matches_legacy(self):
+        """Vectorized RMS agrees with the old struct/sum implementation."""
+        chunk = make_chunk(3000, noise=500)
+        result = EnergyVAD().process(chunk)
+        assert isinstance(result, VADResult)
+        assert abs(result.rms - legacy_rms(chunk)) <= 1
+
+    def test_accepts_memoryview(self):
+        """Chunks can be passed as memoryview slices without copying."""
+        chunk = bytearray(make_chunk(3000))
+        result = EnergyVAD().process(memoryview(chunk))
+        assert result.rms > 0
+
+    def test_empty_chunk(self):
+        result = EnergyVAD().process(b"")
+        assert result.rms == 0
+        assert not result.is_speech
+
+    def test_zcr_only_when_enabled(self):
+        chunk = make_chunk(3000, freq=1000)
+        assert EnergyVAD().process(chunk).zcr is None
+        zcr = EnergyVAD(use_zcr=True).process(chunk).zcr
+        # A 1 kHz tone at 16 kHz crosses zero twice per period
+        assert zcr == pytest.approx(2 * 1000 / SAMPLE_RATE, rel=0.1)
+
+
+class TestSpeechTiming:
+    """Tests for attack and hangover behaviour."""
+
+    def test_silence_is_not_speech(self):
+        vad = EnergyVAD()
+        results = feed(vad, make_chunk(0, noise=20), 20)
+        assert not any(r.is_speech for r in results)
+
+    def test_speech_start_and_end_edges(self):
+        vad = EnergyVAD(hangover_ms=200)
+        feed(vad, make_chunk(0, noise=20), 10)
+
+        results = feed(vad, make_chunk(4000), 3)
+        assert results[0].speech_started
+        assert sum(r.speech_started for r in results) == 1
+
+        # 200 ms hangover at 64 ms per chunk -> ends on the 4th silent chunk
+        results = feed(vad, make_chunk(0, noise=20), 5)
+        ended = [r.speech_ended for r in results]
+        assert ended == [False, False, False, True, False]
+
+    def test_attack_rejects_single_click(self):
+        vad = EnergyVAD(attack_ms=100)
+        feed(vad, make_chunk(0, noise=20), 5)
+        results = [vad.process(make_chunk(8000))] + feed(vad, make_chunk(0, noise=20), 5)
+        assert not any(r.speech_started for r in results)
+
+
+class TestAdaptiveNoiseFloor:
+    """Tests for the adaptive threshold."""
+
+    def test_steady_fan_noise_is_absorbed(self):
+        """Stationary noise above the old fixed 800 threshold stops counting as speech."""
+        vad = EnergyVAD()
+        fan = make_chunk(0, noise=1000)
+        results = feed(vad, fan, 400)
+        assert not results[-1].is_speech
+        assert results[-1].noise_floor > 500
+
+    def test_quiet_speaker_detected_in_quiet_room(self):
+        """A quiet voice well below the old 800 RMS threshold still triggers."""
+        vad = EnergyVAD()
+        feed(vad, make_chunk(0, noise=30), 20)
+        results = feed(vad, make_chunk(600), 2)
+        assert any(r.speech_started for r in results)
+
+    def test_fixed_threshold_mode(self):
+        vad = EnergyVAD(adaptive=False, min_threshold=800)
+        results = feed(vad, make_chunk(0, noise=1000), 50)
+        assert results[-1].threshold == 800
+        assert results[-1].is_speech
+
+
+class TestRegistry:
+    def test_create_energy_vad(self):
+        vad = create_vad("energy", sample_rate=SAMPLE_RATE)
+        assert isinstance(vad, EnergyVAD)
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            create_vad("nope")
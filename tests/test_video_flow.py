@@ -0,0 +1,111 @@
+"""
+Tests for backend-driven client video flow control.
+"""
+import asyncio
+
+import pytest
+
+from video_flow import VideoFlowController, mode_for, OFF, LISTENING, USER_SPEAKING, MODEL_SPEAKING
+
+
+def state(session=True, paused=False, user=False, model=False, video_mode="client", frame_cost_s=0.0):
+    return {"session": session, "paused": paused, "user_speaking": user, "model_speaking": model,
+            "video_mode": video_mode, "frame_cost_s": frame_cost_s}
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, event, payload, room=None):
+        self.calls.append((event, payload, room))
+
+
+class TestModes:
+    """Tests for mapping session state to a mode."""
+
+    @pytest.mark.parametrize("s, expected", [
+        (None, OFF),
+        (state(session=False), OFF),
+        (state(paused=True, user=True), OFF),
+        (state(), LISTENING),
+        (state(model=True), MODEL_SPEAKING),
+        (state(user=True, model=True), USER_SPEAKING),
+        (state(user=True, video_mode="screen"), OFF),
+        (state(user=True, video_mode="camera"), OFF),
+        (state(user=True, video_mode="none"), OFF),
+    ])
+    def test_mode_for(self, s, expected):
+        assert mode_for(s) == expected
+
+
+class TestVideoFlowController:
+    """Tests for policy computation and emission."""
+
+    def test_off_means_zero_fps(self):
+        flow = VideoFlowController(Recorder(), lambda: None)
+        assert flow.compute()["fps"] == 0
+
+    def test_rate_follows_speaking_state(self):
+        flow = VideoFlowController(Recorder(), lambda: None)
+        model = flow.compute(state(model=True))["fps"]
+        listening = flow.compute(state())["fps"]
+        speaking = flow.compute(state(user=True))["fps"]
+        assert 0 < model < listening < speaking
+
+    def test_ingest_cost_caps_fps(self):
+        flow = VideoFlowController(Recorder(), lambda: None, cpu_budget=0.02)
+        flow.add_client("a")
+        flow.record_ingest("a", 10_000, 0.02)  # 20 ms per frame -> 1 fps fits 2%
+        assert flow.compute(state(user=True))["fps"] == pytest.approx(1.0)
+
+    def test_processing_cost_counts_against_budget(self):
+        flow = VideoFlowController(Recorder(), lambda: None, cpu_budget=0.02)
+        flow.add_client("a")
+        flow.record_ingest("a", 10_000, 0.00001)  # Storing the bytes is nearly free
+        assert flow.compute(state(user=True))["fps"] == 2.0
+        # Decode + hash + encode in the frame slot: 20 ms -> 1 fps fits 2%
+        assert flow.compute(state(user=True, frame_cost_s=0.02))["fps"] == pytest.approx(1.0, rel=0.01)
+        assert flow.compute(state(user=True, frame_cost_s=0.04))["fps"] == pytest.approx(0.5, rel=0.01)
+        assert flow.get_stats()["process_ms"] == 40.0
+
+    def test_more_senders_lower_rate(self):
+        flow = VideoFlowController(Recorder(), lambda: None, cpu_budget=0.02)
+        for sid in ("a", "b"):
+            flow.add_client(sid)
+            flow.record_ingest(sid, 10_000, 0.02)
+        assert flow.compute(state(user=True))["fps"] == pytest.approx(0.5)
+
+    def test_large_frames_lower_quality(self):
+        flow = VideoFlowController(Recorder(), lambda: None, target_bytes=40_000)
+        flow.add_client("a")
+        flow.record_ingest("a", 80_000, 0.0001)
+        quality = flow.compute(state())["quality"]
+        assert flow.min_quality <= quality < 0.6
+
+    def test_policy_emitted_only_on_change(self):
+        emit = Recorder()
+        current = {"s": state()}
+        flow = VideoFlowController(emit, lambda: current["s"])
+        flow.add_client("a")
+        flow.add_client("b")
+
+        async def run():
+            await flow.tick_once()
+            await flow.tick_once()
+            current["s"] = state(user=True)
+            await flow.tick_once()
+
+        asyncio.run(run())
+        assert len(emit.calls) == 4
+        assert {room for _, _, room in emit.calls} == {"a", "b"}
+        assert emit.calls[-1][1]["mode"] == USER_SPEAKING
+        assert all(event == "video_policy" for event, _, _ in emit.calls)
+
+    def test_removed_client_not_emitted(self):
+        emit = Recorder()
+        flow = VideoFlowController(emit, lambda: state())
+        flow.add_client("a")
+        flow.remove_client("a")
+        asyncio.run(flow.tick_once())
+        assert emit.calls == []
@@ -0,0 +1,74 @@
+"""
+Tests for the binary visualizer feed.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from visualizer_feed import VisualizerFeed
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, event, payload):
+        self.events.append((event, payload))
+
+
+def tone(freq, rate=24000, samples=2048, amplitude=16000):
+    t = np.arange(samples) / rate
+    return (np.sin(2 * np.pi * freq * t) * amplitude).astype(np.int16).tobytes()
+
+
+class TestVisualizerFeed:
+    """Tests for frame contents and rate limiting."""
+
+    def test_frame_layout_and_peak_band(self):
+        feed = VisualizerFeed(None, bins=32)
+        feed.push(tone(1000))
+        frame = feed.compute_frame()
+        assert isinstance(frame, bytes)
+        assert len(frame) == 33
+        assert frame[0] > 150  # -3 dBFS sine
+        bands = np.frombuffer(frame[1:], dtype=np.uint8)
+        peak_hz = feed._edges[int(np.argmax(bands))] * feed.sample_rate / feed.window
+        assert 700 < peak_hz < 1200
+
+    def test_silence_is_zero(self):
+        feed = VisualizerFeed(None, bins=16)
+        feed.push(bytes(4096))
+        assert feed.compute_frame() == bytes(17)
+
+    async def test_many_pushes_one_frame_per_tick(self):
+        rec = Recorder()
+        feed = VisualizerFeed(rec, bins=8)
+        for _ in range(50):
+            feed.push(tone(440, samples=480))
+        await feed.tick_once()
+        await feed.tick_once()  # Nothing new: one settling zero frame
+        await feed.tick_once()  # Then quiet
+        assert [e for e, _ in rec.events] == ["audio_levels", "audio_levels"]
+        assert rec.events[1][1] == bytes(9)
+        assert feed.get_stats()["chunks_pushed"] == 50
+
+    async def test_raw_pcm_is_batched(self):
+        rec = Recorder()
+        feed = VisualizerFeed(rec, raw_pcm=True)
+        chunks = [tone(440, samples=480) for _ in range(3)]
+        for chunk in chunks:
+            feed.push(chunk)
+        await feed.tick_once()
+        assert rec.events[1] == ("audio_pcm", b"".join(chunks))
+
+    async def test_ticker_respects_rate(self):
+        rec = Recorder()
+        feed = VisualizerFeed(rec, tick_hz=20)
+        feed.start()
+        for _ in range(20):
+            feed.push(tone(440, samples=240))
+            await asyncio.sleep(0.01)
+        feed.stop()
+        # ~200 ms of pushes at 100/s -> about 4-5 frames at 20 Hz, never one per push
+        assert 2 <= len(rec.events) <= 7